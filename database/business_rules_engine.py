@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Business Rules Engine v1.0 - Reglas de negocio compiladas para MatcherV3
+=========================================================================
+
+VERSION: 1.0.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+MatcherV3._check_business_rules() y _evaluate_rule_only() re-ordenaban todas
+las reglas_forzar_isco por prioridad en cada oferta y hacian un `in` por cada
+termino de cada condicion. Con cada iteracion de aprendizaje se suman reglas
+y el costo crecia linealmente.
+
+COMPILACION (una vez, al cargar matching_rules_business.json):
+1. Reglas aplicables (activa + forzar_isco/forzar_isco_familia) ordenadas por
+   prioridad (mismo sort estable que antes)
+2. Terminos de todas las condiciones de texto -> automata Aho-Corasick
+   (multi_pattern) + indice invertido termino -> reglas
+3. Por oferta: una pasada del automata por campo (titulo, titulo original,
+   tareas, titulo+tareas) y solo se evaluan las reglas candidatas (las que
+   tienen algun termino presente). Las condiciones AND/OR se resuelven con
+   lookups en los sets de terminos encontrados.
+
+SEMANTICA: identica a la evaluacion anterior (substring case-insensitive,
+AND entre condiciones, OR dentro de cada una, filtros de area/sector y
+exclusiones). Condiciones no soportadas por MatcherV3 se ignoran igual que antes.
+
+Uso:
+    from business_rules_engine import CompiledRuleEngine
+
+    engine = CompiledRuleEngine(business_rules)
+    for rule_id, rule in engine.matching_rules(oferta_nlp):
+        ...  # en orden de prioridad
+"""
+
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from multi_pattern import MultiPatternMatcher
+
+# Condiciones de texto: (clave, campo donde se busca, modo any/all)
+TEXT_CONDITIONS = (
+    ("titulo_contiene_alguno", "titulo", "any"),
+    ("titulo_contiene_alguno_2", "titulo", "any"),
+    ("titulo_contiene_todos", "titulo", "all"),
+    ("titulo_o_tareas_contiene_alguno", "titulo|tareas", "any"),
+    ("skills_contiene_alguno", "combinado", "any"),
+)
+
+
+class _CompiledRule:
+    """Regla con terminos ya normalizados a ids del automata."""
+
+    __slots__ = (
+        "rule_id", "rule", "position", "critica", "text_conditions",
+        "area", "sector", "sectores_validos", "excluir_titulo",
+        "excluir_sector", "excluir_area", "always_candidate"
+    )
+
+
+class CompiledRuleEngine:
+    """
+    Motor de reglas_forzar_isco compilado (indice invertido + Aho-Corasick).
+    """
+
+    VERSION = "1.0.0"
+
+    def __init__(self, business_rules: Dict):
+        reglas = (business_rules or {}).get("reglas_forzar_isco", {})
+
+        # Mismo orden que el sorted() por prioridad de MatcherV3 v3.4.1
+        reglas_ordenadas = sorted(
+            reglas.items(),
+            key=lambda x: x[1].get("prioridad", 99) if isinstance(x[1], dict) else 99
+        )
+
+        terms: List[str] = []
+        self.rules: List[_CompiledRule] = []
+
+        for rule_id, rule in reglas_ordenadas:
+            if not isinstance(rule, dict) or not rule.get("activa", False):
+                continue
+            accion = rule.get("accion", {})
+            if not (accion.get("forzar_isco") or accion.get("forzar_isco_familia", "")):
+                continue
+
+            condicion = rule.get("condicion", {})
+            compiled = _CompiledRule()
+            compiled.rule_id = rule_id
+            compiled.rule = rule
+            compiled.position = len(self.rules)
+            compiled.critica = bool(rule.get("correccion_critica", False))
+
+            compiled.text_conditions = []
+            for key, field, mode in TEXT_CONDITIONS:
+                terminos = [t.lower() for t in condicion.get(key, [])]
+                if terminos:
+                    compiled.text_conditions.append((field, mode, terminos))
+                    terms.extend(terminos)
+
+            compiled.area = (condicion.get("area_funcional_es") or "").lower() or None
+            compiled.sector = (condicion.get("sector_es") or "").lower() or None
+            compiled.sectores_validos = {s.lower() for s in condicion.get("sector_empresa_es_alguno", [])}
+            compiled.excluir_titulo = [t.lower() for t in condicion.get("titulo_no_contiene_alguno", [])]
+            compiled.excluir_sector = {s.lower() for s in condicion.get("sector_no_es", [])}
+            compiled.excluir_area = {a.lower() for a in condicion.get("area_funcional_no_es", [])}
+            terms.extend(compiled.excluir_titulo)
+
+            self.rules.append(compiled)
+
+        self.automaton = MultiPatternMatcher(terms)
+        term_id = self.automaton.term_ids
+
+        # Indice invertido: termino -> posiciones de reglas que lo usan en
+        # una condicion positiva. Las reglas sin condiciones de texto nunca
+        # aplican (condicion_texto_cumplida=False), no se indexan.
+        self.term_to_rules: Dict[int, List[int]] = {}
+        for compiled in self.rules:
+            ids = set()
+            compiled.text_conditions = [
+                (field, mode, [term_id[t] for t in terminos])
+                for field, mode, terminos in compiled.text_conditions
+            ]
+            for _, _, term_ids in compiled.text_conditions:
+                ids.update(term_ids)
+            for tid in ids:
+                self.term_to_rules.setdefault(tid, []).append(compiled.position)
+            compiled.excluir_titulo = [term_id[t] for t in compiled.excluir_titulo]
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _hits(self, oferta_nlp: Dict) -> Dict[str, Set[int]]:
+        """Una pasada del automata por campo."""
+        titulo = (oferta_nlp.get("titulo_limpio") or oferta_nlp.get("titulo", "")).lower()
+        # v3.3.4: exclusiones sobre el titulo ORIGINAL
+        titulo_original = (oferta_nlp.get("titulo", "")).lower()
+        tareas = (oferta_nlp.get("tareas_explicitas") or "").lower()
+
+        hits_titulo = self.automaton.find(titulo)
+        hits_tareas = self.automaton.find(tareas)
+        return {
+            "titulo": hits_titulo,
+            "titulo|tareas": hits_titulo | hits_tareas,
+            # Texto unido: un termino puede cruzar el limite titulo/tareas
+            "combinado": self.automaton.find(f"{titulo} {tareas}"),
+            "original": self.automaton.find(titulo_original),
+        }
+
+    def _evaluate(self, compiled: _CompiledRule, hits: Dict[str, Set[int]], oferta_nlp: Dict) -> bool:
+        """Evalua una regla candidata con los sets de terminos encontrados."""
+        if not compiled.text_conditions:
+            return False
+
+        for field, mode, term_ids in compiled.text_conditions:
+            found = hits[field]
+            if mode == "all":
+                if not all(t in found for t in term_ids):
+                    return False
+            elif not any(t in found for t in term_ids):
+                return False
+
+        area_actual = (oferta_nlp.get("area_funcional") or "").lower()
+        sector_actual = (oferta_nlp.get("sector_empresa") or "").lower()
+
+        if compiled.area and area_actual != compiled.area:
+            return False
+        if compiled.sector and sector_actual != compiled.sector:
+            return False
+        if compiled.sectores_validos and sector_actual not in compiled.sectores_validos:
+            return False
+
+        # EXCLUSIONES
+        if compiled.excluir_titulo and any(t in hits["original"] for t in compiled.excluir_titulo):
+            return False
+        if sector_actual in compiled.excluir_sector:
+            return False
+        if area_actual in compiled.excluir_area:
+            return False
+
+        return True
+
+    def matching_rules(self, oferta_nlp: Dict, critica_only: bool = False) -> Iterator[Tuple[str, Dict]]:
+        """
+        Reglas que cumplen sus condiciones, en orden de prioridad.
+
+        Args:
+            oferta_nlp: Dict NLP de la oferta
+            critica_only: Solo reglas con correccion_critica=true
+
+        Yields:
+            (rule_id, rule) - el llamador decide si aplica (ej: label ESCO valido)
+        """
+        if not self.rules:
+            return
+
+        hits = self._hits(oferta_nlp)
+        candidates = set()
+        for tid in hits["titulo|tareas"] | hits["combinado"]:
+            candidates.update(self.term_to_rules.get(tid, ()))
+
+        for position in sorted(candidates):
+            compiled = self.rules[position]
+            if critica_only and not compiled.critica:
+                continue
+            if self._evaluate(compiled, hits, oferta_nlp):
+                yield compiled.rule_id, compiled.rule
+
+    def first_match(self, oferta_nlp: Dict, critica_only: bool = False) -> Optional[Tuple[str, Dict]]:
+        """Primera regla (mayor prioridad) que cumple sus condiciones."""
+        return next(self.matching_rules(oferta_nlp, critica_only=critica_only), None)
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Embedding Cache v1.1 - Cache persistente de embeddings de texto
+================================================================
+
+VERSION: 1.1.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+Los mismos titulo_limpio ("Vendedor", "Administrativo contable") y fragmentos
+de tareas se repiten miles de veces en ofertas_nlp. Este cache guarda en disco
+el embedding de cada texto para no volver a encodearlo con BGE-M3 en cada
+corrida de NLP/matching.
+
+CLAVE:
+sha1(modelo + texto normalizado). Normalizacion: Unicode NFC + espacios
+colapsados + strip (no cambia lo que ve el tokenizer de BGE-M3).
+
+ALMACENAMIENTO:
+SQLite aparte (database/embeddings/embedding_cache.db), vector float32 como
+BLOB. Tamaño acotado con eviccion LRU por last_access.
+
+v1.1: Los hits no escriben en cada lookup: last_access se acumula en memoria
+y se vuelca cada ACCESS_FLUSH_EVERY claves (o en put_many/stats/close). El
+conteo de entradas se lleva en memoria; el COUNT(*) real solo corre cuando
+la estimacion supera max_entries.
+
+COMPARTIDO POR:
+- SkillsImplicitExtractor.encode() / prefetch()
+- MatcherV3._semantic_match_title() (via skills_extractor.encode)
+- generate_skills_embeddings()
+
+CONFIG (config/matching_config.json):
+    "embedding_cache": {"enabled": true, "path": ..., "max_entries": 200000}
+Desactivar por entorno: MOL_EMBEDDING_CACHE=0
+Otro archivo por entorno: MOL_EMBEDDING_CACHE_PATH=/ruta/cache.db
+
+Uso:
+    from embedding_cache import get_embedding_cache
+
+    cache = get_embedding_cache()
+    vectors = cache.encode(model, "BAAI/bge-m3", ["Vendedor", "Cajero"])
+    print(cache.stats())
+"""
+
+import os
+import json
+import atexit
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+import re
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).parent
+CONFIG_PATH = BASE_DIR.parent / "config" / "matching_config.json"
+DEFAULT_CACHE_PATH = BASE_DIR / "embeddings" / "embedding_cache.db"
+DEFAULT_MAX_ENTRIES = 200000
+
+# Al superar max_entries se borra hasta quedar en este porcentaje
+EVICTION_TARGET = 0.9
+
+# v1.1: Claves con last_access pendiente antes de volcarlas a disco
+ACCESS_FLUSH_EVERY = 1000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(texto: str) -> str:
+    """Normaliza un texto para usarlo como clave del cache."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", texto)).strip()
+
+
+def cache_key(model_name: str, texto: str) -> str:
+    """Clave del cache: sha1 de modelo + texto normalizado."""
+    raw = f"{model_name}\x00{normalize_text(texto)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Cache persistente (SQLite) de embeddings con eviccion LRU.
+
+    Thread-safe: una sola conexion protegida por lock.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # timeout: varios procesos (match_ofertas_v3 --workers) comparten el archivo
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_cache_access ON embedding_cache(last_access)"
+        )
+        self.conn.commit()
+
+        # v1.1: last_access pendiente (key -> timestamp) y conteo estimado
+        self._pending_access: Dict[str, float] = {}
+        self._entries = self.conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    # =========================================================================
+    # LECTURA / ESCRITURA
+    # =========================================================================
+
+    def get_many(self, model_name: str, textos: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Busca embeddings en el cache.
+
+        Returns:
+            Dict texto -> vector solo para los textos encontrados
+        """
+        keys = {}
+        for texto in textos:
+            keys.setdefault(cache_key(model_name, texto), []).append(texto)
+        if not keys:
+            return {}
+
+        found = {}
+        hit_keys = []
+        key_list = list(keys)
+        with self._lock:
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    hit_keys.append(key)
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    for texto in keys[key]:
+                        found[texto] = vector
+
+            if hit_keys:
+                now = time.time()
+                for k in hit_keys:
+                    self._pending_access[k] = now
+                if len(self._pending_access) >= ACCESS_FLUSH_EVERY:
+                    self._flush_access()
+                    self.conn.commit()
+
+            # Contadores por texto consultado (no por clave unica)
+            hit_count = sum(len(keys[k]) for k in hit_keys)
+            self.hits += hit_count
+            self.misses += sum(len(v) for v in keys.values()) - hit_count
+
+        return found
+
+    def get(self, model_name: str, texto: str) -> Optional[np.ndarray]:
+        """Busca un embedding en el cache (None si no esta)."""
+        return self.get_many(model_name, [texto]).get(texto)
+
+    def put_many(self, model_name: str, items: Iterable[Tuple[str, np.ndarray]]):
+        """Guarda embeddings (texto, vector) y aplica eviccion LRU si corresponde."""
+        now = time.time()
+        rows = []
+        for texto, vector in items:
+            vector = np.asarray(vector, dtype=np.float32)
+            rows.append((cache_key(model_name, texto), model_name, vector.shape[0], vector.tobytes(), now, now))
+        if not rows:
+            return
+
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache "
+                "(key, model, dim, vector, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.writes += len(rows)
+            # Estimacion: INSERT OR REPLACE de una clave existente no suma
+            self._entries += len(rows)
+            self._flush_access()
+            self._evict()
+            self.conn.commit()
+
+    def _flush_access(self):
+        """Vuelca los last_access pendientes (sin commit; llamar con el lock)."""
+        if not self._pending_access:
+            return
+        self.conn.executemany(
+            "UPDATE embedding_cache SET last_access = ? WHERE key = ?",
+            [(ts, k) for k, ts in self._pending_access.items()]
+        )
+        self._pending_access.clear()
+
+    def _evict(self):
+        """Eviccion LRU: borra los menos usados si se supera max_entries."""
+        if not self.max_entries or self._entries <= self.max_entries:
+            return
+        # La estimacion puede sobrecontar (reemplazos): confirmar con el conteo real
+        total = self.conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        self._entries = total
+        if total <= self.max_entries:
+            return
+        excess = total - int(self.max_entries * EVICTION_TARGET)
+        self.conn.execute("""
+            DELETE FROM embedding_cache WHERE key IN (
+                SELECT key FROM embedding_cache ORDER BY last_access ASC LIMIT ?
+            )
+        """, (excess,))
+        self._entries = total - excess
+        self.evictions += excess
+
+    def flush(self):
+        """Persiste los last_access pendientes."""
+        with self._lock:
+            self._flush_access()
+            self.conn.commit()
+
+    # =========================================================================
+    # ENCODING CON CACHE
+    # =========================================================================
+
+    def encode(
+        self,
+        model,
+        model_name: str,
+        textos: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False
+    ) -> List[np.ndarray]:
+        """
+        Retorna los embeddings de textos, encodeando solo los que faltan.
+
+        Args:
+            model: SentenceTransformer (o callable sin argumentos que lo retorne,
+                   para no cargar el modelo si todo esta en cache)
+            model_name: Nombre del modelo (parte de la clave)
+            textos: Textos a encodear
+            batch_size: Batch del modelo para los textos faltantes
+            show_progress_bar: Barra de progreso de sentence-transformers
+
+        Returns:
+            Lista de vectores en el mismo orden que textos
+        """
+        found = self.get_many(model_name, textos)
+        missing = list(dict.fromkeys(t for t in textos if t not in found))
+
+        if missing:
+            if callable(model) and not hasattr(model, "encode"):
+                model = model()
+            vectors = model.encode(
+                missing,
+                batch_size=batch_size,
+                show_progress_bar=show_progress_bar,
+                normalize_embeddings=True
+            )
+            new = list(zip(missing, vectors))
+            self.put_many(model_name, new)
+            found.update(new)
+
+        return [found[t] for t in textos]
+
+    # =========================================================================
+    # METRICAS
+    # =========================================================================
+
+    def stats(self) -> Dict:
+        """Contadores de la sesion + tamaño actual del cache."""
+        with self._lock:
+            self._flush_access()
+            self.conn.commit()
+            entries = self.conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+            self._entries = entries
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+    def reset_stats(self):
+        self.hits = self.misses = self.writes = self.evictions = 0
+
+    def clear(self):
+        """Borra todo el contenido del cache."""
+        with self._lock:
+            self._pending_access.clear()
+            self.conn.execute("DELETE FROM embedding_cache")
+            self.conn.commit()
+            self._entries = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_access()
+            self.conn.commit()
+            self.conn.close()
+
+
+def load_cache_config(config_path: Path = None) -> Dict:
+    """Lee la seccion embedding_cache de matching_config.json."""
+    config = {"enabled": True, "path": None, "max_entries": DEFAULT_MAX_ENTRIES}
+    path = Path(config_path) if config_path else CONFIG_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            section = json.load(f).get("embedding_cache", {})
+        config.update({k: v for k, v in section.items() if not k.startswith("_")})
+    except Exception:
+        pass
+
+    if os.environ.get("MOL_EMBEDDING_CACHE", "").strip().lower() in ("0", "false", "no", "off"):
+        config["enabled"] = False
+    if os.environ.get("MOL_EMBEDDING_CACHE_PATH"):
+        config["path"] = os.environ["MOL_EMBEDDING_CACHE_PATH"]
+    return config
+
+
+# Singleton por proceso (compartido por extractor, matcher y generador)
+_cache_instance = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Obtiene la instancia singleton del cache (None si esta desactivado)."""
+    global _cache_instance
+    if _cache_instance is None:
+        config = load_cache_config()
+        if not config.get("enabled", True):
+            return None
+        path = config.get("path")
+        if path and not Path(path).is_absolute():
+            path = BASE_DIR.parent / path
+        _cache_instance = EmbeddingCache(path=path, max_entries=config.get("max_entries", DEFAULT_MAX_ENTRIES))
+        # v1.1: last_access pendiente se persiste al salir
+        atexit.register(_flush_instance)
+    return _cache_instance
+
+
+def _flush_instance():
+    if _cache_instance is not None:
+        try:
+            _cache_instance.flush()
+        except sqlite3.Error:
+            pass
+
+
+def clear_embedding_cache_instance():
+    """Cierra y descarta el singleton (util para tests)."""
+    global _cache_instance
+    if _cache_instance is not None:
+        _cache_instance.close()
+    _cache_instance = None
+
+
+def main():
+    """CLI: estadisticas y limpieza del cache."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Embedding Cache v1.1")
+    parser.add_argument("--stats", action="store_true", help="Mostrar tamaño del cache")
+    parser.add_argument("--clear", action="store_true", help="Vaciar el cache")
+    args = parser.parse_args()
+
+    cache = get_embedding_cache()
+    if cache is None:
+        print("[CACHE] Cache desactivado (config/entorno)")
+        return
+
+    if args.clear:
+        cache.clear()
+        print(f"[CACHE] Cache vaciado: {cache.path}")
+
+    stats = cache.stats()
+    print(f"[CACHE] {cache.path}")
+    print(f"  Entradas: {stats['entries']}/{stats['max_entries']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Embedding Store v1.2 - Artefactos de embeddings mapeados en memoria
+====================================================================
+
+VERSION: 1.2.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+SkillsImplicitExtractor y MatcherV3 hacian np.load() de las matrices completas
+(copia en el heap de CADA proceso) y json.load() del metadata de skills.
+Con N workers eso son N copias y varios segundos de arranque en frio.
+
+FORMATO:
+- Vectores: el mismo .npy de siempre, abierto con np.load(mmap_mode='r').
+  Solo lectura; todos los procesos comparten la copia del page cache del SO.
+- Metadata: directorio columnar junto al JSON original:
+
+    esco_skills_metadata_full.json            (fuente, sin cambios)
+    esco_skills_metadata_full.columns/
+        schema.json                           columnas, filas, firma del JSON
+        <columna>.data.npy                    uint8, strings UTF-8 concatenados
+        <columna>.offsets.npy                 int64, inicio de cada fila (n+1)
+        <columna>.present.npy                 uint8, 1 si la fila tiene la clave
+
+  Los .npy tambien se abren con mmap; cada dict se arma recien al pedirlo.
+
+El directorio columnar se genera solo la primera vez (o cuando el JSON cambia)
+y si algo falla se cae al json.load() de siempre.
+
+CUANTIZACION (v1.1):
+Variantes reducidas del .npy, generadas a demanda junto al original:
+
+    esco_skills_embeddings_full.float16.npy      2x menos memoria
+    esco_skills_embeddings_full.int8.npy         4x menos memoria
+    esco_skills_embeddings_full.int8.scale.npy   escala float32 por fila
+    esco_skills_embeddings_full.<precision>.json firma del .npy fuente
+
+int8 es simetrico por fila: x ~= codes * scale, scale = max|x| / 127.
+
+ESCRITURA CONCURRENTE (v1.2):
+Con match_ofertas_v3 --workers N varios procesos pueden regenerar el mismo
+artefacto a la vez. save_array y los .json usan un temporal unico por
+escritura (mkstemp en el mismo directorio) + os.replace, y
+prepare_artifacts() los genera una vez en el proceso padre antes del pool.
+load_vectors(path, precision=...) retorna QuantizedVectors; vector_index puede
+re-puntuar la preseleccion contra el float32 original (rescore) para que el
+top-k final use scores exactos.
+
+Uso:
+    from embedding_store import load_vectors, load_metadata
+
+    embeddings = load_vectors(npy_path)       # np.memmap solo lectura
+    embeddings = load_vectors(npy_path, precision="int8")  # QuantizedVectors
+    metadata = load_metadata(json_path)       # secuencia de dicts (lazy)
+    metadata[idx]["label"]
+
+CLI:
+    python embedding_store.py --convert       # Generar columnares de embeddings/
+    python embedding_store.py --quantize int8 # Generar variantes cuantizadas
+"""
+
+import os
+import json
+import tempfile
+import numpy as np
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Dict, List, Union
+
+BASE_DIR = Path(__file__).parent
+EMBEDDINGS_DIR = BASE_DIR / "embeddings"
+
+STORE_FORMAT_VERSION = 1
+
+PRECISIONS = ("float32", "float16", "int8")
+
+# Tipos de columna: str = texto tal cual; json = cualquier otro valor serializado
+COL_STR = "str"
+COL_JSON = "json"
+
+
+def _source_signature(path: Path) -> str:
+    stat = Path(path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def columns_dir_for(json_path: Path) -> Path:
+    """Directorio columnar asociado a un metadata .json."""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.stem + ".columns")
+
+
+def save_array(path: Union[str, Path], array: np.ndarray):
+    """
+    np.save atomico (archivo temporal + os.replace).
+
+    Los procesos que tienen el archivo anterior mapeado siguen leyendo el
+    inodo viejo; sobreescribirlo en el lugar les daria SIGBUS.
+    """
+    _write_atomic(path, lambda f: np.save(f, array))
+
+
+def _write_atomic(path: Union[str, Path], write, mode: str = "wb"):
+    """
+    Escribe path via un temporal unico del mismo directorio + os.replace.
+
+    v1.2: el temporal era <nombre>.tmp fijo; dos procesos regenerando el mismo
+    artefacto se pisaban el temporal (archivo corrupto o FileNotFoundError).
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=path.name + ".", suffix=".tmp")
+    try:
+        encoding = None if "b" in mode else "utf-8"
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class QuantizedVectors:
+    """
+    Matriz de embeddings cuantizada (float16 o int8 por fila), solo lectura.
+
+    Expone lo que usan los indices: len(), shape, size, block(inicio, fin) e
+    indexado (filas decodificadas a float32). exact_rows() retorna las filas
+    del float32 original (mmap) si esta disponible, para el rescore.
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        precision: str,
+        scales: np.ndarray = None,
+        full: np.ndarray = None
+    ):
+        self.codes = codes
+        self.precision = precision
+        self.scales = scales
+        self.full = full
+
+    dtype = np.dtype(np.float32)
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def size(self) -> int:
+        return self.codes.size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes de la representacion cuantizada (sin el float32 de rescore)."""
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _decode(self, codes: np.ndarray, scales) -> np.ndarray:
+        decoded = np.asarray(codes, dtype=np.float32)
+        if scales is not None:
+            decoded = decoded * np.asarray(scales, dtype=np.float32)[..., np.newaxis]
+        return decoded
+
+    def dot_block(self, queries: np.ndarray, start: int, end: int,
+                  buffer: np.ndarray = None) -> np.ndarray:
+        """
+        v1.2: queries @ filas[start:end].T sin decodificar las filas.
+
+        Los codes se castean (sin escalar) a un buffer float32 reutilizable y
+        la escala int8 se aplica a los scores: q . (c * s) = s * (q . c).
+        Con bloques chicos el buffer queda en cache y de memoria solo se leen
+        los codes (1-2 bytes por componente en vez de 4).
+        """
+        codes = self.codes[start:end]
+        if buffer is None or len(buffer) < len(codes):
+            buffer = np.empty(codes.shape, dtype=np.float32)
+        rows = buffer[:len(codes)]
+        np.copyto(rows, codes, casting="unsafe")
+        sims = np.dot(queries, rows.T)
+        if self.scales is not None:
+            sims *= self.scales[start:end]
+        return sims
+
+    def block(self, start: int, end: int) -> np.ndarray:
+        """Filas [start, end) decodificadas a float32."""
+        scales = self.scales[start:end] if self.scales is not None else None
+        return self._decode(self.codes[start:end], scales)
+
+    def __getitem__(self, index) -> np.ndarray:
+        scales = self.scales[index] if self.scales is not None else None
+        return self._decode(self.codes[index], scales)
+
+    def exact_rows(self, index) -> np.ndarray:
+        """Filas float32 originales (o decodificadas si no hay original)."""
+        if self.full is not None:
+            return self.full[index]
+        return self[index]
+
+    def __array__(self, dtype=None, copy=None):
+        decoded = self.block(0, len(self))
+        return decoded.astype(dtype, copy=False) if dtype is not None else decoded
+
+
+def _quantized_paths(npy_path: Path, precision: str) -> Dict[str, Path]:
+    npy_path = Path(npy_path)
+    stem = npy_path.stem
+    return {
+        "codes": npy_path.with_name(f"{stem}.{precision}.npy"),
+        "scale": npy_path.with_name(f"{stem}.{precision}.scale.npy"),
+        "meta": npy_path.with_name(f"{stem}.{precision}.json"),
+    }
+
+
+def quantize_array(vectors: np.ndarray, precision: str):
+    """
+    Cuantiza una matriz float32.
+
+    Returns:
+        (codes, scales) - scales es None para float16
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if precision == "float16":
+        return vectors.astype(np.float16), None
+    if precision == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, np.newaxis]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Precision no soportada: {precision}")
+
+
+def quantize_vectors(npy_path: Union[str, Path], precision: str, verbose: bool = False) -> Path:
+    """Genera (o regenera) la variante cuantizada de un .npy float32."""
+    npy_path = Path(npy_path)
+    paths = _quantized_paths(npy_path, precision)
+    codes, scales = quantize_array(np.load(str(npy_path), mmap_mode="r"), precision)
+
+    save_array(paths["codes"], codes)
+    if scales is not None:
+        save_array(paths["scale"], scales)
+    meta = json.dumps({
+        "precision": precision,
+        "source_signature": _source_signature(npy_path),
+    })
+    _write_atomic(paths["meta"], lambda f: f.write(meta), mode="w")
+
+    if verbose:
+        print(f"[STORE] {npy_path.name} -> {paths['codes'].name} ({codes.nbytes / 1e6:.1f} MB)")
+    return paths["codes"]
+
+
+def load_vectors(
+    npy_path: Union[str, Path],
+    mmap: bool = True,
+    precision: str = "float32",
+    rescore: bool = True,
+    verbose: bool = False
+):
+    """
+    Abre una matriz de embeddings .npy.
+
+    Con mmap=True (default) retorna un np.memmap de solo lectura: no copia
+    nada al heap y las paginas se comparten entre procesos.
+
+    v1.1: precision float16/int8 retorna QuantizedVectors (la variante se
+    genera si falta o si el .npy cambio). Con rescore=True se mantiene
+    ademas el float32 mapeado para re-puntuar candidatos (solo se tocan las
+    paginas de esas filas).
+    """
+    npy_path = Path(npy_path)
+    mmap_mode = "r" if mmap else None
+    if not precision or precision == "float32":
+        return np.load(str(npy_path), mmap_mode=mmap_mode)
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precision no soportada: {precision}")
+
+    paths = _quantized_paths(npy_path, precision)
+    fresh = False
+    if paths["codes"].exists() and paths["meta"].exists():
+        try:
+            meta = json.loads(paths["meta"].read_text(encoding="utf-8"))
+            fresh = meta.get("source_signature") == _source_signature(npy_path)
+        except (OSError, ValueError):
+            fresh = False
+    if not fresh:
+        quantize_vectors(npy_path, precision, verbose=verbose)
+
+    codes = np.load(str(paths["codes"]), mmap_mode=mmap_mode)
+    scales = np.load(str(paths["scale"]), mmap_mode=mmap_mode) if precision == "int8" else None
+    full = np.load(str(npy_path), mmap_mode="r") if rescore else None
+    return QuantizedVectors(codes, precision, scales=scales, full=full)
+
+
+class ColumnarMetadata(Sequence):
+    """
+    Secuencia de dicts respaldada por columnas mapeadas en memoria.
+
+    Se comporta como la lista que devolvia json.load(): len(), [idx],
+    slicing e iteracion. Cada fila se decodifica al accederla.
+    """
+
+    def __init__(self, columns_dir: Path):
+        self.columns_dir = Path(columns_dir)
+        with open(self.columns_dir / "schema.json", "r", encoding="utf-8") as f:
+            self.schema = json.load(f)
+
+        self._rows = self.schema["rows"]
+        self._columns = []
+        for col in self.schema["columns"]:
+            name = col["name"]
+            self._columns.append((
+                name,
+                col["type"],
+                np.load(str(self.columns_dir / f"{col['file']}.data.npy"), mmap_mode="r"),
+                np.load(str(self.columns_dir / f"{col['file']}.offsets.npy"), mmap_mode="r"),
+                np.load(str(self.columns_dir / f"{col['file']}.present.npy"), mmap_mode="r"),
+            ))
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _row(self, i: int) -> Dict:
+        row = {}
+        for name, col_type, data, offsets, present in self._columns:
+            if not present[i]:
+                continue
+            raw = data[offsets[i]:offsets[i + 1]].tobytes().decode("utf-8")
+            row[name] = raw if col_type == COL_STR else json.loads(raw)
+        return row
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(self._rows))]
+        index = int(index)
+        if index < 0:
+            index += self._rows
+        if not 0 <= index < self._rows:
+            raise IndexError(index)
+        return self._row(index)
+
+    def column(self, name: str) -> List:
+        """Valores de una columna completa (None donde falta la clave)."""
+        return [row.get(name) for row in self]
+
+
+def write_columnar(records: List[Dict], columns_dir: Path, source_signature: str = "") -> Path:
+    """Escribe una lista de dicts en formato columnar."""
+    columns_dir = Path(columns_dir)
+    columns_dir.mkdir(parents=True, exist_ok=True)
+    (columns_dir / "schema.json").unlink(missing_ok=True)
+
+    names = list(dict.fromkeys(key for record in records for key in record))
+    schema_columns = []
+
+    for pos, name in enumerate(names):
+        values = [record.get(name) for record in records]
+        present = np.array([name in record for record in records], dtype=np.uint8)
+        col_type = COL_STR if all(isinstance(v, str) for v, p in zip(values, present) if p) else COL_JSON
+
+        encoded = []
+        for value, is_present in zip(values, present):
+            if not is_present:
+                encoded.append(b"")
+            elif col_type == COL_STR:
+                encoded.append(value.encode("utf-8"))
+            else:
+                encoded.append(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+        offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        file_stem = f"c{pos}"
+        save_array(columns_dir / f"{file_stem}.data.npy", data)
+        save_array(columns_dir / f"{file_stem}.offsets.npy", offsets)
+        save_array(columns_dir / f"{file_stem}.present.npy", present)
+        schema_columns.append({"name": name, "type": col_type, "file": file_stem})
+
+    # schema.json al final: si la escritura se corta, el directorio queda invalido
+    schema = {
+        "format_version": STORE_FORMAT_VERSION,
+        "rows": len(records),
+        "columns": schema_columns,
+        "source_signature": source_signature,
+    }
+    _write_atomic(columns_dir / "schema.json",
+                  lambda f: json.dump(schema, f, ensure_ascii=False, indent=2), mode="w")
+
+    return columns_dir
+
+
+def convert_metadata(json_path: Union[str, Path], verbose: bool = False) -> Path:
+    """Genera (o regenera) el directorio columnar de un metadata .json."""
+    json_path = Path(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    columns_dir = write_columnar(records, columns_dir_for(json_path), _source_signature(json_path))
+    if verbose:
+        print(f"[STORE] {json_path.name} -> {columns_dir.name} ({len(records)} filas)")
+    return columns_dir
+
+
+def load_metadata(json_path: Union[str, Path], verbose: bool = False) -> Sequence:
+    """
+    Carga metadata de embeddings.
+
+    Usa el directorio columnar si existe y corresponde al JSON actual; si no,
+    intenta generarlo. Ante cualquier error retorna json.load() (lista).
+    """
+    json_path = Path(json_path)
+    columns_dir = columns_dir_for(json_path)
+    signature = _source_signature(json_path)
+
+    try:
+        schema_path = columns_dir / "schema.json"
+        if schema_path.exists():
+            with open(schema_path, "r", encoding="utf-8") as f:
+                schema = json.load(f)
+            if (schema.get("source_signature") == signature
+                    and schema.get("format_version") == STORE_FORMAT_VERSION):
+                return ColumnarMetadata(columns_dir)
+
+        convert_metadata(json_path, verbose=verbose)
+        return ColumnarMetadata(columns_dir)
+
+    except Exception as e:
+        if verbose:
+            print(f"[STORE] WARN: metadata columnar no disponible ({e}), usando JSON")
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def prepare_artifacts(precision: str = "float32", embeddings_dir: Union[str, Path] = EMBEDDINGS_DIR,
+                      verbose: bool = False) -> int:
+    """
+    v1.2: Genera (si faltan o estan desactualizados) los columnares de cada
+    *metadata*.json y la variante `precision` de cada *embeddings*.npy.
+
+    Llamarlo en el proceso padre antes de arrancar un pool de workers, asi
+    los workers solo abren artefactos ya generados.
+
+    Returns:
+        Cantidad de artefactos revisados
+    """
+    base = Path(embeddings_dir)
+    if not base.exists():
+        return 0
+    checked = 0
+    for json_path in sorted(base.glob("*metadata*.json")):
+        load_metadata(json_path, verbose=verbose)
+        checked += 1
+    if precision and precision != "float32":
+        for npy_path in sorted(base.glob("*embeddings*.npy")):
+            if len(npy_path.suffixes) > 1:
+                continue  # variantes cuantizadas
+            load_vectors(npy_path, precision=precision, rescore=False, verbose=verbose)
+            checked += 1
+    return checked
+
+
+def main():
+    """CLI para generar los directorios columnares."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Embedding Store v1.0")
+    parser.add_argument("--convert", action="store_true", help="Generar metadata columnar")
+    parser.add_argument("--quantize", type=str, choices=["float16", "int8"], default=None,
+                        help="Generar variante cuantizada de cada .npy")
+    parser.add_argument("--dir", type=str, default=str(EMBEDDINGS_DIR), help="Directorio de embeddings")
+    args = parser.parse_args()
+
+    base = Path(args.dir)
+    for json_path in sorted(base.glob("*metadata*.json")):
+        if args.convert:
+            convert_metadata(json_path, verbose=True)
+
+        start = time.perf_counter()
+        metadata = load_metadata(json_path)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"[STORE] {json_path.name}: {len(metadata)} filas, carga {elapsed:.1f} ms ({type(metadata).__name__})")
+
+    for npy_path in sorted(base.glob("*embeddings*.npy")):
+        if len(npy_path.suffixes) > 1:
+            continue  # variantes cuantizadas
+        if args.quantize:
+            quantize_vectors(npy_path, args.quantize, verbose=True)
+
+        start = time.perf_counter()
+        vectors = load_vectors(npy_path)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"[STORE] {npy_path.name}: shape={vectors.shape}, mmap {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM Cache v1.0 - Cache de respuestas LLM direccionado por contenido
+===================================================================
+
+VERSION: 1.0.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+Las ofertas se republican y la misma descripcion aparece con varios id_oferta
+(distintos portales, reposts). NLPExtractorV11._extract_capa1_llm consulta este
+cache antes de llamar a Ollama: misma entrada => misma respuesta (temperature 0).
+
+CLAVE:
+sha1(prompt_version + modelo + options + prompt normalizado). El prompt
+renderizado ya incluye titulo, empresa, ubicacion y descripcion, asi que la
+clave cubre todo lo que ve el LLM. Normalizacion: Unicode NFC + espacios
+colapsados + strip (igual que embedding_cache).
+
+VALOR:
+Texto crudo de la respuesta del LLM (JSON sin parsear). Solo se guardan
+respuestas que parsean bien; el parseo/validacion se repite en cada hit.
+
+ALMACENAMIENTO:
+SQLite aparte (database/cache/llm_response_cache.db), eviccion LRU por
+last_access. Al cambiar el prompt subir PROMPT_VERSION en
+prompts/extraction_prompt_lite_v1.py y evictar la version anterior.
+
+Desactivar por entorno: MOL_LLM_CACHE=0
+
+Uso:
+    from llm_cache import get_llm_cache
+
+    cache = get_llm_cache()
+    key = cache.make_key(PROMPT_VERSION, "qwen2.5:7b", options, prompt)
+    text = cache.get(key)
+    print(cache.stats())
+
+CLI:
+    python llm_cache.py --stats
+    python llm_cache.py --evict-prompt-version extraction_prompt_lite_v1@1.1
+    python llm_cache.py --keep-current      # Borra todo lo que no sea PROMPT_VERSION
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_CACHE_PATH = BASE_DIR / "cache" / "llm_response_cache.db"
+DEFAULT_MAX_ENTRIES = 500000
+
+# Al superar max_entries se borra hasta quedar en este porcentaje
+EVICTION_TARGET = 0.9
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(texto: str) -> str:
+    """Normaliza un texto para usarlo como clave del cache."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", texto or "")).strip()
+
+
+def cache_key(prompt_version: str, model_name: str, options: Dict, prompt: str) -> str:
+    """Clave del cache: sha1 de version de prompt + modelo + options + prompt normalizado."""
+    raw = "\x00".join([
+        prompt_version,
+        model_name,
+        json.dumps(options or {}, sort_keys=True),
+        normalize_text(prompt),
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Cache persistente (SQLite) de respuestas LLM con eviccion LRU.
+
+    Thread-safe: una sola conexion protegida por lock (--concurrency usa hilos).
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                prompt_version TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_version ON llm_cache(prompt_version)"
+        )
+        self.conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(prompt_version: str, model_name: str, options: Dict, prompt: str) -> str:
+        return cache_key(prompt_version, model_name, options, prompt)
+
+    # =========================================================================
+    # LECTURA / ESCRITURA
+    # =========================================================================
+
+    def get(self, key: str) -> Optional[str]:
+        """Respuesta cruda guardada para key (None si no esta)."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, prompt_version: str, model_name: str, response: str):
+        """Guarda la respuesta cruda y aplica eviccion LRU si corresponde."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, prompt_version, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, prompt_version, model_name, response, now, now)
+            )
+            self.writes += 1
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Eviccion LRU: borra los menos usados si se supera max_entries."""
+        if not self.max_entries:
+            return
+        total = self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if total <= self.max_entries:
+            return
+        excess = total - int(self.max_entries * EVICTION_TARGET)
+        self.conn.execute("""
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?
+            )
+        """, (excess,))
+        self.evictions += excess
+
+    # =========================================================================
+    # MANTENIMIENTO
+    # =========================================================================
+
+    def evict_prompt_version(self, prompt_version: str) -> int:
+        """Borra las respuestas de una version de prompt. Retorna filas borradas."""
+        with self._lock:
+            deleted = self.conn.execute(
+                "DELETE FROM llm_cache WHERE prompt_version = ?", (prompt_version,)
+            ).rowcount
+            self.conn.commit()
+        self.evictions += deleted
+        return deleted
+
+    def evict_other_versions(self, current_version: str) -> int:
+        """Borra todas las respuestas que no sean de current_version."""
+        with self._lock:
+            deleted = self.conn.execute(
+                "DELETE FROM llm_cache WHERE prompt_version != ?", (current_version,)
+            ).rowcount
+            self.conn.commit()
+        self.evictions += deleted
+        return deleted
+
+    def version_counts(self) -> Dict[str, int]:
+        """Entradas por prompt_version."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT prompt_version, COUNT(*) FROM llm_cache "
+                "GROUP BY prompt_version ORDER BY prompt_version"
+            ).fetchall()
+        return {version: count for version, count in rows}
+
+    # =========================================================================
+    # METRICAS
+    # =========================================================================
+
+    def stats(self) -> Dict:
+        """Contadores de la sesion + tamaño actual del cache."""
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+    def reset_stats(self):
+        self.hits = self.misses = self.writes = self.evictions = 0
+
+    def clear(self):
+        """Borra todo el contenido del cache."""
+        with self._lock:
+            self.conn.execute("DELETE FROM llm_cache")
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def cache_enabled() -> bool:
+    """False si MOL_LLM_CACHE desactiva el cache."""
+    return os.environ.get("MOL_LLM_CACHE", "").strip().lower() not in ("0", "false", "no", "off")
+
+
+# Singleton por proceso
+_cache_instance = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Obtiene la instancia singleton del cache (None si esta desactivado)."""
+    global _cache_instance
+    if _cache_instance is None:
+        if not cache_enabled():
+            return None
+        _cache_instance = LLMCache(path=os.environ.get("MOL_LLM_CACHE_PATH") or None)
+    return _cache_instance
+
+
+def clear_llm_cache_instance():
+    """Cierra y descarta el singleton (util para tests)."""
+    global _cache_instance
+    if _cache_instance is not None:
+        _cache_instance.close()
+    _cache_instance = None
+
+
+def main():
+    """CLI: estadisticas, eviccion por version de prompt y limpieza."""
+    import argparse
+    import sys
+
+    sys.path.insert(0, str(BASE_DIR))
+    from prompts.extraction_prompt_lite_v1 import PROMPT_VERSION
+
+    parser = argparse.ArgumentParser(description="LLM Cache v1.0")
+    parser.add_argument("--stats", action="store_true", help="Mostrar entradas por version de prompt")
+    parser.add_argument("--evict-prompt-version", type=str, metavar="VERSION",
+                        help="Borrar las respuestas de una version de prompt")
+    parser.add_argument("--keep-current", action="store_true",
+                        help=f"Borrar todo lo que no sea {PROMPT_VERSION}")
+    parser.add_argument("--clear", action="store_true", help="Vaciar el cache")
+    args = parser.parse_args()
+
+    cache = get_llm_cache()
+    if cache is None:
+        print("[CACHE] Cache LLM desactivado (MOL_LLM_CACHE)")
+        return
+
+    if args.clear:
+        cache.clear()
+        print(f"[CACHE] Cache vaciado: {cache.path}")
+    if args.evict_prompt_version:
+        deleted = cache.evict_prompt_version(args.evict_prompt_version)
+        print(f"[CACHE] {deleted} respuestas borradas ({args.evict_prompt_version})")
+    if args.keep_current:
+        deleted = cache.evict_other_versions(PROMPT_VERSION)
+        print(f"[CACHE] {deleted} respuestas de versiones anteriores borradas")
+
+    stats = cache.stats()
+    print(f"[CACHE] {cache.path}")
+    print(f"  Entradas: {stats['entries']}/{stats['max_entries']}")
+    if args.stats:
+        for version, count in cache.version_counts().items():
+            marca = " (actual)" if version == PROMPT_VERSION else ""
+            print(f"  {version}: {count}{marca}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Match By Skills v1.2 - Matchea ocupaciones ESCO usando skills extraídas
+Match By Skills v1.3 - Matchea ocupaciones ESCO usando skills extraídas
 ========================================================================
 
-VERSION: 1.2.0
-FECHA: 2026-01-13
+VERSION: 1.3.0
+FECHA: 2026-10-18
+
+CAMBIOS v1.3.0:
+- Grafo skill -> ocupación en formato CSR (numpy: indptr/indices/data) con
+  skills y ocupaciones indexadas por entero, en vez de dict de listas de tuplas
+- Scoring vectorizado (np.bincount) + argpartition para el top N
+- match_batch(): scoring de N ofertas en una sola pasada
+- Mismos scores y mismo orden que v1.2 (suma en el mismo orden, empates por
+  primera aparición)
 
 CAMBIOS v1.2.0:
 - Añade pesos para skills genéricas (comunicación, trabajo en equipo, etc.)
@@ -37,7 +45,7 @@ Uso:
 import sqlite3
 import logging
 import json
-from collections import defaultdict
+import numpy as np
 from typing import List, Dict, Optional
 from pathlib import Path
 
@@ -59,13 +67,16 @@ class SkillsBasedMatcher:
 
     v1.1.0: Añade pesos por origen (tarea vs titulo) - tareas valen 1.2x
     v1.2.0: Añade pesos para skills genéricas (comunicación, etc.) - valen 0.5x
+    v1.3.0: Grafo de asociaciones en CSR + scoring vectorizado / por lote
     """
 
-    VERSION = "1.2.0"
+    VERSION = "1.3.0"
 
     # Cache a nivel de clase
     _associations_loaded = False
-    _skill_to_occupations = None
+    _skill_index = None       # v1.3: skill_uri -> fila CSR
+    _occupation_uris = None   # v1.3: columna CSR -> occupation_uri
+    _csr = None               # v1.3: (indptr, indices, data)
     _occupation_metadata = None
 
     def __init__(
@@ -168,18 +179,21 @@ class SkillsBasedMatcher:
         return 1.0
 
     def _load_associations(self):
-        """Carga mapa skill_uri → [(occupation_uri, weight)]"""
+        """
+        Carga el grafo skill -> ocupación como matriz CSR.
+
+        Fila = skill, columna = ocupación, valor = peso (essential/optional).
+        Dentro de cada fila se conserva el orden de esco_associations.
+        """
         if SkillsBasedMatcher._associations_loaded:
-            self.skill_to_occupations = SkillsBasedMatcher._skill_to_occupations
-            self.occupation_metadata = SkillsBasedMatcher._occupation_metadata
+            self._use_cached_associations()
             if self.verbose:
-                print(f"[MATCHER] Usando cache: {len(self.skill_to_occupations)} skills mapeadas")
+                print(f"[MATCHER] Usando cache: {len(self.skill_index)} skills mapeadas")
             return
 
         if self.verbose:
             print("[MATCHER] Cargando asociaciones skill -> occupation...")
 
-        self.skill_to_occupations = defaultdict(list)
         self.occupation_metadata = {}
 
         # Cargar asociaciones
@@ -188,14 +202,26 @@ class SkillsBasedMatcher:
             FROM esco_associations
         ''')
 
-        count = 0
+        skill_index = {}
+        occupation_index = {}
+        rows = []
+        cols = []
+        weights = []
         for skill_uri, occ_uri, rel_type in cur:
-            weight = self.essential_weight if rel_type == 'essential' else self.optional_weight
-            self.skill_to_occupations[skill_uri].append((occ_uri, weight))
-            count += 1
+            rows.append(skill_index.setdefault(skill_uri, len(skill_index)))
+            cols.append(occupation_index.setdefault(occ_uri, len(occupation_index)))
+            weights.append(self.essential_weight if rel_type == 'essential' else self.optional_weight)
+
+        rows = np.array(rows, dtype=np.int32)
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(len(skill_index) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(rows, minlength=len(skill_index)))
+        indices = np.array(cols, dtype=np.int32)[order]
+        data = np.array(weights, dtype=np.float64)[order]
 
         if self.verbose:
-            print(f"[MATCHER] Cargadas {count} asociaciones")
+            print(f"[MATCHER] Cargadas {len(data)} asociaciones "
+                  f"({len(skill_index)} skills x {len(occupation_index)} ocupaciones, CSR)")
 
         # Cargar metadata de ocupaciones
         cur = self.conn.execute('''
@@ -213,36 +239,35 @@ class SkillsBasedMatcher:
             print(f"[MATCHER] Cargadas {len(self.occupation_metadata)} ocupaciones")
 
         # Guardar en cache de clase
-        SkillsBasedMatcher._skill_to_occupations = self.skill_to_occupations
+        SkillsBasedMatcher._skill_index = skill_index
+        SkillsBasedMatcher._occupation_uris = list(occupation_index)
+        SkillsBasedMatcher._csr = (indptr, indices, data)
         SkillsBasedMatcher._occupation_metadata = self.occupation_metadata
         SkillsBasedMatcher._associations_loaded = True
+        self._use_cached_associations()
 
-    def match(
-        self,
-        extracted_skills: List[Dict],
-        top_n: int = None
-    ) -> List[Dict]:
+    def _use_cached_associations(self):
+        self.skill_index = SkillsBasedMatcher._skill_index
+        self.occupation_uris = SkillsBasedMatcher._occupation_uris
+        self.indptr, self.indices, self.data = SkillsBasedMatcher._csr
+        self.occupation_metadata = SkillsBasedMatcher._occupation_metadata
+
+    def _skill_contributions(self, extracted_skills: List[Dict]):
         """
-        Encuentra ocupaciones que mejor matchean las skills extraídas.
+        Aportes (ocupación, score) de cada asociación tocada por las skills.
 
-        Args:
-            extracted_skills: Lista de skills con skill_uri y score
-            top_n: Override del número de candidatos
+        Los arrays quedan en el mismo orden que el loop de v1.2 (skill por
+        skill, asociaciones en orden de fila), así la suma por ocupación da
+        exactamente el mismo float.
 
         Returns:
-            Lista ordenada de candidatos con:
-            - occupation_uri, esco_label, isco_code
-            - score (suma ponderada)
-            - skills_matched (lista de skills que matchearon)
-            - match_count (cantidad de skills)
+            (cols, contrib, owner, labels): columna de ocupación, aporte,
+            posición de la skill que aportó y labels de las skills
         """
-        if not extracted_skills:
-            return []
-
-        top_n = top_n or self.top_n
-
-        occupation_scores = defaultdict(float)
-        occupation_skills = defaultdict(list)
+        cols = []
+        contribs = []
+        owners = []
+        labels = []
 
         for skill in extracted_skills:
             skill_uri = skill.get("skill_uri", "")
@@ -253,46 +278,159 @@ class SkillsBasedMatcher:
             if not skill_uri:
                 continue
 
+            row = self.skill_index.get(skill_uri)
+            if row is None:
+                continue
+
             # v1.1: Apply origin weight (tarea=1.2, titulo=0.9)
             origin_weight = self.origin_weights.get(skill_origen, 1.0)
 
             # v1.2: Apply generic skill weight (comunicacion=0.5, etc.)
             generic_weight = self._get_generic_weight(skill_label)
 
-            # Buscar ocupaciones que tienen esta skill
-            for occ_uri, weight in self.skill_to_occupations.get(skill_uri, []):
-                # Score = skill_score * weight * origin_weight * generic_weight
-                occupation_scores[occ_uri] += skill_score * weight * origin_weight * generic_weight
-                occupation_skills[occ_uri].append(skill_label)
+            start, end = self.indptr[row], self.indptr[row + 1]
+            if start == end:
+                continue
 
-        if not occupation_scores:
-            if self.verbose:
-                print("[MATCHER] No se encontraron ocupaciones con las skills dadas")
-            return []
+            # Score = skill_score * weight * origin_weight * generic_weight
+            cols.append(self.indices[start:end])
+            contribs.append(skill_score * self.data[start:end] * origin_weight * generic_weight)
+            owners.append(np.full(end - start, len(labels), dtype=np.int32))
+            labels.append(skill_label)
+
+        if not cols:
+            empty = np.array([], dtype=np.int32)
+            return empty, np.array([], dtype=np.float64), empty, labels
 
-        # Ordenar por score
-        ranked = sorted(
-            occupation_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:top_n]
+        return np.concatenate(cols), np.concatenate(contribs), np.concatenate(owners), labels
+
+    def _rank(
+        self,
+        scores: np.ndarray,
+        first_seen: np.ndarray,
+        touched: np.ndarray,
+        top_n: int
+    ) -> np.ndarray:
+        """
+        Top N columnas tocadas: score desc, empates por primera aparición
+        (mismo orden que el sorted() estable sobre el dict de v1.2).
+        """
+        candidate_scores = scores[touched]
+        if len(touched) > top_n:
+            # Preselección O(n) con argpartition; se conservan empates del corte
+            kth = candidate_scores[np.argpartition(candidate_scores, len(touched) - top_n)[len(touched) - top_n]]
+            keep = candidate_scores >= kth
+            touched = touched[keep]
+            candidate_scores = candidate_scores[keep]
+        order = np.lexsort((first_seen[touched], -candidate_scores))[:top_n]
+        return touched[order]
+
+    def _build_results(
+        self,
+        ranked: np.ndarray,
+        scores: np.ndarray,
+        cols: np.ndarray,
+        owner: np.ndarray,
+        labels: List[str]
+    ) -> List[Dict]:
+        """Arma los dicts de resultado (con skills_matched) para las columnas rankeadas."""
+        matched = {int(col): [] for col in ranked}
+        for pos in np.flatnonzero(np.isin(cols, ranked)):
+            matched[int(cols[pos])].append(labels[owner[pos]])
 
-        # Construir resultado con metadata
         results = []
-        for occ_uri, score in ranked:
+        for col in ranked:
+            col = int(col)
+            occ_uri = self.occupation_uris[col]
+            score = float(scores[col])
+            skills_matched = matched[col]
             meta = self.occupation_metadata.get(occ_uri, {})
             results.append({
                 "occupation_uri": occ_uri,
                 "esco_label": meta.get('label', ''),
                 "isco_code": meta.get('isco_code', ''),
                 "score": round(score, 4),
-                "skills_matched": occupation_skills[occ_uri],
-                "match_count": len(occupation_skills[occ_uri])
+                "skills_matched": skills_matched,
+                "match_count": len(skills_matched)
             })
 
             if self.verbose:
                 print(f"[MATCHER] {meta.get('label', '')[:40]} (ISCO {meta.get('isco_code', '')}) "
-                      f"score={score:.2f}, skills={len(occupation_skills[occ_uri])}")
+                      f"score={score:.2f}, skills={len(skills_matched)}")
+
+        return results
+
+    def match(
+        self,
+        extracted_skills: List[Dict],
+        top_n: int = None
+    ) -> List[Dict]:
+        """
+        Encuentra ocupaciones que mejor matchean las skills extraídas.
+
+        Args:
+            extracted_skills: Lista de skills con skill_uri y score
+            top_n: Override del número de candidatos
+
+        Returns:
+            Lista ordenada de candidatos con:
+            - occupation_uri, esco_label, isco_code
+            - score (suma ponderada)
+            - skills_matched (lista de skills que matchearon)
+            - match_count (cantidad de skills)
+        """
+        if not extracted_skills:
+            return []
+
+        return self.match_batch([extracted_skills], top_n=top_n)[0]
+
+    def match_batch(
+        self,
+        batch_skills: List[List[Dict]],
+        top_n: int = None
+    ) -> List[List[Dict]]:
+        """
+        v1.3: Matchea las skills de N ofertas en una sola pasada.
+
+        Los aportes de todas las ofertas se suman con un único np.bincount
+        sobre (oferta * n_ocupaciones + ocupación); después cada oferta
+        selecciona su top N con argpartition.
+
+        Args:
+            batch_skills: Lista (una por oferta) de listas de skills
+            top_n: Override del número de candidatos
+
+        Returns:
+            Lista (una por oferta) de candidatos, igual que match()
+        """
+        if not batch_skills:
+            return []
+
+        top_n = top_n or self.top_n
+        n_occ = len(self.occupation_uris)
+        per_offer = [self._skill_contributions(skills or []) for skills in batch_skills]
+
+        flat_cols = np.concatenate([
+            cols.astype(np.int64) + i * n_occ for i, (cols, _, _, _) in enumerate(per_offer)
+        ])
+        flat_contrib = np.concatenate([contrib for _, contrib, _, _ in per_offer])
+        all_scores = np.bincount(flat_cols, weights=flat_contrib, minlength=len(batch_skills) * n_occ)
+        all_scores = all_scores.reshape(len(batch_skills), n_occ)
+
+        results = []
+        for i, (cols, _, owner, labels) in enumerate(per_offer):
+            if not len(cols):
+                if self.verbose:
+                    print("[MATCHER] No se encontraron ocupaciones con las skills dadas")
+                results.append([])
+                continue
+
+            touched, first_pos = np.unique(cols, return_index=True)
+            first_seen = np.empty(n_occ, dtype=np.int64)
+            first_seen[touched] = first_pos
+
+            ranked = self._rank(all_scores[i], first_seen, touched, top_n)
+            results.append(self._build_results(ranked, all_scores[i], cols, owner, labels))
 
         return results
 
@@ -327,7 +465,9 @@ class SkillsBasedMatcher:
     def clear_cache(cls):
         """Limpia el cache de asociaciones."""
         cls._associations_loaded = False
-        cls._skill_to_occupations = None
+        cls._skill_index = None
+        cls._occupation_uris = None
+        cls._csr = None
         cls._occupation_metadata = None
 
     def close(self):
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Match Fingerprint v1.0 - Huella de entradas para re-matching incremental
+========================================================================
+
+VERSION: 1.0.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+run_matching_pipeline(only_pending=False) re-matchea TODO el corpus aunque
+solo haya cambiado una regla. Cada fila de ofertas_esco_matching guarda ahora
+input_fingerprint = hash de todo lo que determina su resultado; con
+--changed-only solo se reprocesan las ofertas cuya huella quedo vieja.
+
+COMPONENTES:
+1. Contexto de la corrida (se calcula una vez):
+   - sha256 de los configs de matching (subconjunto de CONFIGS_TO_SNAPSHOT de
+     run_tracking + sinonimos_argentinos_esco.json y skill_categories.json)
+   - modelo de embeddings (BAAI/bge-m3)
+   - versiones de MatcherV3 / SkillsImplicitExtractor / SkillsBasedMatcher
+2. Campos NLP de la oferta (el dict de _build_oferta_nlp)
+
+input_fingerprint = sha1(contexto + JSON canonico de los campos NLP)
+
+Uso:
+    from match_fingerprint import build_context_fingerprint, input_fingerprint
+
+    contexto = build_context_fingerprint({"matcher": "3.12.0", "modelo": "BAAI/bge-m3"})
+    fp = input_fingerprint(oferta_nlp, contexto)
+"""
+
+import json
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+
+# Configs que leen MatcherV3 y sus componentes
+MATCHING_CONFIG_FILES = [
+    "matching_config.json",
+    "matching_rules_business.json",
+    "sector_isco_compatibilidad.json",
+    "skills_weights.json",
+    "sinonimos_argentinos_esco.json",
+    "skill_categories.json",
+]
+
+# Maximo de parametros por IN (...) (limite de SQLite)
+SQL_IN_CHUNK = 500
+
+
+def file_sha256(path: Path) -> str:
+    """sha256 del contenido ("missing" si el archivo no existe)."""
+    path = Path(path)
+    if not path.exists():
+        return "missing"
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def config_hashes(config_files: Iterable[str] = None, config_dir: Path = None) -> Dict[str, str]:
+    """Hash de cada config de matching."""
+    config_dir = Path(config_dir) if config_dir else CONFIG_DIR
+    return {
+        name: file_sha256(config_dir / name)
+        for name in (config_files or MATCHING_CONFIG_FILES)
+    }
+
+
+def build_context_fingerprint(versions: Dict[str, str], config_files: Iterable[str] = None,
+                              config_dir: Path = None) -> str:
+    """
+    Huella del contexto de la corrida: configs + modelo + versiones.
+
+    Args:
+        versions: Ej. {"matcher": "3.12.0", "modelo": "BAAI/bge-m3", ...}
+    """
+    payload = {
+        "configs": config_hashes(config_files, config_dir),
+        "versions": versions,
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def input_fingerprint(oferta_nlp: Dict, context_fingerprint: str) -> str:
+    """Huella de una oferta: contexto + campos NLP (orden de claves canonico)."""
+    payload = json.dumps(oferta_nlp, sort_keys=True, ensure_ascii=False, default=str)
+    h = hashlib.sha1(context_fingerprint.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(payload.encode("utf-8"))
+    return h.hexdigest()
+
+
+def ensure_fingerprint_column(conn: sqlite3.Connection) -> bool:
+    """
+    Agrega ofertas_esco_matching.input_fingerprint si falta (migracion 013).
+
+    Returns:
+        True si la columna se creo ahora
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(ofertas_esco_matching)")}
+    if not columns or "input_fingerprint" in columns:
+        return False
+    conn.execute("ALTER TABLE ofertas_esco_matching ADD COLUMN input_fingerprint TEXT")
+    conn.commit()
+    return True
+
+
+def stored_fingerprints(conn: sqlite3.Connection, ids: List[str] = None) -> Dict[str, str]:
+    """
+    id_oferta -> input_fingerprint guardado (None si la fila es previa a v3.12).
+
+    Con ids solo consulta esas ofertas (en tandas, para el modo stream).
+    """
+    if ids is None:
+        return {
+            str(row[0]): row[1]
+            for row in conn.execute("SELECT id_oferta, input_fingerprint FROM ofertas_esco_matching")
+        }
+
+    result = {}
+    for start in range(0, len(ids), SQL_IN_CHUNK):
+        chunk = ids[start:start + SQL_IN_CHUNK]
+        cur = conn.execute(
+            "SELECT id_oferta, input_fingerprint FROM ofertas_esco_matching "
+            f"WHERE id_oferta IN ({','.join(['?'] * len(chunk))})",
+            chunk
+        )
+        result.update((str(row[0]), row[1]) for row in cur)
+    return result
@@ -4,8 +4,8 @@
 Match Ofertas v3.3.0 - Skills-First Matching Pipeline con Diccionario Argentino
 ================================================================================
 
-VERSION: 3.4.1
-FECHA: 2026-01-20
+VERSION: 3.16.0
+FECHA: 2026-10-18
 MODELO: BGE-M3 (BAAI/bge-m3)
 
 CAMBIO ARQUITECTONICO:
@@ -19,6 +19,33 @@ CAMBIO ARQUITECTONICO:
 - v3.2.4: INTEGRACION RUN TRACKING - versionado de corridas con snapshot de configs
 - v3.3.0: DICCIONARIO ARGENTINO - vocabulario local ANTES de semantico
 - v3.4.0: DUAL MATCHING - ejecuta reglas Y semantico, guarda ambos resultados
+- v3.5.0: MODO BATCH - encoding BGE-M3 de N ofertas en una sola llamada (batch_size)
+- v3.6.0: INDICE VECTORIAL - top-k de ocupaciones/skills via vector_index (exact/ivf/hnsw)
+- v3.7.0: CACHE DE EMBEDDINGS - titulos/tareas repetidos no se re-encodean (embedding_cache)
+- v3.8.0: EMBEDDINGS MMAP - matrices compartidas entre procesos, metadata columnar (embedding_store)
+          + precision float16/int8 con rescore float32 (vector_index.precision)
+- v3.9.0: MOTOR DE REGLAS COMPILADO - indice invertido + Aho-Corasick (business_rules_engine)
+- v3.9.1: DICCIONARIO ARGENTINO COMPILADO - variantes en automata multi_pattern,
+          reconstruido solo si cambia sinonimos_argentinos_esco.json
+- v3.10.0: MODO MULTIPROCESO - run_matching_pipeline(workers=N) / --workers N:
+          N procesos con MatcherV3 caliente calculan, el principal es el unico
+          que escribe en SQLite (MatchResultWriter)
+- v3.11.0: PERSISTENCIA EN LOTE - MatchResultWriter.add()/flush(): executemany en
+          una transaccion cada commit_every ofertas (--commit-every N)
+- v3.12.0: RE-MATCHING INCREMENTAL - input_fingerprint por oferta (campos NLP +
+          hashes de configs + modelo/versiones); --changed-only reprocesa solo
+          las ofertas con huella vieja (match_fingerprint)
+- v3.13.0: MODO STREAM - run_matching_pipeline(stream=True) / --stream: paginas por
+          keyset (id_oferta) en vez de fetchall, membresia del run incremental
+          (RunTracker.register_offers); memoria constante con millones de ofertas
+- v3.14.0: MEMO DE RESULTADOS - match() guarda el MatchResult por hash de las
+          entradas normalizadas + version de config (LRU de memo_size entradas);
+          reposts y multi-localidad no re-ejecutan extractor/embeddings/reglas
+- v3.15.0: LATENCIA POR ETAPA - metadata["timings_ms"] por oferta (matching_metrics)
+          + histograma p50/p95/p99 por etapa de la corrida en pipeline_runs.latencias
+- v3.16.0: SERVICIO LOCAL - si matching_service esta corriendo (MatcherV3 caliente),
+          run_matching_pipeline le delega el calculo en vez de cargar el modelo
+          (opt-in: use_service=True / --service; por defecto matcher local)
 
 FLUJO v3.4.0 (DUAL MATCHING):
 1. Extraer skills desde titulo_limpio + tareas_explicitas (con origen)
@@ -32,11 +59,18 @@ FLUJO v3.4.0 (DUAL MATCHING):
 
 METODOS DE PERSISTENCIA:
 - match_and_persist(id, oferta): Match + guarda matching + skills
+- match_batch(ofertas): Match de un lote con encoding batch (sin persistir)
 - save_matching_result(id, result): Guarda solo matching (incluye dual)
 - save_skills_detalle(id, skills): Guarda solo skills
 
 FUNCION DE PIPELINE (produccion):
-- run_matching_pipeline(offer_ids, limit, only_pending): Procesa lote con persistencia
+- run_matching_pipeline(offer_ids, limit, only_pending, batch_size, workers, commit_every, changed_only, stream, use_service): Procesa lote con persistencia
+
+CLI:
+    python database/match_ofertas_v3.py                       # test_v3()
+    python database/match_ofertas_v3.py --limit 5000 --batch-size 128 --workers 4
+    python database/match_ofertas_v3.py --changed-only       # tras editar reglas/configs
+    python database/match_ofertas_v3.py --all --stream --workers 8   # corpus completo
 
 VENTAJAS:
 - Skills de tareas pesan más que del título (tareas son más confiables)
@@ -50,15 +84,27 @@ VENTAJAS:
 import sqlite3
 import logging
 import json
+import time
+import copy
+import hashlib
 import numpy as np
+from collections import OrderedDict
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
 from enum import Enum
 
 # Imports locales
 from skills_implicit_extractor import SkillsImplicitExtractor
 from match_by_skills import SkillsBasedMatcher
+from vector_index import get_index, load_index_config
+from embedding_store import load_vectors, load_metadata, prepare_artifacts
+from business_rules_engine import CompiledRuleEngine
+from match_fingerprint import (
+    build_context_fingerprint, input_fingerprint, ensure_fingerprint_column, stored_fingerprints
+)
+from multi_pattern import MultiPatternMatcher
+from matching_metrics import StageTimer, LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
@@ -93,23 +139,337 @@ class MatchResult:
         return asdict(self)
 
 
+class MatchResultWriter:
+    """
+    v3.10.0: Persistencia de resultados de matching (ofertas_esco_matching,
+    ofertas_matching_history, run_ofertas, ofertas_esco_skills_detalle).
+
+    Separada de MatcherV3 para que en modo --workers un unico proceso escriba
+    en SQLite mientras los workers solo calculan.
+
+    v3.11.0: Modo buffer - add() acumula ofertas y flush() las escribe con
+    executemany en UNA transaccion cada commit_every ofertas (un fsync por
+    lote en vez de dos por oferta). Cada lote es atomico: una oferta queda
+    con matching + history + run_ofertas + skills o sin nada, asi que una
+    corrida interrumpida se retoma con only_pending=True sin dejar ofertas
+    a medio escribir.
+
+    v3.12.0: Guarda input_fingerprint (ver match_fingerprint) si se pasa.
+
+    v3.15.0: Si latencies (LatencyHistogram) esta seteado, flush() registra la
+    etapa "persistencia" por oferta (tiempo del lote / ofertas del lote).
+    """
+
+    SQL_MATCHING = '''
+        INSERT OR REPLACE INTO ofertas_esco_matching (
+            id_oferta, esco_occupation_uri, esco_occupation_label,
+            occupation_match_score, occupation_match_method,
+            isco_code, isco_label,
+            skills_oferta_json, skills_matched_essential,
+            skills_demandados_total, skills_matcheados_esco,
+            matching_timestamp, matching_version, run_id,
+            estado_validacion,
+            isco_regla, isco_semantico, score_semantico,
+            regla_aplicada, dual_coinciden, decision_metodo,
+            input_fingerprint
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    # v3.3.3: Tracking histórico (no sobrescribe)
+    SQL_HISTORY = '''
+        INSERT INTO ofertas_matching_history
+        (id_oferta, run_id, isco_code, isco_label, match_method, score)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''
+
+    SQL_RUN_OFERTA = '''
+        INSERT OR IGNORE INTO run_ofertas (run_id, id_oferta)
+        VALUES (?, ?)
+    '''
+
+    SQL_SKILLS = '''
+        INSERT INTO ofertas_esco_skills_detalle (
+            id_oferta, skill_mencionado, skill_tipo_fuente,
+            esco_skill_label, match_score, match_method,
+            esco_skill_type, source_classification
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    def __init__(self, conn: sqlite3.Connection, version: str, verbose: bool = False,
+                 commit_every: int = 1):
+        self.conn = conn
+        self.version = version
+        self.verbose = verbose
+        self.commit_every = max(1, commit_every or 1)
+        self._pending: List[Tuple[str, MatchResult, List[Dict], Optional[str], Optional[str]]] = []
+        self.written = 0
+        self.failed = 0
+        self._schema_checked = False
+        self.latencies: Optional[LatencyHistogram] = None
+
+    def _ensure_schema(self):
+        """v3.12.0: Columna input_fingerprint (migracion 013) antes de la primera escritura."""
+        if not self._schema_checked:
+            ensure_fingerprint_column(self.conn)
+            self._schema_checked = True
+
+    # -------------------------------------------------------------------------
+    # Filas
+    # -------------------------------------------------------------------------
+
+    def _matching_row(self, id_oferta: str, result: MatchResult, run_id: str = None,
+                      fingerprint: str = None) -> Tuple:
+        """Fila de ofertas_esco_matching (v3.4.0: incluye campos dual matching)."""
+        from datetime import datetime
+
+        # Extraer campos de dual matching de metadata
+        meta = result.metadata or {}
+        return (
+            str(id_oferta),
+            result.esco_uri,
+            result.esco_label,
+            result.score,
+            result.metodo,
+            result.isco_code,
+            result.esco_label,  # isco_label = esco_label por ahora
+            json.dumps([s.get('skill_esco', '') for s in result.skills_extracted], ensure_ascii=False),
+            json.dumps(result.skills_matched, ensure_ascii=False),
+            len(result.skills_extracted),
+            len(result.skills_matched),
+            datetime.now().isoformat(),
+            self.version,
+            run_id,  # v3.2.4: Run tracking
+            'pendiente',  # v3.2.5: Estado validación inicial
+            # v3.4.0: Campos dual matching
+            meta.get("isco_regla"),
+            meta.get("isco_semantico"),
+            meta.get("score_semantico"),
+            meta.get("regla_aplicada"),
+            meta.get("dual_coinciden"),
+            None,  # decision_metodo será seteado por auto_corrector
+            fingerprint  # v3.12.0: NULL = se reprocesa con --changed-only
+        )
+
+    @staticmethod
+    def _history_row(id_oferta: str, result: MatchResult, run_id: str = None) -> Tuple:
+        return (str(id_oferta), run_id, result.isco_code, result.esco_label, result.metodo, result.score)
+
+    @staticmethod
+    def _skills_rows(id_oferta: str, skills: List[Dict]) -> List[Tuple]:
+        """Filas de ofertas_esco_skills_detalle."""
+        return [
+            (
+                str(id_oferta),
+                skill.get('skill_esco', skill.get('skill', '')),
+                skill.get('origen', 'unknown'),
+                skill.get('skill_esco', ''),
+                skill.get('score', 0),
+                'implicit_bge_m3',
+                skill.get('L1', 'T'),  # Categoría L1
+                json.dumps({
+                    'L1': skill.get('L1', ''),
+                    'L1_nombre': skill.get('L1_nombre', ''),
+                    'L2': skill.get('L2', ''),
+                    'L2_nombre': skill.get('L2_nombre', ''),
+                    'es_digital': skill.get('es_digital', False)
+                }, ensure_ascii=False)
+            )
+            for skill in skills
+        ]
+
+    # -------------------------------------------------------------------------
+    # Escritura inmediata (una oferta, un commit)
+    # -------------------------------------------------------------------------
+
+    def save_matching_result(self, id_oferta: str, result: MatchResult, run_id: str = None,
+                             fingerprint: str = None) -> bool:
+        """
+        Persiste el resultado del matching en ofertas_esco_matching.
+
+        v3.4.0: Incluye campos de dual matching (isco_regla, isco_semantico, etc.)
+
+        Args:
+            id_oferta: ID de la oferta
+            result: MatchResult del matching
+            run_id: ID de la corrida (opcional, para run tracking v3.2.4)
+            fingerprint: input_fingerprint de la oferta (opcional, v3.12.0)
+
+        Returns:
+            True si se guardó correctamente
+        """
+        try:
+            self._ensure_schema()
+            self.conn.execute(self.SQL_MATCHING, self._matching_row(id_oferta, result, run_id, fingerprint))
+            self.conn.execute(self.SQL_HISTORY, self._history_row(id_oferta, result, run_id))
+
+            # Guardar relación run <-> oferta
+            if run_id:
+                self.conn.execute(self.SQL_RUN_OFERTA, (run_id, str(id_oferta)))
+
+            self.conn.commit()
+
+            if self.verbose:
+                dual_coinciden = (result.metadata or {}).get("dual_coinciden")
+                dual_info = ""
+                if dual_coinciden is not None:
+                    dual_info = f" [DUAL: {'COINCIDEN' if dual_coinciden else 'DIFIEREN'}]"
+                print(f"[V3.4] Matching guardado para {id_oferta}{dual_info}" + (f" (run: {run_id})" if run_id else ""))
+            return True
+
+        except Exception as e:
+            logger.error(f"Error guardando matching para {id_oferta}: {e}")
+            if self.verbose:
+                print(f"[V3.4] ERROR guardando matching: {e}")
+            return False
+
+    def save_skills_detalle(self, id_oferta: str, skills: List[Dict]) -> int:
+        """
+        Persiste las skills extraídas en ofertas_esco_skills_detalle.
+
+        Args:
+            id_oferta: ID de la oferta
+            skills: Lista de skills extraídas (del SkillsImplicitExtractor + Categorizer)
+
+        Returns:
+            Número de skills guardadas
+        """
+        try:
+            # Primero eliminar skills anteriores de esta oferta
+            self.conn.execute(
+                'DELETE FROM ofertas_esco_skills_detalle WHERE id_oferta = ?',
+                (str(id_oferta),)
+            )
+
+            rows = self._skills_rows(id_oferta, skills)
+            self.conn.executemany(self.SQL_SKILLS, rows)
+            self.conn.commit()
+
+            if self.verbose:
+                print(f"[V3] {len(rows)} skills guardadas para {id_oferta}")
+            return len(rows)
+
+        except Exception as e:
+            logger.error(f"Error guardando skills para {id_oferta}: {e}")
+            if self.verbose:
+                print(f"[V3] ERROR guardando skills: {e}")
+            return 0
+
+    # -------------------------------------------------------------------------
+    # v3.11.0: Escritura en buffer (N ofertas, un commit)
+    # -------------------------------------------------------------------------
+
+    def add(self, id_oferta: str, result: MatchResult, skills: List[Dict], run_id: str = None,
+            fingerprint: str = None):
+        """Encola una oferta; escribe el lote al llegar a commit_every."""
+        self._pending.append((str(id_oferta), result, skills or [], run_id, fingerprint))
+        if len(self._pending) >= self.commit_every:
+            self.flush()
+
+    def _write_batch(self, batch: List[Tuple[str, MatchResult, List[Dict], Optional[str], Optional[str]]]):
+        """Escribe un lote en una transaccion (sin commit)."""
+        ids = [(id_oferta,) for id_oferta, _, _, _, _ in batch]
+        self.conn.executemany(
+            self.SQL_MATCHING,
+            [self._matching_row(id_oferta, result, run_id, fingerprint)
+             for id_oferta, result, _, run_id, fingerprint in batch]
+        )
+        self.conn.executemany(
+            self.SQL_HISTORY,
+            [self._history_row(id_oferta, result, run_id) for id_oferta, result, _, run_id, _ in batch]
+        )
+        self.conn.executemany(
+            self.SQL_RUN_OFERTA,
+            [(run_id, id_oferta) for id_oferta, _, _, run_id, _ in batch if run_id]
+        )
+        self.conn.executemany('DELETE FROM ofertas_esco_skills_detalle WHERE id_oferta = ?', ids)
+        self.conn.executemany(
+            self.SQL_SKILLS,
+            [row for id_oferta, _, skills, _, _ in batch for row in self._skills_rows(id_oferta, skills)]
+        )
+
+    def flush(self) -> int:
+        """
+        Escribe las ofertas pendientes en una sola transaccion.
+
+        Si el lote falla se hace rollback y se reintenta oferta por oferta, para
+        que un registro invalido no descarte el resto del lote.
+
+        Returns:
+            Ofertas escritas
+        """
+        batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        self._ensure_schema()
+        start = time.perf_counter()
+        try:
+            self._write_batch(batch)
+            self.conn.commit()
+            written = len(batch)
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"Error escribiendo lote de {len(batch)} ofertas, reintento individual: {e}")
+            written = 0
+            for item in batch:
+                try:
+                    self._write_batch([item])
+                    self.conn.commit()
+                    written += 1
+                except Exception as item_error:
+                    self.conn.rollback()
+                    self.failed += 1
+                    logger.error(f"Error guardando matching para {item[0]}: {item_error}")
+
+        if self.latencies is not None:
+            per_offer = (time.perf_counter() - start) * 1000.0 / len(batch)
+            for _ in range(len(batch)):
+                self.latencies.record("persistencia", per_offer)
+
+        self.written += written
+        if self.verbose:
+            print(f"[V3] Lote persistido: {written}/{len(batch)} ofertas (total {self.written})")
+        return written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+
+
 class MatcherV3:
     """
     Pipeline de matching v3.4.0 - Dual Matching (reglas + semantico).
     """
 
-    VERSION = "3.4.1"  # v3.4.1: Ordenar reglas por prioridad (menor = mayor prioridad)
+    VERSION = "3.16.0"  # v3.16.0: Calculo delegable a matching_service
 
     # Pesos para combinacion de scores
     ALPHA_SKILLS = 0.6  # Peso para match por skills
     BETA_TITLE = 0.4    # Peso para match semantico titulo
 
+    # v3.9.1: Cache de clase del diccionario argentino compilado
+    # (firma del JSON, sinonimos, entradas, automata, variante -> entradas)
+    _argentino_cache = None
+    SINONIMOS_RECHECK_SECONDS = 60.0
+
+    # v3.14.0: Campos que determinan el resultado de match() (clave del memo)
+    MEMO_FIELDS = (
+        "titulo_limpio", "titulo", "tareas_explicitas", "sector_empresa",
+        "nivel_seniority", "area_funcional"
+    )
+    MEMO_LIST_FIELDS = ("skills_tecnicas_list", "soft_skills_list")
+    DEFAULT_MEMO_SIZE = 4096
+
     def __init__(
         self,
         db_conn: sqlite3.Connection = None,
         db_path: str = None,
         config_path: str = None,
-        verbose: bool = False
+        verbose: bool = False,
+        memo_size: int = DEFAULT_MEMO_SIZE
     ):
         """
         Inicializa el matcher v3.
@@ -119,6 +479,7 @@ class MatcherV3:
             db_path: Path a BD
             config_path: Path a config de reglas de negocio
             verbose: Modo debug
+            memo_size: Entradas del memo de resultados (0 = desactivado)
         """
         base_path = Path(__file__).parent
 
@@ -143,6 +504,15 @@ class MatcherV3:
         # Cargar reglas de negocio
         self._load_business_rules()
 
+        # v3.10.0: Persistencia separada del calculo
+        self.writer = MatchResultWriter(self.conn, version=self.VERSION, verbose=verbose)
+
+        # v3.14.0: Memo LRU clave -> MatchResult
+        self.memo_size = max(int(memo_size or 0), 0)
+        self._match_memo: "OrderedDict[str, MatchResult]" = OrderedDict()
+        self._memo_config = None
+        self._memo_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
     def _load_occupation_embeddings(self):
         """Carga embeddings pre-calculados de ocupaciones ESCO."""
         base_path = Path(__file__).parent
@@ -150,14 +520,23 @@ class MatcherV3:
         meta_path = base_path / "embeddings" / "esco_occupations_metadata.json"
 
         if emb_path.exists() and meta_path.exists():
-            self.occ_embeddings = np.load(str(emb_path))
-            with open(meta_path, 'r', encoding='utf-8') as f:
-                self.occ_metadata = json.load(f)
+            # v3.8.0: mmap solo lectura (una copia en page cache para N procesos)
+            index_config = load_index_config()
+            self.occ_embeddings = load_vectors(
+                emb_path,
+                precision=index_config.get("precision", "float32"),
+                rescore=index_config.get("rescore", True),
+                verbose=self.verbose
+            )
+            self.occ_metadata = load_metadata(meta_path, verbose=self.verbose)
+            # v3.6.0: Indice de vecinos segun config vector_index
+            self.occ_index = get_index(self.occ_embeddings, emb_path, verbose=self.verbose)
             if self.verbose:
-                print(f"[V3] Cargados {len(self.occ_metadata)} embeddings de ocupaciones")
+                print(f"[V3] Cargados {len(self.occ_metadata)} embeddings de ocupaciones (indice: {self.occ_index.backend})")
         else:
             self.occ_embeddings = None
             self.occ_metadata = []
+            self.occ_index = None
             if self.verbose:
                 print("[V3] WARN: Embeddings de ocupaciones no encontrados")
 
@@ -173,6 +552,12 @@ class MatcherV3:
             if self.verbose:
                 print(f"[V3] WARN: No se pudieron cargar reglas: {e}")
 
+        # v3.9.0: Compilar reglas una sola vez (orden por prioridad + automata de terminos)
+        self.rule_engine = CompiledRuleEngine(self.business_rules)
+        if self.verbose:
+            print(f"[V3] Motor de reglas: {len(self.rule_engine)} reglas aplicables, "
+                  f"{len(self.rule_engine.automaton)} terminos")
+
         # Cargar config sector-ISCO compatibilidad (v3.2.1)
         self._load_sector_isco_config()
 
@@ -198,6 +583,18 @@ class MatcherV3:
         """Carga diccionario de sinonimos argentinos -> ESCO."""
         base_path = Path(__file__).parent
         config_path = base_path.parent / "config" / "sinonimos_argentinos_esco.json"
+        self._sinonimos_checked = time.monotonic()
+        try:
+            stat = config_path.stat()
+            signature = (str(config_path), stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+
+        cache = MatcherV3._argentino_cache
+        if signature is not None and cache is not None and cache[0] == signature:
+            self.sinonimos_arg = cache[1]
+            return
+
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
                 self.sinonimos_arg = json.load(f)
@@ -209,6 +606,41 @@ class MatcherV3:
             if self.verbose:
                 print(f"[V3.3] WARN: No se pudo cargar sinonimos_argentinos: {e}")
 
+        # v3.9.1: Todas las variantes en un automata; cada variante apunta a las
+        # entradas (en orden del JSON) que la declaran
+        entries = [
+            (termino, config)
+            for termino, config in self.sinonimos_arg.get("ocupaciones_titulo", {}).items()
+            if not termino.startswith("_")
+        ]
+        variants = []
+        variant_entries = {}
+        for position, (termino, config) in enumerate(entries):
+            for variante in config.get("variantes", [termino]):
+                variante = variante.lower()
+                variants.append(variante)
+                variant_entries.setdefault(variante, []).append(position)
+        matcher = MultiPatternMatcher(variants)
+        owners = [variant_entries[term] for term in matcher.terms]
+
+        MatcherV3._argentino_cache = (signature, self.sinonimos_arg, entries, matcher, owners)
+
+    def _argentino_candidates(self, titulo: str) -> List[Tuple[str, Dict]]:
+        """
+        v3.9.1: Entradas de ocupaciones_titulo con alguna variante en el titulo.
+
+        Misma semantica que el loop anterior (substring, orden del JSON), pero
+        con una sola pasada del automata sobre el titulo.
+        """
+        if time.monotonic() - self._sinonimos_checked >= self.SINONIMOS_RECHECK_SECONDS:
+            self._load_sinonimos_argentinos()
+
+        _, _, entries, matcher, owners = MatcherV3._argentino_cache
+        positions = set()
+        for term_id in matcher.find(titulo):
+            positions.update(owners[term_id])
+        return [entries[p] for p in sorted(positions)]
+
     def _match_by_argentino_dict(self, oferta_nlp: Dict) -> Optional[Dict]:
         """
         v3.3.0: Busca match directo en diccionario argentino.
@@ -225,19 +657,9 @@ class MatcherV3:
 
         titulo = (oferta_nlp.get("titulo_limpio") or "").lower()
         sector = (oferta_nlp.get("sector_empresa") or "").lower()
-        ocupaciones = self.sinonimos_arg.get("ocupaciones_titulo", {})
-
-        for termino, config in ocupaciones.items():
-            if termino.startswith("_"):
-                continue
-
-            # Verificar si el titulo contiene el termino
-            variantes = config.get("variantes", [termino])
-            match_found = any(v.lower() in titulo for v in variantes)
-
-            if not match_found:
-                continue
 
+        # Solo entradas cuyo termino/variante aparece en el titulo
+        for termino, config in self._argentino_candidates(titulo):
             # Hay match con el termino, ahora verificar contexto
             contextos = config.get("contextos", {})
             isco = None
@@ -416,8 +838,132 @@ class MatcherV3:
         candidates.sort(key=lambda x: x.get("combined_score", x.get("score", 0)), reverse=True)
         return candidates
 
+    # =========================================================================
+    # v3.14.0: MEMO DE RESULTADOS
+    # =========================================================================
+
+    def _memo_config_version(self) -> Tuple:
+        """
+        Version de config del memo: matcher + reglas cargadas + diccionario
+        argentino + indices de skills y ocupaciones (backend, precision e
+        instancia: reconstruir un indice o cambiar de precision invalida el memo).
+        """
+        if time.monotonic() - self._sinonimos_checked >= self.SINONIMOS_RECHECK_SECONDS:
+            self._load_sinonimos_argentinos()
+        cache = MatcherV3._argentino_cache
+        return (
+            self.VERSION, self.config_path, id(self.rule_engine), cache[0] if cache else None,
+            self._index_signature(getattr(self.skills_extractor, "index", None)),
+            self._index_signature(self.occ_index)
+        )
+
+    @staticmethod
+    def _index_signature(index) -> Optional[Tuple]:
+        """(backend, precision, rescore, id) de un VectorIndex (None si no hay indice)."""
+        if index is None:
+            return None
+        embeddings = index.embeddings
+        precision = getattr(embeddings, "precision", None) or str(getattr(embeddings, "dtype", ""))
+        return (index.backend, precision, index.rescore, id(index))
+
+    def _memo_key(self, oferta_nlp: Dict) -> Optional[str]:
+        """Hash de las entradas normalizadas (None si el memo esta desactivado)."""
+        if not self.memo_size:
+            return None
+
+        config = self._memo_config_version()
+        if config != self._memo_config:
+            # Cambio el diccionario (o primera llamada): resultados previos invalidos
+            self._match_memo.clear()
+            self._memo_config = config
+
+        payload = [oferta_nlp.get(field) or "" for field in self.MEMO_FIELDS]
+        payload.extend(self._parse_list_field(oferta_nlp.get(field)) for field in self.MEMO_LIST_FIELDS)
+        payload.append(repr(config))
+        return hashlib.sha1(
+            json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def _memo_get(self, key: Optional[str]) -> Optional[MatchResult]:
+        if key is None:
+            return None
+        result = self._match_memo.get(key)
+        if result is None:
+            self._memo_stats["misses"] += 1
+            return None
+        self._match_memo.move_to_end(key)
+        self._memo_stats["hits"] += 1
+        # Copia: el llamador puede modificar listas/metadata del resultado
+        return copy.deepcopy(result)
+
+    def _memo_put(self, key: Optional[str], result: MatchResult):
+        if key is None:
+            return
+        self._match_memo[key] = copy.deepcopy(result)
+        self._match_memo.move_to_end(key)
+        self._memo_stats["writes"] += 1
+        while len(self._match_memo) > self.memo_size:
+            self._match_memo.popitem(last=False)
+            self._memo_stats["evictions"] += 1
+
+    def memo_stats(self) -> Dict:
+        """Contadores del memo (mismo formato que cache_stats() de embeddings)."""
+        stats = dict(self._memo_stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = len(self._match_memo)
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def reset_memo_stats(self):
+        for key in self._memo_stats:
+            self._memo_stats[key] = 0
+
+    def clear_memo(self):
+        self._match_memo.clear()
+
     def match(self, oferta_nlp: Dict) -> MatchResult:
         """
+        Matching de una oferta con memo (v3.14.0).
+
+        Si otra oferta ya tuvo las mismas entradas normalizadas (MEMO_FIELDS +
+        skills NLP) con la misma config, devuelve una copia de su MatchResult
+        sin correr extractor, embeddings ni reglas.
+        """
+        start = time.perf_counter()
+        key = self._memo_key(oferta_nlp)
+        cached = self._memo_get(key)
+        if cached is not None:
+            return self._with_memo_timing(cached, start)
+
+        result = self._match_uncached(oferta_nlp)
+        self._memo_put(key, result)
+        return result
+
+    @staticmethod
+    def _with_memo_timing(result: MatchResult, start: float) -> MatchResult:
+        """v3.15.0: Un hit del memo reporta su propio tiempo, no el de la oferta original."""
+        timer = StageTimer()
+        timer.add("memo", (time.perf_counter() - start) * 1000.0)
+        result.metadata["timings_ms"] = timer.as_dict()
+        return result
+
+    def _match_uncached(self, oferta_nlp: Dict, timer: StageTimer = None,
+                        skills_extracted: List[Dict] = None) -> MatchResult:
+        """
+        v3.15.0: Ejecuta las etapas midiendo cada una; los tiempos quedan en
+        result.metadata["timings_ms"] (ver matching_metrics.STAGES).
+
+        skills_extracted: skills ya extraidas (y medidas) por el llamador; si
+        se pasan no se vuelve a correr ni a medir extraccion_skills.
+        """
+        timer = timer or StageTimer()
+        result = self._match_stages(oferta_nlp, timer, skills_extracted=skills_extracted)
+        result.metadata["timings_ms"] = timer.as_dict()
+        return result
+
+    def _match_stages(self, oferta_nlp: Dict, timer: StageTimer,
+                      skills_extracted: List[Dict] = None) -> MatchResult:
+        """
         Pipeline principal de matching v3.4.0 - DUAL MATCHING.
 
         v3.4.0: CAMBIO ESTRUCTURAL - Ejecuta AMBOS (semántico Y reglas), guarda ambos.
@@ -433,6 +979,8 @@ class MatcherV3:
 
         Args:
             oferta_nlp: Dict con campos NLP de la oferta
+            timer: Cronometro de etapas (v3.15.0)
+            skills_extracted: Skills ya extraidas (compute_match); None = extraer
 
         Returns:
             MatchResult con ocupacion, skills, score, y metadata con dual match info.
@@ -459,15 +1007,17 @@ class MatcherV3:
             except:
                 soft_skills_nlp = []
 
-        skills_extracted = self.skills_extractor.extract_skills(
-            titulo_limpio=titulo,
-            tareas_explicitas=tareas,
-            skills_nlp=skills_nlp,
-            soft_skills_nlp=soft_skills_nlp,
-            sector_empresa=oferta_nlp.get("sector_empresa"),
-            nivel_seniority=oferta_nlp.get("nivel_seniority"),
-            area_funcional=oferta_nlp.get("area_funcional")
-        )
+        if skills_extracted is None:
+            with timer.stage("extraccion_skills"):
+                skills_extracted = self.skills_extractor.extract_skills(
+                    titulo_limpio=titulo,
+                    tareas_explicitas=tareas,
+                    skills_nlp=skills_nlp,
+                    soft_skills_nlp=soft_skills_nlp,
+                    sector_empresa=oferta_nlp.get("sector_empresa"),
+                    nivel_seniority=oferta_nlp.get("nivel_seniority"),
+                    area_funcional=oferta_nlp.get("area_funcional")
+                )
 
         if self.verbose:
             print(f"[V3.4] Skills extraidas: {len(skills_extracted)}")
@@ -477,7 +1027,8 @@ class MatcherV3:
         # =====================================================================
 
         # 2a: Intentar match por diccionario argentino
-        dict_match = self._match_by_argentino_dict(oferta_nlp)
+        with timer.stage("diccionario"):
+            dict_match = self._match_by_argentino_dict(oferta_nlp)
 
         # Variables para resultado semántico
         semantic_isco = None
@@ -499,17 +1050,20 @@ class MatcherV3:
             # 2b: Match por skills + titulo (embedding)
             candidates_by_skills = []
             if skills_extracted:
-                candidates_by_skills = self.skills_matcher.match(skills_extracted, top_n=10)
+                with timer.stage("match_skills"):
+                    candidates_by_skills = self.skills_matcher.match(skills_extracted, top_n=10)
                 if self.verbose:
                     print(f"[V3.4] Candidatos por skills: {len(candidates_by_skills)}")
 
-            candidates_by_title = self._semantic_match_title(titulo)
+            with timer.stage("embedding_titulo"):
+                candidates_by_title = self._semantic_match_title(titulo)
             if self.verbose:
                 print(f"[V3.4] Candidatos por titulo: {len(candidates_by_title)}")
 
             # Combinar scores
             if candidates_by_skills:
-                final_candidates = self._combine_candidates(candidates_by_skills, candidates_by_title)
+                with timer.stage("combinacion"):
+                    final_candidates = self._combine_candidates(candidates_by_skills, candidates_by_title)
                 semantic_metodo = "skills_first_v3"
             elif candidates_by_title:
                 final_candidates = candidates_by_title
@@ -523,13 +1077,14 @@ class MatcherV3:
 
             if final_candidates:
                 # Aplicar penalizaciones
-                sector_empresa = oferta_nlp.get("sector_empresa", "")
-                if sector_empresa:
-                    final_candidates = self._apply_sector_penalty(final_candidates, sector_empresa)
+                with timer.stage("penalizaciones"):
+                    sector_empresa = oferta_nlp.get("sector_empresa", "")
+                    if sector_empresa:
+                        final_candidates = self._apply_sector_penalty(final_candidates, sector_empresa)
 
-                nivel_seniority = oferta_nlp.get("nivel_seniority", "")
-                if nivel_seniority:
-                    final_candidates = self._apply_seniority_penalty(final_candidates, nivel_seniority)
+                    nivel_seniority = oferta_nlp.get("nivel_seniority", "")
+                    if nivel_seniority:
+                        final_candidates = self._apply_seniority_penalty(final_candidates, nivel_seniority)
 
                 # Seleccionar mejor candidato
                 best = final_candidates[0]
@@ -547,7 +1102,8 @@ class MatcherV3:
         # =====================================================================
         # PASO 3: EVALUAR REGLAS DE NEGOCIO (sin bypass, solo evaluación)
         # =====================================================================
-        rule_info = self._evaluate_rule_only(oferta_nlp)
+        with timer.stage("reglas"):
+            rule_info = self._evaluate_rule_only(oferta_nlp)
 
         regla_isco = None
         regla_aplicada = None
@@ -581,7 +1137,8 @@ class MatcherV3:
         # v3.4.2: Si hay una regla de negocio aplicable, USAR ESA (no el semántico)
         if rule_info:
             # Buscar datos completos de ESCO para la regla
-            rule_occupation = self._find_occupation_by_esco_label(rule_info.get("esco_label", ""))
+            with timer.stage("reglas"):
+                rule_occupation = self._find_occupation_by_esco_label(rule_info.get("esco_label", ""))
 
             if rule_occupation:
                 if self.verbose:
@@ -662,6 +1219,69 @@ class MatcherV3:
             }
         )
 
+    @staticmethod
+    def _parse_list_field(value) -> List:
+        """Parsea campos lista de ofertas_nlp que pueden venir como JSON string."""
+        if isinstance(value, str):
+            try:
+                return json.loads(value) if value else []
+            except (ValueError, TypeError):
+                return []
+        return value or []
+
+    def prefetch_embeddings(self, ofertas_nlp: List[Dict], batch_size: int = 64) -> int:
+        """
+        v3.5.0: Precalcula en UNA llamada a BGE-M3 todos los textos de un lote.
+
+        Junta titulo + tareas + skills NLP de cada oferta (los mismos textos que
+        usan extract_skills() y _semantic_match_title()) y los encodea juntos.
+        Despues, match() de cada oferta reutiliza los vectores sin llamar al modelo.
+
+        Args:
+            ofertas_nlp: Lista de dicts con campos NLP
+            batch_size: Tamaño de batch interno del modelo
+
+        Returns:
+            Cantidad de textos encodeados
+        """
+        textos = []
+        for oferta_nlp in ofertas_nlp:
+            # v3.14.0: Las ofertas con resultado en el memo no se van a encodear
+            key = self._memo_key(oferta_nlp)
+            if key is not None and key in self._match_memo:
+                continue
+            titulo = oferta_nlp.get("titulo_limpio") or oferta_nlp.get("titulo", "")
+            textos.extend(texto for _, texto in self.skills_extractor.collect_texts(
+                titulo,
+                oferta_nlp.get("tareas_explicitas", ""),
+                self._parse_list_field(oferta_nlp.get("skills_tecnicas_list", [])),
+                self._parse_list_field(oferta_nlp.get("soft_skills_list", []))
+            ))
+            if titulo:
+                textos.append(titulo)
+
+        return self.skills_extractor.prefetch(textos, batch_size=batch_size)
+
+    def match_batch(self, ofertas_nlp: List[Dict], batch_size: int = 64) -> List[MatchResult]:
+        """
+        v3.5.0: Matching de varias ofertas con encoding batch.
+
+        Mismo resultado que llamar match() por oferta, pero con una sola llamada
+        a BGE-M3 por lote en lugar de una por texto.
+
+        Args:
+            ofertas_nlp: Lista de dicts con campos NLP
+            batch_size: Tamaño de batch interno del modelo
+
+        Returns:
+            Lista de MatchResult en el mismo orden que ofertas_nlp
+        """
+        self.prefetch_embeddings(ofertas_nlp, batch_size=batch_size)
+        try:
+            return [self.match(oferta_nlp) for oferta_nlp in ofertas_nlp]
+        finally:
+            self.skills_extractor.clear_prefetch()
+
     def _check_business_rules(self, oferta_nlp: Dict, mode: str = "correccion") -> Optional[MatchResult]:
         """Verifica si alguna regla de negocio aplica.
 
@@ -676,145 +1296,39 @@ class MatcherV3:
         if not self.business_rules:
             return None
 
-        titulo = (oferta_nlp.get("titulo_limpio") or oferta_nlp.get("titulo", "")).lower()
-        # v3.3.4: Para exclusiones, usar título ORIGINAL (no limpio) para no perder contexto
-        # Ej: "Gerente de Operaciones – Grupo Gastronómico" limpio queda "Gerente de Operaciones"
-        # pero la exclusión debe ver "gastronómico" del título original
-        titulo_original = (oferta_nlp.get("titulo", "")).lower()
-        tareas = (oferta_nlp.get("tareas_explicitas") or "").lower()
-        reglas = self.business_rules.get("reglas_forzar_isco", {})
-
-        # v3.4.1: Ordenar reglas por prioridad (menor = mayor prioridad)
-        reglas_ordenadas = sorted(
-            reglas.items(),
-            key=lambda x: x[1].get("prioridad", 99) if isinstance(x[1], dict) else 99
-        )
-
-        for rule_id, rule in reglas_ordenadas:
-            # Saltar items que no son reglas (ej: "descripcion")
-            if not isinstance(rule, dict):
-                continue
-            if not rule.get("activa", False):
-                continue
-
-            # v3.3.0: En modo "critica_only", solo aplicar reglas criticas
-            if mode == "critica_only":
-                if not rule.get("correccion_critica", False):
-                    continue
-
+        # v3.9.0: Reglas pre-ordenadas por prioridad; solo se evaluan las que
+        # tienen algun termino presente (ver business_rules_engine)
+        critica_only = mode == "critica_only"
+        for rule_id, rule in self.rule_engine.matching_rules(oferta_nlp, critica_only=critica_only):
             accion = rule.get("accion", {})
 
-            # Solo aplicar bypass si hay forzar_isco
-            isco = accion.get("forzar_isco") or accion.get("forzar_isco_familia", "")
-            if not isco:
-                # Esta regla es de priorizacion, no bypass
-                continue
+            # v3.4.2: ESCO es el target primario, ISCO se deriva
+            esco_label = accion.get("esco_label", "")
 
-            condicion = rule.get("condicion", {})
-
-            # v3.2.3: Usar AND entre condiciones múltiples
-            # Cada condición que existe debe cumplirse (AND)
-            # Dentro de cada condición se usa OR (alguno de los términos)
-            condiciones_evaluadas = []
-
-            # Verificar titulo_contiene_alguno (case-insensitive)
-            terminos = condicion.get("titulo_contiene_alguno", [])
-            if terminos:
-                condiciones_evaluadas.append(any(t.lower() in titulo.lower() for t in terminos))
-
-            # Verificar titulo_contiene_alguno_2 (segundo grupo de OR, case-insensitive)
-            terminos_2 = condicion.get("titulo_contiene_alguno_2", [])
-            if terminos_2:
-                condiciones_evaluadas.append(any(t.lower() in titulo.lower() for t in terminos_2))
-
-            # Verificar titulo_contiene_todos (AND de todos los términos, case-insensitive)
-            terminos_todos = condicion.get("titulo_contiene_todos", [])
-            if terminos_todos:
-                condiciones_evaluadas.append(all(t.lower() in titulo.lower() for t in terminos_todos))
-
-            # Verificar titulo_o_tareas_contiene_alguno (case-insensitive)
-            terminos_ot = condicion.get("titulo_o_tareas_contiene_alguno", [])
-            if terminos_ot:
-                condiciones_evaluadas.append(any(t.lower() in titulo.lower() or t.lower() in tareas.lower() for t in terminos_ot))
-
-            # Verificar skills_contiene_alguno (se procesa en skills extractor)
-            terminos_skills = condicion.get("skills_contiene_alguno", [])
-            if terminos_skills:
-                # Buscar en titulo y tareas
-                texto_completo = f"{titulo} {tareas}"
-                condiciones_evaluadas.append(any(t.lower() in texto_completo for t in terminos_skills))
-
-            # ALL condiciones deben cumplirse (AND entre condiciones)
-            condicion_texto_cumplida = len(condiciones_evaluadas) > 0 and all(condiciones_evaluadas)
-
-            # Verificar area_funcional_es como filtro adicional (AND con otras condiciones)
-            area_requerida = condicion.get("area_funcional_es")
-            if condicion_texto_cumplida and area_requerida:
-                # Si hay condición de área, verificarla
-                condicion_cumplida = oferta_nlp.get("area_funcional", "").lower() == area_requerida.lower()
-            else:
-                condicion_cumplida = condicion_texto_cumplida
-
-            # Verificar sector_es como filtro adicional (AND con otras condiciones)
-            sector_requerido = condicion.get("sector_es")
-            if condicion_cumplida and sector_requerido:
-                sector_actual = oferta_nlp.get("sector_empresa", "").lower()
-                condicion_cumplida = sector_actual == sector_requerido.lower()
-
-            # Verificar sector_empresa_es_alguno (lista de sectores válidos)
-            sectores_validos = condicion.get("sector_empresa_es_alguno", [])
-            if condicion_cumplida and sectores_validos:
-                sector_actual = oferta_nlp.get("sector_empresa", "").lower()
-                condicion_cumplida = any(s.lower() == sector_actual for s in sectores_validos)
-
-            # Verificar EXCLUSIONES (si alguna se cumple, la regla NO aplica)
-            if condicion_cumplida:
-                # titulo_no_contiene_alguno: excluir si el título contiene alguno de estos
-                # v3.3.4: Usar titulo_original para exclusiones (no titulo_limpio)
-                excluir_titulo = condicion.get("titulo_no_contiene_alguno", [])
-                if excluir_titulo and any(t.lower() in titulo_original for t in excluir_titulo):
-                    condicion_cumplida = False
-
-                # sector_no_es: excluir si el sector es alguno de estos
-                excluir_sector = condicion.get("sector_no_es", [])
-                sector_actual = oferta_nlp.get("sector_empresa", "").lower()
-                if excluir_sector and any(s.lower() == sector_actual for s in excluir_sector):
-                    condicion_cumplida = False
-
-                # area_funcional_no_es: excluir si el área es alguna de estas
-                excluir_area = condicion.get("area_funcional_no_es", [])
-                area_actual = oferta_nlp.get("area_funcional", "").lower()
-                if excluir_area and any(a.lower() == area_actual for a in excluir_area):
-                    condicion_cumplida = False
-
-            if condicion_cumplida:
-                # v3.4.2: ESCO es el target primario, ISCO se deriva
-                esco_label = accion.get("esco_label", "")
-
-                # Buscar ocupación ESCO por label exacto
-                occupation = self._find_occupation_by_esco_label(esco_label)
-
-                if not occupation:
-                    if self.verbose:
-                        print(f"[V3.4.2] WARN: Regla {rule_id} - ESCO label no encontrado: '{esco_label}'")
-                    continue  # Skip esta regla, probar siguiente
+            # Buscar ocupación ESCO por label exacto
+            occupation = self._find_occupation_by_esco_label(esco_label)
 
+            if not occupation:
                 if self.verbose:
-                    modo_str = "correccion" if mode == "correccion" else "critica"
-                    print(f"[V3.4.2] Regla {rule_id} ({modo_str}): {rule.get('nombre', '')} -> {occupation['label']}")
+                    print(f"[V3.4.2] WARN: Regla {rule_id} - ESCO label no encontrado: '{esco_label}'")
+                continue  # Skip esta regla, probar siguiente
 
-                return MatchResult(
-                    status=MatchStatus.BUSINESS_RULE.value,
-                    esco_uri=occupation['uri'],
-                    esco_label=occupation['label'],  # Label exacto de ESCO
-                    isco_code=occupation['isco_code'],  # ISCO derivado de ESCO
-                    score=0.98,
-                    metodo=f"regla_negocio_{rule_id}",
-                    skills_extracted=[],
-                    skills_matched=[],
-                    alternativas=[],
-                    metadata={"regla": rule_id, "nombre_regla": rule.get("nombre", "")}
-                )
+            if self.verbose:
+                modo_str = "correccion" if mode == "correccion" else "critica"
+                print(f"[V3.4.2] Regla {rule_id} ({modo_str}): {rule.get('nombre', '')} -> {occupation['label']}")
+
+            return MatchResult(
+                status=MatchStatus.BUSINESS_RULE.value,
+                esco_uri=occupation['uri'],
+                esco_label=occupation['label'],  # Label exacto de ESCO
+                isco_code=occupation['isco_code'],  # ISCO derivado de ESCO
+                score=0.98,
+                metodo=f"regla_negocio_{rule_id}",
+                skills_extracted=[],
+                skills_matched=[],
+                alternativas=[],
+                metadata={"regla": rule_id, "nombre_regla": rule.get("nombre", "")}
+            )
 
         return None
 
@@ -831,109 +1345,24 @@ class MatcherV3:
         if not self.business_rules:
             return None
 
-        titulo = (oferta_nlp.get("titulo_limpio") or oferta_nlp.get("titulo", "")).lower()
-        titulo_original = (oferta_nlp.get("titulo", "")).lower()
-        tareas = (oferta_nlp.get("tareas_explicitas") or "").lower()
-        reglas = self.business_rules.get("reglas_forzar_isco", {})
-
-        # v3.4.1: Ordenar reglas por prioridad (menor = mayor prioridad)
-        reglas_ordenadas = sorted(
-            reglas.items(),
-            key=lambda x: x[1].get("prioridad", 99) if isinstance(x[1], dict) else 99
-        )
-
-        for rule_id, rule in reglas_ordenadas:
-            if not isinstance(rule, dict):
-                continue
-            if not rule.get("activa", False):
-                continue
-
+        # v3.9.0: Motor compilado (mismo orden de prioridad y semantica)
+        for rule_id, rule in self.rule_engine.matching_rules(oferta_nlp):
             accion = rule.get("accion", {})
-            isco = accion.get("forzar_isco") or accion.get("forzar_isco_familia", "")
-            if not isco:
-                continue
 
-            condicion = rule.get("condicion", {})
-            condiciones_evaluadas = []
-
-            # titulo_contiene_alguno
-            terminos = condicion.get("titulo_contiene_alguno", [])
-            if terminos:
-                condiciones_evaluadas.append(any(t.lower() in titulo.lower() for t in terminos))
-
-            # titulo_contiene_alguno_2
-            terminos_2 = condicion.get("titulo_contiene_alguno_2", [])
-            if terminos_2:
-                condiciones_evaluadas.append(any(t.lower() in titulo.lower() for t in terminos_2))
-
-            # titulo_contiene_todos
-            terminos_todos = condicion.get("titulo_contiene_todos", [])
-            if terminos_todos:
-                condiciones_evaluadas.append(all(t.lower() in titulo.lower() for t in terminos_todos))
-
-            # titulo_o_tareas_contiene_alguno
-            terminos_ot = condicion.get("titulo_o_tareas_contiene_alguno", [])
-            if terminos_ot:
-                condiciones_evaluadas.append(any(t.lower() in titulo.lower() or t.lower() in tareas.lower() for t in terminos_ot))
-
-            # skills_contiene_alguno
-            terminos_skills = condicion.get("skills_contiene_alguno", [])
-            if terminos_skills:
-                texto_completo = f"{titulo} {tareas}"
-                condiciones_evaluadas.append(any(t.lower() in texto_completo for t in terminos_skills))
-
-            condicion_texto_cumplida = len(condiciones_evaluadas) > 0 and all(condiciones_evaluadas)
-
-            # area_funcional_es
-            area_requerida = condicion.get("area_funcional_es")
-            if condicion_texto_cumplida and area_requerida:
-                condicion_cumplida = oferta_nlp.get("area_funcional", "").lower() == area_requerida.lower()
+            # v3.4.2: ESCO es el target, ISCO se deriva
+            esco_label = accion.get("esco_label", "")
+            occupation = self._find_occupation_by_esco_label(esco_label)
+
+            if occupation:
+                return {
+                    "rule_id": rule_id,
+                    "isco_code": occupation['isco_code'],  # ISCO derivado de ESCO
+                    "esco_label": occupation['label'],  # Label exacto de ESCO
+                    "nombre_regla": rule.get("nombre", "")
+                }
             else:
-                condicion_cumplida = condicion_texto_cumplida
-
-            # sector_es
-            sector_requerido = condicion.get("sector_es")
-            if condicion_cumplida and sector_requerido:
-                sector_actual = oferta_nlp.get("sector_empresa", "").lower()
-                condicion_cumplida = sector_actual == sector_requerido.lower()
-
-            # sector_empresa_es_alguno
-            sectores_validos = condicion.get("sector_empresa_es_alguno", [])
-            if condicion_cumplida and sectores_validos:
-                sector_actual = oferta_nlp.get("sector_empresa", "").lower()
-                condicion_cumplida = any(s.lower() == sector_actual for s in sectores_validos)
-
-            # EXCLUSIONES
-            if condicion_cumplida:
-                excluir_titulo = condicion.get("titulo_no_contiene_alguno", [])
-                if excluir_titulo and any(t.lower() in titulo_original for t in excluir_titulo):
-                    condicion_cumplida = False
-
-                excluir_sector = condicion.get("sector_no_es", [])
-                sector_actual = oferta_nlp.get("sector_empresa", "").lower()
-                if excluir_sector and any(s.lower() == sector_actual for s in excluir_sector):
-                    condicion_cumplida = False
-
-                excluir_area = condicion.get("area_funcional_no_es", [])
-                area_actual = oferta_nlp.get("area_funcional", "").lower()
-                if excluir_area and any(a.lower() == area_actual for a in excluir_area):
-                    condicion_cumplida = False
-
-            if condicion_cumplida:
-                # v3.4.2: ESCO es el target, ISCO se deriva
-                esco_label = accion.get("esco_label", "")
-                occupation = self._find_occupation_by_esco_label(esco_label)
-
-                if occupation:
-                    return {
-                        "rule_id": rule_id,
-                        "isco_code": occupation['isco_code'],  # ISCO derivado de ESCO
-                        "esco_label": occupation['label'],  # Label exacto de ESCO
-                        "nombre_regla": rule.get("nombre", "")
-                    }
-                else:
-                    # Si no se encuentra ESCO, continuar con siguiente regla
-                    continue
+                # Si no se encuentra ESCO, continuar con siguiente regla
+                continue
 
         return None
 
@@ -1016,17 +1445,17 @@ class MatcherV3:
             return []
 
         # Usar el modelo de skills para encoding (mismo BGE-M3)
-        titulo_emb = self.skills_extractor.model.encode(titulo, normalize_embeddings=True)
+        # v3.5.0: encode() reutiliza el vector si el lote hizo prefetch
+        titulo_emb = self.skills_extractor.encode(titulo)
 
-        # Calcular similitudes
-        similarities = np.dot(self.occ_embeddings, titulo_emb)
-
-        # Top N
-        top_indices = np.argsort(similarities)[-top_n:][::-1]
+        # Top N por similitud coseno (v3.6.0: via vector_index)
+        top_scores, top_indices = self.occ_index.search(titulo_emb, top_n)
 
         results = []
-        for idx in top_indices:
-            score = float(similarities[idx])
+        for score, idx in zip(top_scores[0], top_indices[0]):
+            if idx < 0:
+                continue
+            score = float(score)
             meta = self.occ_metadata[idx]
             results.append({
                 "occupation_uri": meta.get("uri", ""),
@@ -1094,6 +1523,10 @@ class MatcherV3:
 
         return combined
 
+    def extract_skills(self, **kwargs) -> List[Dict]:
+        """v3.16.0: Skills implicitas (misma interfaz que MatchingServiceClient.extract_skills)."""
+        return self.skills_extractor.extract_skills(**kwargs)
+
     def close(self):
         """Cierra conexiones."""
         if self._owns_connection and self.conn:
@@ -1101,158 +1534,12 @@ class MatcherV3:
         self.skills_matcher.close()
 
     def save_matching_result(self, id_oferta: str, result: MatchResult, run_id: str = None) -> bool:
-        """
-        Persiste el resultado del matching en ofertas_esco_matching.
-
-        v3.4.0: Incluye campos de dual matching (isco_regla, isco_semantico, etc.)
-
-        Args:
-            id_oferta: ID de la oferta
-            result: MatchResult del matching
-            run_id: ID de la corrida (opcional, para run tracking v3.2.4)
-
-        Returns:
-            True si se guardó correctamente
-        """
-        from datetime import datetime
-
-        try:
-            # Extraer campos de dual matching de metadata
-            meta = result.metadata or {}
-            isco_regla = meta.get("isco_regla")
-            isco_semantico = meta.get("isco_semantico")
-            score_semantico = meta.get("score_semantico")
-            regla_aplicada = meta.get("regla_aplicada")
-            dual_coinciden = meta.get("dual_coinciden")
-
-            self.conn.execute('''
-                INSERT OR REPLACE INTO ofertas_esco_matching (
-                    id_oferta, esco_occupation_uri, esco_occupation_label,
-                    occupation_match_score, occupation_match_method,
-                    isco_code, isco_label,
-                    skills_oferta_json, skills_matched_essential,
-                    skills_demandados_total, skills_matcheados_esco,
-                    matching_timestamp, matching_version, run_id,
-                    estado_validacion,
-                    isco_regla, isco_semantico, score_semantico,
-                    regla_aplicada, dual_coinciden, decision_metodo
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                str(id_oferta),
-                result.esco_uri,
-                result.esco_label,
-                result.score,
-                result.metodo,
-                result.isco_code,
-                result.esco_label,  # isco_label = esco_label por ahora
-                json.dumps([s.get('skill_esco', '') for s in result.skills_extracted], ensure_ascii=False),
-                json.dumps(result.skills_matched, ensure_ascii=False),
-                len(result.skills_extracted),
-                len(result.skills_matched),
-                datetime.now().isoformat(),
-                self.VERSION,
-                run_id,  # v3.2.4: Run tracking
-                'pendiente',  # v3.2.5: Estado validación inicial
-                # v3.4.0: Campos dual matching
-                isco_regla,
-                isco_semantico,
-                score_semantico,
-                regla_aplicada,
-                dual_coinciden,
-                None  # decision_metodo será seteado por auto_corrector
-            ))
-            # v3.3.3: Tracking histórico
-            # Guardar en ofertas_matching_history (no sobrescribe)
-            self.conn.execute('''
-                INSERT INTO ofertas_matching_history
-                (id_oferta, run_id, isco_code, isco_label, match_method, score)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                str(id_oferta),
-                run_id,
-                result.isco_code,
-                result.esco_label,
-                result.metodo,
-                result.score
-            ))
-
-            # Guardar relación run <-> oferta
-            if run_id:
-                self.conn.execute('''
-                    INSERT OR IGNORE INTO run_ofertas (run_id, id_oferta)
-                    VALUES (?, ?)
-                ''', (run_id, str(id_oferta)))
-
-            self.conn.commit()
-
-            if self.verbose:
-                dual_info = ""
-                if dual_coinciden is not None:
-                    dual_info = f" [DUAL: {'COINCIDEN' if dual_coinciden else 'DIFIEREN'}]"
-                print(f"[V3.4] Matching guardado para {id_oferta}{dual_info}" + (f" (run: {run_id})" if run_id else ""))
-            return True
-
-        except Exception as e:
-            logger.error(f"Error guardando matching para {id_oferta}: {e}")
-            if self.verbose:
-                print(f"[V3.4] ERROR guardando matching: {e}")
-            return False
+        """Persiste el resultado del matching (ver MatchResultWriter)."""
+        return self.writer.save_matching_result(id_oferta, result, run_id=run_id)
 
     def save_skills_detalle(self, id_oferta: str, skills: List[Dict]) -> int:
-        """
-        Persiste las skills extraídas en ofertas_esco_skills_detalle.
-
-        Args:
-            id_oferta: ID de la oferta
-            skills: Lista de skills extraídas (del SkillsImplicitExtractor + Categorizer)
-
-        Returns:
-            Número de skills guardadas
-        """
-        try:
-            # Primero eliminar skills anteriores de esta oferta
-            self.conn.execute(
-                'DELETE FROM ofertas_esco_skills_detalle WHERE id_oferta = ?',
-                (str(id_oferta),)
-            )
-
-            count = 0
-            for skill in skills:
-                self.conn.execute('''
-                    INSERT INTO ofertas_esco_skills_detalle (
-                        id_oferta, skill_mencionado, skill_tipo_fuente,
-                        esco_skill_label, match_score, match_method,
-                        esco_skill_type, source_classification
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    str(id_oferta),
-                    skill.get('skill_esco', skill.get('skill', '')),
-                    skill.get('origen', 'unknown'),
-                    skill.get('skill_esco', ''),
-                    skill.get('score', 0),
-                    'implicit_bge_m3',
-                    skill.get('L1', 'T'),  # Categoría L1
-                    json.dumps({
-                        'L1': skill.get('L1', ''),
-                        'L1_nombre': skill.get('L1_nombre', ''),
-                        'L2': skill.get('L2', ''),
-                        'L2_nombre': skill.get('L2_nombre', ''),
-                        'es_digital': skill.get('es_digital', False)
-                    }, ensure_ascii=False)
-                ))
-                count += 1
-
-            self.conn.commit()
-
-            if self.verbose:
-                print(f"[V3] {count} skills guardadas para {id_oferta}")
-            return count
-
-        except Exception as e:
-            logger.error(f"Error guardando skills para {id_oferta}: {e}")
-            if self.verbose:
-                print(f"[V3] ERROR guardando skills: {e}")
-            return 0
+        """Persiste las skills extraídas (ver MatchResultWriter)."""
+        return self.writer.save_skills_detalle(id_oferta, skills)
 
     def match_and_persist(self, id_oferta: str, oferta_nlp: Dict,
                           categorize_skills: bool = True, run_id: str = None,
@@ -1292,8 +1579,64 @@ class MatcherV3:
                 UserWarning,
                 stacklevel=2
             )
+
+        result, skills_to_save = self.compute_match(id_oferta, oferta_nlp, categorize_skills=categorize_skills)
+
+        start = time.perf_counter()
+        # 5. Persistir matching (con run_id si está disponible)
+        self.save_matching_result(id_oferta, result, run_id=run_id)
+
+        # 6. Persistir skills
+        self.save_skills_detalle(id_oferta, skills_to_save)
+
+        # v3.15.0: Persistencia medida aparte (el matching ya se guardo)
+        timings = result.metadata.setdefault("timings_ms", {})
+        timings["persistencia"] = round((time.perf_counter() - start) * 1000.0, 3)
+
+        if self.verbose:
+            print(f"[V3] Pipeline completo persistido para {id_oferta}")
+
+        return result
+
+    def compute_match(self, id_oferta: str, oferta_nlp: Dict,
+                      categorize_skills: bool = True) -> Tuple[MatchResult, List[Dict]]:
+        """
+        v3.10.0: Pasos 1-4 de match_and_persist() sin escribir en BD.
+
+        Lo usan los workers de run_matching_pipeline(workers=N): calculan en
+        paralelo y el proceso principal persiste con MatchResultWriter.
+
+        Returns:
+            (MatchResult, skills a guardar en ofertas_esco_skills_detalle)
+        """
+        # v3.14.0: Entradas ya vistas -> resultado del memo (ya trae las skills)
+        start = time.perf_counter()
+        memo_key = self._memo_key(oferta_nlp)
+        result = self._memo_get(memo_key)
+        if result is not None:
+            result = self._with_memo_timing(result, start)
+        else:
+            result = self._compute_uncached(oferta_nlp)
+            self._memo_put(memo_key, result)
+
+        # 4. Categorizar skills si se solicita
+        skills_to_save = result.skills_extracted
+        if categorize_skills and skills_to_save:
+            try:
+                from skill_categorizer import SkillCategorizer
+                categorizer = SkillCategorizer()
+                skills_to_save = categorizer.categorize_batch(skills_to_save)
+            except Exception as e:
+                if self.verbose:
+                    print(f"[V3] WARN: No se pudo categorizar skills: {e}")
+
+        return result, skills_to_save
+
+    def _compute_uncached(self, oferta_nlp: Dict) -> MatchResult:
+        """Pasos 1-3 de compute_match(): skills + matching sin memo."""
         titulo = oferta_nlp.get("titulo_limpio") or oferta_nlp.get("titulo", "")
         tareas = oferta_nlp.get("tareas_explicitas", "")
+        timer = StageTimer()
 
         # 1. SIEMPRE extraer skills primero (antes del matching)
         # Esto garantiza que tengamos skills incluso si una regla hace bypass
@@ -1314,21 +1657,23 @@ class MatcherV3:
             except:
                 soft_skills_nlp = []
 
-        skills_extracted = self.skills_extractor.extract_skills(
-            titulo_limpio=titulo,
-            tareas_explicitas=tareas,
-            skills_nlp=skills_nlp,
-            soft_skills_nlp=soft_skills_nlp,
-            sector_empresa=oferta_nlp.get("sector_empresa"),
-            nivel_seniority=oferta_nlp.get("nivel_seniority"),
-            area_funcional=oferta_nlp.get("area_funcional")
-        )
+        with timer.stage("extraccion_skills"):
+            skills_extracted = self.skills_extractor.extract_skills(
+                titulo_limpio=titulo,
+                tareas_explicitas=tareas,
+                skills_nlp=skills_nlp,
+                soft_skills_nlp=soft_skills_nlp,
+                sector_empresa=oferta_nlp.get("sector_empresa"),
+                nivel_seniority=oferta_nlp.get("nivel_seniority"),
+                area_funcional=oferta_nlp.get("area_funcional")
+            )
 
         if self.verbose:
             print(f"[V3] Skills extraídas: {len(skills_extracted)}")
 
-        # 2. Ejecutar matching
-        result = self.match(oferta_nlp)
+        # 2. Ejecutar matching con las skills de arriba (una sola extraccion
+        # por oferta: extraccion_skills mide solo la de este paso)
+        result = self._match_uncached(oferta_nlp, timer=timer, skills_extracted=skills_extracted)
 
         # 3. Si el matching vino de una regla de negocio, puede no tener skills
         # En ese caso, usar las que extrajimos arriba
@@ -1347,26 +1692,6 @@ class MatcherV3:
                 metadata={**result.metadata, "skills_count": len(skills_extracted)}
             )
 
-        # 4. Categorizar skills si se solicita
-        skills_to_save = result.skills_extracted
-        if categorize_skills and skills_to_save:
-            try:
-                from skill_categorizer import SkillCategorizer
-                categorizer = SkillCategorizer()
-                skills_to_save = categorizer.categorize_batch(skills_to_save)
-            except Exception as e:
-                if self.verbose:
-                    print(f"[V3] WARN: No se pudo categorizar skills: {e}")
-
-        # 5. Persistir matching (con run_id si está disponible)
-        self.save_matching_result(id_oferta, result, run_id=run_id)
-
-        # 6. Persistir skills
-        self.save_skills_detalle(id_oferta, skills_to_save)
-
-        if self.verbose:
-            print(f"[V3] Pipeline completo persistido para {id_oferta}")
-
         return result
 
 
@@ -1446,6 +1771,446 @@ def test_v3():
     matcher.close()
 
 
+def matching_context_fingerprint() -> str:
+    """v3.12.0: Huella de configs de matching + modelo + versiones de la corrida."""
+    return build_context_fingerprint({
+        "matcher": MatcherV3.VERSION,
+        "skills_extractor": SkillsImplicitExtractor.VERSION,
+        "skills_matcher": SkillsBasedMatcher.VERSION,
+        "modelo": SkillsImplicitExtractor.DEFAULT_MODEL,
+    })
+
+
+def _build_oferta_nlp(oferta: sqlite3.Row) -> Dict:
+    """Arma el dict NLP que recibe MatcherV3 a partir de una fila del pipeline."""
+    # v3.3.5: Incluir titulo_original para exclusiones en reglas de negocio
+    titulo_original = oferta['titulo_original'] if 'titulo_original' in oferta.keys() else None
+    return {
+        'titulo_limpio': oferta['titulo_limpio'] or '',
+        'titulo': titulo_original or oferta['titulo_limpio'] or '',  # titulo_original para exclusiones
+        'tareas_explicitas': oferta['tareas_explicitas'] or '',
+        'area_funcional': oferta['area_funcional'] or '',
+        'nivel_seniority': oferta['nivel_seniority'] or '',
+        'sector_empresa': oferta['sector_empresa'] or ''
+    }
+
+
+# =============================================================================
+# v3.10.0: WORKERS (modo multiproceso)
+# =============================================================================
+
+# Ofertas por tarea enviada a un worker cuando no se indica batch_size
+WORKER_CHUNK_SIZE = 32
+
+# v3.11.0: Ofertas por transaccion en run_matching_pipeline
+DEFAULT_COMMIT_EVERY = 200
+
+# v3.13.0: Ofertas por pagina (keyset) en modo stream
+DEFAULT_PAGE_SIZE = 1000
+
+# MatcherV3 caliente de cada proceso worker (modelo + embeddings mmap)
+_worker_matcher = None
+
+
+def _init_matching_worker(db_path: str):
+    """Initializer del pool: un MatcherV3 por proceso, cargado una sola vez."""
+    global _worker_matcher
+    # Conexion propia solo para lecturas (ESCO, asociaciones); nunca escribe
+    conn = sqlite3.connect(db_path, timeout=60)
+    _worker_matcher = MatcherV3(db_conn=conn, verbose=False)
+
+
+def _match_chunk_worker(chunk: List[Tuple[str, Dict]], batch_size: int = None) -> Tuple[List[Tuple], Optional[Dict], Dict]:
+    """Calcula el matching de un lote en el worker (sin persistir)."""
+    return _compute_chunk(_worker_matcher, chunk, batch_size)
+
+
+def _compute_chunk(matcher: MatcherV3, chunk: List[Tuple[str, Dict]],
+                   batch_size: int = None) -> Tuple[List[Tuple], Optional[Dict], Dict]:
+    """
+    Matching de un lote con un matcher ya cargado (worker o matching_service).
+
+    Returns:
+        ([(id_oferta, MatchResult | None, skills | None, error | None)],
+         stats cache embeddings del lote, stats memo de resultados del lote
+         + prefetch_errores: 1 si el prefetch BGE-M3 del lote fallo)
+    """
+    extractor = matcher.skills_extractor
+    if extractor.embedding_cache is not None:
+        extractor.embedding_cache.reset_stats()
+    matcher.reset_memo_stats()
+
+    prefetch_errores = 0
+    if batch_size:
+        try:
+            matcher.prefetch_embeddings([nlp for _, nlp in chunk], batch_size=batch_size)
+        except Exception as e:
+            # Se encodea por oferta (lento): que quede rastro
+            logger.warning(f"Prefetch de embeddings fallo ({len(chunk)} ofertas), se encodea por oferta: {e}")
+            prefetch_errores = 1
+
+    outputs = []
+    for id_oferta, oferta_nlp in chunk:
+        try:
+            result, skills = matcher.compute_match(id_oferta, oferta_nlp)
+            outputs.append((id_oferta, result, skills, None))
+        except Exception as e:
+            outputs.append((id_oferta, None, None, str(e)))
+
+    extractor.clear_prefetch()
+    chunk_stats = matcher.memo_stats()
+    chunk_stats["prefetch_errores"] = prefetch_errores
+    return outputs, extractor.cache_stats(), chunk_stats
+
+
+def _merge_cache_stats(total: Optional[Dict], parcial: Optional[Dict]) -> Optional[Dict]:
+    """Suma contadores del cache de embeddings (o del memo) de varios workers."""
+    if not parcial:
+        return total
+    if not total:
+        total = dict(parcial)
+    else:
+        for key in ("hits", "misses", "writes", "evictions"):
+            total[key] += parcial[key]
+        total["entries"] = max(total["entries"], parcial["entries"])
+        if "prefetch_errores" in parcial:
+            total["prefetch_errores"] = total.get("prefetch_errores", 0) + parcial["prefetch_errores"]
+    lookups = total["hits"] + total["misses"]
+    total["hit_rate"] = round(total["hits"] / lookups, 4) if lookups else 0.0
+    return total
+
+
+def _prepare_offers(
+    conn: sqlite3.Connection,
+    rows: List[sqlite3.Row],
+    contexto: str,
+    changed_only: bool = False
+) -> Tuple[List[Tuple[str, Dict, str]], int]:
+    """
+    Arma (id_oferta, oferta_nlp, input_fingerprint) para un lote de filas.
+
+    v3.12.0: con changed_only descarta las ofertas cuya huella guardada
+    coincide con la actual.
+
+    Returns:
+        (ofertas a procesar, ofertas sin cambios descartadas)
+    """
+    prepared = []
+    for row in rows:
+        oferta_nlp = _build_oferta_nlp(row)
+        prepared.append((str(row['id_oferta']), oferta_nlp, input_fingerprint(oferta_nlp, contexto)))
+
+    if not changed_only:
+        return prepared, 0
+
+    guardadas = stored_fingerprints(conn, [id_oferta for id_oferta, _, _ in prepared])
+    vigentes = [item for item in prepared if guardadas.get(item[0]) != item[2]]
+    return vigentes, len(prepared) - len(vigentes)
+
+
+def _iter_offer_pages(
+    conn: sqlite3.Connection,
+    query: str,
+    params: List,
+    page_size: int,
+    limit: Optional[int],
+    contexto: str,
+    stats: Dict,
+    changed_only: bool = False,
+    tracker=None,
+    run_id: Optional[str] = None
+) -> Iterator[List[Tuple[str, Dict, str]]]:
+    """
+    v3.13.0: Paginas de ofertas por keyset (n.id_oferta > ultimo id).
+
+    Cada pagina se lee, se filtra (changed_only) y se registra en el run
+    (run_ofertas) antes de procesarse; nunca se materializa la lista completa.
+    """
+    keyset_query = f"{query} AND n.id_oferta > ? ORDER BY n.id_oferta LIMIT ?"
+    first_query = f"{query} ORDER BY n.id_oferta LIMIT ?"
+    last_id = None
+    emitted = 0
+
+    while limit is None or emitted < limit:
+        if last_id is None:
+            rows = conn.execute(first_query, list(params) + [page_size]).fetchall()
+        else:
+            rows = conn.execute(keyset_query, list(params) + [last_id, page_size]).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1]['id_oferta']
+
+        page, sin_cambios = _prepare_offers(conn, rows, contexto, changed_only)
+        stats['sin_cambios'] = stats.get('sin_cambios', 0) + sin_cambios
+        if limit is not None:
+            page = page[:limit - emitted]
+        if not page:
+            continue
+
+        emitted += len(page)
+        stats['total'] += len(page)
+        if tracker and run_id:
+            tracker.register_offers(run_id, [id_oferta for id_oferta, _, _ in page], conn=conn)
+        yield page
+
+
+def _split_chunks(pages: Iterable[List], chunk_size: int) -> Iterator[List]:
+    """Corta las paginas en lotes de chunk_size."""
+    for page in pages:
+        for start in range(0, len(page), chunk_size):
+            yield page[start:start + chunk_size]
+
+
+def _run_matching_workers(
+    pages: Iterable[List[Tuple[str, Dict, str]]],
+    conn: sqlite3.Connection,
+    db_path: str,
+    run_id: Optional[str],
+    workers: int,
+    batch_size: Optional[int],
+    stats: Dict,
+    verbose: bool = False,
+    commit_every: int = DEFAULT_COMMIT_EVERY
+):
+    """
+    v3.10.0: Reparte las ofertas entre N procesos y persiste desde este proceso.
+
+    Cada worker mantiene un MatcherV3 caliente (initializer); este proceso es el
+    unico escritor de SQLite, asi la BD nunca tiene escritores concurrentes.
+
+    v3.13.0: Como mucho 2 lotes en vuelo por worker (memoria acotada en modo stream).
+
+    Los lotes se persisten en orden de envio (mismo orden que el modo serial):
+    mientras se espera el mas viejo los demas siguen calculando.
+
+    Si un worker muere (OOM, segfault) el pool queda roto: los lotes en vuelo
+    y los que faltaban enviar cuentan como errores y la corrida termina con
+    lo ya persistido (only_pending=True retoma el resto).
+    """
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    # Columnares / variantes cuantizadas una sola vez aca: si los N workers
+    # arrancan en frio los regenerarian todos a la vez
+    try:
+        prepare_artifacts(load_index_config().get("precision", "float32"), verbose=verbose)
+    except Exception as e:
+        print(f"[PIPELINE] WARN: no se pudieron preparar artefactos de embeddings: {e}")
+
+    chunks = _split_chunks(pages, batch_size or WORKER_CHUNK_SIZE)
+    writer = MatchResultWriter(conn, version=MatcherV3.VERSION, commit_every=commit_every)
+    # v3.15.0: Tiempos por etapa (vienen en metadata de cada resultado)
+    latencies = LatencyHistogram()
+    writer.latencies = latencies
+    cache_stats = None
+    memo_stats = None
+    done = 0
+    broken = False
+
+    with writer, ProcessPoolExecutor(max_workers=workers, initializer=_init_matching_worker,
+                                     initargs=(db_path,)) as pool:
+        in_flight = deque()  # (future, lote) en orden de envio
+
+        def drop_chunk(chunk: List):
+            nonlocal done
+            stats['errores'] += len(chunk)
+            done += len(chunk)
+
+        def submit_next() -> bool:
+            nonlocal broken
+            if broken:
+                return False
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            payload = [(id_oferta, oferta_nlp) for id_oferta, oferta_nlp, _ in chunk]
+            try:
+                future = pool.submit(_match_chunk_worker, payload, batch_size)
+            except BrokenProcessPool as e:
+                broken = True
+                drop_chunk(chunk)
+                print(f"[PIPELINE] ERROR: pool de workers roto, no se envian mas lotes: {e}")
+                return False
+            in_flight.append((future, chunk))
+            return True
+
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+
+        while in_flight:
+            future, chunk = in_flight.popleft()
+            try:
+                outputs, chunk_cache_stats, chunk_memo_stats = future.result()
+            except BrokenProcessPool as e:
+                if not broken:
+                    print(f"[PIPELINE] ERROR: un worker murio, pool roto: {e}")
+                broken = True
+                drop_chunk(chunk)
+                continue
+            except Exception as e:
+                drop_chunk(chunk)
+                if verbose:
+                    print(f"[PIPELINE] ERROR en worker ({len(chunk)} ofertas): {e}")
+                submit_next()
+                continue
+
+            submit_next()
+            _persist_outputs(chunk, outputs, writer, latencies, stats, run_id, verbose)
+            stats['prefetch_errores'] += (chunk_memo_stats or {}).get('prefetch_errores', 0)
+            cache_stats = _merge_cache_stats(cache_stats, chunk_cache_stats)
+            # Memo por worker: entries = el mayor de los memos
+            memo_stats = _merge_cache_stats(memo_stats, chunk_memo_stats)
+            done += len(chunk)
+            if verbose:
+                print(f"[PIPELINE] {done}/{stats['total']} procesadas...")
+
+        if broken:
+            # Lotes sin enviar: errores (en stream se leen igual para contarlos)
+            for chunk in chunks:
+                drop_chunk(chunk)
+
+    stats['embedding_cache'] = cache_stats
+    stats['match_memo'] = memo_stats
+    stats['latencias'] = latencies.summary()
+    stats['procesadas'] -= writer.failed
+    stats['errores'] += writer.failed
+
+
+def _persist_outputs(
+    chunk: List[Tuple[str, Dict, str]],
+    outputs: List[Tuple],
+    writer: MatchResultWriter,
+    latencies: LatencyHistogram,
+    stats: Dict,
+    run_id: Optional[str],
+    verbose: bool = False
+):
+    """Encola en el writer los resultados de un lote calculado fuera (workers/servicio)."""
+    fingerprints = {id_oferta: fingerprint for id_oferta, _, fingerprint in chunk}
+    for id_oferta, result, skills, error in outputs:
+        if error is not None:
+            stats['errores'] += 1
+            if verbose:
+                print(f"[PIPELINE] ERROR en {id_oferta}: {error}")
+            continue
+        latencies.add(result.metadata.get("timings_ms"))
+        writer.add(id_oferta, result, skills, run_id=run_id,
+                   fingerprint=fingerprints.get(id_oferta))
+        stats['procesadas'] += 1
+        stats['skills_totales'] += len(result.skills_extracted)
+
+
+def _run_matching_service(
+    pages: Iterable[List[Tuple[str, Dict, str]]],
+    conn: sqlite3.Connection,
+    client,
+    run_id: Optional[str],
+    batch_size: Optional[int],
+    stats: Dict,
+    verbose: bool = False,
+    commit_every: int = DEFAULT_COMMIT_EVERY
+):
+    """
+    v3.16.0: El servicio local (MatcherV3 caliente) calcula cada lote y este
+    proceso persiste, igual que con workers pero sin cargar ningun modelo.
+    """
+    writer = MatchResultWriter(conn, version=MatcherV3.VERSION, commit_every=commit_every)
+    latencies = LatencyHistogram()
+    writer.latencies = latencies
+    cache_stats = None
+    memo_stats = None
+    done = 0
+
+    with writer:
+        for chunk in _split_chunks(pages, batch_size or WORKER_CHUNK_SIZE):
+            payload = [(id_oferta, oferta_nlp) for id_oferta, oferta_nlp, _ in chunk]
+            try:
+                outputs, chunk_cache_stats, chunk_memo_stats = client.compute_chunk(payload, batch_size)
+            except Exception as e:
+                stats['errores'] += len(chunk)
+                done += len(chunk)
+                if verbose:
+                    print(f"[PIPELINE] ERROR en servicio de matching ({len(chunk)} ofertas): {e}")
+                continue
+
+            _persist_outputs(chunk, outputs, writer, latencies, stats, run_id, verbose)
+            stats['prefetch_errores'] += (chunk_memo_stats or {}).get('prefetch_errores', 0)
+            cache_stats = _merge_cache_stats(cache_stats, chunk_cache_stats)
+            memo_stats = _merge_cache_stats(memo_stats, chunk_memo_stats)
+            done += len(chunk)
+            if verbose:
+                print(f"[PIPELINE] {done}/{stats['total']} procesadas...")
+
+    stats['embedding_cache'] = cache_stats
+    stats['match_memo'] = memo_stats
+    stats['latencias'] = latencies.summary()
+    stats['procesadas'] -= writer.failed
+    stats['errores'] += writer.failed
+
+
+def _run_matching_serial(
+    pages: Iterable[List[Tuple[str, Dict, str]]],
+    conn: sqlite3.Connection,
+    run_id: Optional[str],
+    batch_size: Optional[int],
+    stats: Dict,
+    verbose: bool = False,
+    commit_every: int = DEFAULT_COMMIT_EVERY
+):
+    """Matching en un solo proceso (modo por defecto)."""
+    # Inicializar matcher
+    matcher = MatcherV3(db_conn=conn, verbose=verbose)
+    # v3.11.0: Persistencia en lote (una transaccion cada commit_every ofertas)
+    writer = MatchResultWriter(conn, version=MatcherV3.VERSION, commit_every=commit_every)
+    # v3.15.0: Histograma de tiempos por etapa de la corrida
+    latencies = LatencyHistogram()
+    writer.latencies = latencies
+    done = 0
+
+    # v3.7.0: Contadores del cache de embeddings solo de esta corrida
+    if matcher.skills_extractor.embedding_cache is not None:
+        matcher.skills_extractor.embedding_cache.reset_stats()
+
+    for chunk in _split_chunks(pages, batch_size or 1):
+        # v3.5.0: Una sola llamada a BGE-M3 para todos los textos del lote
+        if batch_size:
+            try:
+                matcher.prefetch_embeddings([nlp for _, nlp, _ in chunk], batch_size=batch_size)
+            except Exception as e:
+                stats['prefetch_errores'] += 1
+                if verbose:
+                    print(f"[PIPELINE] WARN: prefetch de embeddings fallo, se encodea por oferta: {e}")
+
+        for id_oferta, oferta_nlp, fingerprint in chunk:
+            done += 1
+            try:
+                result, skills_to_save = matcher.compute_match(id_oferta, oferta_nlp)
+                latencies.add(result.metadata.get("timings_ms"))
+                writer.add(id_oferta, result, skills_to_save, run_id=run_id, fingerprint=fingerprint)
+                stats['procesadas'] += 1
+                stats['skills_totales'] += len(result.skills_extracted)
+
+                if verbose and done % 10 == 0:
+                    print(f"[PIPELINE] {done}/{stats['total']} procesadas...")
+
+            except Exception as e:
+                stats['errores'] += 1
+                if verbose:
+                    print(f"[PIPELINE] ERROR en {id_oferta}: {e}")
+
+        matcher.skills_extractor.clear_prefetch()
+
+    writer.flush()
+    stats['procesadas'] -= writer.failed
+    stats['errores'] += writer.failed
+    stats['embedding_cache'] = matcher.skills_extractor.cache_stats()
+    stats['match_memo'] = matcher.memo_stats()
+    stats['latencias'] = latencies.summary()
+    matcher.close()
+
+
 def run_matching_pipeline(
     offer_ids: List[str] = None,
     limit: int = None,
@@ -1454,7 +2219,14 @@ def run_matching_pipeline(
     source: str = "manual",
     description: str = "",
     track_run: bool = True,
-    force: bool = False
+    force: bool = False,
+    batch_size: int = None,
+    workers: int = None,
+    commit_every: int = DEFAULT_COMMIT_EVERY,
+    changed_only: bool = False,
+    stream: bool = False,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    use_service: bool = False
 ) -> Dict:
     """
     Ejecuta el pipeline completo de matching con persistencia automática.
@@ -1473,6 +2245,23 @@ def run_matching_pipeline(
         description: Descripción de la corrida - para run tracking
         track_run: Si True, crea un run y guarda métricas (default True)
         force: Si True, permite reprocesar ofertas validadas (default False)
+        batch_size: v3.5.0 - Si se indica, encodea titulos/tareas de N ofertas en
+                    una sola llamada a BGE-M3 (recomendado 64-256 en CPU)
+        workers: v3.10.0 - Si es > 1, reparte las ofertas entre N procesos con un
+                 MatcherV3 caliente cada uno; este proceso es el unico que escribe
+        commit_every: v3.11.0 - Ofertas por transaccion (executemany). Cada lote es
+                      atomico: si la corrida se corta, only_pending=True retoma
+                      desde la primera oferta sin persistir
+        changed_only: v3.12.0 - Solo ofertas sin matching o cuyo input_fingerprint
+                      (campos NLP + configs + modelo/versiones) cambio. Ignora
+                      only_pending; limit se aplica despues del filtro
+        stream: v3.13.0 - Lee ofertas_nlp en paginas de page_size por keyset
+                (id_oferta) y registra la membresia del run pagina a pagina, en
+                vez de fetchall + lista completa de IDs. No aplica con offer_ids
+        page_size: v3.13.0 - Ofertas por pagina en modo stream
+        use_service: v3.16.0 - Si matching_service esta corriendo y es compatible
+                     (misma version/configs/BD) y no se pidieron workers, el calculo
+                     se hace ahi. False (default) = siempre MatcherV3 local
 
     Returns:
         Dict con estadísticas del procesamiento (incluye run_id si track_run=True)
@@ -1485,6 +2274,9 @@ def run_matching_pipeline(
     conn = sqlite3.connect(str(db_path))
     conn.row_factory = sqlite3.Row
 
+    # v3.12.0: Columna input_fingerprint (migracion 013)
+    ensure_fingerprint_column(conn)
+
     # PROTECCIÓN: Verificar que no haya ofertas validadas (a menos que force=True)
     if offer_ids and not force:
         cur = conn.execute('''
@@ -1523,7 +2315,7 @@ def run_matching_pipeline(
             WHERE n.id_oferta IN ({placeholders})
         '''
         params = offer_ids
-    elif only_pending:
+    elif only_pending and not changed_only:
         query = f'''
             SELECT n.id_oferta, n.titulo_limpio, n.tareas_explicitas,
                    n.area_funcional, n.nivel_seniority, n.sector_empresa,
@@ -1547,14 +2339,40 @@ def run_matching_pipeline(
         '''
         params = []
 
-    if limit:
-        query += f' LIMIT {limit}'
+    # v3.12.0: Huella de entradas (contexto comun a toda la corrida)
+    contexto = matching_context_fingerprint()
+    stream = stream and not offer_ids
 
-    cur = conn.execute(query, params)
-    ofertas = cur.fetchall()
+    stats = {
+        'total': 0,
+        'procesadas': 0,
+        'errores': 0,
+        'skills_totales': 0,
+        'prefetch_errores': 0,
+        'run_id': None
+    }
+
+    if stream:
+        # v3.13.0: Sin fetchall; las paginas se leen a medida que se procesan
+        ofertas = None
+        processed_ids = []
+        stats['stream'] = True
+    else:
+        if limit and not changed_only:
+            query += f' LIMIT {limit}'
+
+        cur = conn.execute(query, params)
+        ofertas, sin_cambios = _prepare_offers(conn, cur.fetchall(), contexto, changed_only)
+        if changed_only:
+            stats['sin_cambios'] = sin_cambios
+            if limit:
+                ofertas = ofertas[:limit]
+            if verbose:
+                print(f"[PIPELINE] --changed-only: {len(ofertas)} con huella vieja, {sin_cambios} sin cambios")
+        stats['total'] = len(ofertas)
 
-    # Obtener IDs procesados
-    processed_ids = [str(o['id_oferta']) for o in ofertas]
+        # Obtener IDs procesados
+        processed_ids = [id_oferta for id_oferta, _, _ in ofertas]
 
     # Crear run si está habilitado
     run_id = None
@@ -1563,6 +2381,7 @@ def run_matching_pipeline(
         try:
             from run_tracking import RunTracker
             tracker = RunTracker()
+            # v3.13.0: En modo stream el run nace vacio y se completa por pagina
             run_id = tracker.create_run(
                 offer_ids=processed_ids,
                 source=source,
@@ -1575,49 +2394,44 @@ def run_matching_pipeline(
             if verbose:
                 print(f"[PIPELINE] WARN: No se pudo crear run: {e}")
 
-    if verbose:
-        print(f"\n[PIPELINE] Procesando {len(ofertas)} ofertas...")
-        if run_id:
-            print(f"[PIPELINE] Run ID: {run_id}")
-
-    # Inicializar matcher
-    matcher = MatcherV3(db_conn=conn, verbose=verbose)
-
-    stats = {
-        'total': len(ofertas),
-        'procesadas': 0,
-        'errores': 0,
-        'skills_totales': 0,
-        'run_id': run_id
-    }
+    stats['run_id'] = run_id
 
-    for i, oferta in enumerate(ofertas, 1):
-        try:
-            id_oferta = str(oferta['id_oferta'])
-            # v3.3.5: Incluir titulo_original para exclusiones en reglas de negocio
-            titulo_original = oferta['titulo_original'] if 'titulo_original' in oferta.keys() else None
-            oferta_nlp = {
-                'titulo_limpio': oferta['titulo_limpio'] or '',
-                'titulo': titulo_original or oferta['titulo_limpio'] or '',  # titulo_original para exclusiones
-                'tareas_explicitas': oferta['tareas_explicitas'] or '',
-                'area_funcional': oferta['area_funcional'] or '',
-                'nivel_seniority': oferta['nivel_seniority'] or '',
-                'sector_empresa': oferta['sector_empresa'] or ''
-            }
-
-            result = matcher.match_and_persist(id_oferta, oferta_nlp, run_id=run_id)
-            stats['procesadas'] += 1
-            stats['skills_totales'] += len(result.skills_extracted)
-
-            if verbose and i % 10 == 0:
-                print(f"[PIPELINE] {i}/{len(ofertas)} procesadas...")
-
-        except Exception as e:
-            stats['errores'] += 1
-            if verbose:
-                print(f"[PIPELINE] ERROR en {oferta['id_oferta']}: {e}")
+    if stream:
+        pages = _iter_offer_pages(conn, query, params, page_size, limit, contexto, stats,
+                                  changed_only=changed_only, tracker=tracker, run_id=run_id)
+        if verbose:
+            print(f"\n[PIPELINE] Procesando ofertas en modo stream (paginas de {page_size})...")
+    else:
+        pages = [ofertas]
+        if verbose:
+            print(f"\n[PIPELINE] Procesando {len(ofertas)} ofertas...")
+    if verbose and run_id:
+        print(f"[PIPELINE] Run ID: {run_id}")
+
+    if batch_size:
+        stats['batch_size'] = batch_size
+
+    # v3.16.0: Servicio local con MatcherV3 caliente (evita cargar el modelo)
+    service = None
+    if use_service and not (workers and workers > 1):
+        from matching_service import connect_service
+        service = connect_service(context=contexto, db_path=db_path, verbose=verbose)
+
+    if workers and workers > 1:
+        # v3.10.0: N workers calculan, este proceso persiste
+        stats['workers'] = workers
+        if verbose:
+            print(f"[PIPELINE] Modo multiproceso: {workers} workers")
+        _run_matching_workers(pages, conn, str(db_path), run_id, workers, batch_size, stats, verbose,
+                              commit_every=commit_every)
+    elif service is not None:
+        stats['service'] = service.url
+        _run_matching_service(pages, conn, service, run_id, batch_size, stats, verbose,
+                              commit_every=commit_every)
+    else:
+        _run_matching_serial(pages, conn, run_id, batch_size, stats, verbose,
+                             commit_every=commit_every)
 
-    matcher.close()
     conn.close()
 
     # Guardar resultados del run
@@ -1630,7 +2444,7 @@ def run_matching_pipeline(
                 'skills_totales': stats['skills_totales'],
                 'precision': stats['procesadas'] / stats['total'] if stats['total'] > 0 else 0
             }
-            tracker.save_results(run_id, metricas)
+            tracker.save_results(run_id, metricas, latencias=stats.get('latencias'))
         except Exception as e:
             if verbose:
                 print(f"[PIPELINE] WARN: No se pudieron guardar resultados del run: {e}")
@@ -1640,11 +2454,78 @@ def run_matching_pipeline(
         print(f"  Procesadas: {stats['procesadas']}/{stats['total']}")
         print(f"  Errores: {stats['errores']}")
         print(f"  Skills totales: {stats['skills_totales']}")
+        if stats['prefetch_errores']:
+            print(f"  Prefetch de embeddings fallido en {stats['prefetch_errores']} lotes (encodeo por oferta)")
+        if stats['embedding_cache']:
+            cache = stats['embedding_cache']
+            print(f"  Cache embeddings: {cache['hits']} hits / {cache['misses']} misses (hit rate {cache['hit_rate']:.1%})")
+        if stats.get('match_memo'):
+            memo = stats['match_memo']
+            print(f"  Memo resultados: {memo['hits']} hits / {memo['misses']} misses (hit rate {memo['hit_rate']:.1%})")
+        if stats.get('latencias'):
+            print("  Latencia por etapa (ms):")
+            for etapa, lat in stats['latencias'].items():
+                print(f"    {etapa:<18} p50={lat['p50_ms']:.2f} p95={lat['p95_ms']:.2f} "
+                      f"p99={lat['p99_ms']:.2f} (n={lat['count']})")
         if run_id:
             print(f"  Run ID: {run_id}")
 
     return stats
 
 
+def main():
+    """CLI del pipeline de matching (sin argumentos ejecuta test_v3)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pipeline de matching v3 (ofertas_nlp -> ESCO)")
+    parser.add_argument("--ids", nargs="+", help="IDs de ofertas especificos")
+    parser.add_argument("--limit", type=int, help="Limite de ofertas a procesar")
+    parser.add_argument("--all", action="store_true", help="Reprocesar tambien ofertas con matching previo")
+    parser.add_argument("--force", action="store_true", help="Permitir reprocesar ofertas validadas")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="Solo ofertas cuyo input_fingerprint cambio (NLP, configs, modelo)")
+    parser.add_argument("--batch-size", type=int, help="Ofertas por llamada a BGE-M3")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos de matching (1 = sin multiproceso)")
+    parser.add_argument("--commit-every", type=int, default=DEFAULT_COMMIT_EVERY,
+                        help="Ofertas por transaccion al persistir")
+    parser.add_argument("--stream", action="store_true",
+                        help="Leer ofertas por paginas (keyset) sin cargar todo en memoria")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Ofertas por pagina en --stream")
+    parser.add_argument("--service", action="store_true",
+                        help="Calcular en matching_service si esta corriendo y es compatible")
+    parser.add_argument("--source", default="manual", help="Origen de los IDs (run tracking)")
+    parser.add_argument("--description", default="", help="Descripcion de la corrida")
+    parser.add_argument("--no-track", action="store_true", help="No registrar run")
+    parser.add_argument("--test", action="store_true", help="Ejecutar test_v3()")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    args = parser.parse_args()
+
+    if args.test:
+        test_v3()
+        return
+
+    run_matching_pipeline(
+        offer_ids=args.ids,
+        limit=args.limit,
+        only_pending=not args.all,
+        verbose=args.verbose,
+        source=args.source,
+        description=args.description,
+        track_run=not args.no_track,
+        force=args.force,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        commit_every=args.commit_every,
+        changed_only=args.changed_only,
+        stream=args.stream,
+        page_size=args.page_size,
+        use_service=args.service
+    )
+
+
 if __name__ == "__main__":
-    test_v3()
+    import sys
+    if len(sys.argv) == 1:
+        test_v3()
+    else:
+        main()
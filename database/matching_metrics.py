@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Matching Metrics v1.0 - Latencia por etapa de MatcherV3
+=======================================================
+
+VERSION: 1.0.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+pipeline_runs solo guardaba conteos end-to-end. Para saber donde optimizar
+hace falta el tiempo de cada etapa de match() y su distribucion en la corrida
+(p50/p95/p99), no solo el promedio.
+
+COMPONENTES:
+1. StageTimer: cronometro por oferta. Cada etapa acumula ms (perf_counter);
+   MatcherV3 guarda el resultado en MatchResult.metadata["timings_ms"].
+2. LatencyHistogram: histograma por etapa con buckets logaritmicos fijos
+   (factor 1.1 => error de percentil <= 10%). Memoria constante sin importar
+   cuantas ofertas tenga la corrida (modo stream).
+
+ETAPAS (STAGES):
+  extraccion_skills, diccionario, match_skills, embedding_titulo,
+  combinacion, penalizaciones, reglas, persistencia (+ memo en hits del memo)
+
+Uso:
+    from matching_metrics import StageTimer, LatencyHistogram
+
+    timer = StageTimer()
+    with timer.stage("diccionario"):
+        ...
+    timer.as_dict()            # {"diccionario": 0.42, "total": 0.42}
+
+    hist = LatencyHistogram()
+    hist.add(timer.as_dict())
+    hist.summary()             # {"diccionario": {"count": 1, "p50_ms": ..., ...}}
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+STAGES = (
+    "extraccion_skills",
+    "diccionario",
+    "match_skills",
+    "embedding_titulo",
+    "combinacion",
+    "penalizaciones",
+    "reglas",
+    "persistencia",
+)
+
+# Buckets: [MIN_MS * FACTOR^i, MIN_MS * FACTOR^(i+1))
+BUCKET_MIN_MS = 0.001
+BUCKET_FACTOR = 1.1
+PERCENTILES = (50, 95, 99)
+
+
+class StageTimer:
+    """Tiempos (ms) de las etapas de una oferta."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000.0)
+
+    def add(self, name: str, ms: float):
+        """Suma ms a una etapa (una etapa puede ejecutarse mas de una vez)."""
+        self.timings[name] = self.timings.get(name, 0.0) + ms
+
+    def as_dict(self) -> Dict[str, float]:
+        """Tiempos redondeados + total de las etapas medidas."""
+        result = {name: round(ms, 3) for name, ms in self.timings.items()}
+        result["total"] = round(sum(self.timings.values()), 3)
+        return result
+
+
+def _bucket(ms: float) -> int:
+    if ms <= BUCKET_MIN_MS:
+        return 0
+    return int(math.log(ms / BUCKET_MIN_MS, BUCKET_FACTOR)) + 1
+
+
+def _bucket_upper(index: int) -> float:
+    return BUCKET_MIN_MS * BUCKET_FACTOR ** index
+
+
+class LatencyHistogram:
+    """Histograma de latencias por etapa (buckets logaritmicos)."""
+
+    def __init__(self):
+        # etapa -> {"buckets": {indice: conteo}, "count", "sum", "max"}
+        self.stages: Dict[str, Dict] = {}
+
+    def record(self, stage: str, ms: float):
+        data = self.stages.get(stage)
+        if data is None:
+            data = self.stages[stage] = {"buckets": {}, "count": 0, "sum": 0.0, "max": 0.0}
+        index = _bucket(ms)
+        data["buckets"][index] = data["buckets"].get(index, 0) + 1
+        data["count"] += 1
+        data["sum"] += ms
+        data["max"] = max(data["max"], ms)
+
+    def add(self, timings: Optional[Dict[str, float]]):
+        """Registra los tiempos de una oferta (metadata["timings_ms"])."""
+        for stage, ms in (timings or {}).items():
+            self.record(stage, ms)
+
+    def percentile(self, stage: str, p: float) -> Optional[float]:
+        """Percentil p (0-100) estimado con el limite superior del bucket."""
+        data = self.stages.get(stage)
+        if not data or not data["count"]:
+            return None
+        rank = max(1, math.ceil(data["count"] * p / 100.0))
+        seen = 0
+        for index in sorted(data["buckets"]):
+            seen += data["buckets"][index]
+            if seen >= rank:
+                return min(_bucket_upper(index), data["max"])
+        return data["max"]
+
+    def summary(self) -> Dict[str, Dict]:
+        """etapa -> count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms (para pipeline_runs)."""
+        result = {}
+        ordered = [s for s in STAGES if s in self.stages] + sorted(
+            s for s in self.stages if s not in STAGES
+        )
+        for stage in ordered:
+            data = self.stages[stage]
+            item = {
+                "count": data["count"],
+                "mean_ms": round(data["sum"] / data["count"], 3) if data["count"] else 0.0,
+            }
+            for p in PERCENTILES:
+                item[f"p{p}_ms"] = round(self.percentile(stage, p), 3)
+            item["max_ms"] = round(data["max"], 3)
+            result[stage] = item
+        return result
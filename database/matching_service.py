@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Matching Service v1.0 - MatcherV3 caliente en un proceso local
+==============================================================
+
+VERSION: 1.0.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+Cada script (run_validated_pipeline, run_optimization, gold set, subprocesos
+del dashboard admin) crea su propio MatcherV3 y recarga BGE-M3 + matrices de
+embeddings: decenas de segundos por invocacion. Este modulo levanta un daemon
+HTTP en localhost que mantiene UN MatcherV3 cargado y atiende:
+
+    GET  /health          version, huella de configs, BD, pid
+    POST /match           {"oferta_nlp": {...}}                -> MatchResult
+    POST /match_batch     {"ofertas_nlp": [...], "batch_size"} -> [MatchResult]
+    POST /extract_skills  {"kwargs": {...}}                    -> [skills]
+    POST /compute_match   {"id_oferta", "oferta_nlp", "categorize_skills"}
+    POST /compute_chunk   {"chunk": [[id, oferta_nlp], ...], "batch_size"}
+                          (mismo calculo que un worker de run_matching_pipeline)
+
+Las llamadas al matcher se serializan con un lock (el modelo no se comparte
+entre hilos). Cada CONTEXT_RECHECK_SECONDS se recalcula la huella de configs
+(matching_context_fingerprint): si cambio un JSON de reglas/sinonimos el
+matcher se recarga antes de atender.
+
+USO TRANSPARENTE:
+- get_matcher(db_conn) devuelve un MatchingServiceClient si el servicio esta
+  corriendo con la misma version de MatcherV3, los mismos configs y la misma
+  BD; si no, un MatcherV3 local (comportamiento anterior).
+- run_matching_pipeline(use_service=True) / --service usa el servicio para
+  calcular (y persiste en el proceso llamador) cuando esta disponible y no se
+  pidieron workers. Es opt-in: por defecto el pipeline usa MatcherV3 local.
+- Lo usan: run_validated_pipeline, rule_impact (--run y --verify) y
+  analizar_errores_gold_set. Los benchmarks (benchmark_matching,
+  test_gold_set_manual --quantization) miden el matcher local a proposito.
+- MOL_MATCHING_SERVICE=http://host:puerto cambia la URL; MOL_MATCHING_SERVICE=off
+  lo desactiva.
+
+Uso:
+    python database/matching_service.py                 # 127.0.0.1:8765
+    python database/matching_service.py --port 9000 -v
+
+    from matching_service import get_matcher
+    matcher = get_matcher(db_conn=conn)
+    result = matcher.match(oferta_nlp)
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_DB_PATH = Path(__file__).parent / "bumeran_scraping.db"
+SERVICE_URL_ENV = "MOL_MATCHING_SERVICE"
+
+# Sin servicio la conexion se rechaza al instante; el timeout solo corre si
+# el servicio esta ocupado con otra llamada
+HEALTH_TIMEOUT = 10
+REQUEST_TIMEOUT = 600
+CONTEXT_RECHECK_SECONDS = 5.0
+
+
+class MatchingServiceError(RuntimeError):
+    """Error devuelto por el servicio (o servicio inaccesible)."""
+
+
+# =============================================================================
+# SERIALIZACION
+# =============================================================================
+
+def _json_default(obj):
+    """numpy scalars/arrays y sets dentro de skills y metadata."""
+    if hasattr(obj, "item") and callable(obj.item):
+        try:
+            return obj.item()
+        except (ValueError, TypeError):
+            pass
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _dumps(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def _result_from_json(data: Optional[Dict]):
+    from match_ofertas_v3 import MatchResult
+    return MatchResult(**data) if data is not None else None
+
+
+# =============================================================================
+# SERVIDOR
+# =============================================================================
+
+class MatchingService:
+    """MatcherV3 caliente + recarga si cambian los configs."""
+
+    def __init__(self, db_path: Path = None, verbose: bool = False):
+        self.db_path = str(Path(db_path or DEFAULT_DB_PATH).resolve())
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.started = time.time()
+        self.matcher = None
+        self._load()
+
+    def _load(self):
+        from match_ofertas_v3 import MatcherV3, matching_context_fingerprint
+
+        if self.matcher is not None:
+            self.matcher.close()
+            self.conn.close()
+
+        start = time.perf_counter()
+        # Hilo del servidor != hilo de carga; el lock serializa el uso
+        self.conn = sqlite3.connect(self.db_path, timeout=60, check_same_thread=False)
+        self.matcher = MatcherV3(db_conn=self.conn, verbose=self.verbose)
+        self.context = matching_context_fingerprint()
+        self._context_checked = time.monotonic()
+        print(f"[SERVICE] MatcherV3 {MatcherV3.VERSION} cargado en {time.perf_counter() - start:.1f}s "
+              f"(configs {self.context[:12]})")
+
+    def _refresh(self):
+        """Recarga el matcher si cambio la huella de configs (llamar con el lock)."""
+        from match_ofertas_v3 import matching_context_fingerprint
+
+        if time.monotonic() - self._context_checked < CONTEXT_RECHECK_SECONDS:
+            return
+        self._context_checked = time.monotonic()
+        context = matching_context_fingerprint()
+        if context != self.context:
+            print("[SERVICE] Configs de matching cambiaron, recargando MatcherV3...")
+            self._load()
+
+    def health(self) -> Dict:
+        from match_ofertas_v3 import MatcherV3
+
+        with self.lock:
+            self._refresh()
+            return {
+                "status": "ok",
+                "pid": os.getpid(),
+                "version": MatcherV3.VERSION,
+                "context": self.context,
+                "db_path": self.db_path,
+                "requests": self.requests,
+                "uptime_s": round(time.time() - self.started, 1),
+                "memo": self.matcher.memo_stats(),
+            }
+
+    def handle(self, op: str, payload: Dict):
+        """Ejecuta una operacion con el matcher caliente (resultado JSON-serializable)."""
+        from match_ofertas_v3 import _compute_chunk
+
+        with self.lock:
+            self._refresh()
+            self.requests += 1
+            matcher = self.matcher
+
+            if op == "match":
+                return asdict(matcher.match(payload["oferta_nlp"]))
+
+            if op == "match_batch":
+                results = matcher.match_batch(payload["ofertas_nlp"], batch_size=payload.get("batch_size") or 64)
+                return [asdict(r) for r in results]
+
+            if op == "extract_skills":
+                return matcher.skills_extractor.extract_skills(**payload.get("kwargs", {}))
+
+            if op == "compute_match":
+                result, skills = matcher.compute_match(
+                    payload["id_oferta"], payload["oferta_nlp"],
+                    categorize_skills=payload.get("categorize_skills", True)
+                )
+                return {"result": asdict(result), "skills": skills}
+
+            if op == "compute_chunk":
+                chunk = [(id_oferta, oferta_nlp) for id_oferta, oferta_nlp in payload["chunk"]]
+                outputs, cache_stats, memo_stats = _compute_chunk(matcher, chunk, payload.get("batch_size"))
+                return {
+                    "outputs": [
+                        [id_oferta, asdict(result) if result is not None else None, skills, error]
+                        for id_oferta, result, skills, error in outputs
+                    ],
+                    "embedding_cache": cache_stats,
+                    "memo": memo_stats,
+                }
+
+        raise KeyError(f"Operacion desconocida: {op}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MOLMatching/1.0"
+
+    def _send(self, status: int, payload):
+        body = _dumps(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/health":
+            self._send(404, {"error": f"Ruta desconocida: {self.path}"})
+            return
+        self._send(200, self.server.service.health())
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            result = self.server.service.handle(self.path.strip("/"), payload)
+            self._send(200, {"result": result})
+        except KeyError as e:
+            self._send(400, {"error": f"Parametro u operacion invalida: {e}"})
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        if self.server.service.verbose:
+            super().log_message(format, *args)
+
+
+def create_server(service: MatchingService, host: str = DEFAULT_HOST,
+                  port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Servidor HTTP sobre un MatchingService ya cargado (port=0: puerto libre)."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.service = service
+    return server
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, db_path: Path = None,
+          verbose: bool = False):
+    """Levanta el servicio (bloquea hasta Ctrl+C)."""
+    service = MatchingService(db_path=db_path, verbose=verbose)
+    server = create_server(service, host, port)
+    print(f"[SERVICE] Escuchando en http://{host}:{port} (BD {service.db_path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[SERVICE] Detenido")
+    finally:
+        server.server_close()
+        service.matcher.close()
+        service.conn.close()
+
+
+# =============================================================================
+# CLIENTE
+# =============================================================================
+
+def service_url() -> Optional[str]:
+    """URL configurada del servicio (None si esta desactivado)."""
+    url = os.environ.get(SERVICE_URL_ENV, f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    if url.strip().lower() in ("", "0", "off", "no", "false"):
+        return None
+    return url.rstrip("/")
+
+
+class MatchingServiceClient:
+    """
+    Misma interfaz que MatcherV3 para match/match_batch/compute_match
+    (+ extract_skills y compute_chunk), ejecutada en el servicio.
+    """
+
+    def __init__(self, url: str, health: Dict, timeout: float = REQUEST_TIMEOUT):
+        self.url = url
+        self.health = health
+        self.timeout = timeout
+        self.VERSION = health.get("version")
+
+    def _post(self, op: str, payload: Dict):
+        request = urllib.request.Request(
+            f"{self.url}/{op}", data=_dumps(payload),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())["result"]
+        except urllib.error.HTTPError as e:
+            try:
+                detail = json.loads(e.read()).get("error", str(e))
+            except ValueError:
+                detail = str(e)
+            raise MatchingServiceError(f"{op}: {detail}") from e
+        except (urllib.error.URLError, OSError) as e:
+            raise MatchingServiceError(f"Servicio de matching inaccesible ({self.url}): {e}") from e
+
+    def match(self, oferta_nlp: Dict):
+        return _result_from_json(self._post("match", {"oferta_nlp": oferta_nlp}))
+
+    def match_batch(self, ofertas_nlp: List[Dict], batch_size: int = 64) -> List:
+        data = self._post("match_batch", {"ofertas_nlp": ofertas_nlp, "batch_size": batch_size})
+        return [_result_from_json(d) for d in data]
+
+    def extract_skills(self, **kwargs) -> List[Dict]:
+        return self._post("extract_skills", {"kwargs": kwargs})
+
+    def compute_match(self, id_oferta: str, oferta_nlp: Dict, categorize_skills: bool = True) -> Tuple:
+        data = self._post("compute_match", {
+            "id_oferta": id_oferta, "oferta_nlp": oferta_nlp, "categorize_skills": categorize_skills
+        })
+        return _result_from_json(data["result"]), data["skills"]
+
+    def compute_chunk(self, chunk: List[Tuple[str, Dict]], batch_size: int = None) -> Tuple:
+        """Como _match_chunk_worker: (outputs, stats cache embeddings, stats memo)."""
+        data = self._post("compute_chunk", {"chunk": chunk, "batch_size": batch_size})
+        outputs = [
+            (id_oferta, _result_from_json(result), skills, error)
+            for id_oferta, result, skills, error in data["outputs"]
+        ]
+        return outputs, data["embedding_cache"], data["memo"]
+
+    def close(self):
+        """El matcher vive en el servicio; nada que cerrar."""
+
+
+def connect_service(context: str = None, db_path: Path = None,
+                    verbose: bool = False) -> Optional[MatchingServiceClient]:
+    """
+    Cliente del servicio si esta corriendo y es compatible, si no None.
+
+    Compatible = misma MatcherV3.VERSION que este codigo y, si se pasan, misma
+    huella de configs (context) y misma BD (db_path).
+    """
+    from match_ofertas_v3 import MatcherV3
+
+    url = service_url()
+    if url is None:
+        return None
+    try:
+        with urllib.request.urlopen(f"{url}/health", timeout=HEALTH_TIMEOUT) as response:
+            health = json.loads(response.read())
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+    motivo = None
+    if health.get("version") != MatcherV3.VERSION:
+        motivo = f"version {health.get('version')} != {MatcherV3.VERSION}"
+    elif context and health.get("context") != context:
+        motivo = "configs de matching distintos"
+    elif db_path and health.get("db_path") != str(Path(db_path).resolve()):
+        motivo = f"otra BD ({health.get('db_path')})"
+    if motivo:
+        if verbose:
+            print(f"[SERVICE] Servicio en {url} ignorado: {motivo}")
+        return None
+
+    if verbose:
+        print(f"[SERVICE] Usando servicio de matching en {url} (pid {health.get('pid')})")
+    return MatchingServiceClient(url, health)
+
+
+def get_matcher(db_conn: sqlite3.Connection = None, db_path: str = None, verbose: bool = False):
+    """
+    Matcher para scripts: el servicio caliente si esta disponible, si no un
+    MatcherV3 local (mismos argumentos que antes).
+    """
+    from match_ofertas_v3 import MatcherV3, matching_context_fingerprint
+
+    service_db = db_path
+    if db_conn is not None:
+        # BD de la conexion (main); None para :memory:
+        row = db_conn.execute("PRAGMA database_list").fetchone()
+        service_db = row[2] if row and row[2] else None
+    client = connect_service(context=matching_context_fingerprint(),
+                             db_path=service_db or DEFAULT_DB_PATH, verbose=verbose)
+    if client is not None:
+        return client
+    return MatcherV3(db_conn=db_conn, db_path=db_path, verbose=verbose)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local de matching (MatcherV3 caliente)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Host (default {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Puerto (default {DEFAULT_PORT})")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="Path a la BD SQLite")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log de cada request")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, Path(args.db), verbose=args.verbose)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+-- Migration 013: Add input_fingerprint column to ofertas_esco_matching
+-- Date: 2026-10-18
+-- Purpose: Incremental re-matching (run_matching_pipeline --changed-only)
+
+-- sha1 de campos NLP + hashes de configs de matching + modelo/versiones
+-- (ver database/match_fingerprint.py). MatchResultWriter la agrega sola si falta.
+ALTER TABLE ofertas_esco_matching ADD COLUMN input_fingerprint TEXT;
+
+-- Existing data gets NULL input_fingerprint (se reprocesa con --changed-only)
@@ -0,0 +1,9 @@
+-- Migration 014: Add latencias column to pipeline_runs
+-- Date: 2026-10-18
+-- Purpose: Per-stage latency histogram of MatcherV3 runs (p50/p95/p99)
+
+-- JSON {etapa: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}
+-- (ver database/matching_metrics.py). RunTracker.save_results la agrega sola si falta.
+ALTER TABLE pipeline_runs ADD COLUMN latencias TEXT;
+
+-- Existing runs get NULL latencias
@@ -0,0 +1,9 @@
+-- Migration 015: Add nlp_reused_from column to ofertas_nlp
+-- Date: 2026-10-18
+-- Purpose: Audit near-duplicate reuse in NLP v11.6 (database/nlp_near_duplicates.py)
+
+-- id_oferta whose LLM fields were inherited (MinHash jaccard >= threshold).
+-- NULL = extracted with the LLM. NLPExtractorV11 adds it itself if missing.
+ALTER TABLE ofertas_nlp ADD COLUMN nlp_reused_from TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_ofertas_nlp_reused_from ON ofertas_nlp(nlp_reused_from);
@@ -0,0 +1,9 @@
+-- Migration 016: Add prompt_tokens_ahorrados column to ofertas_nlp
+-- Date: 2026-10-18
+-- Purpose: Per-offer token savings of the pre-LLM prompt compression in NLP v11.7
+--          (database/prompt_compression.py)
+
+-- Estimated tokens removed from the description sent to the LLM (chars / 4).
+-- NULL = no compression (reused extraction or --no-compress).
+-- NLPExtractorV11 adds it itself if missing.
+ALTER TABLE ofertas_nlp ADD COLUMN prompt_tokens_ahorrados INTEGER;
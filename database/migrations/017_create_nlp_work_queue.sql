@@ -0,0 +1,22 @@
+-- Migration 017: Create nlp_work_queue
+-- Date: 2026-10-18
+-- Purpose: Durable per-offer state of checkpointed NLP v11.9 runs
+--          (database/nlp_work_queue.py, --checkpoint / --resume)
+
+-- estado: pendiente | en_proceso | hecho | fallido
+-- lease_until: epoch seconds; expired leases go back to pendiente on the next claim.
+-- intentos: claims so far; fallido rows with intentos < --max-retries are retried.
+-- NLPWorkQueue creates the table itself if missing.
+CREATE TABLE IF NOT EXISTS nlp_work_queue (
+    run_id TEXT NOT NULL,
+    id_oferta TEXT NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    worker TEXT,
+    ultimo_error TEXT,
+    updated_at REAL,
+    PRIMARY KEY (run_id, id_oferta)
+);
+
+CREATE INDEX IF NOT EXISTS idx_nlp_work_queue_estado ON nlp_work_queue(run_id, estado);
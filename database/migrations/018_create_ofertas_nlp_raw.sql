@@ -0,0 +1,19 @@
+-- Migration 018: Create ofertas_nlp_raw
+-- Date: 2026-10-18
+-- Purpose: Raw CAPA 0 (regex) + CAPA 1 (parsed LLM JSON) output per offer, so
+--          NLP v11.10 --replay-postprocess can rebuild ofertas_nlp after a
+--          config/nlp_*.json change without calling the LLM
+--          (database/nlp_raw_store.py)
+
+-- raw: zlib-compressed JSON {regex, llm, reused_from, prompt_tokens_ahorrados}.
+-- Only rows whose nlp_version matches the extractor's NLP_VERSION_TAG are replayed.
+-- NLPExtractorV11 creates the table itself if missing.
+CREATE TABLE IF NOT EXISTS ofertas_nlp_raw (
+    id_oferta TEXT PRIMARY KEY,
+    nlp_version TEXT NOT NULL,
+    prompt_version TEXT,
+    raw BLOB NOT NULL,
+    created_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_ofertas_nlp_raw_version ON ofertas_nlp_raw(nlp_version);
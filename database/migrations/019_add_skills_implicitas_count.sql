@@ -0,0 +1,10 @@
+-- Migration 019: Add skills_implicitas_count column to ofertas_nlp
+-- Date: 2026-10-18
+-- Purpose: Number of implicit skills (BGE-M3, NLP CAPA 3) appended at the end of
+--          skills_tecnicas_list, so near-duplicate reuse can recover the LLM skills
+--          of offers without an ofertas_nlp_raw row (database/nlp_near_duplicates.py)
+
+-- 0 = no implicit skills added. NULL = extracted before this column existed
+-- (such rows are not used as near-duplicate donors).
+-- NLPExtractorV11 adds it itself if missing.
+ALTER TABLE ofertas_nlp ADD COLUMN skills_implicitas_count INTEGER;
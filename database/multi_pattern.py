@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi Pattern v1.1 - Busqueda de muchos terminos en una sola pasada
+====================================================================
+
+VERSION: 1.1.0
+FECHA: 2026-10-18
+
+CHANGELOG:
+- v1.0.0: Automata Aho-Corasick con semantica `termino in texto`
+- v1.1.0: Modo word_boundary (equivale a re.search(r'\b' + re.escape(t) + r'\b'))
+          + longest_match() para diccionarios (normalizacion_arg, MatcherV3)
+
+OBJETIVO:
+Reemplazar los loops "for termino in terminos: if termino in texto" (un scan
+del texto por termino) por un automata Aho-Corasick: el texto se recorre UNA
+vez y se obtienen todos los terminos que aparecen, sin importar cuantos haya.
+
+SEMANTICA:
+- Default: igual a `termino in texto` (substring, case-sensitive: el llamador
+  pasa todo en minusculas). El termino vacio aparece en cualquier texto.
+- word_boundary=True: cada ocurrencia debe tener limite de palabra (\b de re)
+  antes y despues, igual que r'\b' + re.escape(termino) + r'\b'.
+- longest_match(texto): termino mas largo presente; empate -> el primero de la
+  lista (mismo resultado que sorted(terminos, key=len, reverse=True) + break).
+
+BACKEND:
+- pyahocorasick (C) si esta instalado (pip install pyahocorasick)
+- Implementacion Python pura como fallback (mismos resultados)
+
+Uso:
+    from multi_pattern import MultiPatternMatcher
+
+    matcher = MultiPatternMatcher(["vendedor", "ventas", "cajero"])
+    matcher.find("vendedor de salon - ventas")   # {0, 1}  (ids de terminos)
+
+    palabras = MultiPatternMatcher(["mozo", "mozo de salon"], word_boundary=True)
+    palabras.longest_match("mozo de salon")      # 1
+    palabras.find("mozos")                       # set()
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Misma definicion de caracter de palabra que usa \b en re (str, Unicode)
+_WORD_CHAR = re.compile(r"\w")
+
+
+def _is_word(char: str) -> bool:
+    return _WORD_CHAR.match(char) is not None
+
+
+class MultiPatternMatcher:
+    """
+    Automata Aho-Corasick sobre una lista fija de terminos.
+
+    Los ids de termino son las posiciones en la lista original; terminos
+    repetidos comparten id (el de su primera aparicion).
+    """
+
+    def __init__(self, terms: Iterable[str], use_c: bool = True, word_boundary: bool = False):
+        self.word_boundary = word_boundary
+        self.terms: List[str] = []
+        self.term_ids: Dict[str, int] = {}
+        for term in terms:
+            if term not in self.term_ids:
+                self.term_ids[term] = len(self.terms)
+                self.terms.append(term)
+
+        # Para word_boundary: si el primer/ultimo caracter es de palabra
+        self._edges: List[Tuple[bool, bool]] = [
+            (_is_word(t[0]), _is_word(t[-1])) if t else (False, False) for t in self.terms
+        ]
+
+        # El termino vacio es substring de todo: no entra al automata
+        self._always: Set[int] = {self.term_ids[""]} if "" in self.term_ids else set()
+        patterns = [(t, i) for t, i in self.term_ids.items() if t]
+
+        self._c_automaton = None
+        if use_c and AHOCORASICK_AVAILABLE and patterns:
+            automaton = ahocorasick.Automaton()
+            for term, term_id in patterns:
+                automaton.add_word(term, term_id)
+            automaton.make_automaton()
+            self._c_automaton = automaton
+        else:
+            self._build(patterns)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _build(self, patterns):
+        """Construye goto/fail/output (implementacion Python pura)."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[List[int]] = [[]]
+        self._fail: List[int] = [0]
+
+        for term, term_id in patterns:
+            node = 0
+            for char in term:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._output.append([])
+                    self._fail.append(0)
+                node = nxt
+            self._output[node].append(term_id)
+
+        # BFS para links de fallo; output de cada nodo incluye el de su fail
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _iter_raw(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(indice del ultimo caracter, term_id) de cada ocurrencia, sin filtros."""
+        if self._c_automaton is not None:
+            yield from self._c_automaton.iter(text)
+            return
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for term_id in output[node]:
+                yield end, term_id
+
+    def _has_boundaries(self, text: str, start: int, end: int, term_id: int) -> bool:
+        """Equivalente a \b antes de text[start] y despues de text[end - 1]."""
+        first_word, last_word = self._edges[term_id]
+        before = start > 0 and _is_word(text[start - 1])
+        after = end < len(text) and _is_word(text[end])
+        return before != first_word and after != last_word
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Ocurrencias (start, end, term_id) con text[start:end] == termino.
+
+        En modo word_boundary solo se devuelven las que respetan \b. El
+        termino vacio no se reporta como ocurrencia (ver find()).
+        """
+        if not text:
+            return
+        for last, term_id in self._iter_raw(text):
+            start = last - len(self.terms[term_id]) + 1
+            if self.word_boundary and not self._has_boundaries(text, start, last + 1, term_id):
+                continue
+            yield start, last + 1, term_id
+
+    def find(self, text: str) -> Set[int]:
+        """Ids de todos los terminos que aparecen en text (una pasada)."""
+        if self.word_boundary:
+            found = {term_id for _, _, term_id in self.iter_matches(text)}
+            # r'\b\b' matchea si el texto tiene algun caracter de palabra
+            if self._always and any(_is_word(c) for c in text or ""):
+                found |= self._always
+            return found
+
+        found = set(self._always)
+        if not text:
+            return found
+
+        if self._c_automaton is not None:
+            for _, term_id in self._c_automaton.iter(text):
+                found.add(term_id)
+            return found
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+    def find_terms(self, text: str) -> Set[str]:
+        """Terminos (strings) que aparecen en text."""
+        return {self.terms[i] for i in self.find(text)}
+
+    def longest_match(self, text: str) -> Optional[int]:
+        """
+        Id del termino mas largo presente en text (None si no hay ninguno).
+
+        Empate de longitud -> menor id (orden de la lista original).
+        """
+        found = self.find(text)
+        if not found:
+            return None
+        return min(found, key=lambda i: (-len(self.terms[i]), i))
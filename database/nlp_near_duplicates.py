@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NLP Near Duplicates v1.0 - Reuso de extracciones entre reposts casi identicos
+=============================================================================
+
+VERSION: 1.1.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+El cache LLM (llm_cache.py) solo acierta si el prompt es identico. Los reposts
+entre portales suelen cambiar un par de lineas (fecha, contacto, footer del
+portal). Este indice MinHash + LSH (datasketch, mismo enfoque que
+scripts/db/deduplicate_cross_portal.py) encuentra una oferta ya procesada casi
+identica y NLPExtractorV11 reusa sus campos LLM: solo se vuelven a correr la
+CAPA 0 (regex) y el NLPPostprocessor sobre la oferta nueva.
+
+SIMILITUD:
+Jaccard estimado sobre shingles de 3 palabras de titulo + descripcion.
+Umbral por defecto 0.9 (deduplicate_cross_portal usa 0.85 para marcar
+duplicados; aca el costo de un falso positivo es una extraccion incorrecta).
+
+DONANTES (campos tal como los devolvio el LLM, antes del postprocess):
+- v1.1: ofertas_nlp_raw["llm"] de la misma nlp_version que no sean a su vez
+  reusadas (reused_from None), las mas recientes primero
+- ofertas_nlp sin fila raw (extracciones previas a v11.10): sus columnas,
+  sacando del final de skills_tecnicas_list las skills_implicitas_count
+  agregadas por BGE-M3 (si no, se sumarian de nuevo al reusar). Sin esa
+  columna o con NULL no se usan como donantes
+- ofertas procesadas con LLM en la corrida actual
+
+CAMPOS HEREDADOS:
+Los del schema lite salvo ubicacion y titulo (INHERIT_EXCLUDE): provincia y
+localidad se vuelven a parsear de la ubicacion de la oferta nueva y
+titulo_limpio sale de su propio titulo.
+
+Sin datasketch el indice queda deshabilitado (MINHASH_AVAILABLE = False).
+
+Uso:
+    from nlp_near_duplicates import NearDuplicateIndex
+
+    index = NearDuplicateIndex(threshold=0.9)
+    index.load_from_db(conn, "11.3.0", SCHEMA_LITE)
+    match = index.find(titulo, descripcion)   # (id_origen, campos, similitud) o None
+    index.add(id_oferta, titulo, descripcion, llm_data)
+"""
+
+import copy
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from nlp_raw_store import unpack
+
+try:
+    from datasketch import MinHash, MinHashLSH
+    MINHASH_AVAILABLE = True
+except ImportError:
+    MINHASH_AVAILABLE = False
+
+DEFAULT_THRESHOLD = 0.9
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+DEFAULT_MAX_DONORS = 20000
+
+INHERIT_EXCLUDE = {"provincia", "localidad", "titulo_ocupacion"}
+
+
+def shingles(titulo: str, descripcion: str) -> set:
+    """Shingles de SHINGLE_SIZE palabras de titulo + descripcion."""
+    palabras = f"{titulo or ''} {descripcion or ''}".lower().split()
+    return {
+        " ".join(palabras[i:i + SHINGLE_SIZE])
+        for i in range(len(palabras) - SHINGLE_SIZE + 1)
+    }
+
+
+def calcular_minhash(titulo: str, descripcion: str, num_perm: int = NUM_PERM) -> Optional["MinHash"]:
+    """MinHash de la oferta (None si no hay datasketch o el texto es muy corto)."""
+    if not MINHASH_AVAILABLE:
+        return None
+    tokens = shingles(titulo, descripcion)
+    if not tokens:
+        return None
+    m = MinHash(num_perm=num_perm)
+    m.update_batch([shingle.encode("utf-8") for shingle in tokens])
+    return m
+
+
+class NearDuplicateIndex:
+    """
+    Indice LSH de ofertas ya extraidas -> campos LLM reutilizables.
+
+    Thread-safe: find() corre en los hilos de --concurrency, add() en el
+    hilo principal.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = NUM_PERM,
+                 max_donors: int = DEFAULT_MAX_DONORS):
+        if not MINHASH_AVAILABLE:
+            raise ImportError("datasketch no disponible. Instalar con: pip install datasketch")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.max_donors = max_donors
+        self.lsh = MinHashLSH(threshold=threshold, num_perm=num_perm)
+        # id_oferta -> (minhash, campos); orden de insercion para descartar los mas viejos
+        self.donors: "OrderedDict[str, Tuple[MinHash, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.reused = 0
+
+    def __len__(self) -> int:
+        return len(self.donors)
+
+    def add(self, id_oferta: str, titulo: str, descripcion: str, fields: Dict[str, Any]) -> bool:
+        """Registra una oferta extraida como donante. Retorna False si no se indexo."""
+        fields = {k: copy.deepcopy(v) for k, v in (fields or {}).items() if k not in INHERIT_EXCLUDE}
+        if not fields:
+            return False
+        m = calcular_minhash(titulo, descripcion, self.num_perm)
+        if m is None:
+            return False
+
+        id_oferta = str(id_oferta)
+        with self._lock:
+            if id_oferta in self.donors:
+                self.lsh.remove(id_oferta)
+                del self.donors[id_oferta]
+            self.lsh.insert(id_oferta, m)
+            self.donors[id_oferta] = (m, fields)
+            while self.max_donors and len(self.donors) > self.max_donors:
+                oldest, _ = self.donors.popitem(last=False)
+                self.lsh.remove(oldest)
+        return True
+
+    def find(self, titulo: str, descripcion: str,
+             exclude_id: str = None) -> Optional[Tuple[str, Dict[str, Any], float]]:
+        """
+        Busca la oferta donante mas parecida.
+
+        Returns:
+            (id_oferta origen, copia de sus campos, similitud) o None
+        """
+        m = calcular_minhash(titulo, descripcion, self.num_perm)
+        if m is None:
+            return None
+
+        with self._lock:
+            self.lookups += 1
+            best = None
+            for candidate in self.lsh.query(m):
+                if candidate == exclude_id:
+                    continue
+                donor_hash, fields = self.donors[candidate]
+                similarity = m.jaccard(donor_hash)
+                if similarity >= self.threshold and (best is None or similarity > best[2]):
+                    best = (candidate, fields, similarity)
+            if best is None:
+                return None
+            self.reused += 1
+            return best[0], copy.deepcopy(best[1]), round(best[2], 4)
+
+    def load_from_db(self, conn: sqlite3.Connection, nlp_version: str,
+                     schema: Dict[str, type], limit: int = None) -> int:
+        """
+        Carga donantes desde ofertas_nlp_raw y, para las ofertas sin fila raw,
+        desde ofertas_nlp (mas recientes primero).
+
+        Args:
+            conn: Conexion a bumeran_scraping.db
+            nlp_version: Solo extracciones de esta version
+            schema: Campos LLM -> tipo (SCHEMA_LITE); las listas se guardan
+                    en ofertas_nlp como "a; b" y se vuelven a separar
+            limit: Maximo de donantes (default: max_donors)
+
+        Returns:
+            Cantidad de donantes indexados
+        """
+        limit = limit or self.max_donors
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        has_raw = "ofertas_nlp_raw" in tables
+
+        donors = []
+        if has_raw:
+            donors += self._raw_donors(conn, nlp_version, schema, limit)
+        donors += self._column_donors(conn, nlp_version, schema, limit, has_raw)
+        donors.sort(key=lambda d: d[0] or "", reverse=True)
+
+        loaded = 0
+        # Mas viejos primero para que el descarte por max_donors saque los viejos
+        for _, id_oferta, titulo, descripcion, fields in reversed(donors[:limit]):
+            if self.add(str(id_oferta), titulo, descripcion, fields):
+                loaded += 1
+        return loaded
+
+    @staticmethod
+    def _raw_donors(conn: sqlite3.Connection, nlp_version: str, schema: Dict[str, type],
+                    limit: int) -> List[Tuple]:
+        """v1.1: (fecha, id, titulo, descripcion, campos) desde el JSON del LLM en ofertas_nlp_raw."""
+        rows = conn.execute("""
+            SELECT o.fecha_publicacion_datetime, o.id_oferta, o.titulo, o.descripcion, r.raw
+            FROM ofertas_nlp_raw r
+            JOIN ofertas o ON o.id_oferta = r.id_oferta
+            WHERE r.nlp_version = ?
+              AND o.descripcion IS NOT NULL
+            ORDER BY o.fecha_publicacion_datetime DESC
+            LIMIT ?
+        """, (nlp_version, limit)).fetchall()
+
+        donors = []
+        for fecha, id_oferta, titulo, descripcion, blob in rows:
+            payload = unpack(blob)
+            llm = payload.get("llm")
+            if not llm or payload.get("reused_from"):
+                continue
+            fields = {k: v for k, v in llm.items() if k in schema}
+            donors.append((fecha, id_oferta, titulo, descripcion, fields))
+        return donors
+
+    @staticmethod
+    def _column_donors(conn: sqlite3.Connection, nlp_version: str, schema: Dict[str, type],
+                       limit: int, has_raw: bool) -> List[Tuple]:
+        """
+        (fecha, id, titulo, descripcion, campos) desde las columnas de ofertas_nlp,
+        solo ofertas sin fila raw y con skills_implicitas_count conocido.
+        """
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(ofertas_nlp)")}
+        field_names = [k for k in schema if k in columns and k not in INHERIT_EXCLUDE]
+        if not field_names or "skills_implicitas_count" not in columns:
+            return []
+
+        only_original = "AND n.nlp_reused_from IS NULL" if "nlp_reused_from" in columns else ""
+        without_raw = """AND n.id_oferta NOT IN (
+                SELECT id_oferta FROM ofertas_nlp_raw WHERE nlp_version = ?)""" if has_raw else ""
+        select = ", ".join(f"n.{k}" for k in field_names)
+        params = (nlp_version, nlp_version, limit) if has_raw else (nlp_version, limit)
+        rows = conn.execute(f"""
+            SELECT o.fecha_publicacion_datetime, o.id_oferta, o.titulo, o.descripcion,
+                   n.skills_implicitas_count, {select}
+            FROM ofertas_nlp n
+            JOIN ofertas o ON o.id_oferta = n.id_oferta
+            WHERE n.nlp_version = ?
+              AND o.descripcion IS NOT NULL
+              AND n.skills_implicitas_count IS NOT NULL
+              {only_original}
+              {without_raw}
+            ORDER BY o.fecha_publicacion_datetime DESC
+            LIMIT ?
+        """, params).fetchall()
+
+        donors = []
+        for row in rows:
+            fecha, id_oferta, titulo, descripcion, implicitas = row[:5]
+            fields = {}
+            for name, value in zip(field_names, row[5:]):
+                if schema[name] is list:
+                    value = [v.strip() for v in value.split(";") if v.strip()] if value else []
+                fields[name] = value
+            # Las implicitas (BGE-M3) van al final de la lista: se vuelven a calcular al reusar
+            skills = fields.get("skills_tecnicas_list")
+            if implicitas and skills:
+                fields["skills_tecnicas_list"] = skills[:max(0, len(skills) - implicitas)]
+            donors.append((fecha, id_oferta, titulo, descripcion, fields))
+        return donors
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "donors": len(self.donors),
+            "lookups": self.lookups,
+            "reused": self.reused,
+            "reuse_rate": round(self.reused / self.lookups, 4) if self.lookups else 0.0,
+            "threshold": self.threshold,
+        }
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NLP Raw Store v1.0 - Salidas crudas de CAPA 0/1 + replay del postprocessor
+==========================================================================
+
+VERSION: 1.1.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+Cada cambio en config/nlp_*.json obligaba a re-correr el LLM sobre todo el
+corpus para ver el efecto en NLPPostprocessor, aunque solo cambiara la CAPA 2.
+NLPExtractorV11 guarda ahora, por oferta, la salida regex (CAPA 0) y el JSON
+parseado del LLM (CAPA 1) en ofertas_nlp_raw (migracion 018), comprimidos con
+zlib. `--replay-postprocess` reconstruye ofertas_nlp desde ahi sin Ollama.
+
+PAYLOAD (JSON + zlib, columna raw):
+  regex                    campos de CAPA 0
+  llm                      JSON parseado del LLM (o heredado de un casi-duplicado;
+                           None si el LLM no devolvio datos)
+  reused_from              oferta donante (v11.6)
+  prompt_tokens_ahorrados  ahorro de la compresion del prompt (v11.7)
+
+REPLAY:
+merge_capas() es el mismo merge + postprocess que usa _finish_oferta, asi que
+el replay reproduce una corrida en vivo. Corre en un pool de procesos (un
+NLPPostprocessor por proceso, configs leidos de disco al arrancar). Las skills
+implicitas (BGE-M3) y la escritura siguen en el proceso principal.
+
+v1.1: fetch_raw lee por paginas (keyset sobre id_oferta) y trae cada pagina
+entera antes de entregarla: no queda un cursor abierto sobre la BD mientras
+el llamador escribe y commitea por otra conexion ("database is locked").
+replay_rows con workers > 1 mantiene como mucho 2 * workers lotes en vuelo en
+vez de que pool.map consuma todos los jobs de entrada.
+
+Uso:
+    from nlp_raw_store import write_raw, fetch_raw, replay_rows
+
+    write_raw(cursor, id_oferta, "11.3.0", payload)
+    jobs = fetch_raw(conn, "11.3.0")
+    for id_oferta, fecha, final_data, error in replay_rows(jobs, workers=8):
+        ...
+"""
+
+import json
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from nlp_postprocessor import NLPPostprocessor
+from limpiar_titulos import limpiar_titulo
+
+ZLIB_LEVEL = 6
+FETCH_BATCH = 500
+REPLAY_CHUNKSIZE = 32
+
+SQL_CREATE = """
+    CREATE TABLE IF NOT EXISTS ofertas_nlp_raw (
+        id_oferta TEXT PRIMARY KEY,
+        nlp_version TEXT NOT NULL,
+        prompt_version TEXT,
+        raw BLOB NOT NULL,
+        created_at TEXT
+    )
+"""
+SQL_INDEX = "CREATE INDEX IF NOT EXISTS idx_ofertas_nlp_raw_version ON ofertas_nlp_raw(nlp_version)"
+
+# Postprocessor del proceso worker (lo crea _init_worker)
+_POSTPROCESSOR = None
+
+
+def ensure_table(conn):
+    """Crea ofertas_nlp_raw si falta (migracion 018)."""
+    conn.execute(SQL_CREATE)
+    conn.execute(SQL_INDEX)
+
+
+def pack(payload: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"), ZLIB_LEVEL)
+
+
+def unpack(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def write_raw(cursor, id_oferta: str, nlp_version: str, payload: Dict[str, Any],
+              prompt_version: str = None):
+    """INSERT OR REPLACE del payload crudo de una oferta (sin commit)."""
+    cursor.execute(
+        "INSERT OR REPLACE INTO ofertas_nlp_raw (id_oferta, nlp_version, prompt_version, raw, created_at) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (str(id_oferta), nlp_version, prompt_version, pack(payload), datetime.now().isoformat())
+    )
+
+
+def fetch_raw(conn, nlp_version: str, ids: List[str] = None) -> Iterator[Tuple]:
+    """
+    Jobs de replay: (id_oferta, payload, descripcion, titulo, localizacion,
+    fecha_publicacion, id_empresa) en orden de id_oferta, por paginas de
+    FETCH_BATCH filas (cada pagina es una consulta completa: entre paginas
+    no hay lectura abierta en conn).
+    """
+    query = """
+        SELECT r.id_oferta, r.raw, o.descripcion, o.titulo, o.localizacion,
+               o.fecha_publicacion_datetime, o.id_empresa
+        FROM ofertas_nlp_raw r
+        JOIN ofertas o ON o.id_oferta = r.id_oferta
+        WHERE r.nlp_version = ?
+          AND r.id_oferta > ?
+    """
+    filtro: List[Any] = []
+    if ids:
+        query += f" AND r.id_oferta IN ({','.join('?' * len(ids))})"
+        filtro = [str(i) for i in ids]
+    query += " ORDER BY r.id_oferta LIMIT ?"
+
+    ultimo = ""
+    while True:
+        rows = conn.execute(query, [nlp_version, ultimo] + filtro + [FETCH_BATCH]).fetchall()
+        if not rows:
+            break
+        ultimo = rows[-1][0]
+        for id_oferta, blob, descripcion, titulo, localizacion, fecha, id_empresa in rows:
+            yield (str(id_oferta), unpack(blob), descripcion or "", titulo or "",
+                   localizacion or "", fecha, str(id_empresa) if id_empresa else None)
+
+
+def merge_capas(postprocessor: NLPPostprocessor, regex_data: Dict[str, Any],
+                llm_data: Optional[Dict[str, Any]], titulo: str, ubicacion: str,
+                descripcion: str, id_empresa: Optional[str] = None) -> Dict[str, Any]:
+    """
+    CAPA 0 + CAPA 1 -> CAPA 2: merge (regex tiene prioridad), titulo limpio,
+    preprocesamiento de ubicacion y NLPPostprocessor.
+    """
+    final_data = {}
+    final_data.update(llm_data or {})
+    final_data.update(regex_data or {})  # regex tiene prioridad
+
+    # Titulo limpio
+    if titulo:
+        final_data["titulo_limpio"] = limpiar_titulo(titulo)
+
+    # POSTPROCESSOR: Aplica reglas de config/nlp_*.json
+    # - Preprocesa ubicación (parsing provincia/localidad)
+    # - Infiere area_funcional, modalidad, seniority desde título
+    # - Valida campos categóricos
+    # - Aplica exclusiones configuradas
+    pre_data = postprocessor.preprocess({
+        'localizacion': ubicacion,
+        'titulo': titulo
+    })
+    # Merge preprocesamiento (provincia, localidad parseados)
+    for key in ['provincia', 'localidad']:
+        if pre_data.get(key) and not final_data.get(key):
+            final_data[key] = pre_data[key]
+
+    # Postprocesar (inferencia + validación + lookup catálogo empresas)
+    return postprocessor.postprocess(final_data, descripcion, id_empresa=id_empresa)
+
+
+def replay_one(job: Tuple, postprocessor: NLPPostprocessor = None) -> Tuple:
+    """
+    Reconstruye los campos de una oferta desde su payload crudo.
+
+    Returns:
+        (id_oferta, fecha_publicacion, final_data o None, error o None)
+    """
+    id_oferta, payload, descripcion, titulo, localizacion, fecha, id_empresa = job
+    try:
+        final_data = merge_capas(
+            postprocessor or _POSTPROCESSOR, payload.get("regex"), payload.get("llm"),
+            titulo, localizacion, descripcion, id_empresa=id_empresa
+        )
+        final_data["nlp_reused_from"] = payload.get("reused_from")
+        final_data["prompt_tokens_ahorrados"] = payload.get("prompt_tokens_ahorrados")
+        return id_oferta, fecha, final_data, None
+    except Exception as e:
+        return id_oferta, fecha, None, str(e)
+
+
+def _init_worker():
+    global _POSTPROCESSOR
+    _POSTPROCESSOR = NLPPostprocessor(verbose=False)
+
+
+def _replay_lote(jobs: List[Tuple]) -> List[Tuple]:
+    """replay_one sobre un lote (en un proceso worker)."""
+    return [replay_one(job) for job in jobs]
+
+
+def replay_rows(jobs: Iterable[Tuple], workers: int = 1) -> Iterator[Tuple]:
+    """
+    replay_one sobre cada job, en el orden de entrada.
+
+    workers > 1: pool de procesos (el postprocessor es CPU puro) con lotes de
+    REPLAY_CHUNKSIZE jobs y como mucho 2 * workers lotes en vuelo; los jobs se
+    leen a medida que se entregan resultados. workers = 1 corre en el
+    proceso actual.
+    """
+    if workers <= 1:
+        postprocessor = NLPPostprocessor(verbose=False)
+        for job in jobs:
+            yield replay_one(job, postprocessor)
+        return
+
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pendientes = deque()
+
+        def submit_next() -> bool:
+            lote = list(islice(jobs, REPLAY_CHUNKSIZE))
+            if not lote:
+                return False
+            pendientes.append(pool.submit(_replay_lote, lote))
+            return True
+
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+        while pendientes:
+            resultados = pendientes.popleft().result()
+            submit_next()
+            yield from resultados
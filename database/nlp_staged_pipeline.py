@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NLP Staged Pipeline v1.0 - Productor/consumidor con colas acotadas
+==================================================================
+
+VERSION: 1.1.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+En process_batch (incluso con --concurrency) el postprocess, las skills
+implicitas (BGE-M3) y la escritura en BD corren en el hilo principal oferta
+por oferta. Con --staged cada etapa corre en su propio hilo (o pool) y se
+comunican por colas acotadas: mientras Ollama genera, el CPU avanza con el
+regex/compresion de las siguientes y el postprocess de las anteriores.
+
+ETAPAS:
+  preparar     (1 hilo)   CAPA 0 regex + reuso casi-duplicados + compresion
+        | cola llm (acotada)
+  llm          (N hilos)  CAPA 1 Ollama (o cache LLM / extraccion heredada)
+        | cola post (acotada)
+  postprocess  (1 hilo)   micro-lotes: prefetch BGE-M3 de todas las tareas del
+                          lote en una llamada + NLPPostprocessor + skills
+        | cola escritura (acotada)
+  escritura    (1 hilo)   micro-lotes: una conexion/commit por lote
+
+Las colas acotadas dan backpressure: si Ollama es el cuello de botella, la
+etapa preparar se bloquea en vez de acumular toda la corrida en memoria.
+Postprocess y skills quedan en un solo hilo (mismo contrato que v11.4: no son
+thread-safe). Los resultados se guardan en orden de llegada, no de entrada.
+
+v1.1: run() acepta un generador (process_run reclama tandas de la cola a
+medida que la etapa preparar las pide) y se puede llamar varias veces sobre
+el mismo pipeline. on_written(pares) se llama desde la etapa escritura despues
+de cada micro-lote guardado, con [(fila, resultado o None)], para checkpointear.
+
+METRICAS (por etapa, en StagedNLPPipeline.metrics()):
+  items, errores, ofertas_por_seg, ocupacion (busy / wall), cola_max,
+  cola_media (profundidad de la cola de ENTRADA de la etapa)
+
+Uso:
+    python process_nlp_from_db_v11.py --limit 500 --staged --concurrency 4
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BATCH_SIZE = 16
+REPORT_EVERY = 50
+
+# Marca de fin de stream entre etapas
+_FIN = object()
+
+
+class StageStats:
+    """Contadores de una etapa (thread-safe: la etapa llm tiene N hilos)."""
+
+    def __init__(self, name: str, cola: Optional[queue.Queue] = None):
+        self.name = name
+        self.cola = cola
+        self.items = 0
+        self.errores = 0
+        self.busy_s = 0.0
+        self.cola_max = 0
+        self._depth_sum = 0
+        self._depth_samples = 0
+        self.inicio = None
+        self.fin = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self.inicio is None:
+                self.inicio = time.time()
+
+    def stop(self):
+        with self._lock:
+            self.fin = time.time()
+
+    def sample_depth(self):
+        """Registra la profundidad actual de la cola de entrada."""
+        if self.cola is None:
+            return
+        depth = self.cola.qsize()
+        with self._lock:
+            self.cola_max = max(self.cola_max, depth)
+            self._depth_sum += depth
+            self._depth_samples += 1
+
+    def done(self, busy_s: float, items: int = 1, errores: int = 0):
+        with self._lock:
+            self.items += items
+            self.errores += errores
+            self.busy_s += busy_s
+
+    def summary(self, workers: int = 1) -> Dict[str, Any]:
+        with self._lock:
+            fin = self.fin or time.time()
+            wall = max(1e-9, fin - self.inicio) if self.inicio else 0.0
+            return {
+                "items": self.items,
+                "errores": self.errores,
+                "ofertas_por_seg": round(self.items / wall, 3) if wall else 0.0,
+                "ocupacion": round(self.busy_s / (wall * workers), 3) if wall else 0.0,
+                "cola_max": self.cola_max,
+                "cola_media": round(self._depth_sum / self._depth_samples, 2) if self._depth_samples else 0.0,
+                "cola_actual": self.cola.qsize() if self.cola is not None else 0,
+            }
+
+
+class StagedNLPPipeline:
+    """
+    Corre NLPExtractorV11 en 4 etapas con colas acotadas.
+
+    Reusa los metodos del extractor (_prepare_oferta, _extract_capa1_llm,
+    _finish_oferta, save_many_to_db), asi que la salida es la misma que
+    process_oferta.
+    """
+
+    def __init__(self, extractor, concurrency: int = 4, batch_size: int = DEFAULT_BATCH_SIZE,
+                 queue_size: int = None, save_to_db: bool = True, report_every: int = REPORT_EVERY,
+                 on_written: Callable[[List[tuple]], None] = None):
+        self.extractor = extractor
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.save_to_db = save_to_db
+        self.report_every = report_every
+        self.on_written = on_written
+
+        # Cola llm: 2 ofertas por hilo (como _process_concurrent); el resto, 2 lotes
+        llm_size = queue_size or self.concurrency * 2
+        batch_size_q = queue_size or self.batch_size * 2
+        self.q_llm = queue.Queue(maxsize=llm_size)
+        self.q_post = queue.Queue(maxsize=batch_size_q)
+        self.q_write = queue.Queue(maxsize=batch_size_q)
+
+        self.stages = {
+            "preparar": StageStats("preparar"),
+            "llm": StageStats("llm", self.q_llm),
+            "postprocess": StageStats("postprocess", self.q_post),
+            "escritura": StageStats("escritura", self.q_write),
+        }
+        self.results: List[Dict[str, Any]] = []
+        self.times: List[int] = []
+        self.total = 0
+        self.offset = 0
+
+    # =========================================================================
+    # ETAPAS
+    # =========================================================================
+
+    def _stage_preparar(self, ofertas: Iterable[tuple]):
+        stats = self.stages["preparar"]
+        stats.start()
+        try:
+            for i, oferta in enumerate(ofertas, 1):
+                id_oferta, descripcion, titulo = oferta[0], oferta[1], oferta[2]
+                start = time.time()
+                job = {"i": i, "oferta": oferta, "work_ms": 0, "error": None}
+                try:
+                    job["prepared"] = self.extractor._prepare_oferta(
+                        descripcion or "", titulo or "", id_oferta=str(id_oferta)
+                    )
+                except Exception as e:
+                    job["error"] = e
+                busy = time.time() - start
+                job["work_ms"] += int(busy * 1000)
+                stats.done(busy, errores=1 if job["error"] else 0)
+                self.q_llm.put(job)
+        finally:
+            for _ in range(self.concurrency):
+                self.q_llm.put(_FIN)
+            stats.stop()
+
+    def _stage_llm(self):
+        stats = self.stages["llm"]
+        stats.start()
+        try:
+            while True:
+                stats.sample_depth()
+                job = self.q_llm.get()
+                if job is _FIN:
+                    break
+                start = time.time()
+                if job["error"] is None:
+                    _, descripcion, titulo, empresa, localizacion = job["oferta"][:5]
+                    regex_data, timings, reuse, descripcion_llm = job["prepared"]
+                    try:
+                        if reuse:
+                            reused_from, llm_data = reuse
+                        else:
+                            reused_from = None
+                            llm_data = self.extractor._extract_capa1_llm(
+                                titulo or "", empresa or "", localizacion or "",
+                                descripcion_llm, timings=timings
+                            )
+                        job["extracted"] = (regex_data, llm_data, timings, reused_from)
+                    except Exception as e:
+                        job["error"] = e
+                busy = time.time() - start
+                job["work_ms"] += int(busy * 1000)
+                stats.done(busy, errores=1 if job["error"] else 0)
+                self.q_post.put(job)
+        finally:
+            self.q_post.put(_FIN)
+            stats.stop()
+
+    def _next_batch(self, cola: queue.Queue, stats: StageStats) -> Tuple[List[dict], int]:
+        """Bloquea por el primer item y junta los que ya esten en cola (hasta batch_size)."""
+        stats.sample_depth()
+        batch, fines = [], 0
+        item = cola.get()
+        while True:
+            if item is _FIN:
+                fines += 1
+            else:
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                item = cola.get_nowait()
+            except queue.Empty:
+                break
+        return batch, fines
+
+    def _prefetch_skills(self, batch: List[dict]):
+        """Una sola llamada a BGE-M3 con las tareas de todo el lote."""
+        skills = self.extractor.skills_extractor
+        if skills is None:
+            return
+        textos = []
+        for job in batch:
+            llm_data = (job.get("extracted") or (None, None))[1] or {}
+            tareas = llm_data.get("tareas_explicitas")
+            if isinstance(tareas, list):
+                tareas = "; ".join(str(t) for t in tareas)
+            if tareas:
+                textos.extend(t.strip() for t in str(tareas).split(";") if t.strip())
+        if textos:
+            try:
+                skills.prefetch(textos)
+            except Exception as e:
+                print(f"[PIPELINE] Prefetch de skills fallo: {e}")
+
+    def _stage_postprocess(self):
+        stats = self.stages["postprocess"]
+        stats.start()
+        pendientes = self.concurrency
+        try:
+            while pendientes:
+                batch, fines = self._next_batch(self.q_post, stats)
+                pendientes -= fines
+                if not batch:
+                    continue
+
+                start = time.time()
+                self._prefetch_skills(batch)
+                errores = 0
+                for job in batch:
+                    job_start = time.time()
+                    if job["error"] is None:
+                        id_oferta, descripcion, titulo, _, localizacion, fecha_pub, id_empresa = job["oferta"]
+                        regex_data, llm_data, timings, reused_from = job["extracted"]
+                        job["result"] = self.extractor._finish_oferta(
+                            str(id_oferta), descripcion or "", titulo or "", localizacion or "",
+                            fecha_pub, str(id_empresa) if id_empresa else None,
+                            regex_data, llm_data, timings["llm_time_ms"], job["work_ms"],
+                            reused_from=reused_from, compression=timings.get("prompt_compression")
+                        )
+                    else:
+                        print(f"[ERROR] {job['oferta'][0]}: {job['error']}")
+                        self.extractor._add_stat("total_errors")
+                        job["result"] = None
+                    if job["result"] is None:
+                        errores += 1
+                    job["work_ms"] += int((time.time() - job_start) * 1000)
+                    self.q_write.put(job)
+                if self.extractor.skills_extractor is not None:
+                    self.extractor.skills_extractor.clear_prefetch()
+                stats.done(time.time() - start, items=len(batch), errores=errores)
+        finally:
+            self.q_write.put(_FIN)
+            stats.stop()
+
+    def _stage_escritura(self):
+        stats = self.stages["escritura"]
+        stats.start()
+        escritas = 0
+        try:
+            while True:
+                batch, fines = self._next_batch(self.q_write, stats)
+                start = time.time()
+                filas = []
+                for job in batch:
+                    escritas += 1
+                    result = job["result"]
+                    id_oferta, fecha_pub = job["oferta"][0], job["oferta"][5]
+                    print(f"[{self.offset + escritas}/{self.total}] {id_oferta}...", end=" ", flush=True)
+                    if result:
+                        self.times.append(result["processing_time_ms"])
+                        print(f"OK ({result['processing_time_ms']}ms, LLM {result['llm_time_ms']}ms)")
+                        filas.append((id_oferta, result["extracted_data"], fecha_pub, result.get("raw")))
+                        self.results.append(result)
+                    else:
+                        print("ERROR")
+                    self.extractor._add_stat("total_processed")
+                    if self.report_every and escritas % self.report_every == 0:
+                        self.report()
+
+                errores = 0
+                if filas and self.save_to_db:
+                    errores = len(filas) - self.extractor.save_many_to_db(filas)
+                if batch:
+                    stats.done(time.time() - start, items=len(batch), errores=errores)
+                    if self.on_written is not None:
+                        self.on_written([(job["oferta"], job["result"]) for job in batch])
+                if fines:
+                    break
+        finally:
+            stats.stop()
+
+    # =========================================================================
+    # EJECUCION
+    # =========================================================================
+
+    def run(self, ofertas: Iterable[tuple], offset: int = 0,
+            total: int = None) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        Procesa las ofertas (filas de process_batch, lista o generador) y
+        espera a que terminen todas las etapas.
+
+        offset/total: numeracion del progreso cuando la corrida va por tandas
+        (process_run con --checkpoint).
+
+        Returns:
+            (resultados de esta llamada en orden de escritura,
+             processing_time_ms de cada uno)
+        """
+        self.offset = offset
+        self.total = total if total is not None else len(ofertas)
+        n_results, n_times = len(self.results), len(self.times)
+        threads = [threading.Thread(target=self._stage_preparar, args=(ofertas,),
+                                    name="nlp-preparar", daemon=True)]
+        threads += [threading.Thread(target=self._stage_llm, name=f"nlp-llm-{n}", daemon=True)
+                    for n in range(self.concurrency)]
+        threads.append(threading.Thread(target=self._stage_postprocess, name="nlp-postprocess", daemon=True))
+        threads.append(threading.Thread(target=self._stage_escritura, name="nlp-escritura", daemon=True))
+
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return self.results[n_results:], self.times[n_times:]
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Profundidad de cola y throughput por etapa."""
+        return {
+            name: stats.summary(workers=self.concurrency if name == "llm" else 1)
+            for name, stats in self.stages.items()
+        }
+
+    def report(self):
+        """Imprime una linea con colas y throughput de cada etapa."""
+        partes = []
+        for name, m in self.metrics().items():
+            partes.append(f"{name} {m['ofertas_por_seg']:.2f}/s cola {m['cola_actual']}")
+        print("[PIPELINE] " + " | ".join(partes))
+
+    def print_summary(self):
+        print("  Etapas (--staged):")
+        print(f"    {'etapa':<12} {'items':>6} {'of/s':>7} {'ocup':>6} {'cola max':>9} {'cola media':>11}")
+        for name, m in self.metrics().items():
+            print(f"    {name:<12} {m['items']:>6} {m['ofertas_por_seg']:>7.2f} "
+                  f"{m['ocupacion']:>6.0%} {m['cola_max']:>9} {m['cola_media']:>11.1f}")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NLP Work Queue v1.0 - Cola durable para corridas NLP reanudables
+================================================================
+
+VERSION: 1.0.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+Un crash o un reinicio de Ollama en medio de
+`process_nlp_from_db_v11.py --limit 5000` perdia el avance de la corrida y sus
+estadisticas. Esta cola (tabla nlp_work_queue, migracion 017) guarda el
+estado de cada oferta del run para que `--resume` siga donde quedo, con el
+mismo run_id de RunTracker.
+
+ESTADOS:
+  pendiente  -> en_proceso (claim: lease de lease_seconds, intentos + 1)
+  en_proceso -> hecho | fallido
+  fallido    -> en_proceso mientras intentos < max_intentos (reintento)
+
+LEASES:
+Si un proceso muere, sus ofertas quedan en_proceso hasta que vence el lease;
+ahi vuelven a pendiente (o a fallido definitivo si agotaron los intentos).
+Los leases de un proceso del mismo host que ya no existe se liberan al
+reanudar sin esperar el vencimiento.
+
+Uso:
+    from nlp_work_queue import NLPWorkQueue
+
+    queue = NLPWorkQueue(db_path, run_id)
+    queue.enqueue(ids)
+    while True:
+        ids = queue.claim(20)
+        if not ids:
+            break
+        ...
+        queue.mark_done(ok_ids)
+        queue.mark_failed(error_ids, "LLM sin respuesta")
+"""
+
+import os
+import socket
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+LEASE_SECONDS = 1800
+MAX_INTENTOS = 3
+ESTADOS = ("pendiente", "en_proceso", "hecho", "fallido")
+
+SQL_CREATE = """
+    CREATE TABLE IF NOT EXISTS nlp_work_queue (
+        run_id TEXT NOT NULL,
+        id_oferta TEXT NOT NULL,
+        estado TEXT NOT NULL DEFAULT 'pendiente',
+        intentos INTEGER NOT NULL DEFAULT 0,
+        lease_until REAL,
+        worker TEXT,
+        ultimo_error TEXT,
+        updated_at REAL,
+        PRIMARY KEY (run_id, id_oferta)
+    )
+"""
+SQL_INDEX = "CREATE INDEX IF NOT EXISTS idx_nlp_work_queue_estado ON nlp_work_queue(run_id, estado)"
+
+
+def worker_id() -> str:
+    """Identificador del proceso actual (host:pid)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _worker_alive(worker: Optional[str]) -> bool:
+    """False solo si el worker es de este host y su proceso ya no existe."""
+    if not worker or ":" not in worker:
+        return True
+    host, _, pid = worker.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    if PSUTIL_AVAILABLE:
+        return psutil.pid_exists(int(pid))
+    if os.name == "posix":
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+    # Sin psutil en Windows no hay forma segura de chequear: esperar el lease
+    return True
+
+
+class NLPWorkQueue:
+    """Cola de ofertas de un run NLP (una fila por oferta en nlp_work_queue)."""
+
+    def __init__(self, db_path: Path, run_id: str, lease_seconds: int = LEASE_SECONDS,
+                 max_intentos: int = MAX_INTENTOS):
+        self.db_path = Path(db_path)
+        self.run_id = run_id
+        self.lease_seconds = lease_seconds
+        self.max_intentos = max_intentos
+        self.worker = worker_id()
+
+        conn = self._connect()
+        try:
+            conn.execute(SQL_CREATE)
+            conn.execute(SQL_INDEX)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.isolation_level = None  # transacciones explicitas (BEGIN IMMEDIATE)
+        return conn
+
+    def enqueue(self, offer_ids: Iterable[str]) -> int:
+        """Agrega ofertas como pendientes (las ya encoladas se ignoran)."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.executemany(
+                "INSERT OR IGNORE INTO nlp_work_queue (run_id, id_oferta, estado, updated_at) "
+                "VALUES (?, ?, 'pendiente', ?)",
+                [(self.run_id, str(i), now) for i in offer_ids]
+            )
+            conn.execute("COMMIT")
+            return max(cur.rowcount, 0)
+        finally:
+            conn.close()
+
+    def release_expired(self, conn: sqlite3.Connection = None) -> int:
+        """
+        Libera leases vencidos o de procesos muertos de este host.
+
+        Las ofertas que ya agotaron los intentos pasan a fallido definitivo.
+        """
+        own_conn = conn is None
+        conn = conn or self._connect()
+        try:
+            now = time.time()
+            rows = conn.execute(
+                "SELECT id_oferta, lease_until, worker, intentos FROM nlp_work_queue "
+                "WHERE run_id = ? AND estado = 'en_proceso'",
+                (self.run_id,)
+            ).fetchall()
+            liberar = [
+                (id_oferta, intentos) for id_oferta, lease_until, worker, intentos in rows
+                if worker != self.worker and (
+                    (lease_until or 0) < now or not _worker_alive(worker)
+                )
+            ]
+            for id_oferta, intentos in liberar:
+                agotado = intentos >= self.max_intentos
+                conn.execute(
+                    "UPDATE nlp_work_queue SET estado = ?, lease_until = NULL, ultimo_error = ?, "
+                    "updated_at = ? WHERE run_id = ? AND id_oferta = ?",
+                    ("fallido" if agotado else "pendiente",
+                     "lease vencido (proceso interrumpido)", now, self.run_id, id_oferta)
+                )
+            return len(liberar)
+        finally:
+            if own_conn:
+                conn.close()
+
+    def claim(self, n: int) -> List[str]:
+        """
+        Toma hasta n ofertas (pendientes primero, despues reintentos) con lease.
+
+        Returns:
+            IDs tomados (vacio si no queda trabajo disponible)
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self.release_expired(conn)
+            ids = [row[0] for row in conn.execute(
+                "SELECT id_oferta FROM nlp_work_queue "
+                "WHERE run_id = ? AND estado IN ('pendiente', 'fallido') AND intentos < ? "
+                "ORDER BY estado = 'fallido', rowid LIMIT ?",
+                (self.run_id, self.max_intentos, n)
+            )]
+            now = time.time()
+            conn.executemany(
+                "UPDATE nlp_work_queue SET estado = 'en_proceso', intentos = intentos + 1, "
+                "lease_until = ?, worker = ?, updated_at = ? WHERE run_id = ? AND id_oferta = ?",
+                [(now + self.lease_seconds, self.worker, now, self.run_id, i) for i in ids]
+            )
+            conn.execute("COMMIT")
+            return ids
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _finish(self, offer_ids: Iterable[str], estado: str, error: Optional[str] = None,
+                final: bool = False):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "UPDATE nlp_work_queue SET estado = ?, lease_until = NULL, ultimo_error = ?, "
+                "updated_at = ?, intentos = CASE WHEN ? THEN MAX(intentos, ?) ELSE intentos END "
+                "WHERE run_id = ? AND id_oferta = ?",
+                [(estado, error, now, final, self.max_intentos, self.run_id, str(i)) for i in offer_ids]
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def mark_done(self, offer_ids: Iterable[str]):
+        self._finish(offer_ids, "hecho")
+
+    def mark_failed(self, offer_ids: Iterable[str], error: str, final: bool = False):
+        """Marca fallidas; final=True agota los intentos (no se reintentan)."""
+        self._finish(offer_ids, "fallido", error=error[:500] if error else None, final=final)
+
+    def counts(self) -> Dict[str, int]:
+        """Ofertas por estado + 'reintentables' (fallidas con intentos disponibles)."""
+        conn = self._connect()
+        try:
+            result = {estado: 0 for estado in ESTADOS}
+            for estado, n in conn.execute(
+                "SELECT estado, COUNT(*) FROM nlp_work_queue WHERE run_id = ? GROUP BY estado",
+                (self.run_id,)
+            ):
+                result[estado] = n
+            result["reintentables"] = conn.execute(
+                "SELECT COUNT(*) FROM nlp_work_queue WHERE run_id = ? AND estado = 'fallido' "
+                "AND intentos < ?", (self.run_id, self.max_intentos)
+            ).fetchone()[0]
+            result["total"] = sum(result[e] for e in ESTADOS)
+            return result
+        finally:
+            conn.close()
+
+    def is_finished(self) -> bool:
+        """True si no quedan ofertas pendientes, en proceso ni reintentables."""
+        c = self.counts()
+        return not (c["pendiente"] or c["en_proceso"] or c["reintentables"])
+
+    @staticmethod
+    def latest_unfinished_run(db_path: Path, max_intentos: int = MAX_INTENTOS) -> Optional[str]:
+        """run_id mas reciente con trabajo pendiente (para --resume sin argumento)."""
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        try:
+            conn.execute(SQL_CREATE)
+            row = conn.execute(
+                "SELECT run_id FROM nlp_work_queue "
+                "WHERE estado IN ('pendiente', 'en_proceso') OR (estado = 'fallido' AND intentos < ?) "
+                "GROUP BY run_id ORDER BY MAX(updated_at) DESC LIMIT 1",
+                (max_intentos,)
+            ).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
@@ -5,7 +5,15 @@ normalizacion_arg.py
 ====================
 Normaliza terminos argentinos usando diccionario_arg_esco.
 
-VERSION: v1.1 (2025-12-09) - Integración con config_loader
+VERSION: v1.2 (2026-10-18) - Automata precompilado (multi_pattern)
+
+CHANGELOG:
+- v1.1 (2025-12-09): Integración con config_loader
+- v1.2 (2026-10-18): normalizar_termino_argentino ya no ordena las claves ni
+  compila un regex por termino en cada llamada. Un automata Aho-Corasick con
+  word boundaries + longest match (multi_pattern) resuelve el termino en una
+  pasada. Se reconstruye solo si cambia el contenido de diccionario_arg_esco
+  (re-chequeo cada FIRMA_RECHECK_SEGUNDOS).
 
 Integracion con match_ofertas_multicriteria.py:
 - Busca terminos argentinos en el titulo de la oferta
@@ -15,9 +23,12 @@ Integracion con match_ofertas_multicriteria.py:
 """
 
 import re
+import time
+import hashlib
 import sqlite3
 from pathlib import Path
-from functools import lru_cache
+
+from multi_pattern import MultiPatternMatcher
 
 # Intentar cargar configuración externalizada
 try:
@@ -42,12 +53,30 @@ else:
 # Cache del diccionario en memoria
 _DICCIONARIO_CACHE = None
 
+# v1.2: automata + firma de la tabla de la que se construyo
+_MATCHER_CACHE = None
+_PATTERN_CACHE = {}
+_FIRMA_CACHE = None
+_ULTIMO_CHEQUEO = 0.0
+
+# Cada cuanto se vuelve a leer la tabla para detectar cambios
+FIRMA_RECHECK_SEGUNDOS = 60.0
+
+
+def _firma_filas(rows) -> str:
+    """Hash del contenido de diccionario_arg_esco (detecta altas/bajas/ediciones)."""
+    h = hashlib.sha1()
+    for row in rows:
+        h.update(repr(tuple(row)).encode('utf-8'))
+    return h.hexdigest()
+
 
 def _cargar_diccionario(conn=None):
     """Carga diccionario de normalizacion argentino desde DB"""
-    global _DICCIONARIO_CACHE
+    global _DICCIONARIO_CACHE, _MATCHER_CACHE, _FIRMA_CACHE, _ULTIMO_CHEQUEO
 
-    if _DICCIONARIO_CACHE is not None:
+    ahora = time.monotonic()
+    if _DICCIONARIO_CACHE is not None and ahora - _ULTIMO_CHEQUEO < FIRMA_RECHECK_SEGUNDOS:
         return _DICCIONARIO_CACHE
 
     close_conn = False
@@ -61,9 +90,18 @@ def _cargar_diccionario(conn=None):
         FROM diccionario_arg_esco
         WHERE termino_argentino IS NOT NULL AND isco_target IS NOT NULL
     """)
+    rows = cursor.fetchall()
+
+    if close_conn:
+        conn.close()
+
+    _ULTIMO_CHEQUEO = ahora
+    firma = _firma_filas(rows)
+    if _DICCIONARIO_CACHE is not None and firma == _FIRMA_CACHE:
+        return _DICCIONARIO_CACHE
 
     diccionario = {}
-    for row in cursor.fetchall():
+    for row in rows:
         # Use index-based access for compatibility with connections without row_factory
         termino = row[0].lower().strip()
         diccionario[termino] = {
@@ -72,13 +110,23 @@ def _cargar_diccionario(conn=None):
             'esco_terms': row[3]
         }
 
-    if close_conn:
-        conn.close()
-
     _DICCIONARIO_CACHE = diccionario
+    # Mismo orden de desempate que sorted(keys, key=len, reverse=True)
+    _MATCHER_CACHE = MultiPatternMatcher(diccionario.keys(), word_boundary=True)
+    _PATTERN_CACHE.clear()
+    _FIRMA_CACHE = firma
     return diccionario
 
 
+def _pattern_termino(termino: str):
+    """Regex compilado del termino (solo para el reemplazo, una vez por termino)."""
+    pattern = _PATTERN_CACHE.get(termino)
+    if pattern is None:
+        pattern = re.compile(r'\b' + re.escape(termino) + r'\b', flags=re.IGNORECASE)
+        _PATTERN_CACHE[termino] = pattern
+    return pattern
+
+
 def normalizar_termino_argentino(titulo: str, conn=None) -> tuple:
     """
     Busca en diccionario_arg_esco si el titulo tiene termino argentino.
@@ -97,6 +145,7 @@ def normalizar_termino_argentino(titulo: str, conn=None) -> tuple:
         "Analista de sistemas" -> (None, None, None, "Analista de sistemas")
     """
     diccionario = _cargar_diccionario(conn)
+    matcher = _MATCHER_CACHE
 
     if not titulo:
         return None, None, None, titulo
@@ -104,32 +153,26 @@ def normalizar_termino_argentino(titulo: str, conn=None) -> tuple:
     titulo_lower = titulo.lower().strip()
     titulo_normalizado = titulo
 
-    # Buscar matches en el diccionario
-    # Ordenar por longitud descendente para matchear primero terminos mas largos
-    terminos_ordenados = sorted(diccionario.keys(), key=len, reverse=True)
-
-    for termino in terminos_ordenados:
-        # Buscar como palabra completa (con word boundaries)
-        pattern = r'\b' + re.escape(termino) + r'\b'
-        if re.search(pattern, titulo_lower):
-            data = diccionario[termino]
-
-            # Crear titulo normalizado reemplazando termino argentino por ESCO
-            esco_label = data['esco_label'] or ''
-            if esco_label:
-                # Mantener la capitalizacion original del titulo
-                titulo_normalizado = re.sub(
-                    pattern,
-                    esco_label,
-                    titulo_lower,
-                    flags=re.IGNORECASE
-                )
-                # Capitalizar primera letra
-                titulo_normalizado = titulo_normalizado.capitalize()
-
-            return termino, data['isco_target'], data['esco_label'], titulo_normalizado
-
-    return None, None, None, titulo
+    # Termino mas largo presente como palabra completa (una pasada del automata)
+    term_id = matcher.longest_match(titulo_lower)
+    if term_id is None:
+        return None, None, None, titulo
+
+    termino = matcher.terms[term_id]
+    data = diccionario[termino]
+
+    # Crear titulo normalizado reemplazando termino argentino por ESCO
+    esco_label = data['esco_label'] or ''
+    if esco_label:
+        # Mantener la capitalizacion original del titulo
+        titulo_normalizado = _pattern_termino(termino).sub(
+            esco_label,
+            titulo_lower
+        )
+        # Capitalizar primera letra
+        titulo_normalizado = titulo_normalizado.capitalize()
+
+    return termino, data['isco_target'], data['esco_label'], titulo_normalizado
 
 
 def obtener_boost_isco(titulo: str, candidatos: list, conn=None) -> list:
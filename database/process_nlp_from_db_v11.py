@@ -1,12 +1,55 @@
 #!/usr/bin/env python3
 """
-NLP Extractor v11.3 - Schema Lite + Postprocessor + Skills Implicitas
-=====================================================================
+NLP Extractor v11.11 - Schema Lite + Postprocessor + Skills Implicitas
+======================================================================
 
-VERSION: 11.3.0
-FECHA: 2026-01-15
+VERSION: 11.11.0
+FECHA: 2026-10-18
 MODELO: Qwen2.5:14b (LLM) + BGE-M3 (skills implicitas)
 
+MEJORA vs v11.10: El timeout de lectura del LLM tambien corre mientras la
+                 request espera en la cola de Ollama: se escala con la
+                 concurrencia (60s x ceil(N / OLLAMA_NUM_PARALLEL)) o se fija
+                 con --llm-timeout.
+MEJORA vs v11.9: Salidas crudas de regex + LLM en ofertas_nlp_raw (zlib,
+                 nlp_raw_store.py, migracion 018). --replay-postprocess
+                 reconstruye ofertas_nlp desde ahi sin Ollama (postprocessor
+                 en un pool de procesos, --workers) para probar cambios en
+                 config/nlp_*.json sobre todo el corpus.
+MEJORA vs v11.8: Corridas durables y reanudables (--checkpoint / --resume).
+                 Las ofertas del run van a nlp_work_queue (nlp_work_queue.py,
+                 migracion 017) y se procesan en tandas con lease; cada tanda
+                 checkpointea metricas en pipeline_runs (RunTracker). Un crash
+                 o un reinicio de Ollama ya no pierde la corrida: --resume
+                 sigue con el mismo run_id. Fallidas se reintentan hasta
+                 --max-retries. Una sola sesion HTTP, pool y pipeline por
+                 corrida: las tandas se reclaman a medida que avanza la
+                 etapa de preparacion y se checkpointean cuando se escribe
+                 su ultima oferta.
+MEJORA vs v11.7: --staged - pipeline productor/consumidor (nlp_staged_pipeline.py):
+                 preparar (regex+compresion) -> pool LLM -> postprocess con
+                 BGE-M3 por micro-lotes -> escritura por lotes, con colas
+                 acotadas. Exporta profundidad de cola y throughput por etapa.
+MEJORA vs v11.6: Compresion del prompt por secciones (prompt_compression.py):
+                 se descartan beneficios, igualdad de oportunidades, legales,
+                 instrucciones de postulacion y footers repetidos antes del LLM.
+                 ofertas_nlp.prompt_tokens_ahorrados guarda el ahorro estimado
+                 por oferta. --no-compress para mandar la descripcion completa.
+MEJORA vs v11.5: Reuso de extracciones de ofertas casi identicas (reposts entre
+                 portales) via MinHash + LSH (nlp_near_duplicates.py). Se
+                 heredan los campos LLM y solo se corren regex + postprocessor.
+                 ofertas_nlp.nlp_reused_from registra la oferta origen.
+                 --no-near-dup / --near-dup-threshold. Requiere datasketch.
+MEJORA vs v11.4: Cache de respuestas LLM (llm_cache.py) direccionado por
+                 contenido: reposts con el mismo texto no vuelven a llamar a
+                 Ollama. Clave = PROMPT_VERSION + modelo + options + prompt.
+                 --no-llm-cache para desactivarlo; hit rate en el resumen.
+MEJORA vs v11.3: --concurrency N - hasta N requests a Ollama en vuelo (hilos +
+                 requests.Session con keep-alive). Regex+LLM corren en paralelo;
+                 postprocess, skills implicitas y escritura en BD siguen en el
+                 hilo principal, en el orden de las ofertas (un solo escritor).
+                 Ollama atiende en paralelo segun OLLAMA_NUM_PARALLEL.
+                 Fix: llm_time_ms por oferta (antes se reportaba el acumulado).
 MEJORA vs v11.2: Pasa id_empresa al postprocessor para lookup en catálogo de empresas
 MEJORA vs v11.1: Integra NLPPostprocessor - usa TODOS los JSONs de config/
 MEJORA vs v10: 240s -> ~25s por oferta (10x mas rapido)
@@ -32,21 +75,37 @@ ARQUITECTURA:
 
 Uso:
     python process_nlp_from_db_v11.py --limit 10
+    python process_nlp_from_db_v11.py --limit 500 --concurrency 4
+    python process_nlp_from_db_v11.py --limit 500 --concurrency 8 --llm-timeout 300
     python process_nlp_from_db_v11.py --benchmark --limit 5
     python process_nlp_from_db_v11.py --ids 1234,5678
     python process_nlp_from_db_v11.py --no-implicit-skills  # Sin skills implicitas
+    python process_nlp_from_db_v11.py --limit 100 --no-llm-cache
+    python process_nlp_from_db_v11.py --limit 500 --near-dup-threshold 0.95
+    python process_nlp_from_db_v11.py --benchmark --limit 20 --no-compress
+    python process_nlp_from_db_v11.py --limit 1000 --staged --concurrency 4
+    python process_nlp_from_db_v11.py --limit 5000 --checkpoint --concurrency 4
+    python process_nlp_from_db_v11.py --resume                   # ultimo run sin terminar
+    python process_nlp_from_db_v11.py --resume run_20261018_1530
+    python process_nlp_from_db_v11.py --replay-postprocess --workers 8 --no-implicit-skills
 """
 
+import os
 import sys
+import math
 import sqlite3
 import json
 import time
+import threading
 import requests
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
 import argparse
+from requests.adapters import HTTPAdapter
 
 # Importar extractor de skills implícitas
 from skills_implicit_extractor import SkillsImplicitExtractor
@@ -61,6 +120,7 @@ sys.path.insert(0, str(database_dir))
 
 # Importar prompt lite v1.1 (20 campos)
 from prompts.extraction_prompt_lite_v1 import (
+    PROMPT_VERSION,
     get_prompt_lite,
     SCHEMA_LITE,
     VALID_EDAD,
@@ -74,8 +134,27 @@ from prompts.extraction_prompt_lite_v1 import (
 # Importar regex patterns para CAPA 0 (salarios, jornada, modalidad)
 from patterns.regex_patterns_v4 import extract_all as extract_regex_v4
 
-# Limpieza de titulos
-from limpiar_titulos import limpiar_titulo
+# v11.5: Cache de respuestas LLM
+from llm_cache import get_llm_cache
+
+# v11.6: Reuso de extracciones entre ofertas casi identicas
+from nlp_near_duplicates import NearDuplicateIndex, MINHASH_AVAILABLE, DEFAULT_THRESHOLD
+
+# v11.7: Compresion del prompt (boilerplate fuera)
+from prompt_compression import compress_description
+
+# v11.8: Pipeline por etapas con colas acotadas
+from nlp_staged_pipeline import StagedNLPPipeline, DEFAULT_BATCH_SIZE as STAGE_BATCH_SIZE
+
+# v11.9: Cola durable para corridas reanudables
+from nlp_work_queue import NLPWorkQueue, LEASE_SECONDS, MAX_INTENTOS
+
+CHECKPOINT_CHUNK = 20  # ofertas por tanda entre checkpoints
+
+# v11.10: Salidas crudas CAPA 0/1 + replay del postprocessor
+from nlp_raw_store import ensure_table as ensure_raw_table, write_raw, fetch_raw, merge_capas, replay_rows
+
+REPLAY_CHUNK = 500  # ofertas por lote de skills + escritura en --replay-postprocess
 
 
 class NLPExtractorV11:
@@ -84,17 +163,42 @@ class NLPExtractorV11:
     Optimizado para velocidad: 18s vs 240s (v10)
     """
 
-    VERSION = "11.3.0"
-    NLP_VERSION_TAG = "11.3.0"
+    VERSION = "11.11.0"
+    NLP_VERSION_TAG = "11.3.0"  # v11.4-v11.10 no cambian el schema (concurrencia, cache, reuso, compresion, etapas, checkpoints, raw)
     EXTRACTION_METHOD = "pipeline_v11_schema_lite_implicit_skills"
     # Modelo optimizado: 7b es suficiente para extracción JSON (3x más rápido que 14b)
     OLLAMA_MODEL = "qwen2.5:7b"
     OLLAMA_URL = "http://localhost:11434/api/generate"
 
+    # v11.4: Timeouts por request (conexion, lectura) y requests en vuelo
+    # v11.11: LLM_TIMEOUT es la lectura con Ollama libre; con concurrencia se
+    # escala (ver _llm_read_timeout) salvo llm_timeout explicito
+    LLM_CONNECT_TIMEOUT = 5
+    LLM_TIMEOUT = 60
+    DEFAULT_CONCURRENCY = 1
+
+    # Columnas de auditoria en ofertas_nlp (migraciones 015-016, 019; se agregan si faltan)
+    EXTRA_COLUMNS = {
+        "nlp_reused_from": "TEXT",
+        "prompt_tokens_ahorrados": "INTEGER",
+        "skills_implicitas_count": "INTEGER",
+    }
+
+    # Options de Ollama (parte de la clave del cache LLM)
+    LLM_OPTIONS = {
+        "temperature": 0.0,
+        "top_p": 0.1,
+        "num_predict": 1024,  # Mucho menos tokens (15 campos)
+        "num_ctx": 4096,      # Menos contexto
+    }
+
     # Cache de configs (se cargan una sola vez)
     _config_cache = None
 
-    def __init__(self, db_path: str = None, verbose: bool = False, enable_implicit_skills: bool = True):
+    def __init__(self, db_path: str = None, verbose: bool = False, enable_implicit_skills: bool = True,
+                 use_llm_cache: bool = True, near_duplicates: bool = True,
+                 near_dup_threshold: float = DEFAULT_THRESHOLD, compress_prompt: bool = True,
+                 llm_timeout: float = None):
         if db_path is None:
             db_path = Path(__file__).parent / "bumeran_scraping.db"
 
@@ -104,6 +208,9 @@ class NLPExtractorV11:
 
         self.verbose = verbose
         self.enable_implicit_skills = enable_implicit_skills
+        # v11.11: Timeout de lectura fijo (None = escalar con la concurrencia)
+        self.llm_timeout = llm_timeout
+        self._read_timeout = self._llm_read_timeout(self.DEFAULT_CONCURRENCY)
 
         # Cargar configs una sola vez
         if NLPExtractorV11._config_cache is None:
@@ -123,6 +230,24 @@ class NLPExtractorV11:
                 print(f"[WARN] Skills implícitas deshabilitadas: {e}")
                 self.skills_extractor = None
 
+        # v11.4: Sesion HTTP con keep-alive (pool ampliado en process_batch)
+        self.session = self._new_session(self.DEFAULT_CONCURRENCY)
+        self._session_pool = self.DEFAULT_CONCURRENCY
+        self._stats_lock = threading.Lock()
+
+        # v11.5: Cache de respuestas LLM (None si esta desactivado)
+        self.llm_cache = get_llm_cache() if use_llm_cache else None
+
+        # v11.6: Indice de ofertas ya extraidas (None si esta desactivado)
+        self.near_dups = None
+        if near_duplicates:
+            if MINHASH_AVAILABLE:
+                self._load_near_duplicates(near_dup_threshold)
+            else:
+                print("[WARN] Reuso de casi-duplicados deshabilitado: pip install datasketch")
+        self.compress_prompt = compress_prompt
+        self._columns_checked = False
+
         self.stats = {
             "total_processed": 0,
             "total_success": 0,
@@ -130,6 +255,10 @@ class NLPExtractorV11:
             "total_time_ms": 0,
             "llm_calls": 0,
             "llm_time_ms": 0,
+            "llm_cache_hits": 0,
+            "near_dup_reused": 0,
+            "prompt_tokens": 0,
+            "prompt_tokens_ahorrados": 0,
             "skills_implicitas_extraidas": 0,
         }
 
@@ -159,6 +288,76 @@ class NLPExtractorV11:
     def _get_connection(self):
         return sqlite3.connect(self.db_path)
 
+    def _load_near_duplicates(self, threshold: float):
+        """v11.6: Indexa las extracciones existentes de esta version como donantes."""
+        start = time.time()
+        self.near_dups = NearDuplicateIndex(threshold=threshold)
+        conn = self._get_connection()
+        try:
+            loaded = self.near_dups.load_from_db(conn, self.NLP_VERSION_TAG, SCHEMA_LITE)
+        finally:
+            conn.close()
+        if self.verbose or loaded:
+            print(f"[NEAR-DUP] {loaded} ofertas indexadas (umbral {threshold}, "
+                  f"{time.time() - start:.1f}s)")
+
+    def _ensure_columns(self):
+        """
+        v11.6: Agrega las EXTRA_COLUMNS que falten en ofertas_nlp (migraciones 015-016).
+        v11.10: Crea ofertas_nlp_raw si falta (migracion 018).
+        """
+        if self._columns_checked:
+            return
+        conn = self._get_connection()
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(ofertas_nlp)")}
+            for name, sql_type in self.EXTRA_COLUMNS.items():
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE ofertas_nlp ADD COLUMN {name} {sql_type}")
+            ensure_raw_table(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        self._columns_checked = True
+
+    @staticmethod
+    def _new_session(pool_size: int) -> requests.Session:
+        """Sesion con pool de conexiones keep-alive a Ollama."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _resize_session(self, pool_size: int):
+        """Recrea la sesion solo si cambia el tamanio del pool (keep-alive entre tandas)."""
+        if pool_size != self._session_pool:
+            self.session.close()
+            self.session = self._new_session(pool_size)
+            self._session_pool = pool_size
+
+    def _llm_read_timeout(self, concurrency: int) -> float:
+        """
+        v11.11: Timeout de lectura por request a Ollama.
+
+        El timeout cuenta desde que se manda la request, incluida la espera en
+        la cola de Ollama: con N en vuelo y OLLAMA_NUM_PARALLEL=P una request
+        puede esperar ceil(N/P) - 1 respuestas antes de empezar. Sin
+        llm_timeout explicito se da LLM_TIMEOUT por cada una de esas rondas.
+        """
+        if self.llm_timeout:
+            return self.llm_timeout
+        try:
+            parallel = max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL") or 1))
+        except ValueError:
+            parallel = 1
+        return self.LLM_TIMEOUT * math.ceil(max(1, concurrency) / parallel)
+
+    def _add_stat(self, key: str, value: int = 1):
+        """Suma a self.stats (thread-safe: la etapa LLM corre en hilos)."""
+        with self._stats_lock:
+            self.stats[key] += value
+
     # =========================================================================
     # CAPA 0: REGEX (solo salarios, jornada, modalidad)
     # =========================================================================
@@ -184,14 +383,34 @@ class NLPExtractorV11:
 
     def _extract_capa1_llm(self, titulo: str, empresa: str,
                            ubicacion: str, descripcion: str,
-                           timeout: int = 60) -> Optional[Dict[str, Any]]:
-        """CAPA 1: Extraccion con LLM - 15 campos"""
-        try:
-            self.stats["llm_calls"] += 1
-            llm_start = time.time()
+                           timeout: int = None,
+                           timings: Dict[str, int] = None) -> Optional[Dict[str, Any]]:
+        """
+        CAPA 1: Extraccion con LLM - 15 campos
 
+        v11.4: timings["llm_time_ms"] recibe el tiempo de ESTA llamada.
+        v11.5: Consulta el cache LLM antes de llamar a Ollama (hit => 0ms).
+        v11.7: timings["prompt_tokens"] = prompt_eval_count real de Ollama.
+        """
+        timeout = timeout or self._read_timeout
+        llm_start = time.time()
+        try:
             prompt = get_prompt_lite(titulo, empresa, ubicacion, descripcion)
 
+            cache_key = None
+            if self.llm_cache is not None:
+                cache_key = self.llm_cache.make_key(
+                    PROMPT_VERSION, self.OLLAMA_MODEL, self.LLM_OPTIONS, prompt
+                )
+                cached = self.llm_cache.get(cache_key)
+                if cached is not None:
+                    self._add_stat("llm_cache_hits")
+                    if self.verbose:
+                        print(f"[LLM] Cache hit ({len(cached)} chars)")
+                    return self._parse_llm_response(cached)
+
+            self._add_stat("llm_calls")
+
             if self.verbose:
                 print(f"[LLM] Prompt: {len(prompt):,} chars")
 
@@ -200,35 +419,41 @@ class NLPExtractorV11:
                 "prompt": prompt,
                 "stream": False,
                 "format": "json",
-                "options": {
-                    "temperature": 0.0,
-                    "top_p": 0.1,
-                    "num_predict": 1024,  # Mucho menos tokens (15 campos)
-                    "num_ctx": 4096,      # Menos contexto
-                }
+                "options": self.LLM_OPTIONS,
             }
 
-            response = requests.post(
+            response = self.session.post(
                 self.OLLAMA_URL,
                 json=payload,
-                timeout=timeout
+                timeout=(self.LLM_CONNECT_TIMEOUT, timeout)
             )
             response.raise_for_status()
 
             llm_time = int((time.time() - llm_start) * 1000)
-            self.stats["llm_time_ms"] += llm_time
+            self._add_stat("llm_time_ms", llm_time)
+            if timings is not None:
+                timings["llm_time_ms"] = llm_time
 
             result = response.json()
             text = result.get("response", "")
+            prompt_tokens = result.get("prompt_eval_count") or 0
+            self._add_stat("prompt_tokens", prompt_tokens)
+            if timings is not None:
+                timings["prompt_tokens"] = prompt_tokens
 
             if self.verbose:
                 print(f"[LLM] Response: {len(text)} chars, {llm_time}ms")
 
-            # Parsear JSON
-            return self._parse_llm_response(text)
+            # Parsear JSON (al cache solo respuestas validas)
+            data = self._parse_llm_response(text)
+            if data is not None and cache_key is not None:
+                self.llm_cache.put(cache_key, PROMPT_VERSION, self.OLLAMA_MODEL, text)
+            return data
 
         except requests.exceptions.Timeout:
             print(f"[LLM] TIMEOUT despues de {timeout}s")
+            if timings is not None:
+                timings["llm_time_ms"] = int((time.time() - llm_start) * 1000)
             return None
         except requests.exceptions.ConnectionError as e:
             print(f"[LLM] No se puede conectar a Ollama: {e}")
@@ -350,77 +575,126 @@ class NLPExtractorV11:
         start_time = time.time()
 
         try:
-            # CAPA 0: REGEX
-            regex_data = self._extract_capa0_regex(descripcion, titulo)
+            regex_data, llm_data, timings, reused_from = self._extract_regex_llm(
+                descripcion, titulo, empresa, ubicacion, id_oferta=id_oferta
+            )
+        except Exception as e:
+            print(f"[ERROR] {id_oferta}: {e}")
+            self._add_stat("total_errors")
+            return None
+
+        return self._finish_oferta(
+            id_oferta, descripcion, titulo, ubicacion, fecha_publicacion, id_empresa,
+            regex_data, llm_data, timings["llm_time_ms"], int((time.time() - start_time) * 1000),
+            reused_from=reused_from, compression=timings.get("prompt_compression")
+        )
+
+    def _extract_regex_llm(self, descripcion: str, titulo: str, empresa: str,
+                           ubicacion: str, id_oferta: str = None
+                           ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Dict[str, Any], Optional[str]]:
+        """
+        v11.4: CAPA 0 + CAPA 1 (la parte que espera a Ollama; thread-safe).
+        v11.6: Si hay una oferta casi identica ya extraida, hereda sus campos
+               LLM en vez de llamar a Ollama.
+        v11.7: Comprime la descripcion antes del LLM (la regex usa la completa).
+
+        Returns:
+            (regex_data, llm_data o None, timings de esta oferta
+             {"llm_time_ms", "prompt_tokens", "prompt_compression"},
+             id_oferta origen si se reuso la extraccion)
+        """
+        regex_data, timings, reuse, descripcion_llm = self._prepare_oferta(
+            descripcion, titulo, id_oferta=id_oferta
+        )
+        if reuse:
+            source_id, llm_data = reuse
+            return regex_data, llm_data, timings, source_id
+
+        # CAPA 1: LLM LITE
+        llm_data = self._extract_capa1_llm(titulo, empresa, ubicacion, descripcion_llm, timings=timings)
+        return regex_data, llm_data, timings, None
+
+    def _prepare_oferta(self, descripcion: str, titulo: str, id_oferta: str = None
+                        ) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[Tuple[str, Dict[str, Any]]], str]:
+        """
+        v11.8: Todo lo previo a Ollama (CPU): CAPA 0 + reuso + compresion.
+
+        Returns:
+            (regex_data, timings, (id_origen, llm_data) si se reusa o None,
+             descripcion a mandar al LLM)
+        """
+        # CAPA 0: REGEX
+        regex_data = self._extract_capa0_regex(descripcion, titulo)
+
+        # REUSO: oferta casi identica
+        timings = {"llm_time_ms": 0}
+        if self.near_dups is not None:
+            match = self.near_dups.find(titulo, descripcion, exclude_id=id_oferta)
+            if match:
+                source_id, llm_data, similarity = match
+                self._add_stat("near_dup_reused")
+                if self.verbose:
+                    print(f"[NEAR-DUP] Reusa {source_id} (jaccard {similarity})")
+                return regex_data, timings, (source_id, llm_data), descripcion
+
+        # COMPRESION: solo las secciones utiles para los 20 campos
+        descripcion_llm = descripcion
+        if self.compress_prompt:
+            descripcion_llm, compression = compress_description(descripcion)
+            timings["prompt_compression"] = compression
+            self._add_stat("prompt_tokens_ahorrados", compression["tokens_ahorrados_est"])
+            if self.verbose:
+                print(f"[COMPRESS] {compression['chars_original']} -> {compression['chars_comprimido']} chars "
+                      f"(~{compression['tokens_ahorrados_est']} tokens menos)")
+
+        return regex_data, timings, None, descripcion_llm
+
+    def _finish_oferta(self, id_oferta: str, descripcion: str, titulo: str, ubicacion: str,
+                       fecha_publicacion: Optional[str], id_empresa: Optional[str],
+                       regex_data: Dict[str, Any], llm_data: Optional[Dict[str, Any]],
+                       llm_time_ms: int, elapsed_ms: int,
+                       reused_from: str = None,
+                       compression: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        v11.4: Merge + postprocess + skills implicitas (hilo principal).
 
-            # CAPA 1: LLM LITE
-            llm_data = self._extract_capa1_llm(titulo, empresa, ubicacion, descripcion)
+        elapsed_ms: tiempo ya consumido por regex + LLM de esta oferta.
+        reused_from: v11.6 - oferta de la que se heredaron los campos LLM.
+        compression: v11.7 - info de compress_description (None sin compresion).
+
+        El resultado incluye llm_ok (v11.9): False si el LLM no devolvio datos
+        (Ollama caido/timeout); process_run lo reintenta.
+        v11.10: raw = payload de ofertas_nlp_raw (regex + LLM antes del merge).
+        """
+        start_time = time.time()
 
+        try:
+            raw = {
+                "regex": regex_data,
+                "llm": llm_data,
+                "reused_from": reused_from,
+                "prompt_tokens_ahorrados": compression["tokens_ahorrados_est"] if compression else None,
+            }
             if llm_data is None:
                 print(f"[WARN] {id_oferta}: LLM no retorno datos")
                 llm_data = {}
+            elif reused_from is None and self.near_dups is not None:
+                # Donante para las ofertas siguientes de la corrida (antes del postprocess)
+                self.near_dups.add(id_oferta, titulo, descripcion, llm_data)
 
-            # MERGE
-            final_data = {}
-            final_data.update(llm_data)
-            final_data.update(regex_data)  # regex tiene prioridad
-
-            # Titulo limpio
-            if titulo:
-                final_data["titulo_limpio"] = limpiar_titulo(titulo)
-
-            # POSTPROCESSOR: Aplica reglas de config/nlp_*.json
-            # - Preprocesa ubicación (parsing provincia/localidad)
-            # - Infiere area_funcional, modalidad, seniority desde título
-            # - Valida campos categóricos
-            # - Aplica exclusiones configuradas
-            pre_data = self.postprocessor.preprocess({
-                'localizacion': ubicacion,
-                'titulo': titulo
-            })
-            # Merge preprocesamiento (provincia, localidad parseados)
-            for key in ['provincia', 'localidad']:
-                if pre_data.get(key) and not final_data.get(key):
-                    final_data[key] = pre_data[key]
-
-            # Postprocesar (inferencia + validación + lookup catálogo empresas)
-            final_data = self.postprocessor.postprocess(final_data, descripcion, id_empresa=id_empresa)
-
-            # SKILLS IMPLÍCITAS (desde tareas)
-            if self.skills_extractor and final_data.get("tareas_explicitas"):
-                tareas = final_data["tareas_explicitas"]
-                if isinstance(tareas, list):
-                    tareas = "; ".join(str(t) for t in tareas)
-
-                skills_declaradas = final_data.get("skills_tecnicas_list", [])
-                if isinstance(skills_declaradas, str):
-                    skills_declaradas = [s.strip() for s in skills_declaradas.split(",") if s.strip()]
+            # MERGE + POSTPROCESSOR (config/nlp_*.json); mismo codigo que --replay-postprocess
+            final_data = merge_capas(self.postprocessor, regex_data, llm_data,
+                                     titulo, ubicacion, descripcion, id_empresa=id_empresa)
+            final_data["nlp_reused_from"] = reused_from  # v11.6: auditoria del reuso
+            final_data["prompt_tokens_ahorrados"] = raw["prompt_tokens_ahorrados"]
 
-                try:
-                    skills_all, skills_implicitas = self.skills_extractor.get_skills_for_offer(
-                        skills_declaradas=skills_declaradas,
-                        tareas_explicitas=tareas,
-                        merge=True
-                    )
+            self._apply_implicit_skills(final_data)
 
-                    if skills_implicitas:
-                        # Agregar skills implícitas al campo skills_tecnicas_list
-                        final_data["skills_tecnicas_list"] = skills_all
-                        # Guardar detalle de skills implícitas (opcional)
-                        final_data["skills_implicitas_count"] = len(skills_implicitas)
-                        self.stats["skills_implicitas_extraidas"] += len(skills_implicitas)
+            # Metricas (por oferta: regex + LLM + postprocess, sin espera en cola)
+            processing_time_ms = elapsed_ms + int((time.time() - start_time) * 1000)
 
-                        if self.verbose:
-                            print(f"[SKILLS] +{len(skills_implicitas)} implícitas: {[s['skill_esco'][:30] for s in skills_implicitas[:3]]}")
-                except Exception as e:
-                    if self.verbose:
-                        print(f"[WARN] Skills implícitas error: {e}")
-
-            # Metricas
-            processing_time_ms = int((time.time() - start_time) * 1000)
-
-            self.stats["total_success"] += 1
-            self.stats["total_time_ms"] += processing_time_ms
+            self._add_stat("total_success")
+            self._add_stat("total_time_ms", processing_time_ms)
 
             return {
                 "id_oferta": id_oferta,
@@ -428,69 +702,69 @@ class NLPExtractorV11:
                 "nlp_version": self.NLP_VERSION_TAG,
                 "extracted_data": final_data,
                 "processing_time_ms": processing_time_ms,
-                "llm_time_ms": self.stats["llm_time_ms"],
+                "llm_time_ms": llm_time_ms,
+                "reused_from": reused_from,
+                "prompt_compression": compression,
+                "llm_ok": bool(llm_data) or reused_from is not None,
+                "raw": raw,
             }
 
         except Exception as e:
             print(f"[ERROR] {id_oferta}: {e}")
             import traceback
             traceback.print_exc()
-            self.stats["total_errors"] += 1
+            self._add_stat("total_errors")
             return None
 
-    def save_to_db(self, id_oferta: str, extracted: Dict[str, Any],
-                   fecha_publicacion: str = None) -> bool:
-        """Guarda en ofertas_nlp (campos lite)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    def _apply_implicit_skills(self, final_data: Dict[str, Any]):
+        """
+        CAPA 3: Skills implicitas desde tareas (BGE-M3), sobre final_data in place.
 
-        try:
-            # Verificar si existe
-            cursor.execute("SELECT 1 FROM ofertas_nlp WHERE id_oferta = ?", (id_oferta,))
-            exists = cursor.fetchone() is not None
+        skills_implicitas_count = cuantas se agregaron al final de
+        skills_tecnicas_list (0 si ninguna); nlp_near_duplicates las saca al
+        usar la fila como donante.
+        """
+        final_data["skills_implicitas_count"] = 0
+        if self.skills_extractor and final_data.get("tareas_explicitas"):
+            tareas = final_data["tareas_explicitas"]
+            if isinstance(tareas, list):
+                tareas = "; ".join(str(t) for t in tareas)
 
-            # Preparar datos
-            data = {
-                "id_oferta": id_oferta,
-                "nlp_version": self.NLP_VERSION_TAG,
-                "nlp_extraction_timestamp": datetime.now().isoformat(),
-                "fecha_publicacion": fecha_publicacion,
-            }
+            skills_declaradas = final_data.get("skills_tecnicas_list", [])
+            if isinstance(skills_declaradas, str):
+                skills_declaradas = [s.strip() for s in skills_declaradas.split(",") if s.strip()]
 
-            # Mapeo de campos lite a columnas BD
-            LITE_TO_DB = {
-                "titulo_ocupacion": "titulo_limpio",  # Usar titulo_limpio existente
-                "titulo_limpio": "titulo_limpio",
-            }
+            try:
+                skills_all, skills_implicitas = self.skills_extractor.get_skills_for_offer(
+                    skills_declaradas=skills_declaradas,
+                    tareas_explicitas=tareas,
+                    merge=True
+                )
+
+                if skills_implicitas:
+                    # Agregar skills implícitas al campo skills_tecnicas_list
+                    final_data["skills_tecnicas_list"] = skills_all
+                    # Guardar detalle de skills implícitas (opcional)
+                    final_data["skills_implicitas_count"] = len(skills_implicitas)
+                    self._add_stat("skills_implicitas_extraidas", len(skills_implicitas))
 
-            # Agregar campos extraidos
-            for campo, valor in extracted.items():
-                db_campo = LITE_TO_DB.get(campo, campo)
-                if isinstance(valor, list):
-                    data[db_campo] = "; ".join(str(v) for v in valor) if valor else None
-                else:
-                    data[db_campo] = valor
+                    if self.verbose:
+                        print(f"[SKILLS] +{len(skills_implicitas)} implícitas: {[s['skill_esco'][:30] for s in skills_implicitas[:3]]}")
+            except Exception as e:
+                if self.verbose:
+                    print(f"[WARN] Skills implícitas error: {e}")
+
+    def save_to_db(self, id_oferta: str, extracted: Dict[str, Any],
+                   fecha_publicacion: str = None, raw: Dict[str, Any] = None) -> bool:
+        """Guarda en ofertas_nlp (campos lite) y, si hay raw, en ofertas_nlp_raw (v11.10)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
 
-            # Obtener columnas validas
+        try:
             cursor.execute("PRAGMA table_info(ofertas_nlp)")
             valid_columns = {row[1] for row in cursor.fetchall()}
 
-            # Filtrar solo columnas existentes
-            data = {k: v for k, v in data.items() if k in valid_columns}
-
-            # Construir query
-            columns = list(data.keys())
-            placeholders = ["?" for _ in columns]
-
-            if exists:
-                set_clause = ", ".join([f"{col} = ?" for col in columns if col != "id_oferta"])
-                query = f"UPDATE ofertas_nlp SET {set_clause} WHERE id_oferta = ?"
-                values = [data[col] for col in columns if col != "id_oferta"] + [id_oferta]
-            else:
-                query = f"INSERT INTO ofertas_nlp ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
-                values = [data[col] for col in columns]
-
-            cursor.execute(query, values)
+            exists = self._write_row(cursor, id_oferta, extracted, fecha_publicacion, valid_columns, raw)
             conn.commit()
 
             if self.verbose:
@@ -505,9 +779,93 @@ class NLPExtractorV11:
         finally:
             conn.close()
 
-    def process_batch(self, limit: int = 10, ids_especificos: List[str] = None,
-                      save_to_db: bool = True) -> Dict[str, Any]:
-        """Procesa un batch de ofertas"""
+    def save_many_to_db(self, rows: List[Tuple]) -> int:
+        """
+        v11.8: Guarda varias ofertas con una conexion y un commit.
+
+        Args:
+            rows: (id_oferta, extracted_data, fecha_publicacion[, raw])
+
+        Returns:
+            Cantidad de filas guardadas (una fila con error no frena el lote)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        saved = 0
+        try:
+            cursor.execute("PRAGMA table_info(ofertas_nlp)")
+            valid_columns = {row[1] for row in cursor.fetchall()}
+            for id_oferta, extracted, fecha_publicacion, *raw in rows:
+                try:
+                    self._write_row(cursor, str(id_oferta), extracted, fecha_publicacion, valid_columns,
+                                    raw[0] if raw else None)
+                    saved += 1
+                except Exception as e:
+                    print(f"[DB ERROR] {id_oferta}: {e}")
+            conn.commit()
+            if self.verbose:
+                print(f"[DB] Lote: {saved}/{len(rows)} ofertas guardadas")
+            return saved
+        except Exception as e:
+            print(f"[DB ERROR] Lote de {len(rows)} ofertas: {e}")
+            conn.rollback()
+            return 0
+        finally:
+            conn.close()
+
+    def _write_row(self, cursor, id_oferta: str, extracted: Dict[str, Any],
+                   fecha_publicacion: Optional[str], valid_columns: set,
+                   raw: Dict[str, Any] = None) -> bool:
+        """INSERT o UPDATE de una oferta en ofertas_nlp (sin commit). Retorna si ya existia."""
+        if raw is not None:
+            write_raw(cursor, id_oferta, self.NLP_VERSION_TAG, raw, prompt_version=PROMPT_VERSION)
+
+        # Verificar si existe
+        cursor.execute("SELECT 1 FROM ofertas_nlp WHERE id_oferta = ?", (id_oferta,))
+        exists = cursor.fetchone() is not None
+
+        # Preparar datos
+        data = {
+            "id_oferta": id_oferta,
+            "nlp_version": self.NLP_VERSION_TAG,
+            "nlp_extraction_timestamp": datetime.now().isoformat(),
+            "fecha_publicacion": fecha_publicacion,
+        }
+
+        # Mapeo de campos lite a columnas BD
+        LITE_TO_DB = {
+            "titulo_ocupacion": "titulo_limpio",  # Usar titulo_limpio existente
+            "titulo_limpio": "titulo_limpio",
+        }
+
+        # Agregar campos extraidos
+        for campo, valor in extracted.items():
+            db_campo = LITE_TO_DB.get(campo, campo)
+            if isinstance(valor, list):
+                data[db_campo] = "; ".join(str(v) for v in valor) if valor else None
+            else:
+                data[db_campo] = valor
+
+        # Filtrar solo columnas existentes
+        data = {k: v for k, v in data.items() if k in valid_columns}
+
+        # Construir query
+        columns = list(data.keys())
+        placeholders = ["?" for _ in columns]
+
+        if exists:
+            set_clause = ", ".join([f"{col} = ?" for col in columns if col != "id_oferta"])
+            query = f"UPDATE ofertas_nlp SET {set_clause} WHERE id_oferta = ?"
+            values = [data[col] for col in columns if col != "id_oferta"] + [id_oferta]
+        else:
+            query = f"INSERT INTO ofertas_nlp ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
+            values = [data[col] for col in columns]
+
+        cursor.execute(query, values)
+        return exists
+
+    def _fetch_ofertas(self, limit: int = 10, ids_especificos: List[str] = None) -> List[tuple]:
+        """Filas (id, descripcion, titulo, empresa, localizacion, fecha, id_empresa) a procesar."""
         conn = self._get_connection()
         cursor = conn.cursor()
 
@@ -540,45 +898,124 @@ class NLPExtractorV11:
 
         ofertas = cursor.fetchall()
         conn.close()
+        return ofertas
 
-        total = len(ofertas)
+    def _print_header(self, total: int, concurrency: int, staged: bool, stage_batch_size: int):
         print(f"\n{'='*60}")
         print(f"NLP LITE v{self.VERSION}")
         print(f"{'='*60}")
         print(f"Ofertas a procesar: {total}")
         print(f"Campos: 15 (normalizables)")
+        if concurrency > 1:
+            print(f"Concurrencia LLM: {concurrency} (timeout de lectura {self._llm_read_timeout(concurrency):.0f}s)")
+        if staged:
+            print(f"Modo: por etapas (micro-lote {stage_batch_size})")
         print()
 
+    def process_batch(self, limit: int = 10, ids_especificos: List[str] = None,
+                      save_to_db: bool = True, concurrency: int = None,
+                      staged: bool = False, stage_batch_size: int = STAGE_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Procesa un batch de ofertas
+
+        v11.4: concurrency > 1 -> hasta N ofertas esperando a Ollama a la vez.
+        Los resultados se terminan y guardan en el orden original.
+        v11.8: staged=True -> StagedNLPPipeline (etapas en hilos con colas
+        acotadas, BGE-M3 y escritura por micro-lotes de stage_batch_size).
+        Los resultados se guardan en orden de llegada.
+        """
+        concurrency = max(1, concurrency or self.DEFAULT_CONCURRENCY)
+        ofertas = self._fetch_ofertas(limit, ids_especificos)
+
+        total = len(ofertas)
+        self._print_header(total, concurrency, staged, stage_batch_size)
+
+        if save_to_db:
+            self._ensure_columns()
+
+        wall_start = time.time()
+        results, times, pipeline = self._run_ofertas(
+            ofertas, save_to_db, concurrency, staged, stage_batch_size
+        )
+        self._print_summary(times, wall_start, pipeline)
+        return self._summary_dict(total, results, times, pipeline)
+
+    def _run_ofertas(self, ofertas: Iterable[tuple], save_to_db: bool, concurrency: int,
+                     staged: bool, stage_batch_size: int, offset: int = 0,
+                     total: int = None, on_done: Callable[[List[tuple]], None] = None,
+                     pipeline: StagedNLPPipeline = None
+                     ) -> Tuple[List[Dict[str, Any]], List[int], Optional[StagedNLPPipeline]]:
+        """
+        Procesa las filas con el modo elegido (secuencial, concurrente o por etapas).
+
+        offset/total: v11.9 - numeracion del progreso cuando se procesa por tandas.
+        ofertas: puede ser un generador (process_run reclama tandas a demanda).
+        on_done: recibe [(fila, resultado o None)] ya guardados en BD (por
+                 oferta, o por micro-lote de escritura con staged).
+        pipeline: StagedNLPPipeline a reusar (si no, se crea uno).
+
+        Returns:
+            (resultados exitosos, processing_time_ms de cada uno, pipeline o None)
+        """
+        if total is None:
+            total = len(ofertas)
         results = []
         times = []
+        self._resize_session(concurrency)
+        self._read_timeout = self._llm_read_timeout(concurrency)
 
-        for i, (id_oferta, descripcion, titulo, empresa, localizacion, fecha_pub, id_empresa) in enumerate(ofertas, 1):
-            print(f"[{i}/{total}] {id_oferta}...", end=" ", flush=True)
-
-            result = self.process_oferta(
-                id_oferta=str(id_oferta),
-                descripcion=descripcion or "",
-                titulo=titulo or "",
-                empresa=empresa or "",
-                ubicacion=localizacion or "",
-                fecha_publicacion=fecha_pub,
-                id_empresa=str(id_empresa) if id_empresa else None
-            )
-
+        def handle(i, oferta, result):
+            id_oferta, fecha_pub = oferta[0], oferta[5]
+            print(f"[{offset + i}/{total}] {id_oferta}...", end=" ", flush=True)
             if result:
                 times.append(result["processing_time_ms"])
-                print(f"OK ({result['processing_time_ms']}ms)")
+                if result["reused_from"]:
+                    print(f"OK ({result['processing_time_ms']}ms, reusa {result['reused_from']})")
+                elif result["prompt_compression"]:
+                    print(f"OK ({result['processing_time_ms']}ms, LLM {result['llm_time_ms']}ms, "
+                          f"-{result['prompt_compression']['tokens_ahorrados_est']} tok)")
+                else:
+                    print(f"OK ({result['processing_time_ms']}ms, LLM {result['llm_time_ms']}ms)")
 
                 if save_to_db:
-                    self.save_to_db(id_oferta, result["extracted_data"], fecha_pub)
+                    self.save_to_db(id_oferta, result["extracted_data"], fecha_pub, raw=result.get("raw"))
 
                 results.append(result)
             else:
                 print("ERROR")
 
             self.stats["total_processed"] += 1
+            if on_done is not None:
+                on_done([(oferta, result)])
+
+        if staged:
+            if pipeline is None:
+                pipeline = StagedNLPPipeline(self, concurrency=concurrency, batch_size=stage_batch_size,
+                                             save_to_db=save_to_db)
+            pipeline.on_written = on_done
+            results, times = pipeline.run(ofertas, offset=offset, total=total)
+            self.stats["pipeline"] = pipeline.metrics()
+        elif concurrency == 1:
+            for i, oferta in enumerate(ofertas, 1):
+                id_oferta, descripcion, titulo, empresa, localizacion, fecha_pub, id_empresa = oferta
+                result = self.process_oferta(
+                    id_oferta=str(id_oferta),
+                    descripcion=descripcion or "",
+                    titulo=titulo or "",
+                    empresa=empresa or "",
+                    ubicacion=localizacion or "",
+                    fecha_publicacion=fecha_pub,
+                    id_empresa=str(id_empresa) if id_empresa else None
+                )
+                handle(i, oferta, result)
+        else:
+            for i, oferta, result in self._process_concurrent(ofertas, concurrency):
+                handle(i, oferta, result)
 
-        # Resumen
+        return results, times, pipeline
+
+    def _print_summary(self, times: List[int], wall_start: float,
+                       pipeline: Optional[StagedNLPPipeline] = None):
         print()
         print("=" * 60)
         print("RESUMEN")
@@ -592,26 +1029,417 @@ class NLPExtractorV11:
             print(f"  Tiempo promedio: {avg_time:.0f}ms ({avg_time/1000:.1f}s)")
             print(f"  Tiempo total: {sum(times)/1000:.1f}s")
             print(f"  Tiempo LLM total: {self.stats['llm_time_ms']/1000:.1f}s")
-
+            if self.llm_cache is not None:
+                cache_stats = self.llm_cache.stats()
+                print(f"  Cache LLM: {self.stats['llm_cache_hits']} hits / "
+                      f"{self.stats['llm_calls']} llamadas "
+                      f"(hit rate {cache_stats['hit_rate']:.1%}, {cache_stats['entries']} entradas)")
+            if self.compress_prompt:
+                print(f"  Tokens de prompt: {self.stats['prompt_tokens']} "
+                      f"(~{self.stats['prompt_tokens_ahorrados']} ahorrados por compresion)")
+            if self.near_dups is not None:
+                print(f"  Reuso casi-duplicados: {self.stats['near_dup_reused']} ofertas "
+                      f"({len(self.near_dups)} donantes)")
+            print(f"  Tiempo real: {time.time() - wall_start:.1f}s")
+        if pipeline is not None:
+            pipeline.print_summary()
+
+    def _summary_dict(self, total: int, results: List[Dict[str, Any]], times: List[int],
+                      pipeline: Optional[StagedNLPPipeline] = None) -> Dict[str, Any]:
         return {
             "total": total,
             "success": self.stats["total_success"],
             "errors": self.stats["total_errors"],
+            "llm_cache_hits": self.stats["llm_cache_hits"],
+            "near_dup_reused": self.stats["near_dup_reused"],
+            "prompt_tokens_ahorrados": self.stats["prompt_tokens_ahorrados"],
             "avg_time_ms": sum(times) / len(times) if times else 0,
+            "pipeline": pipeline.metrics() if pipeline is not None else None,
             "results": results,
         }
 
+    # =========================================================================
+    # v11.9: CORRIDAS CHECKPOINTEADAS (--checkpoint / --resume)
+    # =========================================================================
+
+    def _get_run_tracker(self):
+        """RunTracker de scripts/run_tracking.py (None si no esta disponible)."""
+        try:
+            sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+            from run_tracking import RunTracker
+            return RunTracker(db_path=self.db_path)
+        except Exception as e:
+            print(f"[RUN] WARN: run_tracking no disponible ({e}), corrida sin pipeline_runs")
+            return None
+
+    def _run_stats(self, base: Dict[str, Any]) -> Dict[str, Any]:
+        """Stats numericos acumulados: checkpoint anterior del run + esta sesion."""
+        return {
+            key: (base or {}).get(key, 0) + value
+            for key, value in self.stats.items()
+            if isinstance(value, (int, float))
+        }
+
+    def process_run(self, limit: int = 10, ids_especificos: List[str] = None,
+                    save_to_db: bool = True, concurrency: int = None,
+                    staged: bool = False, stage_batch_size: int = STAGE_BATCH_SIZE,
+                    resume_run: str = None, chunk_size: int = CHECKPOINT_CHUNK,
+                    max_intentos: int = MAX_INTENTOS,
+                    lease_seconds: int = LEASE_SECONDS) -> Dict[str, Any]:
+        """
+        v11.9: Corrida durable y reanudable.
+
+        Las ofertas del run van a nlp_work_queue y se reclaman en tandas de
+        chunk_size con lease a medida que el modo elegido pide filas (una sola
+        sesion HTTP / pool / StagedNLPPipeline para toda la corrida). Cuando se
+        guarda la ultima oferta de una tanda se marcan hecho/fallido y se
+        checkpointean las metricas en pipeline_runs (RunTracker.save_progress).
+        Las fallidas (LLM sin datos, errores) se reintentan hasta max_intentos
+        en una pasada mas sobre el mismo pipeline.
+
+        Args:
+            resume_run: run_id a continuar ("latest": el mas reciente con
+                        trabajo pendiente). None crea un run nuevo.
+
+        Returns:
+            Resumen de process_batch + run_id y estado de la cola
+        """
+        concurrency = max(1, concurrency or self.DEFAULT_CONCURRENCY)
+        tracker = self._get_run_tracker()
+        base_stats = {}
+
+        if resume_run:
+            run_id = resume_run
+            if resume_run == "latest":
+                run_id = NLPWorkQueue.latest_unfinished_run(self.db_path, max_intentos)
+                if run_id is None:
+                    print("[RUN] No hay corridas NLP con trabajo pendiente")
+                    return {"run_id": None, "total": 0, "results": []}
+            queue = NLPWorkQueue(self.db_path, run_id, lease_seconds, max_intentos)
+            run = tracker.get_run(run_id) if tracker else None
+            base_stats = ((run or {}).get("errores_por_tipo") or {}).get("stats", {})
+            print(f"[RUN] Reanudando: {run_id} ({queue.counts()})")
+        else:
+            ids = [str(o[0]) for o in self._fetch_ofertas(limit, ids_especificos)]
+            run_id = None
+            if tracker:
+                try:
+                    run_id = tracker.create_run(
+                        offer_ids=ids, source="nlp_v11",
+                        description=f"NLP v{self.VERSION} ({len(ids)} ofertas)"
+                    )
+                except Exception as e:
+                    print(f"[RUN] WARN: No se pudo crear run: {e}")
+            run_id = run_id or f"run_nlp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            queue = NLPWorkQueue(self.db_path, run_id, lease_seconds, max_intentos)
+            queue.enqueue(ids)
+
+        counts = queue.counts()
+        self._print_header(counts["total"], concurrency, staged, stage_batch_size)
+        print(f"Run: {run_id} | checkpoint cada {chunk_size} ofertas | "
+              f"hasta {max_intentos} intentos por oferta")
+        print()
+
+        if save_to_db:
+            self._ensure_columns()
+
+        def checkpoint(final: bool = False):
+            c = queue.counts()
+            metricas = {"total": c["total"], "correctos": c["hecho"], "errores": c["fallido"]}
+            detalle = {"tipo": "nlp", "nlp_version": self.NLP_VERSION_TAG,
+                       "cola": c, "stats": self._run_stats(base_stats)}
+            if tracker:
+                if final:
+                    tracker.save_results(run_id, metricas, errores_por_tipo=detalle)
+                else:
+                    tracker.save_progress(run_id, metricas, detalle)
+            return c
+
+        # Tandas reclamadas sin terminar: ids que faltan guardar + resultado de los ya guardados
+        tandas: List[Dict[str, Any]] = []
+        tandas_lock = threading.Lock()
+        reclamadas = [0]
+
+        def claimed():
+            """Reclama tandas de la cola a medida que se consumen las filas."""
+            while True:
+                ids = queue.claim(chunk_size)
+                if not ids:
+                    return
+                reclamadas[0] += 1
+                ofertas = self._fetch_ofertas(ids_especificos=ids)
+
+                encontrados = {str(o[0]) for o in ofertas}
+                sin_datos = [i for i in ids if i not in encontrados]
+                if sin_datos:
+                    queue.mark_failed(sin_datos, "oferta sin descripcion utilizable", final=True)
+                if not ofertas:
+                    continue
+                with tandas_lock:
+                    tandas.append({"pendientes": set(encontrados), "ok": [], "fallidas": []})
+                yield from ofertas
+
+        def on_done(pares: List[tuple]):
+            """Ofertas ya guardadas (hilo de escritura con staged): cierra las tandas completas."""
+            with tandas_lock:
+                for oferta, result in pares:
+                    id_oferta = str(oferta[0])
+                    tanda = next((t for t in tandas if id_oferta in t["pendientes"]), None)
+                    if tanda is None:
+                        continue
+                    tanda["pendientes"].discard(id_oferta)
+                    # LLM sin datos (Ollama caido/timeout) cuenta como fallo: se reintenta
+                    ok = result is not None and result.get("llm_ok", True)
+                    tanda["ok" if ok else "fallidas"].append(id_oferta)
+
+                completas = [t for t in tandas if not t["pendientes"]]
+                for tanda in completas:
+                    tandas.remove(tanda)
+                    queue.mark_done(tanda["ok"])
+                    if tanda["fallidas"]:
+                        queue.mark_failed(tanda["fallidas"], "sin resultado del LLM o error de procesamiento")
+                if completas:
+                    c = checkpoint()
+                    print(f"[RUN] Checkpoint {run_id}: {c['hecho']} hechas, {c['fallido']} fallidas "
+                          f"({c['reintentables']} a reintentar), {c['pendiente']} pendientes")
+
+        results, times = [], []
+        pipeline = None
+        wall_start = time.time()
+        while True:
+            # Una pasada consume toda la cola; otra solo si quedaron reintentables
+            reclamadas[0] = 0
+            done_before = counts["hecho"] + counts["fallido"] - counts["reintentables"]
+            pass_results, pass_times, pipeline = self._run_ofertas(
+                claimed(), save_to_db, concurrency, staged, stage_batch_size,
+                offset=done_before, total=counts["total"], on_done=on_done, pipeline=pipeline
+            )
+            results.extend(pass_results)
+            times.extend(pass_times)
+            counts = queue.counts()
+            if not reclamadas[0]:
+                break
+
+        self._print_summary(times, wall_start, pipeline)
+        if queue.is_finished():
+            counts = checkpoint(final=True)
+            print(f"[RUN] Corrida completa: {run_id}")
+        else:
+            counts = checkpoint()
+            print(f"[RUN] Quedan ofertas en proceso por otro worker; continuar con --resume {run_id}")
+
+        summary = self._summary_dict(counts["total"], results, times, pipeline)
+        summary.update({"run_id": run_id, "cola": counts})
+        return summary
+
+    # =========================================================================
+    # v11.10: REPLAY DEL POSTPROCESSOR (--replay-postprocess)
+    # =========================================================================
+
+    def replay_postprocess(self, ids_especificos: List[str] = None, workers: int = None,
+                           save_to_db: bool = True, chunk_size: int = REPLAY_CHUNK) -> Dict[str, Any]:
+        """
+        Reconstruye ofertas_nlp desde ofertas_nlp_raw sin llamar al LLM.
+
+        Merge + NLPPostprocessor corren en `workers` procesos (default: un
+        proceso por core) con los config/nlp_*.json actuales. Skills implicitas
+        (si estan habilitadas) y escritura van por lotes de chunk_size en el
+        proceso principal.
+
+        Returns:
+            Resumen con total, success, errors, ofertas_por_seg
+        """
+        workers = workers or os.cpu_count() or 1
+        conn = self._get_connection()
+        ensure_raw_table(conn)
+        conn.commit()
+        total = conn.execute(
+            "SELECT COUNT(*) FROM ofertas_nlp_raw WHERE nlp_version = ?", (self.NLP_VERSION_TAG,)
+        ).fetchone()[0]
+        if ids_especificos:
+            total = min(total, len(ids_especificos))
+
+        print(f"\n{'='*60}")
+        print(f"NLP LITE v{self.VERSION} - REPLAY POSTPROCESSOR")
+        print(f"{'='*60}")
+        print(f"Salidas crudas (v{self.NLP_VERSION_TAG}): {total}")
+        print(f"Procesos: {workers} | Skills implicitas: {'si' if self.skills_extractor else 'no'}")
+        print()
+
+        if save_to_db:
+            self._ensure_columns()
+
+        start = time.time()
+        procesadas = exitosas = 0
+        lote = []
+
+        def flush():
+            nonlocal exitosas
+            if self.skills_extractor is not None:
+                textos = []
+                for _, final_data, _ in lote:
+                    tareas = final_data.get("tareas_explicitas")
+                    if isinstance(tareas, list):
+                        tareas = "; ".join(str(t) for t in tareas)
+                    if tareas:
+                        textos.extend(t.strip() for t in str(tareas).split(";") if t.strip())
+                if textos:
+                    try:
+                        self.skills_extractor.prefetch(textos)
+                    except Exception as e:
+                        print(f"[REPLAY] Prefetch de skills fallo: {e}")
+            for _, final_data, _ in lote:
+                self._apply_implicit_skills(final_data)
+            if self.skills_extractor is not None:
+                self.skills_extractor.clear_prefetch()
+
+            if save_to_db:
+                exitosas += self.save_many_to_db(lote)
+            else:
+                exitosas += len(lote)
+            lote.clear()
+            print(f"[REPLAY] {procesadas}/{total} ({procesadas / max(time.time() - start, 1e-6):.0f} ofertas/s)")
+
+        try:
+            jobs = fetch_raw(conn, self.NLP_VERSION_TAG, ids_especificos)
+            for id_oferta, fecha_pub, final_data, error in replay_rows(jobs, workers):
+                procesadas += 1
+                if final_data is None:
+                    print(f"[ERROR] {id_oferta}: {error}")
+                    continue
+                lote.append((id_oferta, final_data, fecha_pub))
+                if len(lote) >= chunk_size:
+                    flush()
+            if lote:
+                flush()
+        finally:
+            conn.close()
+
+        elapsed = time.time() - start
+        print()
+        print("=" * 60)
+        print("RESUMEN REPLAY")
+        print("=" * 60)
+        print(f"  Ofertas: {procesadas}")
+        print(f"  {'Guardadas' if save_to_db else 'Reconstruidas'}: {exitosas}")
+        print(f"  Errores: {procesadas - exitosas}")
+        print(f"  Tiempo: {elapsed:.1f}s ({procesadas / max(elapsed, 1e-6):.0f} ofertas/s)")
+
+        return {
+            "total": procesadas,
+            "success": exitosas,
+            "errors": procesadas - exitosas,
+            "elapsed_s": round(elapsed, 2),
+            "ofertas_por_seg": round(procesadas / elapsed, 1) if elapsed else 0.0,
+        }
+
+    def _process_concurrent(self, ofertas: Iterable[tuple], concurrency: int):
+        """
+        v11.4: Regex + LLM en un pool de hilos con como mucho 2*concurrency
+        ofertas pendientes; postprocess/skills en este hilo, en orden.
+        La sesion HTTP la dimensiona _run_ofertas.
+
+        Yields:
+            (posicion 1-based, fila de la oferta, resultado o None)
+        """
+
+        def llm_stage(oferta):
+            id_oferta, descripcion, titulo, empresa, localizacion, _, _ = oferta
+            start = time.time()
+            try:
+                extracted = self._extract_regex_llm(descripcion or "", titulo or "", empresa or "",
+                                                    localizacion or "", id_oferta=str(id_oferta))
+                return extracted, int((time.time() - start) * 1000), None
+            except Exception as e:
+                return None, 0, e
+
+        pending = deque()
+        rows = iter(enumerate(ofertas, 1))
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            def submit_next() -> bool:
+                item = next(rows, None)
+                if item is None:
+                    return False
+                pending.append((item[0], item[1], pool.submit(llm_stage, item[1])))
+                return True
+
+            for _ in range(concurrency * 2):
+                if not submit_next():
+                    break
+
+            while pending:
+                i, oferta, future = pending.popleft()
+                extracted, elapsed_ms, error = future.result()
+                submit_next()
+
+                id_oferta, descripcion, titulo, _, localizacion, fecha_pub, id_empresa = oferta
+                if error is not None:
+                    print(f"[ERROR] {id_oferta}: {error}")
+                    self._add_stat("total_errors")
+                    yield i, oferta, None
+                    continue
+
+                regex_data, llm_data, timings, reused_from = extracted
+                yield i, oferta, self._finish_oferta(
+                    str(id_oferta), descripcion or "", titulo or "", localizacion or "",
+                    fecha_pub, str(id_empresa) if id_empresa else None,
+                    regex_data, llm_data, timings["llm_time_ms"], elapsed_ms,
+                    reused_from=reused_from, compression=timings.get("prompt_compression")
+                )
+
 
 def main():
     parser = argparse.ArgumentParser(description="NLP Extractor LITE - Solo campos normalizables")
     parser.add_argument("--limit", type=int, default=10, help="Numero de ofertas a procesar")
     parser.add_argument("--ids", type=str, help="IDs especificos separados por coma")
     parser.add_argument("--benchmark", action="store_true", help="Modo benchmark (no guarda en BD)")
+    parser.add_argument("--concurrency", type=int, default=NLPExtractorV11.DEFAULT_CONCURRENCY,
+                        help="Requests a Ollama en paralelo (requiere OLLAMA_NUM_PARALLEL >= N)")
+    parser.add_argument("--llm-timeout", type=float, default=None,
+                        help=f"Segundos de lectura por request a Ollama, incluida la espera en su cola "
+                             f"(default: {NLPExtractorV11.LLM_TIMEOUT} x ceil(concurrency / OLLAMA_NUM_PARALLEL))")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="No usar el cache de respuestas LLM (siempre llama a Ollama)")
+    parser.add_argument("--no-near-dup", action="store_true",
+                        help="No reusar extracciones de ofertas casi identicas")
+    parser.add_argument("--near-dup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Jaccard minimo para reusar una extraccion (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--staged", action="store_true",
+                        help="Pipeline por etapas (regex / LLM / postprocess+skills / BD) con colas acotadas")
+    parser.add_argument("--stage-batch-size", type=int, default=STAGE_BATCH_SIZE,
+                        help=f"Micro-lote de skills y escritura en --staged (default: {STAGE_BATCH_SIZE})")
+    parser.add_argument("--no-compress", action="store_true",
+                        help="Mandar la descripcion completa al LLM (sin compresion por secciones)")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="Corrida durable: cola nlp_work_queue + checkpoints en pipeline_runs")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="RUN_ID",
+                        help="Continuar una corrida checkpointeada (sin RUN_ID: la ultima sin terminar)")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_CHUNK,
+                        help=f"Ofertas por tanda entre checkpoints (default: {CHECKPOINT_CHUNK})")
+    parser.add_argument("--max-retries", type=int, default=MAX_INTENTOS,
+                        help=f"Intentos maximos por oferta en --checkpoint/--resume (default: {MAX_INTENTOS})")
+    parser.add_argument("--lease-seconds", type=int, default=LEASE_SECONDS,
+                        help=f"Lease de una tanda antes de liberarla a otro proceso (default: {LEASE_SECONDS})")
+    parser.add_argument("--replay-postprocess", action="store_true",
+                        help="Reconstruir ofertas_nlp desde ofertas_nlp_raw sin LLM (tras cambiar config/nlp_*.json)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos del postprocessor en --replay-postprocess (default: un proceso por core)")
+    parser.add_argument("--no-implicit-skills", action="store_true",
+                        help="Sin skills implicitas (BGE-M3)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Mostrar detalles")
 
     args = parser.parse_args()
 
-    extractor = NLPExtractorV11(verbose=args.verbose)
+    extractor = NLPExtractorV11(
+        verbose=args.verbose,
+        enable_implicit_skills=not args.no_implicit_skills,
+        use_llm_cache=not args.no_llm_cache and not args.replay_postprocess,
+        near_duplicates=not args.no_near_dup and not args.replay_postprocess,
+        near_dup_threshold=args.near_dup_threshold,
+        compress_prompt=not args.no_compress,
+        llm_timeout=args.llm_timeout
+    )
 
     ids = None
     if args.ids:
@@ -622,10 +1450,32 @@ def main():
     if args.benchmark:
         print("[BENCHMARK MODE] No se guardaran cambios en BD")
 
+    if args.replay_postprocess:
+        extractor.replay_postprocess(ids_especificos=ids, workers=args.workers, save_to_db=save_to_db)
+        return
+
+    if args.checkpoint or args.resume:
+        extractor.process_run(
+            limit=args.limit,
+            ids_especificos=ids,
+            save_to_db=save_to_db,
+            concurrency=args.concurrency,
+            staged=args.staged,
+            stage_batch_size=args.stage_batch_size,
+            resume_run=args.resume,
+            chunk_size=args.checkpoint_every,
+            max_intentos=args.max_retries,
+            lease_seconds=args.lease_seconds
+        )
+        return
+
     extractor.process_batch(
         limit=args.limit,
         ids_especificos=ids,
-        save_to_db=save_to_db
+        save_to_db=save_to_db,
+        concurrency=args.concurrency,
+        staged=args.staged,
+        stage_batch_size=args.stage_batch_size
     )
 
 
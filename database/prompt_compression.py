@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prompt Compression v1.0 - Recorte de boilerplate antes del LLM
+==============================================================
+
+VERSION: 1.1.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+get_prompt_lite manda la descripcion completa a qwen2.5 (num_ctx 4096) y el
+prompt-eval escala con los tokens de entrada. Buena parte del texto no aporta
+a los 20 campos: beneficios, textos de igualdad de oportunidades, avisos
+legales, instrucciones de postulacion y footers repetidos del portal.
+
+ESTRATEGIA (usa StructureDetector de patterns/regex_patterns_v4):
+1. Lineas de boilerplate cortas (BOILERPLATE_PATTERNS) se descartan. Lineas
+   largas se conservan aunque matcheen (pueden mezclar requisitos).
+2. Lineas repetidas (footers duplicados) se conservan una sola vez.
+3. Seccion 'beneficios' se descarta entera. v1.1: el header tiene que
+   empezar la linea ("...en las siguientes condiciones:" no es header) y el
+   corte termina en la primera linea en blanco, al final de la tanda de
+   bullets o en el siguiente header aunque no tenga ':' ("Requisitos");
+   encontrar_seccion solo corta en headers con ':' y se comia lo que seguia.
+4. Si hay secciones relevantes (requisitos/responsabilidades/skills) y la
+   introduccion previa supera INTRO_MAX_CHARS (suele ser el blurb de la
+   empresa), se conservan su comienzo (sector_empresa) y su ultima linea
+   ("Buscamos un Analista de Compras...", mision_rol).
+
+La CAPA 0 (regex: salario, jornada, modalidad) sigue corriendo sobre la
+descripcion completa; la compresion solo afecta lo que ve el LLM.
+
+Si el resultado queda por debajo de MIN_KEEP_CHARS se usa la descripcion
+original (la deteccion de secciones fallo).
+
+Tokens: estimacion chars / CHARS_PER_TOKEN (qwen2.5 en castellano ~4).
+
+Uso:
+    from prompt_compression import compress_description
+
+    texto, info = compress_description(descripcion)
+    info["tokens_ahorrados_est"]
+"""
+
+import re
+from typing import Any, Dict, List, Tuple
+
+from patterns.regex_patterns_v4 import StructureDetector
+
+CHARS_PER_TOKEN = 4.0
+INTRO_MAX_CHARS = 500
+INTRO_HEAD_CHARS = 300
+MIN_KEEP_CHARS = 200
+BOILERPLATE_MAX_CHARS = 250
+
+SECCIONES_RELEVANTES = ("requisitos", "responsabilidades", "skills")
+SECCIONES_DESCARTABLES = ("beneficios",)
+
+BOILERPLATE_PATTERNS = [
+    # Igualdad de oportunidades / diversidad
+    r"igualdad\s+de\s+oportunidades",
+    r"no\s+discrimina",
+    r"sin\s+distinci[oó]n\s+de\s+(?:g[eé]nero|sexo|raza|edad|religi[oó]n|orientaci[oó]n)",
+    r"diversidad\s+e\s+inclusi[oó]n",
+    r"ley\s+(?:n[°º.]?\s*)?23\.?592",
+    # Legales / privacidad
+    r"datos\s+personales",
+    r"protecci[oó]n\s+de\s+datos",
+    r"pol[ií]tica\s+de\s+privacidad",
+    r"t[eé]rminos\s+y\s+condiciones",
+    r"ley\s+(?:n[°º.]?\s*)?25\.?326",
+    # Instrucciones de postulacion
+    r"post[uú]la(?:te|r)\s+(?:aqu[ií]|ahora|en|a\s+trav[eé]s)",
+    r"envi[aá](?:r|nos)?\s+(?:tu|su)?\s*(?:cv|curr[ií]cul)",
+    r"[uú]nicamente\s+(?:se\s+)?contactar",
+    r"s[oó]lo\s+(?:se\s+)?contactar",
+    r"(?:si\s+)?(?:cumpl[ií]s|reun[ií]s)\s+con\s+(?:el\s+perfil|los\s+requisitos),?\s+(?:post|envi|aplic)",
+]
+_BOILERPLATE = re.compile("|".join(BOILERPLATE_PATTERNS), re.IGNORECASE)
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_WHITESPACE = re.compile(r"\s+")
+
+_DOS_PUNTOS = r"\s*:"
+# Header de la seccion al comienzo de una linea (con ':')
+_INICIO_LINEA = {
+    seccion: [re.compile(r"^[ \t]*(?:" + patron + ")", re.MULTILINE) for patron in patrones]
+    for seccion, patrones in StructureDetector.SECCIONES.items()
+}
+# Linea que es solo un header, con o sin ':' ("Requisitos", "Funciones principales:")
+_LINEA_HEADER = {
+    seccion: [re.compile(r"^(?:" + (patron[:-len(_DOS_PUNTOS)] if patron.endswith(_DOS_PUNTOS) else patron)
+                         + r")\s*:?$") for patron in patrones]
+    for seccion, patrones in StructureDetector.SECCIONES.items()
+}
+
+
+def estimate_tokens(texto: str) -> int:
+    """Tokens estimados de un texto (chars / CHARS_PER_TOKEN)."""
+    return int(round(len(texto or "") / CHARS_PER_TOKEN))
+
+
+def _inicio_header(texto_lower: str, seccion: str) -> int:
+    """Posicion donde empieza el header que encuentra encontrar_seccion (o -1)."""
+    for patron in StructureDetector.SECCIONES[seccion]:
+        m = re.search(patron, texto_lower)
+        if m:
+            return m.start()
+    return -1
+
+
+def _es_bullet(linea: str) -> bool:
+    return bool(StructureDetector.PAT_BULLET.match(linea) or StructureDetector.PAT_NUMERADO.match(linea))
+
+
+def _es_header(linea: str, seccion: str) -> bool:
+    """Linea (sin espacios en los bordes) que abre otra seccion o un header generico con ':'."""
+    if StructureDetector.PAT_CUALQUIER_HEADER.match(linea):
+        return True
+    linea_lower = linea.lower()
+    return any(
+        patron.match(linea_lower)
+        for otra, patrones in _LINEA_HEADER.items() if otra != seccion
+        for patron in patrones
+    )
+
+
+def _seccion_descartable(texto: str, seccion: str) -> Tuple[int, int]:
+    """
+    (inicio del header, fin de la seccion) o (-1, -1).
+
+    Fin: primera linea en blanco o header (con o sin ':') despues de algo de
+    contenido, o primera linea sin bullet despues de una tanda de bullets.
+    """
+    texto_lower = texto.lower()
+    for patron in _INICIO_LINEA[seccion]:
+        m = patron.search(texto_lower)
+        if m:
+            break
+    else:
+        return -1, -1
+
+    pos = m.end()
+    contenido = en_bullets = False
+    for linea in texto[m.end():].splitlines(keepends=True):
+        limpia = linea.strip()
+        if not limpia:
+            if contenido:
+                return m.start(), pos
+        elif contenido and _es_header(limpia, seccion):
+            return m.start(), pos
+        else:
+            bullet = _es_bullet(linea)
+            if en_bullets and not bullet:
+                return m.start(), pos
+            en_bullets = bullet
+            contenido = True
+        pos += len(linea)
+    return m.start(), len(texto)
+
+
+def _limpiar_lineas(texto: str) -> Tuple[str, int]:
+    """Descarta lineas de boilerplate y lineas repetidas. Retorna (texto, descartadas)."""
+    vistas = set()
+    lineas: List[str] = []
+    descartadas = 0
+    for linea in texto.splitlines():
+        clave = _WHITESPACE.sub(" ", linea).strip().lower()
+        if clave and len(clave) <= BOILERPLATE_MAX_CHARS and _BOILERPLATE.search(clave):
+            descartadas += 1
+            continue
+        if len(clave) > 20:
+            if clave in vistas:
+                descartadas += 1
+                continue
+            vistas.add(clave)
+        lineas.append(linea)
+    return "\n".join(lineas), descartadas
+
+
+def _cortar_oracion(texto: str, max_chars: int) -> str:
+    """Recorta a max_chars terminando en el ultimo punto si hay uno."""
+    if len(texto) <= max_chars:
+        return texto
+    corte = texto[:max_chars]
+    punto = corte.rfind(". ")
+    if punto > max_chars // 2:
+        corte = corte[:punto + 1]
+    return corte.rstrip()
+
+
+def compress_description(descripcion: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Comprime la descripcion que va al LLM.
+
+    Returns:
+        (texto comprimido, info) con chars_original, chars_comprimido,
+        tokens_original_est, tokens_ahorrados_est, secciones_descartadas,
+        lineas_descartadas, intro_recortada
+    """
+    original = descripcion or ""
+    texto, lineas_descartadas = _limpiar_lineas(original)
+
+    secciones_descartadas = []
+    for seccion in SECCIONES_DESCARTABLES:
+        header, fin = _seccion_descartable(texto, seccion)
+        if header >= 0:
+            texto = texto[:header] + "\n" + texto[fin:]
+            secciones_descartadas.append(seccion)
+
+    intro_recortada = False
+    texto_lower = texto.lower()
+    headers = [_inicio_header(texto_lower, s) for s in SECCIONES_RELEVANTES]
+    headers = [h for h in headers if h >= 0]
+    if headers:
+        primer_header = min(headers)
+        intro = texto[:primer_header]
+        if len(intro) > INTRO_MAX_CHARS:
+            partes = [_cortar_oracion(intro, INTRO_HEAD_CHARS)]
+            lineas = [l.strip() for l in intro.splitlines() if l.strip()]
+            if len(lineas) > 1 and len(lineas[-1]) <= INTRO_MAX_CHARS - INTRO_HEAD_CHARS:
+                partes.append(lineas[-1])
+            texto = "\n".join(partes) + "\n" + texto[primer_header:]
+            intro_recortada = True
+
+    texto = _BLANK_LINES.sub("\n\n", texto).strip()
+
+    if len(texto) < MIN_KEEP_CHARS <= len(original.strip()):
+        # Deteccion de secciones poco confiable: se manda el original
+        texto = original
+        secciones_descartadas, lineas_descartadas, intro_recortada = [], 0, False
+
+    tokens_original = estimate_tokens(original)
+    info = {
+        "chars_original": len(original),
+        "chars_comprimido": len(texto),
+        "tokens_original_est": tokens_original,
+        "tokens_ahorrados_est": max(0, tokens_original - estimate_tokens(texto)),
+        "secciones_descartadas": secciones_descartadas,
+        "lineas_descartadas": lineas_descartadas,
+        "intro_recortada": intro_recortada,
+    }
+    return texto, info
@@ -32,6 +32,10 @@ CAMPOS (20):
 NOTA: Salarios, jornada, modalidad se extraen con regex en CAPA 0.
 """
 
+# Version del prompt: subirla al cambiar EXTRACTION_PROMPT_LITE_V1 (invalida
+# el cache de respuestas LLM, ver database/llm_cache.py)
+PROMPT_VERSION = "extraction_prompt_lite_v1@1.2"
+
 
 EXTRACTION_PROMPT_LITE_V1 = """Extrae informacion de esta oferta laboral argentina.
 
@@ -16,6 +16,25 @@ CAMBIO v2.0:
 - Ahora usa título_limpio + tareas_explicitas (antes solo tareas)
 - Nuevo método extract_skills() para el pipeline v3
 
+CAMBIO v2.3:
+- prefetch(): encodea los textos de N ofertas en una sola llamada a BGE-M3
+  (modo batch de MatcherV3); encode() reutiliza esos vectores
+- Busqueda top-k via vector_index (exact/ivf/hnsw segun matching_config.json)
+
+CAMBIO v2.4:
+- Todos los textos de una oferta se buscan en UNA llamada al indice
+  (exact: GEMM por bloques + argpartition, mismos resultados que antes)
+
+CAMBIO v2.5:
+- Cache persistente de embeddings (embedding_cache): encode()/prefetch() y
+  generate_skills_embeddings() solo llaman a BGE-M3 para textos no vistos
+
+CAMBIO v2.6:
+- Embeddings abiertos con mmap (solo lectura, compartidos entre procesos) y
+  metadata columnar en vez de json.load (embedding_store)
+- Precision configurable (vector_index.precision: float32/float16/int8) con
+  rescore float32 opcional de la preseleccion
+
 FLUJO:
 1. Recibe titulo_limpio + tareas_explicitas
 2. Para cada texto, genera embedding con BGE-M3
@@ -50,6 +69,15 @@ from sentence_transformers import SentenceTransformer
 # v2.0: Usa datos ESCO directos del RDF (sin hardcoding)
 from skill_categorizer import get_categorizer
 
+# v2.3: Indice de vecinos (exact/ivf/hnsw) sobre los embeddings de skills
+from vector_index import get_index, load_index_config
+
+# v2.5: Cache persistente de embeddings (compartido con MatcherV3 y generador)
+from embedding_cache import get_embedding_cache
+
+# v2.6: Vectores mmap + metadata columnar (arranque en frio en ms)
+from embedding_store import load_vectors, load_metadata, convert_metadata, save_array
+
 
 class SkillsImplicitExtractor:
     """
@@ -58,7 +86,7 @@ class SkillsImplicitExtractor:
     Usa cache a nivel de clase para evitar recargar modelo y embeddings.
     """
 
-    VERSION = "2.2.0"  # v2.2: Ponderación skills genéricas vs específicas
+    VERSION = "2.6.0"  # v2.6: Embeddings mmap + metadata columnar
 
     # Configuración por defecto
     DEFAULT_MODEL = "BAAI/bge-m3"
@@ -69,6 +97,7 @@ class SkillsImplicitExtractor:
     _model = None
     _skills_embeddings = None
     _skills_metadata = None
+    _skills_index = None  # v2.3: VectorIndex sobre _skills_embeddings
     _skills_weights_config = None  # v2.2: Config de pesos
     _initialized = False
 
@@ -102,6 +131,12 @@ class SkillsImplicitExtractor:
         self.top_k = top_k or self.DEFAULT_TOP_K
         self.verbose = verbose
 
+        # v2.3: Embeddings precalculados por prefetch() para el lote en curso
+        self._prefetched = {}
+
+        # v2.5: Cache en disco (None si esta desactivado)
+        self.embedding_cache = get_embedding_cache()
+
         # Inicializar (usa cache de clase)
         self._initialize()
 
@@ -120,9 +155,14 @@ class SkillsImplicitExtractor:
             if self.embeddings_path.exists() and self.metadata_path.exists():
                 if self.verbose:
                     print(f"[SKILLS] Cargando embeddings desde {self.embeddings_path}...")
-                SkillsImplicitExtractor._skills_embeddings = np.load(str(self.embeddings_path))
-                with open(self.metadata_path, 'r', encoding='utf-8') as f:
-                    SkillsImplicitExtractor._skills_metadata = json.load(f)
+                index_config = load_index_config()
+                SkillsImplicitExtractor._skills_embeddings = load_vectors(
+                    self.embeddings_path,
+                    precision=index_config.get("precision", "float32"),
+                    rescore=index_config.get("rescore", True),
+                    verbose=self.verbose
+                )
+                SkillsImplicitExtractor._skills_metadata = load_metadata(self.metadata_path, verbose=self.verbose)
             else:
                 if self.verbose:
                     print(f"[SKILLS] Embeddings no encontrados, se requiere generación previa")
@@ -132,6 +172,18 @@ class SkillsImplicitExtractor:
         self.embeddings = SkillsImplicitExtractor._skills_embeddings
         self.metadata = SkillsImplicitExtractor._skills_metadata
 
+        # v2.3: Indice de vecinos (se construye/carga una sola vez)
+        if SkillsImplicitExtractor._skills_index is None:
+            SkillsImplicitExtractor._skills_index = get_index(
+                self.embeddings,
+                self.embeddings_path if self.embeddings.size > 0 else None,
+                verbose=self.verbose
+            )
+            if self.verbose:
+                print(f"[SKILLS] Indice de skills: {SkillsImplicitExtractor._skills_index.backend}")
+
+        self.index = SkillsImplicitExtractor._skills_index
+
         # v2.2: Cargar config de pesos para skills genéricas
         if SkillsImplicitExtractor._skills_weights_config is None:
             weights_path = Path(__file__).parent.parent / "config" / "skills_weights.json"
@@ -150,6 +202,131 @@ class SkillsImplicitExtractor:
         if self.verbose:
             print(f"[SKILLS] Inicializado: {len(self.metadata)} skills, umbral={self.threshold}")
 
+    # =========================================================================
+    # ENCODING (v2.3: modo batch)
+    # =========================================================================
+
+    def encode(self, texto: str) -> np.ndarray:
+        """
+        Retorna el embedding normalizado de un texto.
+
+        Si el texto fue precalculado con prefetch() se reutiliza ese vector;
+        si no, se busca en el cache en disco (v2.5) y recien despues se llama
+        a BGE-M3 solo para este texto.
+        """
+        emb = self._prefetched.get(texto)
+        if emb is not None:
+            return emb
+
+        if self.embedding_cache is not None:
+            emb = self.embedding_cache.get(self.DEFAULT_MODEL, texto)
+            if emb is None:
+                emb = self.model.encode(texto, normalize_embeddings=True)
+                self.embedding_cache.put_many(self.DEFAULT_MODEL, [(texto, emb)])
+            return emb
+
+        return self.model.encode(texto, normalize_embeddings=True)
+
+    def prefetch(self, textos: List[str], batch_size: int = 64) -> int:
+        """
+        v2.3: Encodea muchos textos en UNA sola llamada a BGE-M3.
+
+        En CPU el overhead por llamada domina sobre el costo por texto, por lo
+        que juntar los títulos y tareas de N ofertas multiplica el throughput.
+        Los vectores quedan disponibles para encode() hasta clear_prefetch().
+
+        Args:
+            textos: Textos a encodear (se ignoran vacíos y repetidos)
+            batch_size: Tamaño de batch interno del modelo
+
+        Returns:
+            Cantidad de textos nuevos encodeados
+        """
+        pendientes = list(dict.fromkeys(
+            t for t in textos if t and t not in self._prefetched
+        ))
+        if not pendientes:
+            return 0
+
+        if self.embedding_cache is not None:
+            # v2.5: Solo se encodean los textos que no estan en el cache
+            embeddings = self.embedding_cache.encode(
+                self.model, self.DEFAULT_MODEL, pendientes, batch_size=batch_size
+            )
+        else:
+            embeddings = self.model.encode(
+                pendientes,
+                batch_size=batch_size,
+                normalize_embeddings=True
+            )
+        self._prefetched.update(zip(pendientes, embeddings))
+
+        if self.verbose:
+            print(f"[SKILLS] Prefetch: {len(pendientes)} textos encodeados en batch")
+        return len(pendientes)
+
+    def clear_prefetch(self):
+        """Libera los embeddings precalculados del lote."""
+        self._prefetched = {}
+
+    def cache_stats(self) -> Optional[Dict]:
+        """v2.5: Hit/miss del cache de embeddings (None si esta desactivado)."""
+        return self.embedding_cache.stats() if self.embedding_cache is not None else None
+
+    def _search_texts(self, textos: List[str], top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        v2.4: Top K skills de todos los textos en una sola busqueda.
+
+        Returns:
+            (scores, indices) de shape (len(textos), top_k)
+        """
+        queries = np.stack([self.encode(texto) for texto in textos])
+        return self.index.search(queries, top_k)
+
+    def collect_texts(
+        self,
+        titulo_limpio: str,
+        tareas_explicitas: str = None,
+        skills_nlp: List[str] = None,
+        soft_skills_nlp: List[str] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Arma la lista de textos (origen, texto) que extract_skills() va a encodear.
+
+        Expuesto para que el modo batch pueda juntar los textos de varias
+        ofertas antes de llamar a prefetch().
+        """
+        textos = []
+
+        # 1. Título siempre presente (si existe)
+        if titulo_limpio and titulo_limpio.strip():
+            textos.append(("titulo", titulo_limpio.strip()))
+
+        # 2. Tareas si existen
+        if tareas_explicitas:
+            for tarea in tareas_explicitas.split(';'):
+                tarea = tarea.strip()
+                if tarea:
+                    textos.append(("tarea", tarea))
+
+        # 3. Skills NLP (v2.1): usar skills extraídas por LLM como contexto adicional
+        # Esto es CRÍTICO cuando tareas_explicitas es NULL pero el LLM detectó skills
+        if skills_nlp:
+            for skill in skills_nlp:
+                skill = skill.strip() if isinstance(skill, str) else str(skill)
+                if skill and skill.lower() not in ['null', 'none', '']:
+                    textos.append(("skills_nlp", skill))
+
+        # 4. Soft Skills NLP (v2.2): usar soft skills extraídas por LLM
+        # Las soft skills ayudan a identificar mejor roles de gestión/liderazgo
+        if soft_skills_nlp:
+            for skill in soft_skills_nlp:
+                skill = skill.strip() if isinstance(skill, str) else str(skill)
+                if skill and skill.lower() not in ['null', 'none', '']:
+                    textos.append(("soft_skills_nlp", skill))
+
+        return textos
+
     def extract_from_tasks(
         self,
         tareas_explicitas: str,
@@ -182,18 +359,12 @@ class SkillsImplicitExtractor:
         skills_implicitas = []
         skills_vistas = set()  # Para evitar duplicados
 
-        for tarea in tareas:
-            # Generar embedding de la tarea
-            tarea_emb = self.model.encode(tarea, normalize_embeddings=True)
-
-            # Calcular similitud coseno con todas las skills
-            similarities = np.dot(self.embeddings, tarea_emb)
-
-            # Obtener top K indices ordenados por similitud
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
+        # Top K skills por similitud coseno (v2.4: todas las tareas juntas)
+        all_scores, all_indices = self._search_texts(tareas, top_k)
 
-            for idx in top_indices:
-                score = float(similarities[idx])
+        for tarea, top_scores, top_indices in zip(tareas, all_scores, all_indices):
+            for score, idx in zip(top_scores, top_indices):
+                score = float(score)
 
                 if score < threshold:
                     continue
@@ -322,34 +493,7 @@ class SkillsImplicitExtractor:
         threshold = threshold or self.threshold
 
         # Preparar textos a procesar
-        textos = []
-
-        # 1. Título siempre presente (si existe)
-        if titulo_limpio and titulo_limpio.strip():
-            textos.append(("titulo", titulo_limpio.strip()))
-
-        # 2. Tareas si existen
-        if tareas_explicitas:
-            for tarea in tareas_explicitas.split(';'):
-                tarea = tarea.strip()
-                if tarea:
-                    textos.append(("tarea", tarea))
-
-        # 3. Skills NLP (v2.1): usar skills extraídas por LLM como contexto adicional
-        # Esto es CRÍTICO cuando tareas_explicitas es NULL pero el LLM detectó skills
-        if skills_nlp:
-            for skill in skills_nlp:
-                skill = skill.strip() if isinstance(skill, str) else str(skill)
-                if skill and skill.lower() not in ['null', 'none', '']:
-                    textos.append(("skills_nlp", skill))
-
-        # 4. Soft Skills NLP (v2.2): usar soft skills extraídas por LLM
-        # Las soft skills ayudan a identificar mejor roles de gestión/liderazgo
-        if soft_skills_nlp:
-            for skill in soft_skills_nlp:
-                skill = skill.strip() if isinstance(skill, str) else str(skill)
-                if skill and skill.lower() not in ['null', 'none', '']:
-                    textos.append(("soft_skills_nlp", skill))
+        textos = self.collect_texts(titulo_limpio, tareas_explicitas, skills_nlp, soft_skills_nlp)
 
         if not textos:
             return []
@@ -357,18 +501,12 @@ class SkillsImplicitExtractor:
         skills_extraidas = []
         skills_vistas = set()  # Para evitar duplicados
 
-        for origen, texto in textos:
-            # Generar embedding del texto
-            texto_emb = self.model.encode(texto, normalize_embeddings=True)
+        # Top K skills por similitud coseno (v2.4: todos los textos juntos)
+        all_scores, all_indices = self._search_texts([texto for _, texto in textos], top_k)
 
-            # Calcular similitud coseno con todas las skills
-            similarities = np.dot(self.embeddings, texto_emb)
-
-            # Obtener top K indices ordenados por similitud
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
-
-            for idx in top_indices:
-                score = float(similarities[idx])
+        for (origen, texto), top_scores, top_indices in zip(textos, all_scores, all_indices):
+            for score, idx in zip(top_scores, top_indices):
+                score = float(score)
 
                 if score < threshold:
                     continue
@@ -467,6 +605,7 @@ class SkillsImplicitExtractor:
         cls._model = None
         cls._skills_embeddings = None
         cls._skills_metadata = None
+        cls._skills_index = None
         cls._initialized = False
 
     def is_ready(self) -> bool:
@@ -540,30 +679,47 @@ def generate_skills_embeddings(
         print("[GEN] ERROR: No se encontraron skills en la BD")
         return 0, ""
 
-    # Cargar modelo
-    if verbose:
-        print(f"[GEN] Cargando modelo...")
-    model = SentenceTransformer(model_name)
-
     # Generar embeddings en batches
     if verbose:
         print(f"[GEN] Generando embeddings (batch_size={batch_size})...")
 
-    embeddings = model.encode(
-        texts,
-        batch_size=batch_size,
-        show_progress_bar=verbose,
-        normalize_embeddings=True
-    )
+    cache = get_embedding_cache()
+    if cache is not None:
+        # v2.5: Solo se encodean skills nuevas o con texto modificado; el
+        # modelo se carga recien si hay algun texto faltante
+        embeddings = np.array(cache.encode(
+            lambda: SentenceTransformer(model_name),
+            model_name,
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=verbose
+        ))
+        if verbose:
+            stats = cache.stats()
+            print(f"[GEN] Cache embeddings: {stats['hits']} hits, {stats['misses']} encodeados")
+    else:
+        if verbose:
+            print(f"[GEN] Cargando modelo...")
+        model = SentenceTransformer(model_name)
+        embeddings = model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=verbose,
+            normalize_embeddings=True
+        )
 
     # Guardar
     embeddings_path = output_dir / "esco_skills_embeddings_full.npy"
     metadata_path = output_dir / "esco_skills_metadata_full.json"
 
-    np.save(str(embeddings_path), embeddings)
+    # v2.6: Escritura atomica (otros procesos pueden tener el .npy mapeado)
+    save_array(embeddings_path, embeddings)
     with open(metadata_path, 'w', encoding='utf-8') as f:
         json.dump(skills, f, ensure_ascii=False, indent=2)
 
+    # v2.6: Metadata columnar para carga mmap
+    convert_metadata(metadata_path, verbose=verbose)
+
     if verbose:
         print(f"[GEN] Embeddings guardados: {embeddings_path}")
         print(f"[GEN] Metadata guardados: {metadata_path}")
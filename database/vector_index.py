@@ -0,0 +1,666 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vector Index v1.4 - Busqueda de vecinos sobre embeddings ESCO
+==============================================================
+
+VERSION: 1.4.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+Capa comun de busqueda top-k para los embeddings de skills y ocupaciones ESCO
+(database/embeddings/*.npy). Reemplaza el np.dot + np.argsort sobre la matriz
+completa que hacian SkillsImplicitExtractor y MatcherV3.
+
+BACKENDS:
+- exact: producto punto contra toda la matriz (referencia, usar para gold set)
+         v1.1: GEMM por bloques + argpartition, resultados identicos al
+         np.dot + np.argsort por texto (ver exact_topk)
+         v1.4: el re-score usa ventanas alineadas de RESCORE_WINDOW filas,
+         asi los scores son bit a bit los del np.dot(E, q) completo
+- ivf:   indice invertido k-means (numpy puro). Solo recorre las nprobe listas
+         mas cercanas a la query -> costo sub-lineal en las ~14k skills
+- hnsw:  grafo HNSW via hnswlib (opcional, pip install hnswlib)
+
+PERSISTENCIA:
+Los indices aproximados se construyen una vez y se guardan AL LADO del .npy:
+    esco_skills_embeddings_full.npy
+    esco_skills_embeddings_full.ivf.npz
+    esco_skills_embeddings_full.hnsw
+Si el .npy cambia (tamaño/mtime), el indice se reconstruye automaticamente.
+
+CUANTIZACION (v1.2):
+Los backends aceptan QuantizedVectors (embedding_store, float16/int8). El
+score grueso se calcula sobre la matriz cuantizada y, con rescore=True, la
+preseleccion (k + rescore_margin filas) se re-puntua contra el float32
+original, asi el top-k final usa scores exactos.
+v1.3: el score grueso trabaja sobre los codes (cast a un buffer float32 por
+bloque de QUANT_ROW_BLOCK filas + escala int8 sobre los scores), sin
+decodificar la matriz completa en cada busqueda. int8 es la variante rapida;
+float16 queda limitado por la conversion half->float32 de numpy.
+
+CONFIG (config/matching_config.json):
+    "vector_index": {"backend": "exact", "precision": "float32", "rescore": true,
+                     "rescore_margin": 32, "ivf": {...}, "hnsw": {...}}
+Override por entorno: MOL_VECTOR_INDEX=exact|ivf|hnsw,
+                      MOL_EMBEDDING_PRECISION=float32|float16|int8
+
+Uso:
+    from vector_index import get_index
+
+    index = get_index(embeddings, embeddings_path)
+    scores, indices = index.search(query_emb, k=3)   # shape (1, 3)
+
+CLI:
+    python vector_index.py --build --backend ivf      # Construir indices
+    python vector_index.py --recall --backend ivf     # Recall vs busqueda exacta
+"""
+
+import os
+import json
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from embedding_store import QuantizedVectors
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+BASE_DIR = Path(__file__).parent
+CONFIG_PATH = BASE_DIR.parent / "config" / "matching_config.json"
+EMBEDDINGS_DIR = BASE_DIR / "embeddings"
+
+DEFAULT_BACKEND = "exact"
+BACKENDS = ("exact", "ivf", "hnsw")
+
+DEFAULT_CONFIG = {
+    "backend": DEFAULT_BACKEND,
+    "precision": "float32",
+    "rescore": True,
+    "rescore_margin": 32,
+    "ivf": {"nlist": None, "nprobe": 16, "n_iter": 10},
+    "hnsw": {"M": 32, "ef_construction": 200, "ef_search": 64},
+}
+
+
+def load_index_config(config_path: Path = None) -> Dict:
+    """Lee la seccion vector_index de matching_config.json (con defaults)."""
+    config = {k: (dict(v) if isinstance(v, dict) else v) for k, v in DEFAULT_CONFIG.items()}
+    path = Path(config_path) if config_path else CONFIG_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            section = json.load(f).get("vector_index", {})
+        for key, value in section.items():
+            if key.startswith("_"):
+                continue
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key].update(value)
+            else:
+                config[key] = value
+    except Exception:
+        pass
+
+    env_backend = os.environ.get("MOL_VECTOR_INDEX")
+    if env_backend:
+        config["backend"] = env_backend.strip().lower()
+    env_precision = os.environ.get("MOL_EMBEDDING_PRECISION")
+    if env_precision:
+        config["precision"] = env_precision.strip().lower()
+    return config
+
+
+def _as_matrix(queries: np.ndarray) -> np.ndarray:
+    """Normaliza queries a matriz 2D float32 (n_queries, dim)."""
+    queries = np.asarray(queries, dtype=np.float32)
+    if queries.ndim == 1:
+        queries = queries[np.newaxis, :]
+    return queries
+
+
+def _source_signature(embeddings_path: Path) -> str:
+    """Firma del .npy fuente para detectar indices desactualizados."""
+    stat = Path(embeddings_path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class VectorIndex:
+    """
+    Interfaz comun de los backends.
+
+    search(queries, k) retorna (scores, indices), ambos de shape (n_queries, k),
+    ordenados por score descendente. Los scores son producto punto (= coseno
+    porque los embeddings estan normalizados).
+    """
+
+    backend = "base"
+
+    def __init__(self, embeddings: np.ndarray, rescore: bool = True):
+        self.embeddings = embeddings
+        self.rescore = rescore
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def _topk_from_candidates(
+        self,
+        query: np.ndarray,
+        candidates: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score exacto sobre un subconjunto de filas y top-k ordenado."""
+        scores = np.dot(self._candidate_rows(candidates), query)
+        order = np.argsort(scores)[-k:][::-1]
+        return scores[order], candidates[order]
+
+    def _candidate_rows(self, candidates: np.ndarray) -> np.ndarray:
+        """Filas de candidatos (float32 original si hay rescore cuantizado)."""
+        if self.rescore and isinstance(self.embeddings, QuantizedVectors):
+            return self.embeddings.exact_rows(candidates)
+        return self.embeddings[candidates]
+
+
+# v1.1: Tamaños de bloque para exact_topk (filas de queries x filas de embeddings).
+# 256 x 4096 float32 = 4 MB por bloque de similitudes.
+QUERY_BLOCK = 256
+ROW_BLOCK = 4096
+
+# v1.3: Filas por bloque con QuantizedVectors (buffer float32 de 512 x 1024
+# = 2 MB, entra en L2: el GEMM lee de cache y de RAM solo los codes).
+QUANT_ROW_BLOCK = 512
+
+# Margen para la preseleccion: GEMM y producto matriz-vector pueden diferir en
+# el ultimo bit (distinto orden de suma en BLAS), asi que se re-puntua todo lo
+# que quede a menos de SHORTLIST_EPS del k-esimo score del GEMM.
+SHORTLIST_EPS = 1e-4
+
+# v1.4: Re-score por ventanas alineadas: np.dot(E[a:a + 64], q) con a multiplo
+# de 64 da, fila por fila, el mismo float que el np.dot(E, q) completo del
+# camino anterior; np.dot(E[cand], q) no (gemv con pocas filas usa otro kernel).
+RESCORE_WINDOW = 64
+
+
+def _window_scores(embeddings: np.ndarray, query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """Scores de los candidatos con el mismo kernel que np.dot(embeddings, query)."""
+    n_rows = len(embeddings)
+    scores = np.empty(len(candidates), dtype=np.result_type(embeddings.dtype, query.dtype))
+    windows = candidates // RESCORE_WINDOW
+    for window in np.unique(windows):
+        start = int(window) * RESCORE_WINDOW
+        end = min(n_rows, start + RESCORE_WINDOW)
+        in_window = windows == window
+        scores[in_window] = np.dot(embeddings[start:end], query)[candidates[in_window] - start]
+    return scores
+
+
+def exact_topk(
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    query_block: int = QUERY_BLOCK,
+    row_block: int = ROW_BLOCK,
+    rescore: bool = True,
+    rescore_margin: int = 32
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k exacto de muchas queries contra la matriz de embeddings.
+
+    1. Similitudes por GEMM en bloques (queries x filas) en vez de un np.dot
+       por texto.
+    2. Preseleccion con argpartition (O(n)) en vez de argsort completo.
+    3. Re-score de la preseleccion con np.dot sobre ventanas alineadas de
+       RESCORE_WINDOW filas: mismos indices y scores, bit a bit, que el
+       np.dot(E, q) del camino anterior.
+
+    Orden: score descendente; empates por indice descendente (igual que
+    np.argsort(..., kind="stable")[-k:][::-1]).
+
+    v1.2: Con QuantizedVectors la preseleccion es de k + rescore_margin filas
+    y, si rescore, se re-puntua contra el float32 original (por ventanas,
+    como el camino float32). Sin rescore los scores son los aproximados de
+    la matriz cuantizada.
+    v1.3: El score grueso cuantizado ya no decodifica la matriz por query:
+    QuantizedVectors.dot_block castea los codes a un buffer reutilizable
+    y aplica la escala int8 sobre los scores (no sobre las filas).
+
+    Returns:
+        (scores, indices) de shape (n_queries, k)
+    """
+    quantized = isinstance(embeddings, QuantizedVectors)
+    queries = _as_matrix(queries).astype(embeddings.dtype, copy=False)
+    n_rows = len(embeddings)
+    k = min(k, n_rows)
+    out_dtype = np.result_type(embeddings.dtype, queries.dtype)
+    all_scores = np.empty((len(queries), k), dtype=out_dtype)
+    all_indices = np.empty((len(queries), k), dtype=np.int64)
+    if k == 0 or len(queries) == 0:
+        return all_scores, all_indices
+
+    sims = np.empty((min(query_block, len(queries)), n_rows), dtype=out_dtype)
+    if quantized:
+        row_block = min(row_block, QUANT_ROW_BLOCK)
+        buffer = np.empty((min(row_block, n_rows), embeddings.shape[1]), dtype=np.float32)
+
+    for q_start in range(0, len(queries), query_block):
+        q_block = queries[q_start:q_start + query_block]
+        block_sims = sims[:len(q_block)]
+
+        for r_start in range(0, n_rows, row_block):
+            r_end = min(r_start + row_block, n_rows)
+            if quantized:
+                block_sims[:, r_start:r_end] = embeddings.dot_block(q_block, r_start, r_end, buffer)
+            else:
+                block_sims[:, r_start:r_end] = np.dot(q_block, embeddings[r_start:r_end].T)
+
+        for j, query in enumerate(q_block):
+            row = block_sims[j]
+            if quantized:
+                shortlist = min(n_rows, k + rescore_margin) if rescore else k
+                candidates = np.argpartition(row, n_rows - shortlist)[n_rows - shortlist:]
+                if rescore and embeddings.full is not None:
+                    # Mismo kernel que el float32 exacto: scores bit a bit iguales
+                    scores = _window_scores(embeddings.full, query, candidates)
+                elif rescore:
+                    scores = np.dot(embeddings.exact_rows(candidates), query)
+                else:
+                    scores = row[candidates]
+            else:
+                kth = row[np.argpartition(row, n_rows - k)[n_rows - k]]
+                candidates = np.flatnonzero(row >= kth - SHORTLIST_EPS)
+                scores = _window_scores(embeddings, query, candidates)
+
+            order = np.lexsort((-candidates, -scores))[:k]
+            all_scores[q_start + j] = scores[order]
+            all_indices[q_start + j] = candidates[order]
+
+    return all_scores, all_indices
+
+
+class ExactIndex(VectorIndex):
+    """Busqueda exacta (fuerza bruta) - referencia para gold set y recall."""
+
+    backend = "exact"
+
+    def __init__(self, embeddings: np.ndarray, rescore: bool = True, rescore_margin: int = 32):
+        super().__init__(embeddings, rescore=rescore)
+        self.rescore_margin = rescore_margin
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return exact_topk(
+            self.embeddings, queries, k,
+            rescore=self.rescore,
+            rescore_margin=self.rescore_margin
+        )
+
+
+class IVFIndex(VectorIndex):
+    """
+    Indice invertido con cuantizador k-means esferico (numpy puro).
+
+    Cada embedding se asigna al centroide mas cercano. En la busqueda solo se
+    evaluan las listas de los nprobe centroides mas cercanos a la query, y el
+    score final de esos candidatos es exacto.
+    """
+
+    backend = "ivf"
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        centroids: np.ndarray,
+        list_offsets: np.ndarray,
+        list_ids: np.ndarray,
+        nprobe: int = 16,
+        rescore: bool = True
+    ):
+        super().__init__(embeddings, rescore=rescore)
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.nprobe = nprobe
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        nlist: int = None,
+        nprobe: int = 16,
+        n_iter: int = 10,
+        seed: int = 42,
+        rescore: bool = True,
+        verbose: bool = False
+    ) -> "IVFIndex":
+        """Entrena k-means esferico y arma las listas invertidas."""
+        source = embeddings
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        n = len(embeddings)
+        nlist = nlist or max(1, int(4 * np.sqrt(n)))
+        nlist = min(nlist, n)
+        rng = np.random.default_rng(seed)
+
+        centroids = np.array(embeddings[rng.choice(n, nlist, replace=False)], dtype=np.float32)
+
+        for iteration in range(n_iter):
+            assign = np.argmax(embeddings @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, embeddings)
+            counts = np.bincount(assign, minlength=nlist)
+
+            # Re-sembrar clusters vacios con puntos al azar
+            empty = np.where(counts == 0)[0]
+            if len(empty):
+                sums[empty] = embeddings[rng.choice(n, len(empty), replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = (sums / np.maximum(norms, 1e-12)).astype(np.float32)
+
+            if verbose:
+                print(f"[INDEX] k-means iter {iteration + 1}/{n_iter} ({len(empty)} clusters vacios)")
+
+        assign = np.argmax(embeddings @ centroids.T, axis=1)
+        list_ids = np.argsort(assign, kind="stable").astype(np.int64)
+        list_offsets = np.zeros(nlist + 1, dtype=np.int64)
+        list_offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+
+        return cls(source, centroids, list_offsets, list_ids, nprobe=nprobe, rescore=rescore)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = _as_matrix(queries)
+        k = min(k, len(self.embeddings))
+        nprobe = min(self.nprobe, self.nlist)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_indices = np.full((len(queries), k), -1, dtype=np.int64)
+
+        centroid_scores = queries @ self.centroids.T
+        for i, query in enumerate(queries):
+            probe = np.argpartition(centroid_scores[i], -nprobe)[-nprobe:]
+            candidates = np.concatenate([
+                self.list_ids[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probe
+            ])
+            if not len(candidates):
+                continue
+            scores, indices = self._topk_from_candidates(query, candidates, k)
+            all_scores[i, :len(scores)] = scores
+            all_indices[i, :len(indices)] = indices
+
+        return all_scores, all_indices
+
+    def save(self, path: Path, source_signature: str = ""):
+        np.savez(
+            str(path),
+            centroids=self.centroids,
+            list_offsets=self.list_offsets,
+            list_ids=self.list_ids,
+            source_signature=np.array(source_signature)
+        )
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        embeddings: np.ndarray,
+        nprobe: int = 16,
+        rescore: bool = True
+    ) -> Tuple["IVFIndex", str]:
+        data = np.load(str(path))
+        index = cls(
+            embeddings,
+            data["centroids"],
+            data["list_offsets"],
+            data["list_ids"],
+            nprobe=nprobe,
+            rescore=rescore
+        )
+        return index, str(data["source_signature"])
+
+
+class HNSWIndex(VectorIndex):
+    """Grafo HNSW (hnswlib, espacio producto interno)."""
+
+    backend = "hnsw"
+
+    def __init__(self, embeddings: np.ndarray, graph, ef_search: int = 64):
+        super().__init__(embeddings)
+        self.graph = graph
+        self.graph.set_ef(ef_search)
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        M: int = 32,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        verbose: bool = False
+    ) -> "HNSWIndex":
+        graph = hnswlib.Index(space="ip", dim=embeddings.shape[1])
+        graph.init_index(max_elements=len(embeddings), M=M, ef_construction=ef_construction)
+        graph.add_items(np.asarray(embeddings, dtype=np.float32), np.arange(len(embeddings)))
+        if verbose:
+            print(f"[INDEX] HNSW construido: {len(embeddings)} vectores (M={M})")
+        return cls(embeddings, graph, ef_search=ef_search)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = _as_matrix(queries)
+        k = min(k, len(self.embeddings))
+        self.graph.set_ef(max(self.graph.ef, k))
+        labels, distances = self.graph.knn_query(queries, k=k)
+        # Espacio "ip": distancia = 1 - producto punto
+        return (1.0 - distances).astype(np.float32), labels.astype(np.int64)
+
+    def save(self, path: Path, source_signature: str = ""):
+        self.graph.save_index(str(path))
+        Path(str(path) + ".json").write_text(
+            json.dumps({"source_signature": source_signature}), encoding='utf-8'
+        )
+
+    @classmethod
+    def load(cls, path: Path, embeddings: np.ndarray, ef_search: int = 64) -> Tuple["HNSWIndex", str]:
+        graph = hnswlib.Index(space="ip", dim=embeddings.shape[1])
+        graph.load_index(str(path), max_elements=len(embeddings))
+        meta_path = Path(str(path) + ".json")
+        signature = ""
+        if meta_path.exists():
+            signature = json.loads(meta_path.read_text(encoding='utf-8')).get("source_signature", "")
+        return cls(embeddings, graph, ef_search=ef_search), signature
+
+
+def index_path_for(embeddings_path: Path, backend: str) -> Path:
+    """Path del indice persistido al lado del .npy."""
+    embeddings_path = Path(embeddings_path)
+    suffix = ".ivf.npz" if backend == "ivf" else f".{backend}"
+    return embeddings_path.with_name(embeddings_path.stem + suffix)
+
+
+def get_index(
+    embeddings: np.ndarray,
+    embeddings_path: Path = None,
+    backend: str = None,
+    config: Dict = None,
+    rebuild: bool = False,
+    verbose: bool = False
+) -> VectorIndex:
+    """
+    Retorna el indice configurado para una matriz de embeddings.
+
+    Carga el indice persistido si existe y corresponde al .npy actual; si no,
+    lo construye y lo guarda al lado del .npy. Sin embeddings_path (o sin
+    hnswlib para backend hnsw) cae a busqueda exacta.
+
+    Args:
+        embeddings: Matriz (n, dim) de embeddings normalizados
+        embeddings_path: Path al .npy fuente (para persistir el indice)
+        backend: exact|ivf|hnsw (default: config vector_index.backend)
+        config: Config ya cargada (default: load_index_config())
+        rebuild: Forzar reconstruccion aunque exista el indice
+        verbose: Mostrar mensajes
+    """
+    config = config or load_index_config()
+    backend = (backend or config.get("backend") or DEFAULT_BACKEND).lower()
+
+    if backend not in BACKENDS:
+        if verbose:
+            print(f"[INDEX] WARN: backend '{backend}' desconocido, usando exact")
+        backend = "exact"
+
+    if backend == "hnsw" and not HNSWLIB_AVAILABLE:
+        if verbose:
+            print("[INDEX] WARN: hnswlib no disponible, usando exact")
+        backend = "exact"
+
+    rescore = config.get("rescore", True)
+    if backend == "exact" or embeddings_path is None or len(embeddings) == 0:
+        return ExactIndex(embeddings, rescore=rescore, rescore_margin=config.get("rescore_margin", 32))
+
+    embeddings_path = Path(embeddings_path)
+    path = index_path_for(embeddings_path, backend)
+    signature = _source_signature(embeddings_path) if embeddings_path.exists() else ""
+    params = config.get(backend, {})
+
+    if path.exists() and not rebuild:
+        try:
+            if backend == "ivf":
+                index, stored = IVFIndex.load(
+                    path, embeddings, nprobe=params.get("nprobe", 16), rescore=rescore
+                )
+            else:
+                index, stored = HNSWIndex.load(path, embeddings, ef_search=params.get("ef_search", 64))
+            if stored == signature:
+                if verbose:
+                    print(f"[INDEX] Cargado {backend} desde {path.name}")
+                return index
+            if verbose:
+                print(f"[INDEX] {path.name} desactualizado, reconstruyendo...")
+        except Exception as e:
+            if verbose:
+                print(f"[INDEX] WARN: No se pudo cargar {path.name}: {e}")
+
+    start = time.time()
+    if backend == "ivf":
+        index = IVFIndex.build(
+            embeddings,
+            nlist=params.get("nlist"),
+            nprobe=params.get("nprobe", 16),
+            n_iter=params.get("n_iter", 10),
+            rescore=rescore,
+            verbose=verbose
+        )
+    else:
+        index = HNSWIndex.build(
+            embeddings,
+            M=params.get("M", 32),
+            ef_construction=params.get("ef_construction", 200),
+            ef_search=params.get("ef_search", 64),
+            verbose=verbose
+        )
+
+    try:
+        index.save(path, source_signature=signature)
+    except Exception as e:
+        if verbose:
+            print(f"[INDEX] WARN: No se pudo guardar {path.name}: {e}")
+
+    if verbose:
+        print(f"[INDEX] {backend} construido en {time.time() - start:.1f}s -> {path.name}")
+    return index
+
+
+def recall_report(
+    index: VectorIndex,
+    queries: np.ndarray,
+    k: int = 10,
+    exact: VectorIndex = None
+) -> Dict:
+    """
+    Compara un indice contra la busqueda exacta.
+
+    Args:
+        index: Indice a evaluar
+        queries: Matriz (n, dim) de queries
+        k: Tamaño del top-k a comparar
+        exact: Indice exacto de referencia (default: ExactIndex sobre la misma matriz)
+
+    Returns:
+        Dict con recall@k, recall@1 y latencias medias por query
+    """
+    exact = exact or ExactIndex(index.embeddings)
+    queries = _as_matrix(queries)
+
+    start = time.perf_counter()
+    _, exact_ids = exact.search(queries, k)
+    exact_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+    start = time.perf_counter()
+    _, approx_ids = index.search(queries, k)
+    approx_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approx_ids.tolist(), exact_ids.tolist()))
+    top1 = sum(1 for a, e in zip(approx_ids[:, 0], exact_ids[:, 0]) if a == e)
+
+    return {
+        "backend": index.backend,
+        "queries": len(queries),
+        "k": k,
+        f"recall@{k}": round(hits / (len(queries) * k), 4) if len(queries) else 0.0,
+        "recall@1": round(top1 / len(queries), 4) if len(queries) else 0.0,
+        "ms_por_query_exact": round(exact_ms, 3),
+        "ms_por_query_index": round(approx_ms, 3),
+        "speedup": round(exact_ms / approx_ms, 2) if approx_ms > 0 else None,
+    }
+
+
+def main():
+    """CLI para construir indices y medir recall."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Vector Index ESCO v1.0")
+    parser.add_argument("--build", action="store_true", help="Construir/reconstruir indices")
+    parser.add_argument("--recall", action="store_true", help="Reporte de recall vs busqueda exacta")
+    parser.add_argument("--backend", type=str, default=None, help="exact|ivf|hnsw (default: config)")
+    parser.add_argument("--k", type=int, default=10, help="Top K para recall")
+    parser.add_argument("--queries", type=int, default=1000, help="Cantidad de queries para recall")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    args = parser.parse_args()
+
+    matrices = {
+        "skills": EMBEDDINGS_DIR / "esco_skills_embeddings_full.npy",
+        "occupations": EMBEDDINGS_DIR / "esco_occupations_embeddings.npy",
+    }
+    loaded = {name: np.load(str(path)) for name, path in matrices.items() if path.exists()}
+    if not loaded:
+        print("[ERROR] No se encontraron embeddings en database/embeddings/")
+        return
+
+    for name, embeddings in loaded.items():
+        index = get_index(
+            embeddings, matrices[name],
+            backend=args.backend,
+            rebuild=args.build,
+            verbose=True
+        )
+        print(f"\n[{name.upper()}] {len(embeddings)} vectores, backend={index.backend}")
+
+        if args.recall:
+            # Queries realistas: embeddings de la OTRA matriz (textos ESCO reales)
+            other = [m for n, m in loaded.items() if n != name]
+            source = other[0] if other else embeddings
+            rng = np.random.default_rng(0)
+            sample = source[rng.choice(len(source), min(args.queries, len(source)), replace=False)]
+            report = recall_report(index, sample, k=args.k)
+            for key, value in report.items():
+                print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -53,6 +53,13 @@ def load_run(run_id: str) -> Optional[Dict]:
             result["config_versions"] = json.loads(result["config_snapshot"])
         if result.get("ofertas_ids"):
             result["ofertas_ids"] = json.loads(result["ofertas_ids"])
+        if not result.get("ofertas_ids") and result.get("ofertas_count"):
+            # Runs en modo stream: la membresia esta solo en run_ofertas
+            conn = get_conn()
+            result["ofertas_ids"] = [
+                str(r[0]) for r in conn.execute('SELECT id_oferta FROM run_ofertas WHERE run_id = ?', (run_id,))
+            ]
+            conn.close()
         if result.get("metricas_detalle"):
             result["errores_por_tipo"] = json.loads(result["metricas_detalle"])
         return result
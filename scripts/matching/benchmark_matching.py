@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark_matching.py - Throughput y latencia de MatcherV3 sobre corpus fijo
+============================================================================
+
+VERSION: 1.1.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+Medir el costo del matching con un corpus que no cambia entre corridas, para
+detectar regresiones de performance al tocar MatcherV3, el extractor de
+skills, los indices o las reglas:
+
+- Corpus "gold": las ofertas de database/gold_set_nlp_100_ids.json
+- Corpus "sintetico": --scale N ofertas armadas combinando titulo, tareas,
+  sector, seniority y area de ofertas distintas del gold set (semilla fija,
+  mismo corpus en cada corrida)
+
+REPORTA (por corpus):
+- startup_s: tiempo de construir MatcherV3 (modelo + embeddings + reglas)
+- ofertas_por_seg: throughput de compute_match (sin persistir)
+- latencias: p50/p95/p99 por etapa (metadata["timings_ms"], matching_metrics)
+- peak_rss_mb: pico de memoria del proceso
+- errores: ofertas que fallaron en compute_match (cualquier error => exit 1)
+
+CACHE DE EMBEDDINGS (--embedding-cache, queda en result["embedding_cache"]):
+- off (default): MOL_EMBEDDING_CACHE=0, todo se encodea (comparable entre maquinas)
+- fresh: MOL_EMBEDDING_CACHE_PATH a un archivo temporal nuevo (mide escrituras)
+- shared: el cache configurado en matching_config.json (hits de corridas previas)
+
+BASELINE:
+metrics/benchmark_matching_baseline.json (--save-baseline lo reescribe).
+Sin --save-baseline se compara contra el baseline y el script sale con
+codigo 1 si hay regresion mayor a --tolerance (default 20%):
+- ofertas_por_seg menor a baseline * (1 - tolerance)
+- startup_s, peak_rss_mb o p95 de "total" mayor a baseline * (1 + tolerance)
+- errores mayor que en el baseline
+Con errores > 0 el script sale con codigo 1 siempre (y no guarda baseline).
+
+OFFLINE: fuerza HF_HUB_OFFLINE/TRANSFORMERS_OFFLINE; el modelo tiene que
+estar en el cache local (si no, falla al crear MatcherV3).
+
+Uso:
+    python scripts/matching/benchmark_matching.py
+    python scripts/matching/benchmark_matching.py --scale 2000 --batch-size 32
+    python scripts/matching/benchmark_matching.py --save-baseline
+    python scripts/matching/benchmark_matching.py --embedding-cache fresh
+"""
+
+import os
+
+# Antes de importar sentence_transformers (via match_ofertas_v3)
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+import sys
+import io
+import json
+import time
+import random
+import sqlite3
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+BASE_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(BASE_DIR / "database"))
+
+from matching_metrics import LatencyHistogram
+
+DB_PATH = BASE_DIR / "database" / "bumeran_scraping.db"
+GOLD_SET_PATH = BASE_DIR / "database" / "gold_set_nlp_100_ids.json"
+BASELINE_PATH = BASE_DIR / "metrics" / "benchmark_matching_baseline.json"
+
+DEFAULT_SCALE = 1000
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_TOLERANCE = 0.20
+SEED = 42
+EMBEDDING_CACHE_MODES = ("off", "fresh", "shared")
+
+SYNTHETIC_FIELDS = ("tareas_explicitas", "sector_empresa", "nivel_seniority", "area_funcional")
+
+
+# =============================================================================
+# CORPUS
+# =============================================================================
+
+def load_gold_offers(conn: sqlite3.Connection) -> List[Dict]:
+    """Dicts NLP de las ofertas del gold set 100 (mismo formato que el pipeline)."""
+    from match_ofertas_v3 import _build_oferta_nlp
+
+    with open(GOLD_SET_PATH, 'r', encoding='utf-8') as f:
+        ids = [str(i) for i in json.load(f)]
+
+    conn.row_factory = sqlite3.Row
+    placeholders = ','.join(['?'] * len(ids))
+    cur = conn.execute(f'''
+        SELECT n.id_oferta, n.titulo_limpio, n.tareas_explicitas,
+               n.area_funcional, n.nivel_seniority, n.sector_empresa,
+               o.titulo as titulo_original
+        FROM ofertas_nlp n
+        LEFT JOIN ofertas o ON CAST(n.id_oferta AS INTEGER) = o.id_oferta
+        WHERE n.id_oferta IN ({placeholders})
+        ORDER BY n.id_oferta
+    ''', ids)
+    return [(str(row['id_oferta']), _build_oferta_nlp(row)) for row in cur.fetchall()]
+
+
+def synthetic_offers(gold: List, n: int, seed: int = SEED) -> List:
+    """
+    N ofertas sinteticas: titulo de una oferta del gold set y cada otro campo
+    de otra elegida al azar (semilla fija => mismo corpus siempre).
+    """
+    rng = random.Random(seed)
+    offers = []
+    for i in range(n):
+        _, base = rng.choice(gold)
+        oferta = dict(base)
+        for field in SYNTHETIC_FIELDS:
+            _, donor = rng.choice(gold)
+            oferta[field] = donor.get(field, '')
+        offers.append((f"synthetic_{i}", oferta))
+    return offers
+
+
+# =============================================================================
+# MEDICION
+# =============================================================================
+
+def configure_embedding_cache(mode: str) -> Optional[str]:
+    """
+    Fija el cache de embeddings por entorno antes de importar MatcherV3, para
+    que un cache tibio de corridas previas no infle el throughput.
+
+    Returns:
+        Ruta del cache temporal (modo fresh) o None
+    """
+    if mode not in EMBEDDING_CACHE_MODES:
+        raise ValueError(f"Modo de cache desconocido: {mode}")
+    if mode == "off":
+        os.environ["MOL_EMBEDDING_CACHE"] = "0"
+        return None
+    os.environ.pop("MOL_EMBEDDING_CACHE", None)
+    if mode == "fresh":
+        fd, path = tempfile.mkstemp(prefix="bench_embedding_cache_", suffix=".db")
+        os.close(fd)
+        os.unlink(path)  # EmbeddingCache crea el archivo con su schema
+        os.environ["MOL_EMBEDDING_CACHE_PATH"] = path
+        return path
+    return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso (None si no se puede medir)."""
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta KB, macOS bytes
+        divisor = 1024 * 1024 if platform.system() == "Darwin" else 1024
+        return round(peak / divisor, 1)
+    if PSUTIL_AVAILABLE:
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    return None
+
+
+def run_corpus(matcher, offers: List, batch_size: int) -> Dict:
+    """compute_match de todo el corpus en lotes (como _run_matching_serial, sin escribir)."""
+    latencies = LatencyHistogram()
+    errores = 0
+    start = time.perf_counter()
+
+    for i in range(0, len(offers), batch_size):
+        chunk = offers[i:i + batch_size]
+        matcher.prefetch_embeddings([nlp for _, nlp in chunk], batch_size=batch_size)
+        for id_oferta, oferta_nlp in chunk:
+            try:
+                result, _ = matcher.compute_match(id_oferta, oferta_nlp, categorize_skills=False)
+                latencies.add(result.metadata.get("timings_ms"))
+            except Exception as e:
+                errores += 1
+                print(f"[BENCH] ERROR en {id_oferta}: {e}")
+        matcher.skills_extractor.clear_prefetch()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "ofertas": len(offers),
+        "errores": errores,
+        "segundos": round(elapsed, 3),
+        "ofertas_por_seg": round(len(offers) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latencias": latencies.summary(),
+    }
+
+
+def run_benchmark(scale: int, batch_size: int, embedding_cache: str = "off") -> Dict:
+    """Startup + corpus gold + corpus sintetico; cada corpus con memo vacio."""
+    from match_ofertas_v3 import MatcherV3
+
+    if not DB_PATH.exists():
+        raise FileNotFoundError(f"No existe la BD: {DB_PATH}")
+
+    conn = sqlite3.connect(str(DB_PATH))
+    gold = load_gold_offers(conn)
+    if not gold:
+        raise ValueError("Ninguna oferta del gold set esta en ofertas_nlp")
+
+    start = time.perf_counter()
+    matcher = MatcherV3(db_conn=conn, verbose=False)
+    startup = time.perf_counter() - start
+    print(f"[BENCH] Startup MatcherV3: {startup:.2f}s")
+
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "matcher_version": MatcherV3.VERSION,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "batch_size": batch_size,
+        "embedding_cache": embedding_cache,
+        "startup_s": round(startup, 3),
+        "corpus": {},
+    }
+
+    corpora = [("gold", gold)]
+    if scale:
+        corpora.append(("sintetico", synthetic_offers(gold, scale)))
+
+    for name, offers in corpora:
+        matcher.clear_memo()
+        matcher.reset_memo_stats()
+        print(f"[BENCH] Corpus {name}: {len(offers)} ofertas...")
+        stats = run_corpus(matcher, offers, batch_size)
+        stats["memo"] = matcher.memo_stats()
+        stats["embedding_cache"] = matcher.skills_extractor.cache_stats()
+        result["corpus"][name] = stats
+
+    matcher.close()
+    conn.close()
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+# =============================================================================
+# BASELINE
+# =============================================================================
+
+def compare_to_baseline(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regresiones de result vs baseline (lista vacia = OK)."""
+    regresiones = []
+
+    def higher_is_worse(nombre: str, actual, base):
+        if actual is None or not base:
+            return
+        if actual > base * (1 + tolerance):
+            regresiones.append(f"{nombre}: {actual} vs baseline {base} (+{(actual / base - 1):.0%})")
+
+    if result.get("embedding_cache") != baseline.get("embedding_cache"):
+        print(f"[BENCH] WARN: cache de embeddings {result.get('embedding_cache')} "
+              f"(baseline {baseline.get('embedding_cache')}), comparacion aproximada")
+
+    higher_is_worse("startup_s", result.get("startup_s"), baseline.get("startup_s"))
+    higher_is_worse("peak_rss_mb", result.get("peak_rss_mb"), baseline.get("peak_rss_mb"))
+
+    for name, base_corpus in baseline.get("corpus", {}).items():
+        corpus = result["corpus"].get(name)
+        if corpus is None:
+            continue
+        if corpus["ofertas"] != base_corpus.get("ofertas"):
+            print(f"[BENCH] WARN: corpus {name} con {corpus['ofertas']} ofertas "
+                  f"(baseline {base_corpus.get('ofertas')}), comparacion aproximada")
+
+        if corpus.get("errores", 0) > base_corpus.get("errores", 0):
+            regresiones.append(f"{name}.errores: {corpus['errores']} vs baseline {base_corpus.get('errores', 0)}")
+
+        base_tput = base_corpus.get("ofertas_por_seg")
+        if base_tput and corpus["ofertas_por_seg"] < base_tput * (1 - tolerance):
+            regresiones.append(
+                f"{name}.ofertas_por_seg: {corpus['ofertas_por_seg']} vs baseline {base_tput} "
+                f"({(corpus['ofertas_por_seg'] / base_tput - 1):.0%})"
+            )
+
+        base_total = base_corpus.get("latencias", {}).get("total", {})
+        higher_is_worse(f"{name}.total.p95_ms",
+                        corpus["latencias"].get("total", {}).get("p95_ms"),
+                        base_total.get("p95_ms"))
+
+    return regresiones
+
+
+def total_errors(result: Dict) -> int:
+    """Ofertas con error en compute_match, sumando todos los corpus."""
+    return sum(corpus.get("errores", 0) for corpus in result["corpus"].values())
+
+
+def print_report(result: Dict):
+    print("\n" + "=" * 70)
+    print(f"BENCHMARK MATCHING (MatcherV3 {result['matcher_version']})")
+    print("=" * 70)
+    print(f"Startup: {result['startup_s']:.2f}s | Peak RSS: {result['peak_rss_mb']} MB "
+          f"| Cache embeddings: {result['embedding_cache']}")
+    for name, corpus in result["corpus"].items():
+        print(f"\n[{name}] {corpus['ofertas']} ofertas en {corpus['segundos']:.1f}s "
+              f"-> {corpus['ofertas_por_seg']:.1f} ofertas/s (errores: {corpus['errores']}, "
+              f"memo hit rate {corpus['memo']['hit_rate']:.1%})")
+        for etapa, lat in corpus["latencias"].items():
+            print(f"  {etapa:<18} p50={lat['p50_ms']:>8.2f}  p95={lat['p95_ms']:>8.2f}  "
+                  f"p99={lat['p99_ms']:>8.2f} ms  (n={lat['count']})")
+
+
+def main():
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    parser = argparse.ArgumentParser(description='Benchmark de throughput/latencia de MatcherV3')
+    parser.add_argument('--scale', type=int, default=DEFAULT_SCALE,
+                        help=f'Ofertas del corpus sintetico (default {DEFAULT_SCALE}, 0 = solo gold set)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Ofertas por lote de encoding (default {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Regresion tolerada vs baseline (default 0.20 = 20%%)')
+    parser.add_argument('--embedding-cache', choices=EMBEDDING_CACHE_MODES, default='off',
+                        help='Cache de embeddings: off (default), fresh (archivo temporal) o shared')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help='Archivo de baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='Guardar este resultado como baseline')
+    parser.add_argument('--output', help='Guardar el resultado en JSON')
+    args = parser.parse_args()
+
+    cache_path = configure_embedding_cache(args.embedding_cache)
+    try:
+        result = run_benchmark(args.scale, args.batch_size, args.embedding_cache)
+    finally:
+        if cache_path:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.unlink(cache_path + suffix)
+                except OSError:
+                    pass
+    print_report(result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    errores = total_errors(result)
+    if errores:
+        print(f"\n[BENCH] ERROR: {errores} ofertas fallaron en compute_match (ver [BENCH] ERROR arriba)")
+        if args.save_baseline:
+            print("[BENCH] Baseline NO guardado")
+        return 1
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\n[BENCH] Baseline guardado: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"\n[BENCH] Sin baseline en {baseline_path} (usar --save-baseline)")
+        return 0
+
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regresiones = compare_to_baseline(result, baseline, args.tolerance)
+    if regresiones:
+        print("\n" + "!" * 70)
+        print(f"[BENCH] REGRESION DE PERFORMANCE (tolerancia {args.tolerance:.0%}):")
+        for r in regresiones:
+            print(f"  - {r}")
+        print("!" * 70)
+        return 1
+
+    print(f"\n[BENCH] OK vs baseline ({baseline.get('timestamp', '?')}, tolerancia {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
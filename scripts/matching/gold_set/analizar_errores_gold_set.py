@@ -25,9 +25,8 @@ sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='repla
 BASE_DIR = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(BASE_DIR / "database"))
 
-from skills_implicit_extractor import SkillsImplicitExtractor
 from match_by_skills import SkillsBasedMatcher
-from match_ofertas_v3 import MatcherV3
+from matching_service import get_matcher
 
 
 def cargar_errores_gold_set():
@@ -239,9 +238,11 @@ def main():
 
     # Inicializar componentes
     print("\nCargando componentes...")
-    extractor = SkillsImplicitExtractor(verbose=False)
+    # matching_service caliente si esta corriendo (si no, MatcherV3 local);
+    # extract_skills del matcher = SkillsImplicitExtractor.extract_skills
     skills_matcher = SkillsBasedMatcher(db_conn=conn, verbose=False)
-    matcher_v3 = MatcherV3(db_conn=conn, verbose=False)
+    matcher_v3 = get_matcher(db_conn=conn)
+    extractor = matcher_v3
     print("  [OK] Componentes cargados")
 
     # Analizar cada error
@@ -29,8 +29,7 @@ sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='repla
 BASE_DIR = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(BASE_DIR / "database"))
 
-from match_ofertas_v3 import MatcherV3
-from skills_implicit_extractor import SkillsImplicitExtractor
+from matching_service import get_matcher
 from skill_categorizer import SkillCategorizer
 
 
@@ -125,10 +124,10 @@ def main():
 
     # Cargar componentes
     print("\nCargando componentes...")
-    matcher = MatcherV3(db_conn=conn, verbose=False)
-    extractor = SkillsImplicitExtractor(verbose=False)
+    # Servicio de matching si esta corriendo (modelo ya cargado), si no MatcherV3 local
+    matcher = get_matcher(db_conn=conn, verbose=False)
     categorizer = SkillCategorizer()
-    print("  [OK] Matcher v3, Extractor y Categorizer cargados")
+    print("  [OK] Matcher v3 y Categorizer cargados")
 
     # Procesar ofertas
     print("\nProcesando ofertas...")
@@ -185,7 +184,7 @@ def main():
 
         # Skills extraidas y categorizadas
         try:
-            skills = extractor.extract_skills(titulo_limpio=titulo_limpio, tareas_explicitas=tareas)
+            skills = matcher.extract_skills(titulo_limpio=titulo_limpio, tareas_explicitas=tareas)
             # Categorizar skills con L1/L2
             skills = categorizer.categorize_batch(skills)
             skills_count = len(skills)
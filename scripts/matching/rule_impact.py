@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+rule_impact.py - Pre-filtro de impacto de cambios en reglas/configs de matching
+===============================================================================
+
+VERSION: 1.1.0
+FECHA: 2026-10-18
+
+OBJETIVO:
+Al editar matching_rules_business.json o sector_isco_compatibilidad.json no
+hace falta re-matchear todo el corpus: solo pueden cambiar las ofertas que
+tocan lo que cambio. Este script:
+
+1. Compara los configs actuales contra los de un run base (snapshot de
+   RunTracker en pipeline_runs.config_files) o contra archivos dados.
+2. Arma el impacto del diff:
+   - reglas agregadas/eliminadas/modificadas -> sus terminos de texto y los
+     ISCO/regla que aplicaban
+   - sectores/aliases modificados -> sectores afectados
+3. Selecciona ofertas con indices:
+   - termino -> ofertas: automata multi_pattern con los terminos del diff,
+     una pasada por oferta sobre titulo/tareas
+   - regla -> ofertas: ofertas_esco_matching.regla_aplicada
+   - ISCO -> ofertas: ofertas_esco_matching.isco_code igual (o de la familia)
+     a un ISCO que forzaba/fuerza una regla cambiada (v1.1)
+   - sector -> ofertas: sector_empresa resuelto igual que MatcherV3
+4. Opcional: --run corre run_matching_pipeline(offer_ids=...) sobre la
+   seleccion y --verify N re-matchea N ofertas FUERA de la seleccion (sin
+   persistir) para confirmar que su ISCO no cambia.
+
+Una regla solo puede aplicar si aparece al menos uno de sus terminos (las
+condiciones de texto son AND de OR-listas), asi que la seleccion es un
+superconjunto de las ofertas cuyo resultado puede cambiar.
+
+Uso:
+    python scripts/matching/rule_impact.py                      # vs ultimo run
+    python scripts/matching/rule_impact.py --base-run run_20260113_1550
+    python scripts/matching/rule_impact.py --old-rules backup/matching_rules_business.json
+    python scripts/matching/rule_impact.py --run --verify 200
+"""
+
+import sys
+import io
+import json
+import random
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+BASE_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(BASE_DIR / "database"))
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+from business_rules_engine import TEXT_CONDITIONS
+from multi_pattern import MultiPatternMatcher
+
+DB_PATH = BASE_DIR / "database" / "bumeran_scraping.db"
+CONFIG_DIR = BASE_DIR / "config"
+
+RULES_FILE = "matching_rules_business.json"
+SECTOR_FILE = "sector_isco_compatibilidad.json"
+
+# Claves de sector_isco_compatibilidad.json que no cambian el matching
+SECTOR_METADATA_KEYS = {"version", "descripcion", "fecha_actualizacion"}
+
+
+# =============================================================================
+# DIFF DE CONFIGS
+# =============================================================================
+
+def rule_terms(rule: Dict) -> Set[str]:
+    """Terminos positivos de texto de una regla (en minusculas)."""
+    if not isinstance(rule, dict):
+        return set()
+    condicion = rule.get("condicion", {})
+    return {
+        t.lower()
+        for key, _, _ in TEXT_CONDITIONS
+        for t in condicion.get(key, [])
+    }
+
+
+def diff_rules(old_config: Dict, new_config: Dict) -> Dict:
+    """
+    Reglas reglas_forzar_isco que cambiaron entre dos versiones del config.
+
+    Returns:
+        {"reglas": ids cambiados, "terminos": terminos de la version vieja y
+         nueva de esas reglas, "iscos": ISCO forzados vieja/nueva}
+    """
+    old_rules = (old_config or {}).get("reglas_forzar_isco", {})
+    new_rules = (new_config or {}).get("reglas_forzar_isco", {})
+
+    changed = sorted(
+        rule_id for rule_id in set(old_rules) | set(new_rules)
+        if old_rules.get(rule_id) != new_rules.get(rule_id)
+    )
+
+    terminos = set()
+    iscos = set()
+    for rule_id in changed:
+        for rule in (old_rules.get(rule_id), new_rules.get(rule_id)):
+            if not isinstance(rule, dict):
+                continue
+            terminos |= rule_terms(rule)
+            accion = rule.get("accion", {})
+            isco = accion.get("forzar_isco") or accion.get("forzar_isco_familia")
+            if isco:
+                iscos.add(str(isco))
+
+    return {"reglas": changed, "terminos": terminos, "iscos": iscos}
+
+
+def resolve_sector(sector_empresa: str, config: Dict) -> Optional[str]:
+    """Sector de config para sector_empresa (misma logica que MatcherV3._apply_sector_penalty)."""
+    if not sector_empresa or not config:
+        return None
+    sectores = config.get("sectores", {})
+    aliases = config.get("aliases", {})
+
+    sector_norm = sector_empresa.strip()
+    if sector_norm not in sectores:
+        sector_norm = aliases.get(sector_empresa, sector_empresa)
+    if sector_norm not in sectores:
+        for key in sectores:
+            if key.lower() == sector_norm.lower():
+                sector_norm = key
+                break
+    return sector_norm if sectores.get(sector_norm) else None
+
+
+def diff_sectors(old_config: Dict, new_config: Dict) -> Dict:
+    """
+    Sectores cuya penalizacion puede cambiar.
+
+    Returns:
+        {"sectores": sectores modificados, "aliases": aliases modificados,
+         "todos": True si cambio algo global (isco_genericos, claves nuevas)}
+    """
+    old_config = old_config or {}
+    new_config = new_config or {}
+    old_sectores = old_config.get("sectores", {})
+    new_sectores = new_config.get("sectores", {})
+    old_aliases = old_config.get("aliases", {})
+    new_aliases = new_config.get("aliases", {})
+
+    sectores = {
+        s for s in set(old_sectores) | set(new_sectores)
+        if old_sectores.get(s) != new_sectores.get(s)
+    }
+    aliases = {
+        a for a in set(old_aliases) | set(new_aliases)
+        if not a.startswith("_") and old_aliases.get(a) != new_aliases.get(a)
+    }
+
+    otras = set(old_config) | set(new_config)
+    otras -= SECTOR_METADATA_KEYS | {"sectores", "aliases"}
+    todos = any(
+        old_config.get(k) != new_config.get(k)
+        for k in otras if not k.startswith("_")
+    )
+    return {"sectores": sectores, "aliases": aliases, "todos": todos}
+
+
+# =============================================================================
+# SELECCION DE OFERTAS
+# =============================================================================
+
+def offer_scan_text(oferta: Dict) -> str:
+    """
+    Texto donde pueden aparecer terminos de reglas (titulo efectivo, tareas,
+    titulo+tareas unidos y titulo original de las exclusiones).
+    """
+    titulo_original = (oferta.get("titulo_original") or "").lower()
+    titulo = (oferta.get("titulo_limpio") or "").lower() or titulo_original
+    tareas = (oferta.get("tareas_explicitas") or "").lower()
+    return f"{titulo} {tareas}\n{titulo_original}"
+
+
+def select_affected_offers(
+    ofertas: List[Dict],
+    rules_diff: Dict,
+    sectors_diff: Dict,
+    old_sector_config: Dict,
+    new_sector_config: Dict
+) -> Dict[str, Set[str]]:
+    """
+    Ofertas cuyo resultado puede cambiar, por motivo.
+
+    Args:
+        ofertas: Dicts con id_oferta, titulo_limpio, titulo_original,
+                 tareas_explicitas, sector_empresa, regla_aplicada
+
+    Returns:
+        {"terminos": ids, "regla_aplicada": ids, "isco": ids, "sector": ids}
+    """
+    selected = {"terminos": set(), "regla_aplicada": set(), "isco": set(), "sector": set()}
+
+    # Indice termino -> ofertas (solo terminos del diff)
+    matcher = MultiPatternMatcher(rules_diff["terminos"]) if rules_diff["terminos"] else None
+    reglas = set(rules_diff["reglas"])
+    iscos = tuple(sorted(rules_diff["iscos"]))
+    sectores = sectors_diff["sectores"]
+    aliases = sectors_diff["aliases"]
+
+    for oferta in ofertas:
+        id_oferta = str(oferta["id_oferta"])
+
+        if matcher is not None and matcher.find(offer_scan_text(oferta)):
+            selected["terminos"].add(id_oferta)
+
+        if oferta.get("regla_aplicada") in reglas:
+            selected["regla_aplicada"].add(id_oferta)
+
+        # ISCO guardado que vino (o pudo venir) de una regla cambiada, p.ej.
+        # corregido por auto_corrector sin regla_aplicada
+        isco_code = (oferta.get("isco_code") or "").lstrip("C")
+        if iscos and isco_code and isco_code.startswith(iscos):
+            selected["isco"].add(id_oferta)
+
+        sector = oferta.get("sector_empresa") or ""
+        if sector and (sectors_diff["todos"] or sectores or aliases):
+            antes = resolve_sector(sector, old_sector_config)
+            despues = resolve_sector(sector, new_sector_config)
+            # Cambio de alias (resuelve distinto), de la entrada del sector o global
+            if antes != despues or {antes, despues} & sectores \
+                    or (sectors_diff["todos"] and (antes or despues)):
+                selected["sector"].add(id_oferta)
+
+    return selected
+
+
+def load_offers(conn: sqlite3.Connection) -> List[Dict]:
+    """Ofertas NLP con su titulo original, la regla aplicada y el ISCO del ultimo matching."""
+    conn.row_factory = sqlite3.Row
+    cur = conn.execute('''
+        SELECT n.id_oferta, n.titulo_limpio, n.tareas_explicitas,
+               n.area_funcional, n.nivel_seniority, n.sector_empresa,
+               o.titulo as titulo_original, m.regla_aplicada, m.isco_code
+        FROM ofertas_nlp n
+        LEFT JOIN ofertas o ON CAST(n.id_oferta AS INTEGER) = o.id_oferta
+        LEFT JOIN ofertas_esco_matching m ON n.id_oferta = m.id_oferta
+    ''')
+    return [dict(row) for row in cur.fetchall()]
+
+
+# =============================================================================
+# CONFIG BASE
+# =============================================================================
+
+def load_base_configs(base_run: str = None) -> Dict[str, Dict]:
+    """Contenido de los configs guardados por RunTracker para base_run (default: ultimo run)."""
+    from compare_runs import load_run, get_latest_runs
+
+    if base_run is None:
+        runs = get_latest_runs(1)
+        if not runs:
+            raise ValueError("No hay runs en pipeline_runs; usar --old-rules/--old-sector")
+        base_run = runs[0]
+
+    meta = load_run(base_run)
+    if not meta:
+        raise ValueError(f"Run no encontrado: {base_run}")
+    contents = json.loads(meta.get("config_files") or "{}")
+    return {"run_id": base_run, RULES_FILE: contents.get(RULES_FILE), SECTOR_FILE: contents.get(SECTOR_FILE)}
+
+
+def _read_json(path: Path) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# =============================================================================
+# VERIFICACION
+# =============================================================================
+
+def verify_outside(conn: sqlite3.Connection, ofertas: List[Dict], selected: Set[str],
+                   sample: int, seed: int = 42) -> Dict:
+    """
+    Re-matchea (sin persistir) una muestra de ofertas NO seleccionadas y
+    compara el ISCO con el guardado en ofertas_esco_matching.
+    """
+    from match_ofertas_v3 import _build_oferta_nlp
+    from matching_service import get_matcher
+
+    stored = {
+        str(row[0]): row[1]
+        for row in conn.execute("SELECT id_oferta, isco_code FROM ofertas_esco_matching")
+    }
+    fuera = [o for o in ofertas if str(o["id_oferta"]) not in selected and str(o["id_oferta"]) in stored]
+    random.Random(seed).shuffle(fuera)
+    fuera = fuera[:sample]
+
+    matcher = get_matcher(db_conn=conn)
+    cambios = []
+    for oferta in fuera:
+        id_oferta = str(oferta["id_oferta"])
+        result = matcher.match(_build_oferta_nlp(oferta))
+        if result.isco_code != stored[id_oferta]:
+            cambios.append({"id": id_oferta, "isco_guardado": stored[id_oferta], "isco_nuevo": result.isco_code})
+    matcher.close()
+
+    return {"verificadas": len(fuera), "cambios_fuera_del_set": len(cambios), "detalle": cambios[:10]}
+
+
+def main():
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    parser = argparse.ArgumentParser(description="Ofertas afectadas por un cambio de reglas/configs de matching")
+    parser.add_argument("--base-run", help="Run base (default: ultimo run en pipeline_runs)")
+    parser.add_argument("--old-rules", help="matching_rules_business.json anterior (en vez del snapshot)")
+    parser.add_argument("--old-sector", help="sector_isco_compatibilidad.json anterior (en vez del snapshot)")
+    parser.add_argument("--output", help="Guardar IDs seleccionados en JSON")
+    parser.add_argument("--run", action="store_true", help="Ejecutar run_matching_pipeline sobre la seleccion")
+    parser.add_argument("--force", action="store_true", help="Permitir reprocesar ofertas validadas")
+    parser.add_argument("--batch-size", type=int, help="batch_size de run_matching_pipeline")
+    parser.add_argument("--workers", type=int, help="workers de run_matching_pipeline")
+    parser.add_argument("--verify", type=int, default=0, metavar="N",
+                        help="Re-matchear N ofertas fuera de la seleccion y comparar ISCO")
+    args = parser.parse_args()
+
+    base = {"run_id": None, RULES_FILE: None, SECTOR_FILE: None}
+    if not (args.old_rules and args.old_sector):
+        base = load_base_configs(args.base_run)
+    old_rules = _read_json(Path(args.old_rules)) if args.old_rules else base[RULES_FILE]
+    old_sector = _read_json(Path(args.old_sector)) if args.old_sector else base[SECTOR_FILE]
+    new_rules = _read_json(CONFIG_DIR / RULES_FILE)
+    new_sector = _read_json(CONFIG_DIR / SECTOR_FILE)
+
+    if old_rules is None or old_sector is None:
+        print("[IMPACT] WARN: el run base no tiene snapshot de algun config; se toma como vacio")
+
+    rules_diff = diff_rules(old_rules, new_rules)
+    sectors_diff = diff_sectors(old_sector, new_sector)
+
+    print("=" * 70)
+    print(f"IMPACTO DE CAMBIOS (base: {base['run_id'] or 'archivos'})")
+    print("=" * 70)
+    print(f"  Reglas cambiadas:   {len(rules_diff['reglas'])} {rules_diff['reglas'][:10]}")
+    print(f"  Terminos afectados: {len(rules_diff['terminos'])}")
+    print(f"  ISCO afectados:     {sorted(rules_diff['iscos'])[:10]}")
+    print(f"  Sectores cambiados: {sorted(sectors_diff['sectores'])}"
+          + (" (+ cambio global)" if sectors_diff["todos"] else ""))
+
+    conn = sqlite3.connect(str(DB_PATH))
+    ofertas = load_offers(conn)
+    selected = select_affected_offers(ofertas, rules_diff, sectors_diff, old_sector, new_sector)
+    ids = sorted(set().union(*selected.values()))
+
+    print(f"\n  Ofertas totales:      {len(ofertas)}")
+    print(f"  Por terminos:         {len(selected['terminos'])}")
+    print(f"  Por regla aplicada:   {len(selected['regla_aplicada'])}")
+    print(f"  Por ISCO guardado:    {len(selected['isco'])}")
+    print(f"  Por sector:           {len(selected['sector'])}")
+    print(f"  SELECCIONADAS:        {len(ids)} ({len(ids) / max(len(ofertas), 1):.1%})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"base_run": base["run_id"], "reglas": rules_diff["reglas"], "ids": ids}, f, indent=2)
+        print(f"\n  IDs guardados en {args.output}")
+
+    if args.run and ids:
+        from match_ofertas_v3 import run_matching_pipeline
+        stats = run_matching_pipeline(
+            offer_ids=ids,
+            source="rule_impact",
+            description=f"Impacto de {len(rules_diff['reglas'])} reglas / {len(sectors_diff['sectores'])} sectores",
+            force=args.force,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            verbose=True,
+            use_service=True
+        )
+        if base["run_id"] and stats.get("run_id"):
+            from compare_runs import compare_configs
+            print(f"\n  Configs vs {base['run_id']}: {compare_configs(base['run_id'], stats['run_id'])}")
+
+    if args.verify:
+        report = verify_outside(conn, ofertas, set(ids), args.verify)
+        print(f"\n  Verificacion: {report['cambios_fuera_del_set']} cambios en "
+              f"{report['verificadas']} ofertas fuera de la seleccion")
+        for cambio in report["detalle"]:
+            print(f"    {cambio['id']}: {cambio['isco_guardado']} -> {cambio['isco_nuevo']}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -103,9 +103,10 @@ def cargar_datos_nlp(ids: list, conn, columnas: list) -> pd.DataFrame:
 
 def ejecutar_matching(ids: list, conn, df_nlp: pd.DataFrame, verbose: bool = False):
     """Ejecuta matching para los IDs dados."""
-    from match_ofertas_v3 import MatcherV3
+    from matching_service import get_matcher
 
-    matcher = MatcherV3(db_conn=conn, verbose=False)
+    # Servicio de matching si esta corriendo (modelo ya cargado), si no MatcherV3 local
+    matcher = get_matcher(db_conn=conn, verbose=False)
     resultados = []
 
     for i, id_oferta in enumerate(ids, 1):
@@ -75,7 +75,7 @@ def rematch_with_clean_titles(verbose=True):
     Reprocesa matching con títulos limpios y penalización sector.
     """
     from limpiar_titulos import limpiar_titulo, cargar_config
-    from match_ofertas_v3 import MatcherV3
+    from matching_service import get_matcher
 
     # Obtener resultados actuales
     current = get_current_results()
@@ -87,7 +87,7 @@ def rematch_with_clean_titles(verbose=True):
     titulo_config = cargar_config()
 
     # Inicializar matcher v3.2.1
-    matcher = MatcherV3(verbose=False)
+    matcher = get_matcher(verbose=False)
     print(f"Matcher version: {matcher.VERSION}")
 
     results = []
@@ -11,6 +11,18 @@ Cada ejecución del pipeline crea un "run" que vincula:
 
 **v2.0**: Todo se guarda en BD (tabla pipeline_runs), no en archivos JSON.
 
+**v2.3**: Membresia incremental (register_offers) para el modo stream de
+run_matching_pipeline: el run se crea vacio y las ofertas se agregan a
+run_ofertas pagina a pagina, sin armar la lista completa de IDs.
+
+**v2.4**: save_results(latencias=...) guarda el histograma de latencia por
+etapa de MatcherV3 (p50/p95/p99, ver database/matching_metrics.py) en
+pipeline_runs.latencias (migracion 014).
+
+**v2.5**: save_progress() checkpointea metricas de un run en curso sin
+registrar el evento run_completado (corridas NLP reanudables con --resume,
+ver database/nlp_work_queue.py).
+
 Uso:
     from scripts.run_tracking import RunTracker
 
@@ -51,7 +63,7 @@ CONFIGS_TO_SNAPSHOT = [
 class RunTracker:
     """Gestiona corridas del pipeline con versionado en BD."""
 
-    VERSION = "2.2.0"  # v2.2: Flujo optimización → validación humana
+    VERSION = "2.5.0"  # v2.5: Checkpoint de runs en curso (save_progress)
 
     # Umbral de convergencia: cuando tasa < 5%, el sistema está maduro
     UMBRAL_CONVERGENCIA = 5.0
@@ -234,6 +246,50 @@ class RunTracker:
 
         return run_id
 
+    def register_offers(self, run_id: str, offer_ids: List[str],
+                        conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Agrega ofertas a un run ya creado (run_ofertas + ofertas_count).
+
+        Args:
+            run_id: ID del run
+            offer_ids: IDs a agregar (los ya registrados se ignoran)
+            conn: Conexion a reutilizar (ej: la del pipeline, unico escritor)
+
+        Returns:
+            Cantidad de ofertas nuevas en el run
+        """
+        own_conn = conn is None
+        conn = conn or self._get_conn()
+
+        cur = conn.executemany(
+            'INSERT OR IGNORE INTO run_ofertas (run_id, id_oferta) VALUES (?, ?)',
+            [(run_id, str(id_oferta)) for id_oferta in offer_ids]
+        )
+        added = max(cur.rowcount, 0)
+        conn.execute(
+            'UPDATE pipeline_runs SET ofertas_count = COALESCE(ofertas_count, 0) + ? WHERE run_id = ?',
+            (added, run_id)
+        )
+        conn.commit()
+
+        if own_conn:
+            conn.close()
+        return added
+
+    def get_run_offer_ids(self, run_id: str) -> List[str]:
+        """IDs de un run: ofertas_ids si se guardo la lista, si no run_ofertas (modo stream)."""
+        run = self.get_run(run_id)
+        if run and run.get("ofertas_ids"):
+            return [str(i) for i in run["ofertas_ids"]]
+
+        conn = self._get_conn()
+        ids = [str(row[0]) for row in conn.execute(
+            'SELECT id_oferta FROM run_ofertas WHERE run_id = ?', (run_id,)
+        )]
+        conn.close()
+        return ids
+
     def _snapshot_configs(self, target_dir: Path) -> Dict[str, str]:
         """Copia configs actuales y extrae versiones."""
         versions = {}
@@ -326,7 +382,8 @@ class RunTracker:
         comparacion: Optional[Dict] = None,
         errores_detectados: int = 0,
         errores_corregidos: int = 0,
-        errores_escalados: int = 0
+        errores_escalados: int = 0,
+        latencias: Optional[Dict] = None
     ) -> bool:
         """
         Guarda resultados de una corrida en BD.
@@ -339,6 +396,7 @@ class RunTracker:
             errores_detectados: Cantidad de errores detectados por validación
             errores_corregidos: Cantidad auto-corregidos
             errores_escalados: Cantidad que requieren reglas nuevas
+            latencias: Resumen por etapa {etapa: {count, p50_ms, p95_ms, p99_ms, ...}} (v2.4)
 
         Returns:
             True si se guardó correctamente
@@ -346,6 +404,11 @@ class RunTracker:
         conn = self._get_conn()
         cur = conn.cursor()
 
+        # v2.4: Columna latencias (migracion 014) si la BD es anterior
+        columns = {row[1] for row in cur.execute("PRAGMA table_info(pipeline_runs)")}
+        if "latencias" not in columns:
+            cur.execute("ALTER TABLE pipeline_runs ADD COLUMN latencias TEXT")
+
         # Preparar detalle de errores
         metricas_detalle = errores_por_tipo or {}
 
@@ -375,7 +438,8 @@ class RunTracker:
                 diff_sin_cambio = ?,
                 errores_detectados = ?,
                 errores_corregidos = ?,
-                errores_escalados = ?
+                errores_escalados = ?,
+                latencias = ?
             WHERE run_id = ?
         ''', (
             metricas.get("total"),
@@ -391,6 +455,7 @@ class RunTracker:
             errores_detectados,
             errores_corregidos,
             errores_escalados,
+            json.dumps(latencias, ensure_ascii=False) if latencias else None,
             run_id
         ))
 
@@ -426,6 +491,38 @@ class RunTracker:
 
         return True
 
+    def save_progress(self, run_id: str, metricas: Dict, detalle: Optional[Dict] = None) -> bool:
+        """
+        Checkpoint de un run en curso: actualiza metricas y detalle sin
+        registrar run_completado (eso lo hace save_results al terminar).
+
+        Args:
+            run_id: ID del run
+            metricas: Dict con total, correctos, errores
+            detalle: Se guarda en metricas_detalle (get_run lo expone como errores_por_tipo)
+
+        Returns:
+            True si el run existe
+        """
+        conn = self._get_conn()
+        cur = conn.execute('''
+            UPDATE pipeline_runs SET
+                metricas_total = ?,
+                metricas_correctos = ?,
+                metricas_errores = ?,
+                metricas_detalle = ?
+            WHERE run_id = ?
+        ''', (
+            metricas.get("total"),
+            metricas.get("correctos"),
+            metricas.get("errores"),
+            json.dumps(detalle or {}, ensure_ascii=False),
+            run_id
+        ))
+        conn.commit()
+        conn.close()
+        return cur.rowcount > 0
+
     def log_learning_event(
         self,
         evento_tipo: str,
@@ -495,6 +592,8 @@ class RunTracker:
                 result["ofertas_ids"] = json.loads(result["ofertas_ids"])
             if result.get("metricas_detalle"):
                 result["errores_por_tipo"] = json.loads(result["metricas_detalle"])
+            if result.get("latencias"):
+                result["latencias"] = json.loads(result["latencias"])
             return result
         return None
 
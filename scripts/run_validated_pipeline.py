@@ -217,11 +217,14 @@ def run_full_pipeline(
                 safe_print("=" * 60)
 
             try:
+                # Si matching_service esta corriendo y es compatible calcula ahi
+                # (sin recargar BGE-M3); si no, MatcherV3 local
                 stats = run_matching_pipeline(
                     offer_ids=ids_to_process,
                     limit=limit,
                     only_pending=only_pending,
-                    verbose=verbose
+                    verbose=verbose,
+                    use_service=True
                 )
                 resultados["matching"] = stats
 
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del chequeo de regresiones de benchmark_matching.py (sin modelo)."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts" / "matching"))
+
+import os
+
+from benchmark_matching import compare_to_baseline, configure_embedding_cache, synthetic_offers, total_errors
+
+BASELINE = {
+    "startup_s": 10.0,
+    "peak_rss_mb": 2000.0,
+    "corpus": {"gold": {"ofertas": 100, "ofertas_por_seg": 50.0,
+                        "latencias": {"total": {"p95_ms": 40.0}}}},
+}
+
+
+def _result(tput=50.0, p95=40.0, startup=10.0, errores=0):
+    return {
+        "startup_s": startup,
+        "peak_rss_mb": 2000.0,
+        "corpus": {"gold": {"ofertas": 100, "ofertas_por_seg": tput, "errores": errores,
+                            "latencias": {"total": {"p95_ms": p95}}}},
+    }
+
+
+class TestBenchmarkMatching:
+    def test_sin_regresion_dentro_de_tolerancia(self):
+        assert compare_to_baseline(_result(tput=45.0, p95=46.0, startup=11.0), BASELINE, 0.2) == []
+
+    def test_detecta_regresiones(self):
+        regresiones = compare_to_baseline(_result(tput=30.0, p95=60.0, startup=20.0), BASELINE, 0.2)
+        assert len(regresiones) == 3
+        assert any("ofertas_por_seg" in r for r in regresiones)
+
+    def test_corpus_sintetico_determinista(self):
+        gold = [(str(i), {"titulo_limpio": f"t{i}", "tareas_explicitas": f"x{i}",
+                          "sector_empresa": "", "nivel_seniority": "", "area_funcional": ""})
+                for i in range(10)]
+        assert synthetic_offers(gold, 50) == synthetic_offers(gold, 50)
+        assert len(synthetic_offers(gold, 50)) == 50
+
+    def test_errores_son_regresion(self):
+        result = _result(errores=3)
+        assert total_errors(result) == 3
+        assert any("errores" in r for r in compare_to_baseline(result, BASELINE, 0.2))
+
+    def test_cache_embeddings_por_entorno(self, monkeypatch):
+        # setenv (no delenv): monkeypatch restaura el valor previo aunque no existiera
+        monkeypatch.setenv("MOL_EMBEDDING_CACHE", "1")
+        monkeypatch.setenv("MOL_EMBEDDING_CACHE_PATH", "cache_previo.db")
+        assert configure_embedding_cache("off") is None
+        assert os.environ["MOL_EMBEDDING_CACHE"] == "0"
+
+        path = configure_embedding_cache("fresh")
+        assert "MOL_EMBEDDING_CACHE" not in os.environ
+        assert os.environ["MOL_EMBEDDING_CACHE_PATH"] == path
+        assert not os.path.exists(path)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del motor de reglas compilado contra la evaluacion lineal de v3.4."""
+
+import sys
+import json
+import random
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+import pytest
+
+from business_rules_engine import CompiledRuleEngine
+from multi_pattern import MultiPatternMatcher
+
+RULES_PATH = Path(__file__).parent.parent.parent / "config" / "matching_rules_business.json"
+
+
+def legacy_matching_rules(business_rules, oferta_nlp, critica_only=False):
+    """Evaluacion de MatcherV3 v3.4 (loop por regla y por termino)."""
+    titulo = (oferta_nlp.get("titulo_limpio") or oferta_nlp.get("titulo", "")).lower()
+    titulo_original = (oferta_nlp.get("titulo", "")).lower()
+    tareas = (oferta_nlp.get("tareas_explicitas") or "").lower()
+    reglas = business_rules.get("reglas_forzar_isco", {})
+    reglas_ordenadas = sorted(
+        reglas.items(),
+        key=lambda x: x[1].get("prioridad", 99) if isinstance(x[1], dict) else 99
+    )
+
+    matched = []
+    for rule_id, rule in reglas_ordenadas:
+        if not isinstance(rule, dict) or not rule.get("activa", False):
+            continue
+        if critica_only and not rule.get("correccion_critica", False):
+            continue
+        accion = rule.get("accion", {})
+        if not (accion.get("forzar_isco") or accion.get("forzar_isco_familia", "")):
+            continue
+
+        condicion = rule.get("condicion", {})
+        evaluadas = []
+        for key in ("titulo_contiene_alguno", "titulo_contiene_alguno_2"):
+            if condicion.get(key):
+                evaluadas.append(any(t.lower() in titulo for t in condicion[key]))
+        if condicion.get("titulo_contiene_todos"):
+            evaluadas.append(all(t.lower() in titulo for t in condicion["titulo_contiene_todos"]))
+        if condicion.get("titulo_o_tareas_contiene_alguno"):
+            evaluadas.append(any(t.lower() in titulo or t.lower() in tareas
+                                 for t in condicion["titulo_o_tareas_contiene_alguno"]))
+        if condicion.get("skills_contiene_alguno"):
+            evaluadas.append(any(t.lower() in f"{titulo} {tareas}" for t in condicion["skills_contiene_alguno"]))
+
+        cumplida = len(evaluadas) > 0 and all(evaluadas)
+        area = oferta_nlp.get("area_funcional", "").lower()
+        sector = oferta_nlp.get("sector_empresa", "").lower()
+        if cumplida and condicion.get("area_funcional_es"):
+            cumplida = area == condicion["area_funcional_es"].lower()
+        if cumplida and condicion.get("sector_es"):
+            cumplida = sector == condicion["sector_es"].lower()
+        if cumplida and condicion.get("sector_empresa_es_alguno"):
+            cumplida = any(s.lower() == sector for s in condicion["sector_empresa_es_alguno"])
+        if cumplida:
+            if any(t.lower() in titulo_original for t in condicion.get("titulo_no_contiene_alguno", [])):
+                cumplida = False
+            if any(s.lower() == sector for s in condicion.get("sector_no_es", [])):
+                cumplida = False
+            if any(a.lower() == area for a in condicion.get("area_funcional_no_es", [])):
+                cumplida = False
+        if cumplida:
+            matched.append(rule_id)
+    return matched
+
+
+class TestMultiPattern:
+    def test_igual_a_substring(self):
+        rng = random.Random(5)
+        for _ in range(500):
+            terms = ["".join(rng.choice("ab ") for _ in range(rng.randrange(0, 4))) for _ in range(6)]
+            text = "".join(rng.choice("ab ") for _ in range(rng.randrange(0, 20)))
+            assert MultiPatternMatcher(terms, use_c=False).find_terms(text) == {t for t in terms if t in text}
+
+
+@pytest.fixture(scope="module")
+def business_rules():
+    with open(RULES_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TestCompiledRuleEngine:
+    def test_paridad_con_reglas_reales(self, business_rules):
+        engine = CompiledRuleEngine(business_rules)
+        rng = random.Random(17)
+
+        # Vocabulario: terminos de las propias reglas + ruido
+        vocab = ["vendedor", "analista", "de", "sr", "gastronomico", "operaciones"]
+        sectores = ["", "gastronomia", "retail", "salud"]
+        areas = ["", "ventas", "administracion", "tecnologia"]
+        for rule in business_rules["reglas_forzar_isco"].values():
+            if isinstance(rule, dict):
+                for key, value in rule.get("condicion", {}).items():
+                    if isinstance(value, list):
+                        vocab.extend(v for v in value if isinstance(v, str))
+                    elif key in ("sector_es", "area_funcional_es") and isinstance(value, str):
+                        (sectores if key == "sector_es" else areas).append(value)
+
+        for _ in range(2000):
+            titulo = " ".join(rng.choice(vocab) for _ in range(rng.randrange(1, 5)))
+            oferta = {
+                "titulo_limpio": titulo,
+                "titulo": titulo + (" - " + rng.choice(vocab) if rng.random() < 0.5 else ""),
+                "tareas_explicitas": "; ".join(rng.choice(vocab) for _ in range(rng.randrange(0, 4))),
+                "area_funcional": rng.choice(areas),
+                "sector_empresa": rng.choice(sectores),
+            }
+            for critica_only in (False, True):
+                got = [rule_id for rule_id, _ in engine.matching_rules(oferta, critica_only=critica_only)]
+                assert got == legacy_matching_rules(business_rules, oferta, critica_only=critica_only)
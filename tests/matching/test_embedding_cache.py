@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del cache persistente de embeddings (sin modelo real)."""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache, normalize_text
+
+
+class FakeModel:
+    """Modelo falso: cuenta textos encodeados."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, textos, batch_size=32, show_progress_bar=False, normalize_embeddings=True):
+        self.encoded.extend(textos)
+        return [np.full(4, len(t), dtype=np.float32) for t in textos]
+
+
+class TestEmbeddingCache:
+    def test_normalizacion(self):
+        assert normalize_text("  Vendedor   de\tsalón ") == "Vendedor de salón"
+
+    def test_hits_y_misses(self, tmp_path):
+        cache = EmbeddingCache(path=tmp_path / "cache.db")
+        model = FakeModel()
+
+        cache.encode(model, "m", ["Vendedor", "Cajero", "Vendedor"])
+        assert model.encoded == ["Vendedor", "Cajero"]
+
+        vectors = cache.encode(model, "m", ["Vendedor ", "Cajero"])
+        assert model.encoded == ["Vendedor", "Cajero"]
+        assert vectors[0].tolist() == [8.0] * 4
+        assert cache.stats()["hits"] == 2
+
+        # Otro modelo = otra clave
+        cache.encode(model, "otro", ["Vendedor"])
+        assert model.encoded[-1] == "Vendedor"
+
+    def test_hits_no_escriben_hasta_flush(self, tmp_path):
+        path = tmp_path / "cache.db"
+        cache = EmbeddingCache(path=path)
+        model = FakeModel()
+        cache.encode(model, "m", ["Vendedor"])
+
+        def last_access():
+            conn = sqlite3.connect(str(path))
+            value = conn.execute("SELECT last_access FROM embedding_cache").fetchone()[0]
+            conn.close()
+            return value
+
+        antes = last_access()
+        time.sleep(0.01)
+        cache.get("m", "Vendedor")
+        assert last_access() == antes
+
+        cache.flush()
+        assert last_access() > antes
+
+    def test_eviccion_lru(self, tmp_path):
+        cache = EmbeddingCache(path=tmp_path / "cache.db", max_entries=10)
+        model = FakeModel()
+        cache.encode(model, "m", [f"texto {i}" for i in range(12)])
+        assert cache.stats()["entries"] <= 10
+        assert cache.stats()["evictions"] > 0
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del formato columnar de metadata de embeddings."""
+
+import sys
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+import numpy as np
+
+from embedding_store import ColumnarMetadata, columns_dir_for, load_metadata, save_array
+
+
+class TestColumnarMetadata:
+    def test_roundtrip_igual_a_json(self, tmp_path):
+        records = [
+            {"uri": "esco/1", "label": "atención al cliente", "isco_code": "C4222"},
+            {"uri": "esco/2", "label": "ventas"},
+            {"uri": "esco/3", "label": "", "extra": {"peso": 0.5}},
+        ]
+        json_path = tmp_path / "meta.json"
+        json_path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+
+        metadata = load_metadata(json_path)
+        assert isinstance(metadata, ColumnarMetadata)
+        assert columns_dir_for(json_path).exists()
+        assert len(metadata) == 3
+        assert list(metadata) == records
+        assert metadata[-1] == records[-1]
+        assert metadata[0:2] == records[0:2]
+
+    def test_regenera_si_cambia_json(self, tmp_path):
+        json_path = tmp_path / "meta.json"
+        json_path.write_text(json.dumps([{"label": "a"}]), encoding="utf-8")
+        assert len(load_metadata(json_path)) == 1
+
+        json_path.write_text(json.dumps([{"label": "a"}, {"label": "bb"}]), encoding="utf-8")
+        metadata = load_metadata(json_path)
+        assert [m["label"] for m in metadata] == ["a", "bb"]
+
+
+class TestSaveArray:
+    def test_escrituras_concurrentes_del_mismo_artefacto(self, tmp_path):
+        # --workers N en frio: varios procesos regeneran el mismo .npy a la vez
+        path = tmp_path / "emb.int8.npy"
+        array = np.arange(4096, dtype=np.float32)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: save_array(path, array), range(32)))
+
+        assert np.array_equal(np.load(str(path)), array)
+        assert not list(tmp_path.glob("*.tmp"))
@@ -4,8 +4,8 @@
 Test de Validacion con Gold Set Manual
 =======================================
 
-VERSION: 1.1
-FECHA: 2025-12-07
+VERSION: 1.2
+FECHA: 2026-10-18
 
 OBJETIVO:
   Evaluar la precision del matching ESCO usando un gold set
@@ -18,12 +18,23 @@ METRICAS:
 EJECUCION:
   python test_gold_set_manual.py
   python test_gold_set_manual.py --no-save  # Sin guardar en historial
+  python test_gold_set_manual.py --quantization  # Delta por precision de embeddings
 
 CAMBIOS v1.1:
   - Integracion con experiment_logger.py (MOL-48)
   - Guarda resultados automaticamente en metrics/gold_set_history.json
+
+CAMBIOS v1.2:
+  - Modo --quantization: re-matchea el gold set en memoria con embeddings
+    float32 / float16 / int8 (con y sin rescore) y reporta el delta de
+    precision vs el baseline float32 (no escribe en ofertas_esco_matching)
+  - El matcher corre sin memo (memo_size=0): cada variante matchea todas
+    las ofertas. Con rescore, float16/int8 dan los mismos scores que
+    float32 (delta esperado 0); sin rescore el delta es el de la cuantizacion
 """
 
+import sys
+import time
 import sqlite3
 import json
 import struct
@@ -41,6 +52,8 @@ except ImportError:
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DB_PATH = PROJECT_ROOT / 'database' / 'bumeran_scraping.db'
 GOLD_SET_PATH = PROJECT_ROOT / 'database' / 'gold_set_manual_v2.json'
+EMBEDDINGS_DIR = PROJECT_ROOT / 'database' / 'embeddings'
+QUANTIZATION_RESULTS_PATH = PROJECT_ROOT / 'metrics' / 'quantization_benchmark.json'
 
 
 def parse_score(value):
@@ -199,14 +212,169 @@ def run_validation():
     }
 
 
+def run_quantization_benchmark(levels=("float32", "float16", "int8"), save=True):
+    """
+    Delta de precision del gold set por nivel de cuantizacion de embeddings.
+
+    Matchea en memoria (MatcherV3.match, sin persistir) las ofertas del gold
+    set con cada precision y compara contra el baseline float32:
+      - coincidencia_top1: % de ofertas con la misma ocupacion que float32
+      - jaccard_skills: solapamiento medio de skills extraidas
+      - precision_estimada: % del gold set que sigue correcto (esco_ok=True y
+        misma ocupacion que la validada en BD)
+      - ms_busqueda_skills / ms_busqueda_ocupaciones: latencia de index.search
+        por llamada (1 query, como el camino por oferta), sin modelo ni BD
+    """
+    import numpy as np
+    sys.path.insert(0, str(PROJECT_ROOT / 'database'))
+    from match_ofertas_v3 import MatcherV3, _build_oferta_nlp
+    from embedding_store import load_vectors
+    from vector_index import get_index, load_index_config
+
+    print("=" * 70)
+    print("BENCHMARK CUANTIZACION EMBEDDINGS - GOLD SET MANUAL")
+    print("=" * 70)
+
+    gold_set = load_gold_set()
+    ids = [str(g['id_oferta']) for g in gold_set]
+
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    stored = {str(k): v for k, v in get_current_matches(conn.cursor(), ids).items()}
+
+    placeholders = ','.join(['?'] * len(ids))
+    rows = conn.execute(f'''
+        SELECT n.id_oferta, n.titulo_limpio, n.tareas_explicitas,
+               n.area_funcional, n.nivel_seniority, n.sector_empresa,
+               o.titulo as titulo_original
+        FROM ofertas_nlp n
+        LEFT JOIN ofertas o ON CAST(n.id_oferta AS INTEGER) = o.id_oferta
+        WHERE n.id_oferta IN ({placeholders})
+    ''', ids).fetchall()
+    ofertas = [(str(r['id_oferta']), _build_oferta_nlp(r)) for r in rows]
+    print(f"[1] Ofertas del gold set con NLP: {len(ofertas)}/{len(ids)}")
+
+    # Sin memo: cada variante re-matchea de verdad (un hit devolveria el
+    # resultado float32 y los segundos no medirian la busqueda)
+    matcher = MatcherV3(db_conn=conn, memo_size=0)
+    extractor = matcher.skills_extractor
+    skills_path = extractor.embeddings_path
+    occ_path = EMBEDDINGS_DIR / 'esco_occupations_embeddings.npy'
+    base_config = load_index_config()
+
+    variants = []
+    for level in levels:
+        variants.append((level, True))
+        if level != "float32":
+            variants.append((level, False))
+
+    # Queries fijas para medir solo la busqueda: vectores reales de ocupaciones
+    occ_full = load_vectors(occ_path)
+    rng = np.random.default_rng(0)
+    search_queries = np.asarray(occ_full[rng.choice(len(occ_full), min(200, len(occ_full)), replace=False)])
+
+    def ms_por_busqueda(index):
+        index.search(search_queries[0], 5)  # warm-up (page cache)
+        start = time.perf_counter()
+        for query in search_queries:
+            index.search(query, 5)
+        return round((time.perf_counter() - start) * 1000 / len(search_queries), 3)
+
+    baseline = None
+    report = []
+    for level, rescore in variants:
+        config = dict(base_config, precision=level, rescore=rescore)
+        skills_vec = load_vectors(skills_path, precision=level, rescore=rescore)
+        occ_vec = load_vectors(occ_path, precision=level, rescore=rescore)
+        extractor.index = get_index(skills_vec, None, config=config)
+        matcher.occ_index = get_index(occ_vec, None, config=config)
+
+        start = time.perf_counter()
+        preds = {}
+        for id_oferta, oferta_nlp in ofertas:
+            result = matcher.match(oferta_nlp)
+            preds[id_oferta] = (
+                result.esco_label,
+                {s.get('skill_uri') for s in result.skills_extracted}
+            )
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = preds
+
+        same_top1 = sum(1 for i, p in preds.items() if p[0] == baseline[i][0])
+        jaccards = []
+        for i, (_, skills) in preds.items():
+            union = skills | baseline[i][1]
+            jaccards.append(len(skills & baseline[i][1]) / len(union) if union else 1.0)
+
+        still_ok = 0
+        evaluables = 0
+        for gold in gold_set:
+            id_oferta = str(gold['id_oferta'])
+            if id_oferta not in preds or id_oferta not in stored:
+                continue
+            evaluables += 1
+            if gold['esco_ok'] and preds[id_oferta][0] == stored[id_oferta]['esco_label']:
+                still_ok += 1
+
+        memoria_mb = (getattr(skills_vec, 'nbytes', 0) + getattr(occ_vec, 'nbytes', 0)) / 1e6
+        report.append({
+            'precision_embeddings': level,
+            'rescore': rescore,
+            'memoria_mb': round(memoria_mb, 1),
+            'segundos': round(elapsed, 2),
+            'ms_busqueda_skills': ms_por_busqueda(extractor.index),
+            'ms_busqueda_ocupaciones': ms_por_busqueda(matcher.occ_index),
+            'coincidencia_top1': round(same_top1 / len(preds) * 100, 1) if preds else 0.0,
+            'jaccard_skills': round(sum(jaccards) / len(jaccards), 4) if jaccards else 0.0,
+            'precision_estimada': round(still_ok / evaluables * 100, 1) if evaluables else 0.0,
+        })
+
+    matcher.close()
+    conn.close()
+
+    print("\n" + "-" * 88)
+    print(f"{'Variante':<18}{'MB':>8}{'Seg':>8}{'ms/skills':>10}{'ms/occ':>8}"
+          f"{'Top1=f32':>10}{'Jaccard':>9}{'Precision':>11}{'Delta':>8}")
+    print("-" * 88)
+    base_precision = report[0]['precision_estimada'] if report else 0.0
+    for r in report:
+        name = r['precision_embeddings'] + ('' if r['rescore'] else ' sin rescore')
+        delta = r['precision_estimada'] - base_precision
+        r['delta_precision'] = round(delta, 1)
+        print(f"{name:<18}{r['memoria_mb']:>8.1f}{r['segundos']:>8.2f}"
+              f"{r['ms_busqueda_skills']:>10.2f}{r['ms_busqueda_ocupaciones']:>8.2f}{r['coincidencia_top1']:>9.1f}%"
+              f"{r['jaccard_skills']:>9.3f}{r['precision_estimada']:>10.1f}%{delta:>+8.1f}")
+    print("=" * 70)
+
+    if save:
+        QUANTIZATION_RESULTS_PATH.parent.mkdir(exist_ok=True)
+        with open(QUANTIZATION_RESULTS_PATH, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'ofertas': len(ofertas),
+                'resultados': report
+            }, f, ensure_ascii=False, indent=2)
+        print(f"[OK] Resultados guardados en {QUANTIZATION_RESULTS_PATH}")
+
+    return report
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Test de validacion con Gold Set Manual")
     parser.add_argument("--no-save", action="store_true",
                         help="No guardar resultados en historial")
     parser.add_argument("--notes", type=str, default="",
                         help="Notas adicionales para el run")
+    parser.add_argument("--quantization", action="store_true",
+                        help="Benchmark de precision por cuantizacion de embeddings (float32/float16/int8)")
     args = parser.parse_args()
 
+    if args.quantization:
+        run_quantization_benchmark(save=not args.no_save)
+        exit(0)
+
     results = run_validation()
 
     # Guardar en historial (si logger disponible y no --no-save)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del scoring CSR de SkillsBasedMatcher contra el loop de v1.2."""
+
+import sys
+import random
+import sqlite3
+from collections import defaultdict
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+import pytest
+
+from match_by_skills import SkillsBasedMatcher
+
+
+def legacy_match(matcher, associations, extracted_skills, top_n):
+    """Implementacion v1.2 (dict de listas + sorted estable) como referencia."""
+    skill_to_occupations = defaultdict(list)
+    for skill_uri, occ_uri, rel_type in associations:
+        weight = matcher.essential_weight if rel_type == 'essential' else matcher.optional_weight
+        skill_to_occupations[skill_uri].append((occ_uri, weight))
+
+    occupation_scores = defaultdict(float)
+    occupation_skills = defaultdict(list)
+    for skill in extracted_skills:
+        skill_uri = skill.get("skill_uri", "")
+        if not skill_uri:
+            continue
+        origin_weight = matcher.origin_weights.get(skill.get("origen", "titulo"), 1.0)
+        generic_weight = matcher._get_generic_weight(skill.get("skill_esco", ""))
+        for occ_uri, weight in skill_to_occupations.get(skill_uri, []):
+            occupation_scores[occ_uri] += skill.get("score", 0.5) * weight * origin_weight * generic_weight
+            occupation_skills[occ_uri].append(skill.get("skill_esco", ""))
+
+    ranked = sorted(occupation_scores.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    return [(uri, round(score, 4), occupation_skills[uri]) for uri, score in ranked]
+
+
+@pytest.fixture
+def matcher_and_associations():
+    rng = random.Random(11)
+    associations = [
+        (f"skill/{rng.randrange(60)}", f"occ/{rng.randrange(40)}", rng.choice(["essential", "optional"]))
+        for _ in range(800)
+    ]
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE esco_associations (skill_uri TEXT, occupation_uri TEXT, relation_type TEXT)")
+    conn.execute("CREATE TABLE esco_occupations (occupation_uri TEXT, preferred_label_es TEXT, isco_code TEXT)")
+    conn.executemany("INSERT INTO esco_associations VALUES (?, ?, ?)", associations)
+    conn.executemany("INSERT INTO esco_occupations VALUES (?, ?, ?)",
+                     [(f"occ/{i}", f"ocupacion {i}", f"C{1000 + i}") for i in range(40)])
+
+    SkillsBasedMatcher.clear_cache()
+    matcher = SkillsBasedMatcher(db_conn=conn)
+    yield matcher, associations, rng
+    SkillsBasedMatcher.clear_cache()
+    conn.close()
+
+
+class TestSkillsMatcherCSR:
+    def test_igual_a_v12(self, matcher_and_associations):
+        matcher, associations, rng = matcher_and_associations
+        batch = []
+        for _ in range(25):
+            batch.append([
+                {
+                    "skill_uri": f"skill/{rng.randrange(70)}",
+                    "skill_esco": rng.choice(["comunicación", "contabilidad", "ventas"]),
+                    "score": round(rng.uniform(0.6, 0.9), 4),
+                    "origen": rng.choice(["tarea", "titulo"]),
+                }
+                for _ in range(rng.randrange(0, 8))
+            ])
+
+        batch_results = matcher.match_batch(batch, top_n=7)
+        for skills, batch_result in zip(batch, batch_results):
+            expected = legacy_match(matcher, associations, skills, 7)
+            single = matcher.match(skills, top_n=7)
+            for result in (single, batch_result):
+                got = [(r["occupation_uri"], r["score"], r["skills_matched"]) for r in result]
+                assert got == expected
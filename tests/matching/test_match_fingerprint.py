@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests de input_fingerprint para re-matching incremental (--changed-only)."""
+
+import sys
+import sqlite3
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+from match_fingerprint import (
+    build_context_fingerprint, input_fingerprint, ensure_fingerprint_column, stored_fingerprints
+)
+
+VERSIONS = {"matcher": "3.12.0", "modelo": "BAAI/bge-m3"}
+OFERTA = {"titulo_limpio": "vendedor", "tareas_explicitas": "atencion al cliente", "sector_empresa": ""}
+
+
+class TestMatchFingerprint:
+    def test_cambia_con_config_y_version(self, tmp_path):
+        config = tmp_path / "matching_rules_business.json"
+        config.write_text('{"reglas_forzar_isco": {}}', encoding="utf-8")
+        files = ["matching_rules_business.json"]
+
+        base = build_context_fingerprint(VERSIONS, files, tmp_path)
+        assert build_context_fingerprint(VERSIONS, files, tmp_path) == base
+        assert build_context_fingerprint({**VERSIONS, "matcher": "3.13.0"}, files, tmp_path) != base
+
+        config.write_text('{"reglas_forzar_isco": {"R1": {}}}', encoding="utf-8")
+        assert build_context_fingerprint(VERSIONS, files, tmp_path) != base
+
+    def test_cambia_con_campos_nlp(self):
+        fp = input_fingerprint(OFERTA, "ctx")
+        assert input_fingerprint(dict(reversed(list(OFERTA.items()))), "ctx") == fp
+        assert input_fingerprint({**OFERTA, "sector_empresa": "retail"}, "ctx") != fp
+        assert input_fingerprint(OFERTA, "ctx2") != fp
+
+    def test_columna(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE ofertas_esco_matching (id_oferta TEXT PRIMARY KEY)")
+        conn.execute("INSERT INTO ofertas_esco_matching VALUES ('1')")
+        assert ensure_fingerprint_column(conn)
+        assert not ensure_fingerprint_column(conn)
+        assert stored_fingerprints(conn) == {"1": None}
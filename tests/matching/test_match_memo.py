@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del memo de resultados y de compute_match de MatcherV3 (sin modelo ni BD)."""
+
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")  # via skills_implicit_extractor
+
+from match_ofertas_v3 import MatcherV3, MatchResult
+from vector_index import ExactIndex
+from embedding_store import QuantizedVectors, quantize_array
+
+OFERTA = {"titulo_limpio": "vendedor", "tareas_explicitas": "atencion al cliente",
+          "skills_tecnicas_list": '["ventas"]'}
+
+
+def indice(precision="float32"):
+    vectors = np.eye(4, dtype=np.float32)
+    if precision == "float32":
+        return ExactIndex(vectors)
+    codes, scales = quantize_array(vectors, precision)
+    return ExactIndex(QuantizedVectors(codes, precision, scales=scales, full=vectors))
+
+
+@pytest.fixture
+def matcher():
+    """MatcherV3 con solo el estado que usa el memo; cuenta los calculos reales."""
+    m = MatcherV3.__new__(MatcherV3)
+    m.verbose = False
+    m.config_path = "matching_rules_business.json"
+    m.rule_engine = object()
+    m.skills_extractor = SimpleNamespace(index=indice())
+    m.occ_index = indice()
+    m.memo_size = 8
+    m._match_memo = OrderedDict()
+    m._memo_config = None
+    m._memo_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+    m._sinonimos_checked = time.monotonic()
+    m.calculos = []
+
+    def compute(oferta_nlp):
+        m.calculos.append(oferta_nlp["titulo_limpio"])
+        return MatchResult(
+            status="matched", esco_uri="occ/1", esco_label="vendedor", isco_code="5223",
+            score=0.9, metodo="semantico", skills_extracted=[{"skill_esco": "ventas"}],
+            skills_matched=["ventas"], alternativas=[], metadata={"timings_ms": {"titulo": 1.0}}
+        )
+
+    m._compute_uncached = compute
+    return m
+
+
+class TestMatchMemo:
+    def test_hit_con_mismas_entradas(self, matcher):
+        first, _ = matcher.compute_match("1", dict(OFERTA), categorize_skills=False)
+        second, skills = matcher.compute_match("2", dict(OFERTA), categorize_skills=False)
+
+        assert matcher.calculos == ["vendedor"]
+        assert second.isco_code == first.isco_code
+        assert skills == [{"skill_esco": "ventas"}]
+        assert set(second.metadata["timings_ms"]) == {"memo", "total"}
+        stats = matcher.memo_stats()
+        assert (stats["hits"], stats["misses"], stats["writes"], stats["entries"]) == (1, 1, 1, 1)
+
+        matcher.compute_match("3", {**OFERTA, "skills_tecnicas_list": '["caja"]'}, categorize_skills=False)
+        assert matcher.calculos == ["vendedor", "vendedor"]
+
+    def test_memo_desactivado(self, matcher):
+        matcher.memo_size = 0
+        for i in range(3):
+            matcher.compute_match(str(i), dict(OFERTA), categorize_skills=False)
+        assert len(matcher.calculos) == 3
+        assert matcher.memo_stats()["entries"] == 0
+
+    @pytest.mark.parametrize("cambio", ["reglas", "config_path", "indice_skills", "precision_ocupaciones"])
+    def test_cambio_de_config_invalida(self, matcher, cambio):
+        matcher.compute_match("1", dict(OFERTA), categorize_skills=False)
+        if cambio == "reglas":
+            matcher.rule_engine = object()
+        elif cambio == "config_path":
+            matcher.config_path = "otras_reglas.json"
+        elif cambio == "indice_skills":
+            matcher.skills_extractor.index = indice()
+        else:
+            matcher.occ_index = indice("int8")
+
+        matcher.compute_match("2", dict(OFERTA), categorize_skills=False)
+        assert len(matcher.calculos) == 2
+        assert matcher.memo_stats()["entries"] == 1
+
+    def test_resultado_devuelto_es_copia(self, matcher):
+        first, _ = matcher.compute_match("1", dict(OFERTA), categorize_skills=False)
+        first.skills_extracted.append({"skill_esco": "ajena"})
+        first.metadata["modificado"] = True
+
+        second, _ = matcher.compute_match("2", dict(OFERTA), categorize_skills=False)
+        second.skills_matched.append("ajena")
+
+        third, _ = matcher.compute_match("3", dict(OFERTA), categorize_skills=False)
+        assert third.skills_extracted == [{"skill_esco": "ventas"}]
+        assert third.skills_matched == ["ventas"]
+        assert "modificado" not in third.metadata
+        assert third is not second
+
+
+class TestComputeUncached:
+    def test_una_sola_extraccion_de_skills(self, matcher):
+        extracciones = []
+
+        def extract_skills(**kwargs):
+            time.sleep(0.02)
+            extracciones.append(kwargs["titulo_limpio"])
+            return [{"skill_esco": "ventas"}]
+
+        recibidas = []
+
+        def match_stages(oferta_nlp, timer, skills_extracted=None):
+            recibidas.append(skills_extracted)
+            with timer.stage("titulo"):
+                pass
+            return MatchResult(status="semantic", esco_uri="occ/1", esco_label="vendedor", isco_code="5223",
+                               score=0.9, metodo="semantico", skills_extracted=skills_extracted or [],
+                               skills_matched=[], alternativas=[], metadata={})
+
+        matcher.skills_extractor = SimpleNamespace(index=indice(), extract_skills=extract_skills)
+        matcher._match_stages = match_stages
+
+        result = MatcherV3._compute_uncached(matcher, dict(OFERTA))
+
+        assert extracciones == ["vendedor"]
+        assert recibidas == [[{"skill_esco": "ventas"}]]
+        assert result.skills_extracted == [{"skill_esco": "ventas"}]
+        assert 20 <= result.metadata["timings_ms"]["extraccion_skills"] < 40
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del pipeline de matching (paginas keyset, workers vs serial, MatchResultWriter) con BD chica."""
+
+import multiprocessing
+import os
+import sqlite3
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+
+import pytest
+
+pytest.importorskip("sentence_transformers")  # via skills_implicit_extractor
+
+import match_ofertas_v3
+from match_ofertas_v3 import MatchResult, _iter_offer_pages, _build_oferta_nlp
+from match_fingerprint import input_fingerprint
+from run_tracking import RunTracker
+
+N_OFERTAS = 23
+
+QUERY = '''
+    SELECT n.id_oferta, n.titulo_limpio, n.tareas_explicitas,
+           n.area_funcional, n.nivel_seniority, n.sector_empresa,
+           o.titulo as titulo_original
+    FROM ofertas_nlp n
+    LEFT JOIN ofertas o ON CAST(n.id_oferta AS INTEGER) = o.id_oferta
+    WHERE 1=1
+'''
+
+
+def crear_db(path, n, titulos=None):
+    """Tablas que leen/escriben el pipeline y MatchResultWriter."""
+    titulos = titulos or {}
+    conn = sqlite3.connect(str(path))
+    conn.executescript('''
+        CREATE TABLE ofertas (id_oferta INTEGER PRIMARY KEY, titulo TEXT);
+        CREATE TABLE ofertas_nlp (id_oferta TEXT PRIMARY KEY, titulo_limpio TEXT, tareas_explicitas TEXT,
+                                  area_funcional TEXT, nivel_seniority TEXT, sector_empresa TEXT);
+        CREATE TABLE ofertas_esco_matching (
+            id_oferta TEXT PRIMARY KEY, esco_occupation_uri TEXT, esco_occupation_label TEXT,
+            occupation_match_score REAL, occupation_match_method TEXT, isco_code TEXT, isco_label TEXT,
+            skills_oferta_json TEXT, skills_matched_essential TEXT, skills_demandados_total INTEGER,
+            skills_matcheados_esco INTEGER, matching_timestamp TEXT, matching_version TEXT, run_id TEXT,
+            estado_validacion TEXT, isco_regla TEXT, isco_semantico TEXT, score_semantico REAL,
+            regla_aplicada TEXT, dual_coinciden INTEGER, decision_metodo TEXT
+        );
+        CREATE TABLE ofertas_matching_history (id_oferta TEXT, run_id TEXT, isco_code TEXT,
+                                               isco_label TEXT, match_method TEXT, score REAL);
+        CREATE TABLE run_ofertas (run_id TEXT, id_oferta TEXT, PRIMARY KEY (run_id, id_oferta));
+        CREATE TABLE ofertas_esco_skills_detalle (
+            id_oferta TEXT, skill_mencionado TEXT, skill_tipo_fuente TEXT, esco_skill_label TEXT,
+            match_score REAL, match_method TEXT, esco_skill_type TEXT, source_classification TEXT
+        );
+    ''')
+    for i in range(n):
+        id_oferta = 1000 + i
+        conn.execute("INSERT INTO ofertas VALUES (?, ?)", (id_oferta, f"Puesto {i}"))
+        conn.execute("INSERT INTO ofertas_nlp VALUES (?, ?, 'tareas', '', '', '')",
+                     (str(id_oferta), titulos.get(i, f"puesto {i}")))
+    conn.commit()
+    conn.close()
+
+
+def resultado(id_oferta):
+    n = int(id_oferta)
+    skills = [{"skill_esco": f"skill {n % 5}", "origen": "tarea", "score": 0.8}]
+    return MatchResult(
+        status="semantic", esco_uri=f"occ/{n % 7}", esco_label=f"ocupacion {n % 7}",
+        isco_code=str(2000 + n % 7), score=round(0.5 + (n % 100) / 1000, 4), metodo="semantico",
+        skills_extracted=skills, skills_matched=[], alternativas=[],
+        metadata={"timings_ms": {"titulo": 1.0, "total": 1.0}}
+    )
+
+
+class FakeExtractor:
+    embedding_cache = None
+
+    def clear_prefetch(self):
+        pass
+
+    def cache_stats(self):
+        return None
+
+
+class FakeMatcher:
+    """Misma interfaz que usan _compute_chunk y _run_matching_serial; sin modelo."""
+
+    VERSION = match_ofertas_v3.MatcherV3.VERSION
+
+    def __init__(self, db_conn=None, verbose=False, **kwargs):
+        self.skills_extractor = FakeExtractor()
+
+    def reset_memo_stats(self):
+        pass
+
+    def memo_stats(self):
+        return {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "entries": 0, "hit_rate": 0.0}
+
+    def prefetch_embeddings(self, ofertas, batch_size=None):
+        pass
+
+    def compute_match(self, id_oferta, oferta_nlp):
+        if oferta_nlp["titulo_limpio"] == "muere":
+            os._exit(1)  # worker caido (OOM / segfault)
+        if oferta_nlp["titulo_limpio"] == "falla":
+            raise ValueError("oferta invalida")
+        result = resultado(id_oferta)
+        return result, result.skills_extracted
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_matcher(monkeypatch):
+    monkeypatch.setattr(match_ofertas_v3, "MatcherV3", FakeMatcher)
+    monkeypatch.setattr(match_ofertas_v3, "prepare_artifacts", lambda *args, **kwargs: None)
+
+
+def nuevas_stats():
+    return {'total': 0, 'procesadas': 0, 'errores': 0, 'skills_totales': 0, 'prefetch_errores': 0}
+
+
+def correr(db, workers=None, page_size=7, batch_size=4):
+    conn = sqlite3.connect(str(db))
+    conn.row_factory = sqlite3.Row
+    stats = nuevas_stats()
+    pages = _iter_offer_pages(conn, QUERY, [], page_size, None, "ctx", stats)
+    if workers:
+        match_ofertas_v3._run_matching_workers(pages, conn, str(db), "run-1", workers, batch_size, stats,
+                                               commit_every=5)
+    else:
+        match_ofertas_v3._run_matching_serial(pages, conn, "run-1", batch_size, stats, commit_every=5)
+    conn.close()
+    return stats
+
+
+def persistido(db):
+    conn = sqlite3.connect(str(db))
+    matching = conn.execute('''
+        SELECT id_oferta, esco_occupation_uri, isco_code, occupation_match_score, skills_oferta_json,
+               run_id, input_fingerprint
+        FROM ofertas_esco_matching ORDER BY id_oferta
+    ''').fetchall()
+    history = conn.execute("SELECT id_oferta, isco_code FROM ofertas_matching_history ORDER BY rowid").fetchall()
+    skills = conn.execute("SELECT * FROM ofertas_esco_skills_detalle ORDER BY rowid").fetchall()
+    run = conn.execute("SELECT id_oferta FROM run_ofertas ORDER BY rowid").fetchall()
+    conn.close()
+    return matching, history, skills, run
+
+
+fork_only = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="los workers heredan el MatcherV3 falso solo con fork"
+)
+
+
+@fork_only
+class TestWorkers:
+    def test_workers_igual_a_serial(self, tmp_path, fake_matcher):
+        crear_db(tmp_path / "serial.db", N_OFERTAS, {5: "falla"})
+        crear_db(tmp_path / "workers.db", N_OFERTAS, {5: "falla"})
+
+        serial = correr(tmp_path / "serial.db")
+        paralelo = correr(tmp_path / "workers.db", workers=2)
+
+        for key in ('total', 'procesadas', 'errores', 'skills_totales'):
+            assert paralelo[key] == serial[key]
+        assert (serial['procesadas'], serial['errores']) == (N_OFERTAS - 1, 1)
+
+        # Mismas filas y mismo orden de escritura (history / run_ofertas / skills por rowid)
+        assert persistido(tmp_path / "workers.db") == persistido(tmp_path / "serial.db")
+
+    def test_worker_caido_cuenta_errores(self, tmp_path, fake_matcher):
+        crear_db(tmp_path / "t.db", N_OFERTAS, {9: "muere"})
+
+        stats = correr(tmp_path / "t.db", workers=2)
+
+        assert stats['total'] == N_OFERTAS
+        assert stats['errores'] > 0
+        assert stats['procesadas'] + stats['errores'] == N_OFERTAS
+        matching, _, _, _ = persistido(tmp_path / "t.db")
+        assert len(matching) == stats['procesadas']
+        assert "1009" not in {row[0] for row in matching}
+
+
+class TestMatchResultWriter:
+    def test_buffer_escribe_cada_commit_every(self, tmp_path):
+        crear_db(tmp_path / "w.db", 0)
+        conn = sqlite3.connect(str(tmp_path / "w.db"))
+        writer = match_ofertas_v3.MatchResultWriter(conn, version="3.x", commit_every=3)
+
+        for id_oferta in ("1", "2"):
+            writer.add(id_oferta, resultado(id_oferta), resultado(id_oferta).skills_extracted, run_id="r")
+        assert conn.execute("SELECT COUNT(*) FROM ofertas_esco_matching").fetchone()[0] == 0
+
+        writer.add("3", resultado("3"), [], run_id="r")
+        assert writer.written == 3
+        writer.add("4", resultado("4"), [])
+        writer.flush()
+
+        assert writer.written == 4
+        assert conn.execute("SELECT COUNT(*) FROM ofertas_esco_matching").fetchone()[0] == 4
+        assert conn.execute("SELECT COUNT(*) FROM ofertas_esco_skills_detalle").fetchone()[0] == 2
+        assert conn.execute("SELECT id_oferta FROM run_ofertas").fetchall() == [("1",), ("2",), ("3",)]
+        conn.close()
+
+    def test_lote_fallido_rollback_y_reintento_por_oferta(self, tmp_path):
+        crear_db(tmp_path / "w.db", 0)
+        conn = sqlite3.connect(str(tmp_path / "w.db"))
+        # Una oferta invalida: el history de "13" viola el CHECK y hace fallar el executemany
+        conn.execute("DROP TABLE ofertas_matching_history")
+        conn.execute('''CREATE TABLE ofertas_matching_history (id_oferta TEXT CHECK (id_oferta != '13'),
+                        run_id TEXT, isco_code TEXT, isco_label TEXT, match_method TEXT, score REAL)''')
+        writer = match_ofertas_v3.MatchResultWriter(conn, version="3.x", commit_every=10)
+
+        ids = ["11", "12", "13", "14"]
+        for id_oferta in ids:
+            writer.add(id_oferta, resultado(id_oferta), resultado(id_oferta).skills_extracted, run_id="r")
+        assert writer.flush() == 3
+
+        assert (writer.written, writer.failed) == (3, 1)
+        guardadas = [row[0] for row in conn.execute("SELECT id_oferta FROM ofertas_esco_matching ORDER BY 1")]
+        assert guardadas == ["11", "12", "14"]
+        # Rollback completo de la oferta fallida: ni matching ni skills ni run_ofertas a medias
+        for table in ("ofertas_matching_history", "ofertas_esco_skills_detalle", "run_ofertas"):
+            ids_tabla = [row[0] for row in conn.execute(f"SELECT id_oferta FROM {table} ORDER BY 1")]
+            assert ids_tabla == ["11", "12", "14"], table
+        conn.close()
+
+
+def paginas(conn, page_size, limit=None, changed_only=False, tracker=None, run_id=None):
+    conn.row_factory = sqlite3.Row
+    stats = nuevas_stats()
+    pages = _iter_offer_pages(conn, QUERY, [], page_size, limit, "ctx", stats,
+                              changed_only=changed_only, tracker=tracker, run_id=run_id)
+    return pages, stats
+
+
+def ids_de(page):
+    return [id_oferta for id_oferta, _, _ in page]
+
+
+class TestOfferPages:
+    def test_keyset_cruza_paginas(self, tmp_path):
+        crear_db(tmp_path / "p.db", N_OFERTAS)
+        conn = sqlite3.connect(str(tmp_path / "p.db"))
+
+        pages, stats = paginas(conn, page_size=5)
+        leidas = [ids_de(page) for page in pages]
+        assert [len(page) for page in leidas] == [5, 5, 5, 5, 3]
+        assert sum(leidas, []) == [str(1000 + i) for i in range(N_OFERTAS)]
+        assert stats['total'] == N_OFERTAS
+
+        pages, stats = paginas(conn, page_size=5, limit=12)
+        assert [len(ids_de(page)) for page in pages] == [5, 5, 2]
+        assert stats['total'] == 12
+        conn.close()
+
+    def test_ofertas_insertadas_durante_el_scan(self, tmp_path):
+        crear_db(tmp_path / "p.db", N_OFERTAS)
+        conn = sqlite3.connect(str(tmp_path / "p.db"))
+        otra = sqlite3.connect(str(tmp_path / "p.db"))
+
+        pages, stats = paginas(conn, page_size=5)
+        leidas = ids_de(next(pages))
+        # Una detras del cursor (no se relee) y una adelante (entra en su pagina)
+        otra.executemany("INSERT INTO ofertas_nlp VALUES (?, 'nueva', '', '', '', '')", [("0999",), ("2000",)])
+        otra.commit()
+        for page in pages:
+            leidas += ids_de(page)
+
+        assert leidas == [str(1000 + i) for i in range(N_OFERTAS)] + ["2000"]
+        assert stats['total'] == N_OFERTAS + 1
+        otra.close()
+        conn.close()
+
+    def test_changed_only_salta_paginas_sin_cambios(self, tmp_path):
+        crear_db(tmp_path / "p.db", N_OFERTAS)
+        conn = sqlite3.connect(str(tmp_path / "p.db"))
+        conn.row_factory = sqlite3.Row
+        conn.execute("ALTER TABLE ofertas_esco_matching ADD COLUMN input_fingerprint TEXT")
+        # Las primeras 12 ya tienen la huella vigente (dos paginas enteras y parte de la tercera)
+        for row in conn.execute(QUERY + " ORDER BY n.id_oferta LIMIT 12").fetchall():
+            conn.execute("INSERT INTO ofertas_esco_matching (id_oferta, input_fingerprint) VALUES (?, ?)",
+                         (row['id_oferta'], input_fingerprint(_build_oferta_nlp(row), "ctx")))
+        conn.commit()
+
+        pages, stats = paginas(conn, page_size=5, limit=6, changed_only=True)
+        assert sum((ids_de(page) for page in pages), []) == [str(1000 + i) for i in range(12, 18)]
+        assert stats['sin_cambios'] == 12
+        assert stats['total'] == 6
+        conn.close()
+
+    def test_registra_el_run_por_pagina(self, tmp_path):
+        crear_db(tmp_path / "p.db", N_OFERTAS)
+        conn = sqlite3.connect(str(tmp_path / "p.db"))
+        conn.execute("CREATE TABLE pipeline_runs (run_id TEXT PRIMARY KEY, ofertas_count INTEGER)")
+        conn.execute("INSERT INTO pipeline_runs VALUES ('run-1', 0)")
+        conn.commit()
+        tracker = RunTracker(db_path=tmp_path / "p.db")
+
+        def registrado():
+            count = conn.execute("SELECT ofertas_count FROM pipeline_runs").fetchone()[0]
+            return count, conn.execute("SELECT COUNT(*) FROM run_ofertas").fetchone()[0]
+
+        pages, stats = paginas(conn, page_size=5, tracker=tracker, run_id="run-1")
+        emitidas = 0
+        for page in pages:
+            emitidas += len(page)
+            # La pagina ya esta en el run antes de procesarse
+            assert registrado() == (emitidas, emitidas)
+        assert emitidas == N_OFERTAS
+
+        # Reintento de una pagina ya registrada: no suma ofertas_count
+        assert tracker.register_offers("run-1", ["1000", "1001", "2000"], conn=conn) == 1
+        assert registrado() == (N_OFERTAS + 1, N_OFERTAS + 1)
+        conn.close()
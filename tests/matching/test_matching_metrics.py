@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del histograma de latencia por etapa (pipeline_runs.latencias)."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+from matching_metrics import StageTimer, LatencyHistogram, BUCKET_FACTOR
+
+
+class TestMatchingMetrics:
+    def test_stage_timer_acumula(self):
+        timer = StageTimer()
+        timer.add("reglas", 1.0)
+        timer.add("reglas", 0.5)
+        with timer.stage("diccionario"):
+            pass
+        timings = timer.as_dict()
+        assert timings["reglas"] == 1.5
+        assert timings["total"] >= 1.5
+
+    def test_percentiles_dentro_del_error_de_bucket(self):
+        hist = LatencyHistogram()
+        valores = [float(ms) for ms in range(1, 1001)]
+        for ms in valores:
+            hist.record("embedding_titulo", ms)
+
+        resumen = hist.summary()["embedding_titulo"]
+        assert resumen["count"] == 1000
+        assert resumen["max_ms"] == 1000.0
+        for p, exacto in ((50, 500.0), (95, 950.0), (99, 990.0)):
+            estimado = resumen[f"p{p}_ms"]
+            assert exacto <= estimado <= exacto * BUCKET_FACTOR
+
+    def test_orden_de_etapas(self):
+        hist = LatencyHistogram()
+        hist.add({"reglas": 1.0, "total": 2.0, "extraccion_skills": 1.0})
+        assert list(hist.summary()) == ["extraccion_skills", "reglas", "total"]
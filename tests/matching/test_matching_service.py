@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests de matching_service: servidor real en un puerto libre con un MatcherV3 falso."""
+
+import json
+import sqlite3
+import sys
+import threading
+import urllib.request
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+import pytest
+
+pytest.importorskip("sentence_transformers")  # via skills_implicit_extractor
+
+import match_ofertas_v3
+import matching_service
+from match_ofertas_v3 import MatchResult, matching_context_fingerprint
+from matching_service import MatchingService, MatchingServiceError, connect_service, create_server, get_matcher
+
+
+class FakeMatcher:
+    VERSION = match_ofertas_v3.MatcherV3.VERSION
+    cargados = 0
+
+    def __init__(self, db_conn=None, db_path=None, verbose=False, **kwargs):
+        FakeMatcher.cargados += 1
+
+    def match(self, oferta_nlp):
+        if oferta_nlp.get("titulo_limpio") == "falla":
+            raise ValueError("oferta invalida")
+        return MatchResult(
+            status="semantic", esco_uri="occ/1", esco_label=f"ocupacion {oferta_nlp['titulo_limpio']}",
+            isco_code="5223", score=0.9, metodo="semantico",
+            skills_extracted=[{"skill_esco": "ventas", "score": 0.8}], skills_matched=["ventas"],
+            alternativas=[], metadata={"timings_ms": {"total": 1.0}}
+        )
+
+    def compute_match(self, id_oferta, oferta_nlp, categorize_skills=True):
+        result = self.match(oferta_nlp)
+        return result, result.skills_extracted
+
+    def memo_stats(self):
+        return {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "entries": 0, "hit_rate": 0.0}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def servicio(tmp_path, monkeypatch):
+    """Servicio escuchando en 127.0.0.1:<puerto libre>; MOL_MATCHING_SERVICE apunta ahi."""
+    monkeypatch.setattr(match_ofertas_v3, "MatcherV3", FakeMatcher)
+    db_path = tmp_path / "service.db"
+    sqlite3.connect(str(db_path)).close()
+
+    service = MatchingService(db_path=db_path)
+    server = create_server(service, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setenv(matching_service.SERVICE_URL_ENV, url)
+    yield service, url, db_path
+    server.shutdown()
+    server.server_close()
+    service.conn.close()
+
+
+class TestMatchingService:
+    def test_health(self, servicio):
+        service, url, db_path = servicio
+        with urllib.request.urlopen(f"{url}/health", timeout=5) as response:
+            health = json.loads(response.read())
+        assert health["status"] == "ok"
+        assert health["version"] == FakeMatcher.VERSION
+        assert health["context"] == matching_context_fingerprint()
+        assert health["db_path"] == str(db_path.resolve())
+
+    def test_match_via_cliente(self, servicio):
+        _, url, db_path = servicio
+        client = connect_service(context=matching_context_fingerprint(), db_path=db_path)
+        assert client is not None and client.url == url
+
+        result = client.match({"titulo_limpio": "vendedor"})
+        assert isinstance(result, MatchResult)
+        assert result.esco_label == "ocupacion vendedor"
+        assert result.skills_extracted == [{"skill_esco": "ventas", "score": 0.8}]
+
+        result, skills = client.compute_match("1", {"titulo_limpio": "cajero"})
+        assert result.esco_label == "ocupacion cajero"
+        assert skills == [{"skill_esco": "ventas", "score": 0.8}]
+
+        # Error del matcher -> 500 con el detalle; el servicio sigue atendiendo
+        with pytest.raises(MatchingServiceError, match="oferta invalida"):
+            client.match({"titulo_limpio": "falla"})
+        with pytest.raises(MatchingServiceError, match="Operacion desconocida"):
+            client._post("no_existe", {})
+        assert client.match({"titulo_limpio": "chofer"}).esco_label == "ocupacion chofer"
+
+    def test_rechaza_version_configs_o_bd_distintos(self, servicio, monkeypatch, tmp_path):
+        service, _, db_path = servicio
+        context = matching_context_fingerprint()
+
+        assert connect_service(context="otra-huella", db_path=db_path) is None
+        assert connect_service(context=context, db_path=tmp_path / "otra.db") is None
+
+        health = service.health
+        monkeypatch.setattr(service, "health", lambda: {**health(), "version": "3.0.0"})
+        assert connect_service(context=context, db_path=db_path) is None
+
+    def test_get_matcher_cae_a_local(self, servicio, monkeypatch):
+        _, _, db_path = servicio
+        conn = sqlite3.connect(str(db_path))
+        assert isinstance(get_matcher(db_conn=conn), matching_service.MatchingServiceClient)
+
+        cargados = FakeMatcher.cargados
+        monkeypatch.setenv(matching_service.SERVICE_URL_ENV, "off")
+        assert isinstance(get_matcher(db_conn=conn), FakeMatcher)
+        assert FakeMatcher.cargados == cargados + 1
+        conn.close()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests de normalizacion_arg con automata (v1.2) vs regex por termino (v1.1)."""
+
+import re
+import sys
+import random
+import sqlite3
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+import pytest
+
+import normalizacion_arg
+
+
+def legacy_normalizar(diccionario, titulo):
+    """normalizar_termino_argentino v1.1 (sorted + regex por termino)."""
+    if not titulo:
+        return None, None, None, titulo
+    titulo_lower = titulo.lower().strip()
+    for termino in sorted(diccionario.keys(), key=len, reverse=True):
+        pattern = r'\b' + re.escape(termino) + r'\b'
+        if re.search(pattern, titulo_lower):
+            data = diccionario[termino]
+            titulo_normalizado = titulo
+            if data['esco_label']:
+                titulo_normalizado = re.sub(pattern, data['esco_label'], titulo_lower,
+                                            flags=re.IGNORECASE).capitalize()
+            return termino, data['isco_target'], data['esco_label'], titulo_normalizado
+    return None, None, None, titulo
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE diccionario_arg_esco (
+            termino_argentino TEXT, isco_target TEXT,
+            esco_preferred_label TEXT, esco_terms_json TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO diccionario_arg_esco VALUES (?, ?, ?, NULL)",
+        [("mozo", "5131", "camarero"), ("moza", "5131", "camarera"),
+         ("repositor", "5223", "reponedor de tienda"), ("chofer", "8322", "conductor"),
+         ("chofer de camion", "8332", "conductor de camion"), ("cadete", "9621", ""),
+         ("atencion al cliente", "4222", "empleado de atencion al cliente")]
+    )
+    monkeypatch.setattr(normalizacion_arg, "_DICCIONARIO_CACHE", None)
+    monkeypatch.setattr(normalizacion_arg, "FIRMA_RECHECK_SEGUNDOS", 0.0)
+    yield conn
+    conn.close()
+
+
+class TestNormalizacionArg:
+    def test_paridad_con_regex(self, conn):
+        diccionario = normalizacion_arg._cargar_diccionario(conn)
+        palabras = ["mozo", "moza", "mozos", "repositor", "chofer", "de", "camion",
+                    "cadete", "atencion", "al", "cliente", "externo", "/", "-", "(zona norte)"]
+        rng = random.Random(11)
+        titulos = ["", "Mozo/Moza para restaurant", "Chofer de camion", "Analista"]
+        titulos += [" ".join(rng.choice(palabras) for _ in range(rng.randrange(1, 6))) for _ in range(500)]
+        for titulo in titulos:
+            assert normalizacion_arg.normalizar_termino_argentino(titulo, conn) == \
+                legacy_normalizar(diccionario, titulo)
+
+    def test_reconstruye_si_cambia_tabla(self, conn):
+        assert normalizacion_arg.normalizar_termino_argentino("Fletero", conn)[0] is None
+        conn.execute("INSERT INTO diccionario_arg_esco VALUES ('fletero', '8322', 'conductor', NULL)")
+        assert normalizacion_arg.normalizar_termino_argentino("Fletero", conn)[:2] == ("fletero", "8322")
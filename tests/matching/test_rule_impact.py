@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del pre-filtro de impacto: toda oferta cuyo resultado de reglas cambia queda seleccionada."""
+
+import sys
+import copy
+import json
+import random
+from pathlib import Path
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT / "database"))
+sys.path.insert(0, str(ROOT / "scripts" / "matching"))
+
+from business_rules_engine import CompiledRuleEngine
+from rule_impact import diff_rules, diff_sectors, select_affected_offers, rule_terms
+
+
+def _load(name):
+    with open(ROOT / "config" / name, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _oferta_nlp(oferta):
+    return {
+        "titulo_limpio": oferta["titulo_limpio"],
+        "titulo": oferta["titulo_original"] or oferta["titulo_limpio"],
+        "tareas_explicitas": oferta["tareas_explicitas"],
+        "area_funcional": "",
+        "sector_empresa": oferta["sector_empresa"],
+    }
+
+
+class TestRuleImpact:
+    def test_seleccion_es_superconjunto(self):
+        rules = _load("matching_rules_business.json")
+        sector_config = _load("sector_isco_compatibilidad.json")
+        rng = random.Random(23)
+
+        reglas = [r for r in rules["reglas_forzar_isco"].values() if isinstance(r, dict)]
+        vocab = sorted({t for r in reglas for t in rule_terms(r)}) + ["analista", "de", "senior"]
+
+        ofertas = []
+        for i in range(1500):
+            titulo = " ".join(rng.choice(vocab) for _ in range(rng.randrange(1, 4)))
+            ofertas.append({
+                "id_oferta": str(i),
+                "titulo_limpio": titulo,
+                "titulo_original": titulo + " " + rng.choice(vocab),
+                "tareas_explicitas": " ".join(rng.choice(vocab) for _ in range(rng.randrange(0, 3))),
+                "sector_empresa": rng.choice(["", "Retail", "IT", "Salud"]),
+                "regla_aplicada": None,
+            })
+
+        old_engine = CompiledRuleEngine(rules)
+        rule_ids = [k for k, v in rules["reglas_forzar_isco"].items() if isinstance(v, dict)]
+
+        for _ in range(5):
+            new_rules = copy.deepcopy(rules)
+            for rule_id in rng.sample(rule_ids, 3):
+                rule = new_rules["reglas_forzar_isco"][rule_id]
+                cambio = rng.choice(["prioridad", "termino", "desactivar", "borrar"])
+                if cambio == "prioridad":
+                    rule["prioridad"] = rng.randrange(0, 10)
+                elif cambio == "termino":
+                    rule.setdefault("condicion", {}).setdefault("titulo_contiene_alguno", []).append(rng.choice(vocab))
+                elif cambio == "desactivar":
+                    rule["activa"] = not rule.get("activa", False)
+                else:
+                    del new_rules["reglas_forzar_isco"][rule_id]
+
+            new_engine = CompiledRuleEngine(new_rules)
+            rules_diff = diff_rules(rules, new_rules)
+            sectors_diff = diff_sectors(sector_config, sector_config)
+            selected = select_affected_offers(ofertas, rules_diff, sectors_diff, sector_config, sector_config)
+
+            assert not selected["sector"]
+            for oferta in ofertas:
+                nlp = _oferta_nlp(oferta)
+                antes = [(rid, r) for rid, r in old_engine.matching_rules(nlp)]
+                despues = [(rid, r) for rid, r in new_engine.matching_rules(nlp)]
+                if antes != despues:
+                    assert oferta["id_oferta"] in selected["terminos"]
+
+    def test_sector_alias(self):
+        old = {"sectores": {"Tecnologia": {"isco_compatibles": ["25"]}, "Retail": {"isco_compatibles": ["52"]}},
+               "aliases": {"IT": "Tecnologia"}}
+        new = copy.deepcopy(old)
+        new["aliases"]["IT"] = "Retail"
+        ofertas = [
+            {"id_oferta": "1", "sector_empresa": "IT"},
+            {"id_oferta": "2", "sector_empresa": "Tecnologia"},
+        ]
+        selected = select_affected_offers(ofertas, diff_rules({}, {}), diff_sectors(old, new), old, new)
+        assert selected["sector"] == {"1"}
+
+    def test_isco_guardado(self):
+        old = {"reglas_forzar_isco": {"R1": {"condicion": {"titulo_contiene_alguno": ["chofer"]},
+                                             "accion": {"forzar_isco": "8322"}}}}
+        new = copy.deepcopy(old)
+        new["reglas_forzar_isco"]["R1"]["accion"]["forzar_isco"] = "8331"
+        ofertas = [
+            {"id_oferta": "1", "titulo_limpio": "conductor", "isco_code": "C8322"},
+            {"id_oferta": "2", "titulo_limpio": "conductor", "isco_code": "8331"},
+            {"id_oferta": "3", "titulo_limpio": "conductor", "isco_code": "8332"},
+            {"id_oferta": "4", "titulo_limpio": "conductor", "isco_code": None},
+        ]
+        rules_diff = diff_rules(old, new)
+        assert rules_diff["iscos"] == {"8322", "8331"}
+        selected = select_affected_offers(ofertas, rules_diff, diff_sectors({}, {}), {}, {})
+        assert selected["isco"] == {"1", "2"}
+        assert not selected["terminos"]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del indice vectorial (exact / ivf) sobre embeddings sinteticos."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+import numpy as np
+import pytest
+
+from embedding_store import load_vectors
+from vector_index import ExactIndex, IVFIndex, exact_topk, get_index, recall_report
+
+
+@pytest.fixture
+def embeddings():
+    rng = np.random.default_rng(7)
+    emb = rng.standard_normal((2000, 64)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+class TestExactIndex:
+    def test_igual_a_argsort_legacy(self, embeddings):
+        index = ExactIndex(embeddings)
+        query = embeddings[10] + 0.1 * embeddings[20]
+        scores, indices = index.search(query, 5)
+
+        similarities = np.dot(embeddings, query)
+        legacy = np.argsort(similarities)[-5:][::-1]
+        assert indices[0].tolist() == legacy.tolist()
+        assert np.array_equal(scores[0], similarities[legacy])
+
+    def test_bloques_bit_identico_a_legacy(self, embeddings):
+        rng = np.random.default_rng(3)
+        queries = rng.standard_normal((37, 64)).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        # Bloques chicos para forzar varias pasadas de GEMM
+        scores, indices = exact_topk(embeddings, queries, 3, query_block=8, row_block=300)
+
+        for i, query in enumerate(queries):
+            similarities = np.dot(embeddings, query)
+            legacy = np.argsort(similarities)[-3:][::-1]
+            assert indices[i].tolist() == legacy.tolist()
+            assert np.array_equal(scores[i], similarities[legacy])
+
+
+class TestQuantizedSearch:
+    def test_int8_con_rescore_igual_a_float32(self, embeddings, tmp_path):
+        npy = tmp_path / "emb.npy"
+        np.save(str(npy), embeddings)
+        queries = embeddings[:20] + 0.05
+
+        exact_scores, exact_ids = ExactIndex(embeddings).search(queries, 5)
+        for precision in ("float16", "int8"):
+            vectors = load_vectors(npy, precision=precision, rescore=True)
+            assert vectors.nbytes < embeddings.nbytes
+            scores, ids = ExactIndex(vectors).search(queries, 5)
+            assert ids.tolist() == exact_ids.tolist()
+            assert np.array_equal(scores, exact_scores)
+
+    def test_dot_block_igual_a_decodificar(self, embeddings, tmp_path):
+        npy = tmp_path / "emb.npy"
+        np.save(str(npy), embeddings)
+        queries = embeddings[:4]
+        for precision in ("float16", "int8"):
+            vectors = load_vectors(npy, precision=precision, rescore=False)
+            buffer = np.empty((100, embeddings.shape[1]), dtype=np.float32)
+            sims = vectors.dot_block(queries, 300, 400, buffer)
+            assert np.allclose(sims, queries @ vectors.block(300, 400).T, atol=1e-5)
+
+    def test_int8_sin_rescore_aproximado(self, embeddings, tmp_path):
+        npy = tmp_path / "emb.npy"
+        np.save(str(npy), embeddings)
+        vectors = load_vectors(npy, precision="int8", rescore=False)
+        report = recall_report(ExactIndex(vectors, rescore=False), embeddings[:50], k=5,
+                               exact=ExactIndex(embeddings))
+        assert report["recall@5"] >= 0.9
+
+
+class TestIVFIndex:
+    def test_nprobe_total_es_exacto(self, embeddings):
+        index = IVFIndex.build(embeddings, nlist=20, nprobe=20, n_iter=3)
+        report = recall_report(index, embeddings[:50], k=10)
+        assert report["recall@10"] == 1.0
+
+    def test_persistencia(self, embeddings, tmp_path):
+        npy = tmp_path / "emb.npy"
+        np.save(str(npy), embeddings)
+        config = {"backend": "ivf", "ivf": {"nlist": 16, "nprobe": 4, "n_iter": 2}}
+
+        built = get_index(embeddings, npy, config=config)
+        assert (tmp_path / "emb.ivf.npz").exists()
+
+        loaded = get_index(embeddings, npy, config=config)
+        _, a = built.search(embeddings[:5], 3)
+        _, b = loaded.search(embeddings[:5], 3)
+        assert a.tolist() == b.tolist()
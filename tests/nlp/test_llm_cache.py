@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del cache de respuestas LLM (sin Ollama)."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+from llm_cache import LLMCache, cache_key
+
+OPTIONS = {"temperature": 0.0, "num_ctx": 4096}
+
+
+class TestLLMCache:
+    def test_clave_normaliza_prompt(self):
+        a = cache_key("v1", "qwen2.5:7b", OPTIONS, "Vendedor\n\n  salón")
+        b = cache_key("v1", "qwen2.5:7b", {"num_ctx": 4096, "temperature": 0.0}, "Vendedor salón ")
+        assert a == b
+        assert a != cache_key("v2", "qwen2.5:7b", OPTIONS, "Vendedor salón")
+        assert a != cache_key("v1", "qwen2.5:14b", OPTIONS, "Vendedor salón")
+
+    def test_hits_y_misses(self, tmp_path):
+        cache = LLMCache(path=tmp_path / "llm.db")
+        key = cache.make_key("v1", "m", OPTIONS, "prompt")
+        assert cache.get(key) is None
+
+        cache.put(key, "v1", "m", '{"provincia": "Cordoba"}')
+        assert cache.get(key) == '{"provincia": "Cordoba"}'
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["writes"]) == (1, 1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_eviccion_por_version(self, tmp_path):
+        cache = LLMCache(path=tmp_path / "llm.db")
+        for version in ("v1", "v1", "v2"):
+            prompt = f"{version}-{cache.stats()['entries']}"
+            cache.put(cache.make_key(version, "m", OPTIONS, prompt), version, "m", "{}")
+
+        assert cache.version_counts() == {"v1": 2, "v2": 1}
+        assert cache.evict_prompt_version("v1") == 2
+        assert cache.evict_other_versions("v2") == 0
+        assert cache.version_counts() == {"v2": 1}
+
+    def test_eviccion_lru(self, tmp_path):
+        cache = LLMCache(path=tmp_path / "llm.db", max_entries=10)
+        for i in range(12):
+            cache.put(cache.make_key("v1", "m", OPTIONS, str(i)), "v1", "m", "{}")
+        assert cache.stats()["entries"] <= 10
+        assert cache.evictions > 0
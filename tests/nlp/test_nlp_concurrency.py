@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests de la etapa LLM concurrente de NLPExtractorV11 (session.post falso, sin Ollama)."""
+
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+pytest.importorskip("sentence_transformers")  # via skills_implicit_extractor
+requests = pytest.importorskip("requests")
+
+import process_nlp_from_db_v11
+from process_nlp_from_db_v11 import NLPExtractorV11
+from nlp_work_queue import NLPWorkQueue
+
+N_OFERTAS = 12
+
+
+def delay_de(i):
+    """Las primeras ofertas tardan mas: terminan despues que las siguientes."""
+    return 0.02 * (N_OFERTAS - i)
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+def ofertas(n):
+    return [(str(i), f"Se busca puesto {i} con experiencia.", f"Puesto {i}", "Empresa",
+             "CABA", "2026-10-01", None) for i in range(n)]
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    db = tmp_path / "t.db"
+    sqlite3.connect(str(db)).close()
+    return NLPExtractorV11(db_path=str(db), enable_implicit_skills=False, use_llm_cache=False,
+                           near_duplicates=False, compress_prompt=False)
+
+
+@pytest.fixture
+def fake_post(monkeypatch):
+    """Reemplaza Session.post (la sesion se recrea al fijar la concurrencia)."""
+    calls = {"en_vuelo": 0, "max_en_vuelo": 0, "sesiones": set(), "timeouts": set()}
+    lock = threading.Lock()
+
+    def post(self, url, **kwargs):
+        i = int(re.search(r"Puesto (\d+)", kwargs["json"]["prompt"]).group(1))
+        with lock:
+            calls["sesiones"].add(id(self))
+            calls["timeouts"].add(kwargs["timeout"])
+            calls["en_vuelo"] += 1
+            calls["max_en_vuelo"] = max(calls["max_en_vuelo"], calls["en_vuelo"])
+        time.sleep(delay_de(i))
+        with lock:
+            calls["en_vuelo"] -= 1
+        body = {"titulo_ocupacion": f"Puesto {i}", "experiencia_min_anios": i}
+        return FakeResponse({"response": json.dumps(body), "prompt_eval_count": 100})
+
+    monkeypatch.setattr(requests.Session, "post", post)
+    return calls
+
+
+class TestConcurrentLLM:
+    def test_orden_tiempos_y_stats(self, extractor, fake_post):
+        filas = ofertas(N_OFERTAS)
+        start = time.time()
+        results, times, pipeline = extractor._run_ofertas(
+            filas, save_to_db=False, concurrency=4, staged=False, stage_batch_size=8
+        )
+        wall = time.time() - start
+
+        # Mismo orden que la entrada aunque las respuestas lleguen al reves
+        assert [r["id_oferta"] for r in results] == [f[0] for f in filas]
+        assert [r["extracted_data"]["experiencia_min_anios"] for r in results] == list(range(N_OFERTAS))
+        assert pipeline is None
+        assert len(times) == N_OFERTAS
+
+        # llm_time_ms es el de cada llamada, no el acumulado
+        for i, r in enumerate(results):
+            assert delay_de(i) * 1000 * 0.9 <= r["llm_time_ms"] < delay_de(i) * 1000 + 150
+
+        assert extractor.stats["llm_calls"] == N_OFERTAS
+        assert extractor.stats["total_success"] == N_OFERTAS
+        assert extractor.stats["total_processed"] == N_OFERTAS
+        assert extractor.stats["prompt_tokens"] == 100 * N_OFERTAS
+
+        # Las llamadas se solapan: menos que la suma de los delays
+        assert 1 < fake_post["max_en_vuelo"] <= 4
+        assert wall < sum(delay_de(i) for i in range(N_OFERTAS))
+
+    @pytest.mark.parametrize("parallel,llm_timeout,esperado", [
+        (None, None, 240),  # 4 en vuelo contra un slot: hasta 3 respuestas de espera en cola
+        ("2", None, 120),
+        ("8", None, 60),
+        (None, 30, 30),     # --llm-timeout explicito no se escala
+    ])
+    def test_timeout_de_lectura_escala_con_la_concurrencia(self, tmp_path, fake_post, monkeypatch,
+                                                           parallel, llm_timeout, esperado):
+        if parallel is None:
+            monkeypatch.delenv("OLLAMA_NUM_PARALLEL", raising=False)
+        else:
+            monkeypatch.setenv("OLLAMA_NUM_PARALLEL", parallel)
+        db = tmp_path / "t.db"
+        sqlite3.connect(str(db)).close()
+        extractor = NLPExtractorV11(db_path=str(db), enable_implicit_skills=False, use_llm_cache=False,
+                                    near_duplicates=False, compress_prompt=False, llm_timeout=llm_timeout)
+
+        extractor._run_ofertas(ofertas(4), save_to_db=False, concurrency=4, staged=False, stage_batch_size=8)
+
+        assert fake_post["timeouts"] == {(NLPExtractorV11.LLM_CONNECT_TIMEOUT, esperado)}
+
+
+def crear_db(path, n):
+    conn = sqlite3.connect(str(path))
+    conn.execute("""
+        CREATE TABLE ofertas (id_oferta TEXT PRIMARY KEY, descripcion TEXT, titulo TEXT, empresa TEXT,
+                              localizacion TEXT, fecha_publicacion_datetime TEXT, id_empresa TEXT)
+    """)
+    conn.execute("CREATE TABLE ofertas_nlp (id_oferta TEXT PRIMARY KEY, nlp_version TEXT, "
+                 "nlp_extraction_timestamp TEXT, fecha_publicacion TEXT, experiencia_min_anios INTEGER)")
+    for i in range(n):
+        descripcion = f"Se busca puesto {i} para planta industrial. " * 4
+        conn.execute("INSERT INTO ofertas VALUES (?, ?, ?, 'Empresa', 'CABA', '2026-10-01', NULL)",
+                     (str(i), descripcion, f"Puesto {i}"))
+    conn.commit()
+    conn.close()
+
+
+class TestProcessRun:
+    @pytest.mark.parametrize("staged", [False, True])
+    def test_una_sesion_y_pipeline_para_toda_la_corrida(self, tmp_path, fake_post, monkeypatch, capsys, staged):
+        crear_db(tmp_path / "run.db", N_OFERTAS)
+        extractor = NLPExtractorV11(db_path=str(tmp_path / "run.db"), enable_implicit_skills=False,
+                                    use_llm_cache=False, near_duplicates=False, compress_prompt=False)
+        monkeypatch.setattr(extractor, "_get_run_tracker", lambda: None)
+
+        creados = []
+
+        class ContarPipelines(process_nlp_from_db_v11.StagedNLPPipeline):
+            def __init__(self, *args, **kwargs):
+                creados.append(self)
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(process_nlp_from_db_v11, "StagedNLPPipeline", ContarPipelines)
+
+        summary = extractor.process_run(limit=N_OFERTAS, concurrency=4, staged=staged,
+                                        stage_batch_size=4, chunk_size=5)
+
+        assert summary["cola"]["hecho"] == N_OFERTAS
+        assert len(summary["results"]) == N_OFERTAS
+        assert len(fake_post["sesiones"]) == 1
+        assert len(creados) == (1 if staged else 0)
+        # Una tanda de 5 se checkpointea al guardarse su ultima oferta: 5 + 5 + 2
+        assert capsys.readouterr().out.count("[RUN] Checkpoint") == 3
+
+        conn = sqlite3.connect(str(tmp_path / "run.db"))
+        assert conn.execute("SELECT COUNT(*) FROM ofertas_nlp").fetchone()[0] == N_OFERTAS
+        conn.close()
+        assert NLPWorkQueue(tmp_path / "run.db", summary["run_id"]).is_finished()
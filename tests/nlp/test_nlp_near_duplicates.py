@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del indice de casi-duplicados para reuso de extracciones NLP."""
+
+import sqlite3
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+import pytest
+
+pytest.importorskip("datasketch")
+
+from nlp_near_duplicates import NearDuplicateIndex, shingles
+from nlp_raw_store import ensure_table, write_raw
+
+DESCRIPCION = (
+    "Importante empresa de logistica busca operario de deposito para la zona de "
+    "Pilar. Tareas: carga y descarga de mercaderia, control de stock, armado de "
+    "pedidos y manejo de autoelevador. Requisitos: secundario completo, "
+    "experiencia minima de dos anios, disponibilidad horaria full time."
+)
+
+SCHEMA = {"skills_tecnicas_list": list, "nivel_educativo": str, "provincia": str}
+TITULO = "Operario de deposito"
+
+
+def crear_db(path):
+    """Donante 100 con raw, 101 sin raw (con conteo de implicitas) y 102 sin raw ni conteo."""
+    conn = sqlite3.connect(str(path))
+    conn.execute("""
+        CREATE TABLE ofertas (id_oferta TEXT PRIMARY KEY, titulo TEXT, descripcion TEXT, empresa TEXT,
+                              localizacion TEXT, fecha_publicacion_datetime TEXT, id_empresa TEXT)
+    """)
+    conn.execute("""
+        CREATE TABLE ofertas_nlp (id_oferta TEXT PRIMARY KEY, nlp_version TEXT, skills_tecnicas_list TEXT,
+                                  nivel_educativo TEXT, provincia TEXT, nlp_reused_from TEXT,
+                                  skills_implicitas_count INTEGER)
+    """)
+    ensure_table(conn)
+    otra = DESCRIPCION.replace("Pilar", "Escobar").replace("dos anios", "un anio")
+    tercera = DESCRIPCION.replace("Pilar", "Moreno").replace("secundario", "terciario")
+    filas = [("100", DESCRIPCION, "2026-10-03", 1), ("101", otra, "2026-10-02", 1), ("102", tercera, "2026-10-01", None)]
+    for id_oferta, descripcion, fecha, implicitas in filas:
+        conn.execute("INSERT INTO ofertas VALUES (?, ?, ?, 'Empresa', 'Pilar, Buenos Aires', ?, NULL)",
+                     (id_oferta, TITULO, descripcion, fecha))
+        # Post-procesado: las skills de BGE-M3 quedan al final de la lista
+        conn.execute("INSERT INTO ofertas_nlp VALUES (?, '11.3.0', 'autoelevador; control de stock', "
+                     "'secundario', 'Buenos Aires', NULL, ?)", (id_oferta, implicitas))
+    write_raw(conn.cursor(), "100", "11.3.0", {
+        "regex": {}, "llm": {"skills_tecnicas_list": ["autoelevador"], "nivel_educativo": "secundario"},
+        "reused_from": None, "prompt_tokens_ahorrados": None,
+    })
+    conn.commit()
+    return conn
+
+
+class TestNearDuplicateIndex:
+    def test_shingles(self):
+        assert shingles("Operario", "de deposito") == {"operario de deposito"}
+        assert shingles("", "corto") == set()
+
+    def test_reusa_repost_casi_identico(self):
+        index = NearDuplicateIndex(threshold=0.8)
+        index.add("100", "Operario de deposito", DESCRIPCION,
+                  {"provincia": "Buenos Aires", "skills_tecnicas_list": ["autoelevador"]})
+
+        repost = DESCRIPCION + " Postulate en nuestro portal."
+        match = index.find("Operario de deposito", repost, exclude_id="200")
+        assert match is not None
+        source_id, fields, similarity = match
+        assert source_id == "100"
+        assert similarity >= 0.8
+        # La ubicacion no se hereda
+        assert fields == {"skills_tecnicas_list": ["autoelevador"]}
+
+    def test_no_reusa_texto_distinto_ni_a_si_misma(self):
+        index = NearDuplicateIndex(threshold=0.8)
+        index.add("100", "Operario de deposito", DESCRIPCION, {"nivel_educativo": "secundario"})
+
+        assert index.find("Operario de deposito", DESCRIPCION, exclude_id="100") is None
+        otra = "Estudio contable incorporara analista de impuestos con experiencia en liquidacion de IVA y ganancias"
+        assert index.find("Analista contable", otra) is None
+        assert index.stats()["reused"] == 0
+
+    def test_donantes_desde_bd_sin_skills_implicitas(self, tmp_path):
+        conn = crear_db(tmp_path / "t.db")
+        index = NearDuplicateIndex(threshold=0.95)
+        assert index.load_from_db(conn, "11.3.0", SCHEMA) == 2
+        # 102 sin raw ni skills_implicitas_count: no se sabe cuales son del LLM
+        assert set(index.donors) == {"100", "101"}
+
+        # Con raw: el JSON del LLM tal cual
+        assert index.donors["100"][1] == {"skills_tecnicas_list": ["autoelevador"], "nivel_educativo": "secundario"}
+        # Sin raw: columnas menos las implicitas del final
+        assert index.donors["101"][1]["skills_tecnicas_list"] == ["autoelevador"]
+        assert "provincia" not in index.donors["101"][1]
+
+
+class FakeSkillsExtractor:
+    """Suma una skill implicita fija (en vez de BGE-M3)."""
+
+    def get_skills_for_offer(self, skills_declaradas, tareas_explicitas, merge=True):
+        implicitas = [{"skill_esco": "control de stock"}]
+        nuevas = [s for s in implicitas if s["skill_esco"] not in skills_declaradas]
+        return list(skills_declaradas) + [s["skill_esco"] for s in nuevas], nuevas
+
+
+class TestNearDuplicateReuse:
+    def test_reuso_desde_bd_no_duplica_implicitas(self, tmp_path):
+        pytest.importorskip("sentence_transformers")  # via process_nlp_from_db_v11
+        from process_nlp_from_db_v11 import NLPExtractorV11
+
+        conn = crear_db(tmp_path / "t.db")
+        conn.close()
+        extractor = NLPExtractorV11(db_path=str(tmp_path / "t.db"), enable_implicit_skills=False,
+                                    use_llm_cache=False, near_dup_threshold=0.8, compress_prompt=False)
+        extractor.skills_extractor = FakeSkillsExtractor()
+        assert "100" in extractor.near_dups.donors
+
+        repost = DESCRIPCION + " Postulate en nuestro portal."
+        regex_data, timings, reuse, _ = extractor._prepare_oferta(repost, TITULO, id_oferta="200")
+        assert reuse is not None and reuse[0] == "100"
+        # Skills del LLM del donante, sin la implicita que se le sumo al guardarlo
+        assert reuse[1]["skills_tecnicas_list"] == ["autoelevador"]
+
+        llm_data = dict(reuse[1], tareas_explicitas="carga y descarga de mercaderia")
+        result = extractor._finish_oferta("200", repost, TITULO, "Pilar, Buenos Aires", "2026-10-04", None,
+                                          regex_data, llm_data, 0, 0, reused_from=reuse[0])
+        skills = result["extracted_data"]["skills_tecnicas_list"]
+        assert skills.count("control de stock") == 1
+        assert result["extracted_data"]["skills_implicitas_count"] == 1
+        assert result["reused_from"] == "100"
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de nlp_raw_store (salidas crudas + replay del postprocessor).
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+import pytest
+
+from nlp_postprocessor import NLPPostprocessor
+from nlp_raw_store import (FETCH_BATCH, REPLAY_CHUNKSIZE, ensure_table, fetch_raw, merge_capas, pack,
+                           replay_rows, unpack, write_raw)
+
+DESCRIPCION = (
+    "Empresa de consumo masivo busca Analista de Compras. Requisitos: experiencia "
+    "de 3 anios en compras, manejo de Excel avanzado y SAP. Jornada completa."
+)
+PAYLOAD = {
+    "regex": {"jornada_laboral": "full_time"},
+    "llm": {
+        "titulo_ocupacion": "Analista de Compras",
+        "experiencia_min_anios": 3,
+        "skills_tecnicas_list": ["compras", "negociacion"],
+        "tecnologias_list": ["SAP"],
+        "herramientas_list": ["Excel"],
+        "tareas_explicitas": "gestionar ordenes de compra; evaluar proveedores",
+    },
+    "reused_from": None,
+    "prompt_tokens_ahorrados": 12,
+}
+
+
+def crear_db(path, n):
+    conn = sqlite3.connect(str(path))
+    conn.execute("""
+        CREATE TABLE ofertas (id_oferta TEXT PRIMARY KEY, descripcion TEXT, titulo TEXT,
+                              localizacion TEXT, fecha_publicacion_datetime TEXT, id_empresa TEXT)
+    """)
+    ensure_table(conn)
+    cursor = conn.cursor()
+    for i in range(n):
+        cursor.execute("INSERT INTO ofertas VALUES (?, ?, ?, ?, ?, ?)",
+                       (str(i), DESCRIPCION, "Analista de Compras", "Capital Federal, Buenos Aires",
+                        "2026-10-01", None))
+        write_raw(cursor, str(i), "11.3.0", PAYLOAD)
+    conn.commit()
+    return conn
+
+
+class TestNLPRawStore:
+
+    def test_pack_roundtrip_comprime(self):
+        blob = pack(PAYLOAD)
+        assert unpack(blob) == PAYLOAD
+        assert isinstance(blob, bytes)
+
+    def test_fetch_filtra_version_e_ids(self, tmp_path):
+        conn = crear_db(tmp_path / "t.db", 3)
+        write_raw(conn.cursor(), "2", "10.0.0", PAYLOAD)
+
+        jobs = list(fetch_raw(conn, "11.3.0"))
+        assert sorted(j[0] for j in jobs) == ["0", "1"]
+        assert jobs[0][1] == PAYLOAD
+        assert [j[0] for j in fetch_raw(conn, "11.3.0", ids=["1"])] == ["1"]
+
+    def test_replay_igual_a_corrida_en_vivo(self, tmp_path):
+        conn = crear_db(tmp_path / "t.db", 4)
+        esperado = merge_capas(NLPPostprocessor(), PAYLOAD["regex"], PAYLOAD["llm"],
+                               "Analista de Compras", "Capital Federal, Buenos Aires", DESCRIPCION)
+        esperado["nlp_reused_from"] = None
+        esperado["prompt_tokens_ahorrados"] = 12
+
+        secuencial = list(replay_rows(fetch_raw(conn, "11.3.0"), workers=1))
+        paralelo = list(replay_rows(fetch_raw(conn, "11.3.0"), workers=2))
+
+        assert [r[0] for r in paralelo] == ["0", "1", "2", "3"]
+        for id_oferta, fecha, final_data, error in secuencial + paralelo:
+            assert error is None
+            assert fecha == "2026-10-01"
+            assert final_data == esperado
+
+    def test_fetch_no_bloquea_escrituras_entre_paginas(self, tmp_path):
+        n = FETCH_BATCH + 20
+        conn = crear_db(tmp_path / "t.db", n)
+        conn.execute("CREATE TABLE escrituras (id_oferta TEXT)")
+        conn.commit()
+
+        otra = sqlite3.connect(str(tmp_path / "t.db"), timeout=0.2)
+        leidos = 0
+        for job in fetch_raw(conn, "11.3.0"):
+            leidos += 1
+            if leidos % 100 == 0:
+                # Como save_many_to_db: otra conexion escribe y commitea mientras se itera
+                otra.execute("INSERT INTO escrituras VALUES (?)", (job[0],))
+                otra.commit()
+        otra.close()
+
+        assert leidos == n
+        assert conn.execute("SELECT COUNT(*) FROM escrituras").fetchone()[0] == n // 100
+
+    def test_replay_paralelo_lee_jobs_a_demanda(self, tmp_path):
+        conn = crear_db(tmp_path / "t.db", 1)
+        job = next(fetch_raw(conn, "11.3.0"))
+        consumidos = []
+
+        def jobs():
+            for i in range(REPLAY_CHUNKSIZE * 10):
+                consumidos.append(i)
+                yield (str(i),) + job[1:]
+
+        replay = replay_rows(jobs(), workers=2)
+        primero = next(replay)
+        assert primero[0] == "0"
+        # 2 * workers lotes en vuelo + el que se encola al entregar el primero
+        assert len(consumidos) <= REPLAY_CHUNKSIZE * 5
+        resto = list(replay)
+        assert [r[0] for r in [primero] + resto] == [str(i) for i in range(REPLAY_CHUNKSIZE * 10)]
+
+
+class TestReplayPostprocess:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_replay_guarda_mas_de_un_lote(self, tmp_path, workers):
+        pytest.importorskip("sentence_transformers")  # via process_nlp_from_db_v11
+        import process_nlp_from_db_v11
+        from process_nlp_from_db_v11 import NLPExtractorV11
+
+        # El primer lote se escribe con la lectura de ofertas_nlp_raw a mitad de camino
+        n = process_nlp_from_db_v11.REPLAY_CHUNK + 37
+        conn = crear_db(tmp_path / "t.db", n)
+        conn.execute("CREATE TABLE ofertas_nlp (id_oferta TEXT PRIMARY KEY, nlp_version TEXT, "
+                     "nlp_extraction_timestamp TEXT, fecha_publicacion TEXT, experiencia_min_anios INTEGER)")
+        conn.commit()
+        conn.close()
+
+        extractor = NLPExtractorV11(db_path=str(tmp_path / "t.db"), enable_implicit_skills=False,
+                                    use_llm_cache=False, near_duplicates=False)
+        summary = extractor.replay_postprocess(workers=workers)
+
+        assert summary["total"] == n
+        assert summary["success"] == n
+        conn = sqlite3.connect(str(tmp_path / "t.db"))
+        assert conn.execute("SELECT COUNT(*) FROM ofertas_nlp WHERE experiencia_min_anios = 3").fetchone()[0] == n
+        conn.close()
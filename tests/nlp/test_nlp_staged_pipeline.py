@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del pipeline NLP por etapas (extractor falso, sin Ollama ni BD)."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+from nlp_staged_pipeline import StagedNLPPipeline
+
+
+class FakeExtractor:
+    """Implementa los metodos de NLPExtractorV11 que usa el pipeline."""
+
+    def __init__(self, llm_delay: float = 0.01):
+        self.llm_delay = llm_delay
+        self.skills_extractor = None
+        self.saved = []
+        self.stats = {"total_processed": 0, "total_errors": 0}
+        self.en_vuelo = 0
+        self.max_en_vuelo = 0
+        self._lock = threading.Lock()
+
+    def _add_stat(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def _prepare_oferta(self, descripcion, titulo, id_oferta=None):
+        if id_oferta == "falla":
+            raise ValueError("regex rota")
+        return {"modalidad": "presencial"}, {"llm_time_ms": 0}, None, descripcion
+
+    def _extract_capa1_llm(self, titulo, empresa, ubicacion, descripcion, timings=None):
+        with self._lock:
+            self.en_vuelo += 1
+            self.max_en_vuelo = max(self.max_en_vuelo, self.en_vuelo)
+        time.sleep(self.llm_delay)
+        with self._lock:
+            self.en_vuelo -= 1
+        timings["llm_time_ms"] = int(self.llm_delay * 1000)
+        return {"titulo_ocupacion": titulo}
+
+    def _finish_oferta(self, id_oferta, descripcion, titulo, ubicacion, fecha, id_empresa,
+                       regex_data, llm_data, llm_time_ms, elapsed_ms, reused_from=None, compression=None):
+        return {
+            "id_oferta": id_oferta,
+            "extracted_data": {**llm_data, **regex_data},
+            "processing_time_ms": elapsed_ms,
+            "llm_time_ms": llm_time_ms,
+        }
+
+    def save_many_to_db(self, rows):
+        self.saved.extend(rows)
+        return len(rows)
+
+
+def ofertas(n):
+    return [(str(i), "descripcion", f"Puesto {i}", "Empresa", "CABA", "2026-10-01", None) for i in range(n)]
+
+
+class TestStagedNLPPipeline:
+    def test_procesa_y_guarda_todas(self):
+        extractor = FakeExtractor()
+        pipeline = StagedNLPPipeline(extractor, concurrency=4, batch_size=5, report_every=0)
+        results, times = pipeline.run(ofertas(40))
+
+        assert len(results) == 40
+        assert sorted(r[0] for r in extractor.saved) == sorted(str(i) for i in range(40))
+        assert extractor.stats["total_processed"] == 40
+        # Las llamadas LLM se solapan (pool de 4 hilos)
+        assert 1 < extractor.max_en_vuelo <= 4
+
+    def test_metricas_por_etapa(self):
+        pipeline = StagedNLPPipeline(FakeExtractor(), concurrency=2, batch_size=4, report_every=0)
+        pipeline.run(ofertas(20))
+        metrics = pipeline.metrics()
+
+        assert list(metrics) == ["preparar", "llm", "postprocess", "escritura"]
+        for m in metrics.values():
+            assert m["items"] == 20
+            assert m["ofertas_por_seg"] > 0
+        # Cola acotada: la cola llm nunca supera 2 * concurrency
+        assert metrics["llm"]["cola_max"] <= 4
+
+    def test_error_en_una_oferta_no_frena_el_pipeline(self):
+        extractor = FakeExtractor(llm_delay=0)
+        filas = ofertas(5) + [("falla", "d", "t", "e", "l", None, None)]
+        pipeline = StagedNLPPipeline(extractor, concurrency=2, save_to_db=False, report_every=0)
+        results, _ = pipeline.run(filas)
+
+        assert len(results) == 5
+        assert extractor.stats["total_errors"] == 1
+        assert extractor.saved == []
+
+    def test_generador_on_written_y_varias_corridas(self):
+        extractor = FakeExtractor(llm_delay=0)
+        escritas = []
+        pipeline = StagedNLPPipeline(extractor, concurrency=2, batch_size=3, report_every=0,
+                                     on_written=escritas.extend)
+
+        results, _ = pipeline.run((fila for fila in ofertas(7)), total=10)
+        assert len(results) == 7
+        assert sorted(str(f[0]) for f, _ in escritas) == [str(i) for i in range(7)]
+        assert all(r is not None for _, r in escritas)
+
+        # Mismo pipeline: devuelve solo lo de esta llamada
+        results, _ = pipeline.run(ofertas(3), offset=7, total=10)
+        assert len(results) == 3
+        assert len(escritas) == 10
+        assert pipeline.metrics()["escritura"]["items"] == 10
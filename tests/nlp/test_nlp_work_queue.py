@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de NLPWorkQueue (cola durable de corridas NLP reanudables).
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+from nlp_work_queue import NLPWorkQueue
+
+
+class TestNLPWorkQueue:
+
+    def test_claim_done_y_fin(self, tmp_path):
+        queue = NLPWorkQueue(tmp_path / "q.db", "run_test")
+        assert queue.enqueue(["1", "2", "3"]) == 3
+        assert queue.enqueue(["1"]) == 0
+
+        ids = queue.claim(2)
+        assert ids == ["1", "2"]
+        assert queue.counts()["en_proceso"] == 2
+
+        queue.mark_done(ids)
+        assert queue.claim(5) == ["3"]
+        queue.mark_done(["3"])
+
+        counts = queue.counts()
+        assert counts["hecho"] == 3 and counts["total"] == 3
+        assert queue.is_finished()
+        assert NLPWorkQueue.latest_unfinished_run(tmp_path / "q.db") is None
+
+    def test_reintentos_hasta_max(self, tmp_path):
+        queue = NLPWorkQueue(tmp_path / "q.db", "run_test", max_intentos=2)
+        queue.enqueue(["1", "2"])
+
+        queue.claim(2)
+        queue.mark_failed(["1"], "LLM sin respuesta")
+        queue.mark_failed(["2"], "sin descripcion", final=True)
+        assert queue.counts()["reintentables"] == 1
+
+        assert queue.claim(5) == ["1"]
+        queue.mark_failed(["1"], "LLM sin respuesta")
+        assert queue.claim(5) == []
+        assert queue.counts()["fallido"] == 2
+        assert queue.is_finished()
+
+    def test_lease_vencido_se_libera(self, tmp_path):
+        db = tmp_path / "q.db"
+        muerto = NLPWorkQueue(db, "run_test", lease_seconds=3600)
+        muerto.enqueue(["1", "2"])
+        assert muerto.claim(2) == ["1", "2"]
+
+        # Otro proceso reanuda: el lease sigue vigente
+        otro = NLPWorkQueue(db, "run_test")
+        otro.worker = "otro-host:1"
+        assert otro.claim(5) == []
+        assert NLPWorkQueue.latest_unfinished_run(db) == "run_test"
+
+        # Lease vencido -> vuelve a pendiente
+        conn = muerto._connect()
+        conn.execute("UPDATE nlp_work_queue SET lease_until = ?", (time.time() - 1,))
+        conn.close()
+        assert otro.claim(5) == ["1", "2"]
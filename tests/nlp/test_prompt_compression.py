@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests de la compresion del prompt por secciones (sin LLM)."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "database"))
+
+from prompt_compression import compress_description, INTRO_MAX_CHARS
+
+OFERTA = """Buscamos un Analista de Compras para nuestra planta de Pilar.
+Responsabilidades:
+- Gestionar ordenes de compra y seguimiento de entregas
+- Negociar condiciones comerciales con proveedores
+Requisitos:
+- Contador o Lic. en Administracion
+- 3 anios de experiencia en compras industriales
+- Manejo de SAP MM
+Beneficios:
+- Prepaga para el grupo familiar
+- Comedor en planta
+Somos una empresa que promueve la igualdad de oportunidades.
+Postulate aqui con tu CV actualizado.
+Somos una empresa que promueve la igualdad de oportunidades."""
+
+
+class TestPromptCompression:
+    def test_descarta_beneficios_y_boilerplate(self):
+        texto, info = compress_description(OFERTA)
+        assert "SAP MM" in texto
+        assert "Gestionar ordenes de compra" in texto
+        assert "Prepaga" not in texto
+        assert "igualdad de oportunidades" not in texto
+        assert "Postulate" not in texto
+        assert info["secciones_descartadas"] == ["beneficios"]
+        assert info["lineas_descartadas"] == 3
+        assert info["tokens_ahorrados_est"] > 0
+
+    def test_recorta_intro_larga_conservando_ultima_linea(self):
+        blurb = "Somos una empresa lider en consumo masivo con presencia regional. " * 12
+        texto, info = compress_description(blurb + "\n" + OFERTA)
+        assert info["intro_recortada"]
+        assert "Buscamos un Analista de Compras" in texto
+        assert texto.index("Responsabilidades:") < INTRO_MAX_CHARS + 100
+
+    def test_sin_estructura_no_recorta(self):
+        texto = "Vendedor para local de ropa en Rosario con experiencia en atencion al publico. " * 4
+        comprimido, info = compress_description(texto)
+        assert comprimido == texto.strip()
+        assert info["tokens_ahorrados_est"] == 0
+
+    def test_beneficios_corta_en_header_sin_dos_puntos(self):
+        oferta = """Buscamos un Tecnico de Mantenimiento para planta en Campana.
+Beneficios:
+- Prepaga para el grupo familiar
+- Comedor en planta
+Requisitos
+- Tecnico electromecanico recibido
+- Experiencia en mantenimiento preventivo de lineas de envasado
+Funciones
+- Mantenimiento de tableros electricos y PLC"""
+        texto, info = compress_description(oferta)
+        assert info["secciones_descartadas"] == ["beneficios"]
+        assert "Prepaga" not in texto
+        assert "Tecnico electromecanico recibido" in texto
+        assert "mantenimiento preventivo" in texto
+        assert "tableros electricos y PLC" in texto
+
+    def test_condiciones_dentro_de_oracion_no_es_header(self):
+        oferta = """Buscamos un Chofer profesional con carnet E1 para reparto en zona norte del conurbano.
+Trabajaras en las siguientes condiciones: jornada de lunes a viernes de 8 a 17 hs en relacion de dependencia.
+Requisitos:
+- Carnet profesional E1 vigente
+- Experiencia de dos anios en reparto urbano
+
+Te ofrecemos:
+Obra social y bono anual por presentismo
+
+Enviar consultas sobre la ruta al supervisor de turno."""
+        texto, info = compress_description(oferta)
+        assert "lunes a viernes de 8 a 17" in texto
+        assert "Carnet profesional E1" in texto
+        # Beneficios termina en la linea en blanco
+        assert "Obra social" not in texto
+        assert "supervisor de turno" in texto